@@ -22,7 +22,7 @@ from typing import Any, Dict, List, Optional, Tuple
 log = logging.getLogger(__name__)
 
 from ouroboros.utils import (
-    utc_now_iso, read_text, append_jsonl,
+    utc_now_iso, read_text, append_jsonl, flush_jsonl,
     safe_relpath, truncate_for_log,
     get_git_info, sanitize_task_for_event,
 )
@@ -460,6 +460,8 @@ class OuroborosAgent:
             if heartbeat_stop is not None:
                 heartbeat_stop.set()
             self._current_task_type = None
+            # Task end: make this task's logs visible to other processes
+            flush_jsonl()
 
     # =====================================================================
     # Task result emission
@@ -487,6 +489,7 @@ class OuroborosAgent:
         n_tool_calls = len(llm_trace.get("tool_calls", []))
         n_tool_errors = sum(1 for tc in llm_trace.get("tool_calls", [])
                             if isinstance(tc, dict) and tc.get("is_error"))
+        read_cache = self.tools._ctx.read_cache.stats()
         try:
             append_jsonl(drive_logs / "events.jsonl", {
                 "ts": utc_now_iso(), "type": "task_eval", "ok": True,
@@ -495,6 +498,7 @@ class OuroborosAgent:
                 "tool_calls": n_tool_calls,
                 "tool_errors": n_tool_errors,
                 "response_len": len(text),
+                "read_cache": read_cache,
             })
         except Exception:
             log.warning("Failed to log task eval event", exc_info=True)
@@ -505,6 +509,7 @@ class OuroborosAgent:
             "task_id": task.get("id"), "task_type": task.get("type"),
             "duration_sec": duration_sec,
             "tool_calls": n_tool_calls, "tool_errors": n_tool_errors,
+            "read_cache": read_cache,
             "cost_usd": round(float(usage.get("cost") or 0), 6),
             "prompt_tokens": int(usage.get("prompt_tokens") or 0),
             "completion_tokens": int(usage.get("completion_tokens") or 0),
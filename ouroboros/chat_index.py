@@ -0,0 +1,377 @@
+"""
+Ouroboros — Chat search index.
+
+Incremental inverted index over the live chat log (logs/chat.jsonl) and all
+rotated archives (archive/chat_*.jsonl), stored on the drive under
+index/chat/. Each refresh indexes only bytes appended since the last one and
+only appends to the index files; nothing already written is rewritten.
+
+Layout:
+    header.json        small: sources (path, indexed bytes, fingerprint, doc
+                       and token counts) and the committed byte length of
+                       every file below
+    docs.jsonl         one line per doc: [source, byte offset, length, ts, tokens]
+    postings_XX.jsonl  one delta line per refresh that touched the shard:
+                       {token: [doc, tf, doc, tf, ...]}, sharded by token hash,
+                       so a query loads only the shards of its own tokens
+
+Readers read each file only up to the length committed in the header, so a
+half-finished append is invisible; the next writer truncates it away. The
+parsed docs and shards are cached per process and extended incrementally.
+
+When the live log is rotated its indexed docs are re-pointed at the archive
+that now holds the same bytes (matched by first-line fingerprint), so
+rotation costs nothing to re-index. A source that disappeared is marked
+dropped in the header and its docs are filtered out at query time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import pathlib
+import re
+import threading
+import uuid
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+N_SHARDS = 64
+LIVE_SOURCE = "logs/chat.jsonl"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(str(text or "").lower()) if len(t) > 1 or t.isdigit()]
+
+
+def _shard_of(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) % N_SHARDS
+
+
+def _fingerprint(path: pathlib.Path) -> str:
+    try:
+        with path.open("rb") as f:
+            first = f.readline()
+    except FileNotFoundError:
+        return ""
+    return hashlib.sha256(first).hexdigest()[:16] if first.endswith(b"\n") else ""
+
+
+def _atomic_write_json(path: pathlib.Path, obj: Any) -> None:
+    tmp = path.with_name(f".{path.name}.tmp.{uuid.uuid4().hex}")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(str(tmp), str(path))
+
+
+def _append_committed(path: pathlib.Path, committed: int, data: bytes) -> int:
+    """Append data after the committed length (dropping any uncommitted tail). Returns the new length."""
+    with path.open("ab") as f:
+        if f.tell() != committed:
+            f.truncate(committed)
+            f.seek(committed)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return committed + len(data)
+
+
+def _read_range(path: pathlib.Path, start: int, end: int) -> bytes:
+    if end <= start:
+        return b""
+    with path.open("rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+class ChatIndex:
+    """Inverted index over live and archived chat logs."""
+
+    def __init__(self, drive_root: pathlib.Path):
+        self.drive_root = pathlib.Path(drive_root)
+        self.index_dir = self.drive_root / "index" / "chat"
+        self._key = str(self.index_dir)
+
+    # --- Storage ---
+
+    def _header_path(self) -> pathlib.Path:
+        return self.index_dir / "header.json"
+
+    def _docs_path(self) -> pathlib.Path:
+        return self.index_dir / "docs.jsonl"
+
+    def _shard_path(self, shard: int) -> pathlib.Path:
+        return self.index_dir / f"postings_{shard:02d}.jsonl"
+
+    @staticmethod
+    def _empty_header() -> Dict[str, Any]:
+        return {"version": INDEX_VERSION, "epoch": uuid.uuid4().hex, "sources": [],
+                "n_docs": 0, "docs_bytes": 0, "shard_bytes": [0] * N_SHARDS}
+
+    def _state(self) -> Dict[str, Any]:
+        with _cache_lock:
+            return _cache.setdefault(self._key, {
+                "lock": threading.Lock(), "header_mtime": None, "header": None,
+                "epoch": None, "docs": [], "docs_bytes": 0, "shards": {},
+            })
+
+    def _load_header(self) -> Dict[str, Any]:
+        state = self._state()
+        try:
+            mtime = self._header_path().stat().st_mtime_ns
+        except FileNotFoundError:
+            return self._empty_header()
+        if state["header"] is not None and state["header_mtime"] == mtime:
+            return state["header"]
+        try:
+            header = json.loads(self._header_path().read_text(encoding="utf-8"))
+            if header.get("version") != INDEX_VERSION:
+                header = self._empty_header()
+        except Exception:
+            log.warning("Chat index header unreadable, rebuilding", exc_info=True)
+            header = self._empty_header()
+        state.update(header_mtime=mtime, header=header)
+        return header
+
+    def _sync_epoch(self, state: Dict[str, Any], header: Dict[str, Any]) -> None:
+        """Drop cached docs/shards that belong to another build of the index. Caller holds state lock."""
+        if state["epoch"] != header["epoch"]:
+            state.update(epoch=header["epoch"], docs=[], docs_bytes=0, shards={})
+
+    def _docs(self, header: Dict[str, Any]) -> List[List[Any]]:
+        """Doc table up to the committed length, parsing only what is new since the last call."""
+        state = self._state()
+        with state["lock"]:
+            self._sync_epoch(state, header)
+            end = header["docs_bytes"]
+            if end > state["docs_bytes"]:
+                data = _read_range(self._docs_path(), state["docs_bytes"], end)
+                state["docs"].extend(json.loads(line) for line in data.splitlines() if line.strip())
+                state["docs_bytes"] = end
+            return state["docs"]
+
+    def _load_shard(self, header: Dict[str, Any], shard: int) -> Dict[str, List[int]]:
+        state = self._state()
+        with state["lock"]:
+            self._sync_epoch(state, header)
+            read, data = state["shards"].get(shard, (0, {}))
+            end = header["shard_bytes"][shard]
+            if end > read:
+                try:
+                    chunk = _read_range(self._shard_path(shard), read, end)
+                    for line in chunk.splitlines():
+                        if line.strip():
+                            for token, plist in json.loads(line).items():
+                                data.setdefault(token, []).extend(plist)
+                    read = end
+                except Exception:
+                    log.debug(f"Chat index shard {shard} unreadable", exc_info=True)
+                state["shards"][shard] = (read, data)
+            return data
+
+    def _lock(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.index_dir / ".lock"), os.O_CREAT | os.O_RDWR, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                log.debug("flock unsupported for chat index lock", exc_info=True)
+        return fd
+
+    # --- Indexing ---
+
+    def _discover_sources(self) -> List[str]:
+        archives = sorted((self.drive_root / "archive").glob("chat_*.jsonl"))
+        return [str(p.relative_to(self.drive_root)) for p in archives] + [LIVE_SOURCE]
+
+    def refresh(self) -> Dict[str, Any]:
+        """Index whatever was appended or archived since the last refresh. Returns the header."""
+        header = self._load_header()
+        if not self._needs_refresh(header):
+            return header
+        fd = self._lock()
+        try:
+            header = json.loads(json.dumps(self._load_header()))  # private copy (small) under lock
+            if not self._header_path().exists():
+                self._remove_index_files()
+            docs_out: List[bytes] = []
+            deltas: Dict[int, Dict[str, List[int]]] = {}
+            self._handle_live_rotation(header)
+            known = {s["path"]: s for s in header["sources"]}
+            for rel in self._discover_sources():
+                src = known.get(rel)
+                if src is None:
+                    src = {"id": len(header["sources"]), "path": rel, "size": 0, "fingerprint": "",
+                           "docs": 0, "tokens": 0}
+                    header["sources"].append(src)
+                    known[rel] = src
+                self._index_source(header, src, docs_out, deltas)
+            if docs_out:
+                header["docs_bytes"] = _append_committed(self._docs_path(), header["docs_bytes"], b"".join(docs_out))
+            for shard, delta in deltas.items():
+                line = json.dumps(delta, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                header["shard_bytes"][shard] = _append_committed(
+                    self._shard_path(shard), header["shard_bytes"][shard], line)
+            _atomic_write_json(self._header_path(), header)  # commit
+            return header
+        finally:
+            os.close(fd)
+
+    def _remove_index_files(self) -> None:
+        """Starting a new build: clear files of an older or unreadable one (incl. v1 layout)."""
+        for pattern in ("docs.jsonl", "postings_*.jsonl", "postings_*.json", "meta.json"):
+            for p in self.index_dir.glob(pattern):
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _needs_refresh(self, header: Dict[str, Any]) -> bool:
+        known = {s["path"]: s for s in header["sources"]}
+        for rel in self._discover_sources():
+            src = known.get(rel)
+            try:
+                size = (self.drive_root / rel).stat().st_size
+            except FileNotFoundError:
+                continue
+            if src is None or size != src["size"]:
+                return True
+        return False
+
+    def _handle_live_rotation(self, header: Dict[str, Any]) -> None:
+        live = next((s for s in header["sources"] if s["path"] == LIVE_SOURCE), None)
+        if live is None or not live["size"]:
+            return
+        path = self.drive_root / LIVE_SOURCE
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size >= live["size"] and _fingerprint(path) == live["fingerprint"]:
+            return
+        # Rotated: the indexed bytes now live in an archive with the same first line.
+        known_paths = {s["path"] for s in header["sources"]}
+        for rel in self._discover_sources()[:-1]:
+            if rel not in known_paths and _fingerprint(self.drive_root / rel) == live["fingerprint"]:
+                live["path"] = rel
+                break
+        else:
+            live.update(path=f"(dropped){live['id']}", dropped=True)  # its docs are filtered at query time
+        header["sources"].append({"id": len(header["sources"]), "path": LIVE_SOURCE, "size": 0,
+                                  "fingerprint": "", "docs": 0, "tokens": 0})
+
+    def _index_source(self, header: Dict[str, Any], src: Dict[str, Any], docs_out: List[bytes],
+                      deltas: Dict[int, Dict[str, List[int]]]) -> None:
+        path = self.drive_root / src["path"]
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size <= src["size"]:
+            return
+        offset = src["size"]
+        with path.open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                line_offset, offset = offset, offset + len(raw)
+                try:
+                    entry = json.loads(raw)
+                except (ValueError, TypeError):
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                tokens = tokenize(entry.get("text", ""))
+                doc_id = header["n_docs"]
+                header["n_docs"] += 1
+                docs_out.append(json.dumps(
+                    [src["id"], line_offset, len(raw), str(entry.get("ts", ""))[:19], len(tokens)],
+                    ensure_ascii=False).encode("utf-8") + b"\n")
+                src["docs"] += 1
+                src["tokens"] += len(tokens)
+                for token, tf in Counter(tokens).items():
+                    deltas.setdefault(_shard_of(token), {}).setdefault(token, []).extend((doc_id, tf))
+        src["size"] = offset
+        if not src["fingerprint"]:
+            src["fingerprint"] = _fingerprint(path)
+
+    # --- Query ---
+
+    def search(self, query: str, count: int = 20, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """BM25-ranked search. Returns (total_matches, page of chat entries)."""
+        header = self.refresh()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not header["n_docs"]:
+            return 0, []
+        docs = self._docs(header)
+        dropped = {s["id"] for s in header["sources"] if s.get("dropped")}
+        live = [s for s in header["sources"] if not s.get("dropped")]
+        live_docs = sum(s["docs"] for s in live) or 1
+        avgdl = max(1.0, sum(s["tokens"] for s in live) / live_docs)
+        per_term: List[Dict[int, int]] = []
+        for term in terms:
+            plist = self._load_shard(header, _shard_of(term)).get(term, [])
+            per_term.append({plist[i]: plist[i + 1] for i in range(0, len(plist), 2)
+                             if plist[i] < len(docs) and docs[plist[i]][0] not in dropped})
+        # All terms must match; fall back to any term if nothing matches them all.
+        candidates = set.intersection(*(set(p) for p in per_term)) or set().union(*per_term)
+        scored: List[Tuple[float, int]] = []
+        for doc_id in candidates:
+            dl = docs[doc_id][4] or 1
+            score = 0.0
+            for postings in per_term:
+                tf = postings.get(doc_id)
+                if not tf:
+                    continue
+                idf = math.log(1 + (live_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                score += idf * tf * (_BM25_K1 + 1) / (tf + _BM25_K1 * (1 - _BM25_B + _BM25_B * dl / avgdl))
+            scored.append((score, doc_id))
+        scored.sort(key=lambda x: (x[0], x[1]), reverse=True)  # ties: newest first
+        page = scored[offset:offset + count]
+        return len(scored), self._read_entries(header, docs, page)
+
+    def _read_entries(self, header: Dict[str, Any], docs: List[List[Any]],
+                      page: List[Tuple[float, int]]) -> List[Dict[str, Any]]:
+        paths = {s["id"]: self.drive_root / s["path"] for s in header["sources"]}
+        out: List[Dict[str, Any]] = []
+        handles: Dict[int, Any] = {}
+        try:
+            for score, doc_id in page:
+                src_id, off, length = docs[doc_id][:3]
+                try:
+                    f = handles.get(src_id) or handles.setdefault(src_id, paths[src_id].open("rb"))
+                    f.seek(off)
+                    entry = json.loads(f.read(length))
+                except Exception:
+                    log.debug(f"Chat index: cannot read doc {doc_id}", exc_info=True)
+                    continue
+                entry["_score"] = round(score, 3)
+                out.append(entry)
+        finally:
+            for f in handles.values():
+                f.close()
+        return out
+
+
+def search_chat(drive_root: pathlib.Path, query: str, count: int = 20,
+                offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+    return ChatIndex(drive_root).search(query, count=count, offset=offset)
@@ -32,6 +32,8 @@ from ouroboros.utils import (
     truncate_for_log, sanitize_tool_result_for_log, sanitize_tool_args_for_log,
 )
 from ouroboros.llm import LLMClient, DEFAULT_LIGHT_MODEL
+from ouroboros import model_health
+from ouroboros.tool_pool import get_pool
 
 log = logging.getLogger(__name__)
 
@@ -175,7 +177,7 @@ class BackgroundConsciousness:
     def _think(self) -> None:
         """One thinking cycle: build context, call LLM, execute tools iteratively."""
         context = self._build_context()
-        model = self._model
+        model = model_health.pick(self._model)  # route around an open circuit
 
         tools = self._tool_schemas()
         messages = [
@@ -192,14 +194,35 @@ class BackgroundConsciousness:
             for round_idx in range(1, self._MAX_BG_ROUNDS + 1):
                 if self._paused:
                     break
-                msg, usage = self._llm.chat(
-                    messages=messages,
-                    model=model,
-                    tools=tools,
-                    reasoning_effort="low",
-                    max_tokens=2048,
-                )
+                started = time.time()
+                try:
+                    msg, usage = self._llm.chat(
+                        messages=messages,
+                        model=model,
+                        tools=tools,
+                        reasoning_effort="low",
+                        max_tokens=2048,
+                    )
+                except Exception as e:
+                    from ouroboros.loop import _is_rate_limit_error
+                    model_health.record(model, False, time.time() - started,
+                                        rate_limited=_is_rate_limit_error(e))
+                    raise
+                model_health.record(model, bool(msg.get("content") or msg.get("tool_calls")),
+                                    time.time() - started)
                 cost = float(usage.get("cost") or 0)
+                if not cost and usage.get("generation_id"):
+                    # Provisional; the supervisor reconciles it with OpenRouter later.
+                    from ouroboros.pricing import estimate_cost
+                    cost = estimate_cost(
+                        model,
+                        int(usage.get("prompt_tokens") or 0),
+                        int(usage.get("completion_tokens") or 0),
+                        int(usage.get("cached_tokens") or 0),
+                        int(usage.get("cache_write_tokens") or 0),
+                    )
+                    usage["cost"] = cost
+                    usage["cost_estimated"] = True
                 total_cost += cost
                 self._bg_spent_usd += cost
 
@@ -434,19 +457,17 @@ class BackgroundConsciousness:
             except Exception as e:
                 error = e
 
-        # Execute with timeout using ThreadPoolExecutor
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_run_tool)
-            try:
-                future.result(timeout=timeout_sec)
-            except concurrent.futures.TimeoutError:
-                result = f"[TIMEOUT after {timeout_sec}s]"
-                append_jsonl(self._drive_root / "logs" / "events.jsonl", {
-                    "ts": utc_now_iso(),
-                    "type": "consciousness_tool_timeout",
-                    "tool": fn_name,
-                    "timeout_sec": timeout_sec,
-                })
+        # Execute with timeout on the shared tool runner pool
+        try:
+            get_pool().run(_run_tool, timeout=timeout_sec, name=f"bg:{fn_name}")
+        except concurrent.futures.TimeoutError:
+            result = f"[TIMEOUT after {timeout_sec}s]"
+            append_jsonl(self._drive_root / "logs" / "events.jsonl", {
+                "ts": utc_now_iso(),
+                "type": "consciousness_tool_timeout",
+                "tool": fn_name,
+                "timeout_sec": timeout_sec,
+            })
 
         # Handle errors
         if error is not None:
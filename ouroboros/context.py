@@ -7,17 +7,20 @@ Extracted from agent.py to keep the agent thin and focused.
 
 from __future__ import annotations
 
-import copy
 import json
 import logging
 import os
 import pathlib
+import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from ouroboros.utils import (
-    utc_now_iso, read_text, clip_text, estimate_tokens, get_git_info,
+    utc_now_iso, read_text, clip_text, get_git_info,
 )
+from ouroboros.health_snapshot import read_checks as read_health_checks
 from ouroboros.memory import Memory
+from ouroboros.prompt_blocks import prompt_block_cache
+from ouroboros.tokenizer import backend_name, count_messages_tokens, count_tokens
 
 log = logging.getLogger(__name__)
 
@@ -122,24 +125,26 @@ def _build_recent_sections(memory: Memory, env: Any, task_id: str = "") -> List[
     if chat_summary:
         sections.append("## Recent chat\n\n" + chat_summary)
 
-    progress_entries = memory.read_jsonl_tail("progress.jsonl", 200)
-    if task_id:
-        progress_entries = [e for e in progress_entries if e.get("task_id") == task_id]
+    # Per-task sidecars hold exactly this task's entries, however many
+    # workers interleave in the shared logs.
+    def _entries(log_name: str) -> List[Dict[str, Any]]:
+        if task_id:
+            return memory.read_task_tail(log_name, task_id, 200)
+        return memory.read_jsonl_tail(log_name, 200)
+
+    progress_entries = _entries("progress.jsonl")
     progress_summary = memory.summarize_progress(progress_entries, limit=15)
     if progress_summary:
         sections.append("## Recent progress\n\n" + progress_summary)
 
-    tools_entries = memory.read_jsonl_tail("tools.jsonl", 200)
-    if task_id:
-        tools_entries = [e for e in tools_entries if e.get("task_id") == task_id]
+    tools_entries = _entries("tools.jsonl")
     tools_summary = memory.summarize_tools(tools_entries)
     if tools_summary:
         sections.append("## Recent tools\n\n" + tools_summary)
 
-    events_entries = memory.read_jsonl_tail("events.jsonl", 200)
-    if task_id:
-        events_entries = [e for e in events_entries if e.get("task_id") == task_id]
-    events_summary = memory.summarize_events(events_entries)
+    events_entries = _entries("events.jsonl")
+    events_summary = memory.summarize_events(
+        events_entries, memory.event_type_counts(task_id) if task_id else None)
     if events_summary:
         sections.append("## Recent events\n\n" + events_summary)
 
@@ -156,121 +161,14 @@ def _build_health_invariants(env: Any) -> str:
 
     Surfaces anomalies as informational text. The LLM (not code) decides
     what action to take based on what it reads here. (Bible P0+P3)
+    The checks are maintained by the supervisor in state/health.json
+    (see health_snapshot.py); this only reads them.
     """
-    checks = []
-
-    # 1. Version sync: VERSION file vs pyproject.toml
-    try:
-        ver_file = read_text(env.repo_path("VERSION")).strip()
-        pyproject = read_text(env.repo_path("pyproject.toml"))
-        pyproject_ver = ""
-        for line in pyproject.splitlines():
-            if line.strip().startswith("version"):
-                pyproject_ver = line.split("=", 1)[1].strip().strip('"').strip("'")
-                break
-        if ver_file and pyproject_ver and ver_file != pyproject_ver:
-            checks.append(f"CRITICAL: VERSION DESYNC — VERSION={ver_file}, pyproject.toml={pyproject_ver}")
-        elif ver_file:
-            checks.append(f"OK: version sync ({ver_file})")
-    except Exception:
-        pass
-
-    # 2. Budget drift
-    try:
-        state_json = read_text(env.drive_path("state/state.json"))
-        state_data = json.loads(state_json)
-        if state_data.get("budget_drift_alert"):
-            drift_pct = state_data.get("budget_drift_pct", 0)
-            our = state_data.get("spent_usd", 0)
-            theirs = state_data.get("openrouter_total_usd", 0)
-            checks.append(f"WARNING: BUDGET DRIFT {drift_pct:.1f}% — tracked=${our:.2f} vs OpenRouter=${theirs:.2f}")
-        else:
-            checks.append("OK: budget drift within tolerance")
-    except Exception:
-        pass
-
-    # 3. Per-task cost anomalies
     try:
-        from supervisor.state import per_task_cost_summary
-        costly = [t for t in per_task_cost_summary(5) if t["cost"] > 5.0]
-        for t in costly:
-            checks.append(
-                f"WARNING: HIGH-COST TASK — task_id={t['task_id']} "
-                f"cost=${t['cost']:.2f} rounds={t['rounds']}"
-            )
-        if not costly:
-            checks.append("OK: no high-cost tasks (>$5)")
+        checks = read_health_checks(pathlib.Path(env.repo_dir), pathlib.Path(env.drive_root))
     except Exception:
-        pass
-
-    # 4. Stale identity.md
-    try:
-        import time as _time
-        identity_path = env.drive_path("memory/identity.md")
-        if identity_path.exists():
-            age_hours = (_time.time() - identity_path.stat().st_mtime) / 3600
-            if age_hours > 8:
-                checks.append(f"WARNING: STALE IDENTITY — identity.md last updated {age_hours:.0f}h ago")
-            else:
-                checks.append("OK: identity.md recent")
-    except Exception:
-        pass
-
-    # 5. Duplicate processing detection: same owner message text appearing in multiple tasks
-    try:
-        import hashlib
-        msg_hash_to_tasks: Dict[str, set] = {}
-        tail_bytes = 256_000
-
-        def _scan_file_for_injected(path, type_field="type", type_value="owner_message_injected"):
-            if not path.exists():
-                return
-            file_size = path.stat().st_size
-            with path.open("r", encoding="utf-8") as f:
-                if file_size > tail_bytes:
-                    f.seek(file_size - tail_bytes)
-                    f.readline()
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        ev = json.loads(line)
-                        if ev.get(type_field) != type_value:
-                            continue
-                        text = ev.get("text", "")
-                        if not text and "event_repr" in ev:
-                            # Historical entries in supervisor.jsonl lack "text";
-                            # try to extract task_id at least for presence detection
-                            text = ev.get("event_repr", "")[:200]
-                        if not text:
-                            continue
-                        text_hash = hashlib.md5(text.encode()).hexdigest()[:12]
-                        tid = ev.get("task_id") or "unknown"
-                        if text_hash not in msg_hash_to_tasks:
-                            msg_hash_to_tasks[text_hash] = set()
-                        msg_hash_to_tasks[text_hash].add(tid)
-                    except (json.JSONDecodeError, ValueError):
-                        continue
-
-        _scan_file_for_injected(env.drive_path("logs/events.jsonl"))
-        # Also check supervisor.jsonl for historically unhandled events
-        _scan_file_for_injected(
-            env.drive_path("logs/supervisor.jsonl"),
-            type_field="event_type",
-            type_value="owner_message_injected",
-        )
-
-        dupes = {h: tids for h, tids in msg_hash_to_tasks.items() if len(tids) > 1}
-        if dupes:
-            checks.append(
-                f"CRITICAL: DUPLICATE PROCESSING — {len(dupes)} message(s) "
-                f"appeared in multiple tasks: {', '.join(str(sorted(tids)) for tids in dupes.values())}"
-            )
-        else:
-            checks.append("OK: no duplicate message processing detected")
-    except Exception:
-        pass
+        log.debug("Failed to read health snapshot", exc_info=True)
+        return ""
 
     if not checks:
         return ""
@@ -299,15 +197,7 @@ def build_llm_messages(
     """
     # --- Extract task type for adaptive context ---
     task_type = str(task.get("type") or "user")
-
-    # --- Read base prompts and state ---
-    base_prompt = _safe_read(
-        env.repo_path("prompts/SYSTEM.md"),
-        fallback="You are Ouroboros. Your base prompt could not be loaded."
-    )
-    bible_md = _safe_read(env.repo_path("BIBLE.md"))
-    readme_md = _safe_read(env.repo_path("README.md"))
-    state_json = _safe_read(env.drive_path("state/state.json"), fallback="{}")
+    t_assembly = time.perf_counter()
 
     # --- Load memory ---
     memory.ensure_files()
@@ -316,29 +206,31 @@ def build_llm_messages(
     # Block 1: Static content (SYSTEM.md + BIBLE.md + README) — cached
     # Block 2: Semi-stable content (identity + scratchpad + knowledge) — cached
     # Block 3: Dynamic content (state + runtime + recent logs) — uncached
+    # Blocks 1-2 are rebuilt only when an input file changes (prompt_blocks.py).
 
     # BIBLE.md always included (Constitution requires it for every decision)
     # README.md only for evolution/review (architecture context)
     needs_full_context = task_type in ("evolution", "review", "scheduled")
-    static_text = (
-        base_prompt + "\n\n"
-        + "## BIBLE.md\n\n" + clip_text(bible_md, 180000)
-    )
+    static_inputs = [env.repo_path("prompts/SYSTEM.md"), env.repo_path("BIBLE.md")]
     if needs_full_context:
-        static_text += "\n\n## README.md\n\n" + clip_text(readme_md, 180000)
+        static_inputs.append(env.repo_path("README.md"))
+    static_text, static_hit = prompt_block_cache.get(
+        "static:full" if needs_full_context else "static:base", static_inputs,
+        lambda: _build_static_text(env, needs_full_context),
+    )
 
     # Semi-stable content: identity, scratchpad, knowledge
     # These change ~once per task, not per round
-    semi_stable_parts = []
-    semi_stable_parts.extend(_build_memory_sections(memory))
-
-    kb_index_path = env.drive_path("memory/knowledge/_index.md")
-    if kb_index_path.exists():
-        kb_index = kb_index_path.read_text(encoding="utf-8")
-        if kb_index.strip():
-            semi_stable_parts.append("## Knowledge base\n\n" + clip_text(kb_index, 50000))
+    semi_inputs = [
+        memory.scratchpad_path(), memory.identity_path(),
+        memory.drive_root / "memory" / "dialogue_summary.md",
+        env.drive_path("memory/knowledge/_index.md"),
+    ]
+    semi_stable_text, semi_hit = prompt_block_cache.get(
+        "semi_stable", semi_inputs, lambda: _build_semi_stable_text(env, memory),
+    )
 
-    semi_stable_text = "\n\n".join(semi_stable_parts)
+    state_json = _safe_read(env.drive_path("state/state.json"), fallback="{}")
 
     # Dynamic content: changes every round
     dynamic_parts = [
@@ -390,10 +282,69 @@ def build_llm_messages(
 
     # --- Soft-cap token trimming ---
     messages, cap_info = apply_message_token_soft_cap(messages, 200000)
+    cap_info["prompt_cache"] = {
+        "static_hit": static_hit,
+        "semi_stable_hit": semi_hit,
+        "assembly_ms": round((time.perf_counter() - t_assembly) * 1000, 2),
+        **prompt_block_cache.stats(),
+    }
 
     return messages, cap_info
 
 
+def _build_static_text(env: Any, needs_full_context: bool) -> str:
+    base_prompt = _safe_read(
+        env.repo_path("prompts/SYSTEM.md"),
+        fallback="You are Ouroboros. Your base prompt could not be loaded."
+    )
+    static_text = (
+        base_prompt + "\n\n"
+        + "## BIBLE.md\n\n" + clip_text(_safe_read(env.repo_path("BIBLE.md")), 180000)
+    )
+    if needs_full_context:
+        static_text += "\n\n## README.md\n\n" + clip_text(_safe_read(env.repo_path("README.md")), 180000)
+    return static_text
+
+
+def _build_semi_stable_text(env: Any, memory: Memory) -> str:
+    semi_stable_parts = []
+    semi_stable_parts.extend(_build_memory_sections(memory))
+
+    kb_index_path = env.drive_path("memory/knowledge/_index.md")
+    if kb_index_path.exists():
+        kb_index = kb_index_path.read_text(encoding="utf-8")
+        if kb_index.strip():
+            semi_stable_parts.append("## Knowledge base\n\n" + clip_text(kb_index, 50000))
+
+    return "\n\n".join(semi_stable_parts)
+
+
+# Section headings emitted by the context builder. Only these start a new
+# section, so user-written "##" headings inside a scratchpad stay attached
+# to it. Trimming order: recent logs first, then the semi-stable block.
+_SECTION_HEADINGS = (
+    "## Scratchpad", "## Identity", "## Dialogue Summary", "## Knowledge base",
+    "## Drive state", "## Runtime context", "## Health Invariants", "## Code Review Context",
+    "## Recent chat", "## Recent progress", "## Recent tools", "## Recent events", "## Supervisor",
+)
+SOFT_CAP_TRIM_ORDER = (
+    "## Recent chat", "## Recent progress", "## Recent tools", "## Recent events", "## Supervisor",
+    "## Dialogue Summary", "## Knowledge base", "## Scratchpad",
+)
+
+
+def _split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split a prompt block into (heading, text) sections in one pass."""
+    sections: List[Tuple[str, List[str]]] = []
+    for para in text.split("\n\n"):
+        heading = next((h for h in _SECTION_HEADINGS if para.startswith(h)), None)
+        if heading is not None or not sections:
+            sections.append((heading or "", [para]))
+        else:
+            sections[-1][1].append(para)
+    return [(h, "\n\n".join(parts)) for h, parts in sections]
+
+
 def apply_message_token_soft_cap(
     messages: List[Dict[str, Any]],
     soft_cap_tokens: int,
@@ -401,76 +352,73 @@ def apply_message_token_soft_cap(
     """
     Trim prunable context sections if estimated tokens exceed soft cap.
 
+    Every trimmable block (system text blocks except the 1h-cached static
+    one, and legacy string system messages) is split into named sections
+    with memoized token counts; sections are then dropped in
+    SOFT_CAP_TRIM_ORDER until the estimate fits. Only rebuilt blocks are
+    copied, the input list is not modified.
+
     Returns (pruned_messages, cap_info_dict).
     """
-    def _estimate_message_tokens(msg: Dict[str, Any]) -> int:
-        """Estimate tokens for a message, handling multipart content."""
-        content = msg.get("content", "")
-        if isinstance(content, list):
-            # Multipart content: sum tokens from all text blocks
-            total = 0
-            for block in content:
-                if isinstance(block, dict) and block.get("type") == "text":
-                    total += estimate_tokens(str(block.get("text", "")))
-            return total + 6
-        return estimate_tokens(str(content)) + 6
-
-    estimated = sum(_estimate_message_tokens(m) for m in messages)
+    estimated = count_messages_tokens(messages)
     info: Dict[str, Any] = {
         "estimated_tokens_before": estimated,
         "estimated_tokens_after": estimated,
         "soft_cap_tokens": soft_cap_tokens,
+        "tokenizer": backend_name(),
         "trimmed_sections": [],
     }
 
     if soft_cap_tokens <= 0 or estimated <= soft_cap_tokens:
         return messages, info
 
-    # Prune log summaries from the dynamic text block in multipart system messages
-    prunable = ["## Recent chat", "## Recent progress", "## Recent tools", "## Recent events", "## Supervisor"]
-    pruned = copy.deepcopy(messages)
-    for prefix in prunable:
+    # (msg index, block index or None for string content) -> sections
+    blocks: Dict[Tuple[int, Optional[int]], List[Tuple[str, str]]] = {}
+    for i, msg in enumerate(messages):
+        content = msg.get("content")
+        if msg.get("role") != "system":
+            continue
+        if isinstance(content, list):
+            for j, block in enumerate(content):
+                if (isinstance(block, dict) and block.get("type") == "text"
+                        and "ttl" not in (block.get("cache_control") or {})):
+                    blocks[(i, j)] = _split_sections(str(block.get("text", "")))
+        elif isinstance(content, str):
+            blocks[(i, None)] = _split_sections(content)
+
+    candidates: Dict[str, List[Tuple[Tuple[int, Optional[int]], int]]] = {}
+    for key, sections in blocks.items():
+        for k, (heading, _) in enumerate(sections):
+            if heading in SOFT_CAP_TRIM_ORDER:
+                candidates.setdefault(heading, []).append((key, k))
+
+    dropped: Dict[Tuple[int, Optional[int]], set] = {}
+    for heading in SOFT_CAP_TRIM_ORDER:
+        for key, k in candidates.get(heading, []):
+            if estimated <= soft_cap_tokens:
+                break
+            dropped.setdefault(key, set()).add(k)
+            estimated -= count_tokens(blocks[key][k][1])
+            info["trimmed_sections"].append(heading)
         if estimated <= soft_cap_tokens:
             break
-        for i, msg in enumerate(pruned):
-            content = msg.get("content")
-
-            # Handle multipart content (trim from dynamic text block)
-            if isinstance(content, list) and msg.get("role") == "system":
-                # Find the dynamic text block (the block without cache_control)
-                for j, block in enumerate(content):
-                    if (isinstance(block, dict) and
-                        block.get("type") == "text" and
-                        "cache_control" not in block):
-                        text = block.get("text", "")
-                        if prefix in text:
-                            # Remove this section from the dynamic text
-                            lines = text.split("\n\n")
-                            new_lines = []
-                            skip_section = False
-                            for line in lines:
-                                if line.startswith(prefix):
-                                    skip_section = True
-                                    info["trimmed_sections"].append(prefix)
-                                    continue
-                                if line.startswith("##"):
-                                    skip_section = False
-                                if not skip_section:
-                                    new_lines.append(line)
-
-                            block["text"] = "\n\n".join(new_lines)
-                            estimated = sum(_estimate_message_tokens(m) for m in pruned)
-                            break
-                break
 
-            # Handle legacy string content (for backwards compatibility)
-            elif isinstance(content, str) and content.startswith(prefix):
-                pruned.pop(i)
-                info["trimmed_sections"].append(prefix)
-                estimated = sum(_estimate_message_tokens(m) for m in pruned)
-                break
+    pruned = list(messages)
+    removed_msgs = set()
+    for (i, j), drop in dropped.items():
+        kept = "\n\n".join(text for k, (_, text) in enumerate(blocks[(i, j)]) if k not in drop)
+        if j is None:
+            if kept.strip():
+                pruned[i] = {**pruned[i], "content": kept}
+            else:
+                removed_msgs.add(i)
+            continue
+        content = list(pruned[i]["content"])
+        content[j] = {**content[j], "text": kept}
+        pruned[i] = {**pruned[i], "content": content}
+    pruned = [m for i, m in enumerate(pruned) if i not in removed_msgs]
 
-    info["estimated_tokens_after"] = estimated
+    info["estimated_tokens_after"] = count_messages_tokens(pruned)
     return pruned, info
 
 
@@ -541,6 +489,66 @@ def _compact_assistant_msg(msg: dict) -> dict:
     return compacted_msg
 
 
+def _tool_round_spans(messages: list, start: int = 0) -> List[Tuple[int, int]]:
+    """(first, end) index spans of tool-call rounds at or after start.
+
+    A round is an assistant message with tool_calls plus everything up to
+    the next such message; its tool results are the tool messages inside.
+    """
+    starts = [i for i in range(start, len(messages))
+              if messages[i].get("role") == "assistant" and messages[i].get("tool_calls")]
+    return [(s, starts[k + 1] if k + 1 < len(starts) else len(messages)) for k, s in enumerate(starts)]
+
+
+def _compact_round(messages: list, first: int, end: int) -> None:
+    """Compact one round in place: its assistant message and its tool results."""
+    messages[first] = _compact_assistant_msg(messages[first])
+    for i in range(first + 1, end):
+        msg = messages[i]
+        if msg.get("role") == "tool":
+            messages[i] = _compact_tool_result(msg, str(msg.get("content") or ""))
+
+
+class ToolHistoryCompactor:
+    """Incremental tool-history compaction, kept for the whole LLM loop.
+
+    Remembers where each round starts and how many leading rounds are
+    already compacted, so each round is compacted exactly once, when it
+    ages out of the last keep_recent rounds. Earlier messages are never
+    rewritten again, which keeps the prompt prefix stable for caching.
+    """
+
+    def __init__(self, keep_recent: int = 6):
+        self.keep_recent = keep_recent
+        self._round_starts: List[int] = []
+        self._scanned = 0
+        self._compacted = 0
+
+    def _sync(self, messages: list) -> None:
+        # Messages are only appended during the loop; anything else means a rebuild.
+        if len(messages) < self._scanned or any(
+                not messages[i].get("tool_calls") for i in self._round_starts[-1:]):
+            self._round_starts, self._scanned, self._compacted = [], 0, 0
+        self._round_starts.extend(s for s, _ in _tool_round_spans(messages, self._scanned))
+        self._scanned = len(messages)
+
+    def compact(self, messages: list) -> list:
+        """Compact rounds that just aged out, in place. Returns messages."""
+        self._sync(messages)
+        target = len(self._round_starts) - self.keep_recent
+        while self._compacted < target:
+            k = self._compacted
+            end = self._round_starts[k + 1] if k + 1 < len(self._round_starts) else len(messages)
+            _compact_round(messages, self._round_starts[k], end)
+            self._compacted += 1
+        return messages
+
+    def mark_compacted(self, messages: list, keep_recent: int) -> None:
+        """Record an external compaction (compact_tool_history_llm) of all but keep_recent rounds."""
+        self._sync(messages)
+        self._compacted = max(self._compacted, len(self._round_starts) - keep_recent)
+
+
 def compact_tool_history(messages: list, keep_recent: int = 6) -> list:
     """
     Compress old tool call/result message pairs into compact summaries.
@@ -551,53 +559,14 @@ def compact_tool_history(messages: list, keep_recent: int = 6) -> list:
 
     This dramatically reduces prompt tokens in long tool-use conversations
     without losing important context (the tool names and whether they succeeded
-    are preserved).
+    are preserved). One-shot form; the LLM loop uses ToolHistoryCompactor.
     """
-    # Find all indices that are tool-call assistant messages
-    # (messages with tool_calls field)
-    tool_round_starts = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") == "assistant" and msg.get("tool_calls"):
-            tool_round_starts.append(i)
-
-    if len(tool_round_starts) <= keep_recent:
+    spans = _tool_round_spans(messages)
+    if len(spans) <= keep_recent:
         return messages  # Nothing to compact
-
-    # Rounds to compact: all except the last keep_recent
-    rounds_to_compact = set(tool_round_starts[:-keep_recent])
-
-    # Build compacted message list
-    result = []
-    for i, msg in enumerate(messages):
-        # Skip system messages with multipart content (prompt caching format)
-        if msg.get("role") == "system" and isinstance(msg.get("content"), list):
-            result.append(msg)
-            continue
-
-        if msg.get("role") == "tool" and i > 0:
-            # Check if the preceding assistant message (with tool_calls)
-            # is one we want to compact
-            # Find which round this tool result belongs to
-            parent_round = None
-            for rs in reversed(tool_round_starts):
-                if rs < i:
-                    parent_round = rs
-                    break
-
-            if parent_round is not None and parent_round in rounds_to_compact:
-                # Compact this tool result
-                content = str(msg.get("content") or "")
-                result.append(_compact_tool_result(msg, content))
-                continue
-
-        # For compacted assistant messages, also trim the content (progress notes)
-        # AND compact tool_call arguments
-        if i in rounds_to_compact and msg.get("role") == "assistant":
-            result.append(_compact_assistant_msg(msg))
-            continue
-
-        result.append(msg)
-
+    result = list(messages)
+    for first, end in spans[:-keep_recent]:
+        _compact_round(result, first, end)
     return result
 
 
@@ -607,26 +576,16 @@ def compact_tool_history_llm(messages: list, keep_recent: int = 6) -> list:
     Falls back to simple truncation (compact_tool_history) on any error.
     Called when the agent explicitly invokes the compact_context tool.
     """
-    tool_round_starts = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") == "assistant" and msg.get("tool_calls"):
-            tool_round_starts.append(i)
-
-    if len(tool_round_starts) <= keep_recent:
+    spans = _tool_round_spans(messages)
+    if len(spans) <= keep_recent:
         return messages
 
-    rounds_to_compact = set(tool_round_starts[:-keep_recent])
-
     old_results = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") != "tool" or i == 0:
-            continue
-        parent_round = None
-        for rs in reversed(tool_round_starts):
-            if rs < i:
-                parent_round = rs
-                break
-        if parent_round is not None and parent_round in rounds_to_compact:
+    for first, end in spans[:-keep_recent]:
+        for i in range(first + 1, end):
+            msg = messages[i]
+            if msg.get("role") != "tool":
+                continue
             content = str(msg.get("content") or "")
             if len(content) > 120:
                 tool_call_id = msg.get("tool_call_id", "")
@@ -646,9 +605,10 @@ def compact_tool_history_llm(messages: list, keep_recent: int = 6) -> list:
 
     try:
         from ouroboros.llm import LLMClient, DEFAULT_LIGHT_MODEL
+        from ouroboros.llm_cache import cached_chat
         light_model = os.environ.get("OUROBOROS_MODEL_LIGHT") or DEFAULT_LIGHT_MODEL
-        client = LLMClient()
-        resp_msg, _usage = client.chat(
+        resp_msg, _usage = cached_chat(
+            LLMClient(), "compaction",
             messages=[{"role": "user", "content": prompt}],
             model=light_model,
             reasoning_effort="low",
@@ -685,28 +645,11 @@ def compact_tool_history_llm(messages: list, keep_recent: int = 6) -> list:
         if s:
             idx_to_summary[r["idx"]] = s
 
-    result = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") == "system" and isinstance(msg.get("content"), list):
-            result.append(msg)
-            continue
-        if i in idx_to_summary:
-            result.append({**msg, "content": idx_to_summary[i]})
-            continue
-        if msg.get("role") == "tool" and i > 0:
-            parent_round = None
-            for rs in reversed(tool_round_starts):
-                if rs < i:
-                    parent_round = rs
-                    break
-            if parent_round is not None and parent_round in rounds_to_compact:
-                content = str(msg.get("content") or "")
-                result.append(_compact_tool_result(msg, content))
-                continue
-        if i in rounds_to_compact and msg.get("role") == "assistant":
-            result.append(_compact_assistant_msg(msg))
-            continue
-        result.append(msg)
+    result = list(messages)
+    for first, end in spans[:-keep_recent]:
+        _compact_round(result, first, end)
+    for i, summary in idx_to_summary.items():
+        result[i] = {**messages[i], "content": summary}
 
     return result
 
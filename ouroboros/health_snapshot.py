@@ -0,0 +1,242 @@
+"""
+Ouroboros — Health snapshot.
+
+The health invariants shown in every task's context (version sync, budget
+drift, high-cost tasks, stale identity, duplicate owner-message processing)
+are computed by the supervisor on a timer and written to state/health.json.
+Context building only reads that small file.
+
+Duplicate detection is incremental: state/health_scan.json keeps the byte
+offset consumed in events.jsonl / supervisor.jsonl and, per owner-message
+hash, the task ids seen with the log and offset of their latest record, so
+each refresh parses only newly appended lines. Records that have fallen out
+of the last _WINDOW_BYTES of their log are evicted, which keeps the check's
+meaning of the original full scan of each log's last 256 KB.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from ouroboros.segmented_log import line_fingerprint
+from ouroboros.utils import read_text, utc_now_iso
+
+log = logging.getLogger(__name__)
+
+HEALTH_FILE = "state/health.json"
+SCAN_FILE = "state/health_scan.json"
+REFRESH_INTERVAL_SEC = 30.0
+STALE_AFTER_SEC = 600.0  # older snapshots are recomputed by the reader
+MAX_TRACKED_MESSAGES = 500
+_WINDOW_BYTES = 256_000
+_SCAN_VERSION = 2
+
+# log file -> (type field, type value) of owner_message_injected records
+_INJECTED_SOURCES = {
+    "logs/events.jsonl": ("type", "owner_message_injected"),
+    # supervisor.jsonl: historically unhandled events
+    "logs/supervisor.jsonl": ("event_type", "owner_message_injected"),
+}
+
+_last_refresh = 0.0
+
+
+def _write_json(path: pathlib.Path, obj: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp.{uuid.uuid4().hex}")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(str(tmp), str(path))
+
+
+def _load_json(path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    try:
+        obj = json.loads(path.read_text(encoding="utf-8"))
+        return obj if isinstance(obj, dict) else None
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log.debug(f"Unreadable health file {path}", exc_info=True)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Checks
+# ---------------------------------------------------------------------------
+
+def _version_check(repo_dir: pathlib.Path) -> Optional[str]:
+    try:
+        ver_file = read_text(repo_dir / "VERSION").strip()
+        pyproject = read_text(repo_dir / "pyproject.toml")
+        pyproject_ver = ""
+        for line in pyproject.splitlines():
+            if line.strip().startswith("version"):
+                pyproject_ver = line.split("=", 1)[1].strip().strip('"').strip("'")
+                break
+        if ver_file and pyproject_ver and ver_file != pyproject_ver:
+            return f"CRITICAL: VERSION DESYNC — VERSION={ver_file}, pyproject.toml={pyproject_ver}"
+        if ver_file:
+            return f"OK: version sync ({ver_file})"
+    except Exception:
+        log.debug("Health: version check failed", exc_info=True)
+    return None
+
+
+def _budget_check(drive_root: pathlib.Path) -> Optional[str]:
+    try:
+        state_data = json.loads(read_text(drive_root / "state" / "state.json"))
+        if state_data.get("budget_drift_alert"):
+            drift_pct = state_data.get("budget_drift_pct", 0)
+            our = state_data.get("spent_usd", 0)
+            theirs = state_data.get("openrouter_total_usd", 0)
+            return f"WARNING: BUDGET DRIFT {drift_pct:.1f}% — tracked=${our:.2f} vs OpenRouter=${theirs:.2f}"
+        return "OK: budget drift within tolerance"
+    except Exception:
+        log.debug("Health: budget check failed", exc_info=True)
+    return None
+
+
+def _task_cost_checks(drive_root: pathlib.Path) -> List[str]:
+    try:
+        from ouroboros.log_columns import recent_task_costs
+        costly = [t for t in recent_task_costs(drive_root / "logs", max_tasks=5) if t["cost"] > 5.0]
+    except Exception:
+        log.debug("Health: task cost check failed", exc_info=True)
+        return []
+    if not costly:
+        return ["OK: no high-cost tasks (>$5)"]
+    return [f"WARNING: HIGH-COST TASK — task_id={t['task_id']} cost=${t['cost']:.2f} rounds={t['rounds']}"
+            for t in costly]
+
+
+def _identity_check(drive_root: pathlib.Path, now: float) -> Optional[str]:
+    try:
+        identity_path = drive_root / "memory" / "identity.md"
+        if identity_path.exists():
+            age_hours = (now - identity_path.stat().st_mtime) / 3600
+            if age_hours > 8:
+                return f"WARNING: STALE IDENTITY — identity.md last updated {age_hours:.0f}h ago"
+            return "OK: identity.md recent"
+    except Exception:
+        log.debug("Health: identity check failed", exc_info=True)
+    return None
+
+
+def _scan_injected(drive_root: pathlib.Path, scan: Dict[str, Any]) -> None:
+    """Fold owner_message_injected records appended since the last scan into scan["messages"].
+
+    messages: text hash -> [[task_id, log rel path, offset of its latest record], ...]
+    """
+    if scan.get("version") != _SCAN_VERSION:
+        scan.clear()
+        scan["version"] = _SCAN_VERSION
+    messages: Dict[str, List[List[Any]]] = scan.setdefault("messages", {})
+    window_start: Dict[str, int] = {}
+    for rel, (type_field, type_value) in _INJECTED_SOURCES.items():
+        path = drive_root / rel
+        pos = scan.setdefault("sources", {}).setdefault(rel, {"offset": 0, "fingerprint": ""})
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            window_start[rel] = -1  # nothing from a vanished log counts
+            continue
+        window_start[rel] = size - _WINDOW_BYTES
+        fingerprint = line_fingerprint(path)
+        if fingerprint != pos["fingerprint"] or size < pos["offset"]:
+            # New or rotated file: start from its recent tail, like the old scan did.
+            pos.update(offset=max(0, size - _WINDOW_BYTES), fingerprint=fingerprint, aligned=False)
+            for seen in messages.values():
+                seen[:] = [s for s in seen if s[1] != rel]
+        offset = pos["offset"]
+        with path.open("rb") as f:
+            f.seek(offset)
+            if offset and not pos.get("aligned"):
+                offset += len(f.readline())  # started mid-line
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                record_offset = offset
+                offset += len(raw)
+                if type_value.encode() not in raw:
+                    continue
+                try:
+                    ev = json.loads(raw)
+                except ValueError:
+                    continue
+                if ev.get(type_field) != type_value:
+                    continue
+                text = ev.get("text", "") or str(ev.get("event_repr", ""))[:200]
+                if not text:
+                    continue
+                text_hash = hashlib.md5(text.encode()).hexdigest()[:12]
+                tid = ev.get("task_id") or "unknown"
+                seen = [s for s in messages.pop(text_hash, []) if not (s[0] == tid and s[1] == rel)]
+                messages[text_hash] = seen + [[tid, rel, record_offset]]  # re-insert: most recent last
+        pos.update(offset=offset, aligned=True)
+    for text_hash in list(messages):
+        seen = [s for s in messages[text_hash] if s[2] >= window_start.get(s[1], -1)]
+        if seen:
+            messages[text_hash] = seen
+        else:
+            del messages[text_hash]
+    while len(messages) > MAX_TRACKED_MESSAGES:
+        messages.pop(next(iter(messages)))
+
+
+def _duplicate_check(scan: Dict[str, Any]) -> str:
+    dupes = [tids for tids in ({s[0] for s in seen} for seen in scan.get("messages", {}).values())
+             if len(tids) > 1]
+    if dupes:
+        return (f"CRITICAL: DUPLICATE PROCESSING — {len(dupes)} message(s) "
+                f"appeared in multiple tasks: {', '.join(str(sorted(tids)) for tids in dupes)}")
+    return "OK: no duplicate message processing detected"
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+def refresh(repo_dir: pathlib.Path, drive_root: pathlib.Path) -> Dict[str, Any]:
+    """Recompute all checks and write state/health.json. Returns the snapshot."""
+    now = time.time()
+    scan_path = drive_root / SCAN_FILE
+    scan = _load_json(scan_path) or {}
+    try:
+        _scan_injected(drive_root, scan)
+        duplicate = _duplicate_check(scan)
+        _write_json(scan_path, scan)
+    except Exception:
+        log.debug("Health: duplicate scan failed", exc_info=True)
+        duplicate = None
+    checks = [c for c in (_version_check(repo_dir), _budget_check(drive_root)) if c]
+    checks.extend(_task_cost_checks(drive_root))
+    checks.extend(c for c in (_identity_check(drive_root, now), duplicate) if c)
+    snapshot = {"updated_at": utc_now_iso(), "updated_ts": now, "checks": checks}
+    _write_json(drive_root / HEALTH_FILE, snapshot)
+    return snapshot
+
+
+def refresh_if_due(repo_dir: pathlib.Path, drive_root: pathlib.Path) -> None:
+    """Supervisor timer hook: refresh at most every REFRESH_INTERVAL_SEC."""
+    global _last_refresh
+    if time.time() - _last_refresh < REFRESH_INTERVAL_SEC:
+        return
+    _last_refresh = time.time()
+    try:
+        refresh(repo_dir, drive_root)
+    except Exception:
+        log.warning("Health snapshot refresh failed", exc_info=True)
+
+
+def read_checks(repo_dir: pathlib.Path, drive_root: pathlib.Path) -> List[str]:
+    """Checks from state/health.json, recomputed if missing or stale."""
+    snapshot = _load_json(drive_root / HEALTH_FILE)
+    if snapshot is None or time.time() - float(snapshot.get("updated_ts") or 0) > STALE_AFTER_SEC:
+        snapshot = refresh(repo_dir, drive_root)
+    return [str(c) for c in snapshot.get("checks", [])]
@@ -0,0 +1,180 @@
+"""
+Ouroboros — Shared HTTP transport.
+
+One keep-alive connection pool per provider base_url for the whole process.
+Every LLMClient (the agent's, consciousness', and the throwaway ones used for
+compaction, dedup and dialogue summaries) and the multi-model reviewer share
+these pools, so an auxiliary call reuses a warm TLS connection instead of
+doing a fresh handshake.
+
+Pool limits come from the environment:
+
+    OUROBOROS_HTTP_MAX_CONNECTIONS   total connections per pool (default 20)
+    OUROBOROS_HTTP_KEEPALIVE         idle keep-alive connections kept (default 10)
+    OUROBOROS_HTTP_KEEPALIVE_SEC     idle connection expiry (default 60)
+    OUROBOROS_HTTP2                  auto (default: on if `h2` is installed), 1 or 0
+
+Pools are per process: a forked worker starts with none and builds its own,
+since sockets inherited from the parent must not be shared.
+
+pool_stats() reports what each pool's request/response event hooks counted;
+it does not look inside httpx's connection pool.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Dict, Tuple
+from urllib.parse import urlsplit
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SEC = 600.0  # same as the openai client default; long generations
+
+_lock = threading.Lock()
+_http_clients: Dict[str, Any] = {}
+_openai_clients: Dict[Tuple[str, str], Any] = {}
+_counters: Dict[str, "_RequestCounter"] = {}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _http2_enabled() -> bool:
+    mode = os.environ.get("OUROBOROS_HTTP2", "auto").strip().lower()
+    if mode in ("0", "false", "no", "off"):
+        return False
+    try:
+        import h2  # noqa: F401  # type: ignore
+        return True
+    except ImportError:
+        if mode != "auto":
+            log.warning("OUROBOROS_HTTP2=%s but the h2 package is not installed; using HTTP/1.1", mode)
+        return False
+
+
+class _RequestCounter:
+    """Event hooks for one pool: request totals and requests awaiting a response.
+
+    A request that fails before any response never reaches on_response; it
+    drops out of the in-flight set once garbage-collected (weak references).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self.requests = 0
+        self.responses = 0
+
+    def on_request(self, request: Any) -> None:
+        with self._lock:
+            self._in_flight.add(request)
+            self.requests += 1
+
+    def on_response(self, response: Any) -> None:
+        with self._lock:
+            self._in_flight.discard(response.request)
+            self.responses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._in_flight), "requests": self.requests, "responses": self.responses}
+
+
+def pool_key(url: str) -> str:
+    """Pools are per scheme://host[:port], so every path of a provider shares one."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_http_client(base_url: str):
+    """Process-wide httpx.Client with a keep-alive pool for base_url's host."""
+    key = pool_key(base_url)
+    client = _http_clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _http_clients.get(key)
+        if client is None:
+            import httpx
+            limits = httpx.Limits(
+                max_connections=_env_int("OUROBOROS_HTTP_MAX_CONNECTIONS", 20),
+                max_keepalive_connections=_env_int("OUROBOROS_HTTP_KEEPALIVE", 10),
+                keepalive_expiry=float(_env_int("OUROBOROS_HTTP_KEEPALIVE_SEC", 60)),
+            )
+            counter = _RequestCounter()
+            client = httpx.Client(
+                limits=limits,
+                http2=_http2_enabled(),
+                timeout=httpx.Timeout(DEFAULT_TIMEOUT_SEC, connect=10.0),
+                follow_redirects=True,
+                event_hooks={"request": [counter.on_request], "response": [counter.on_response]},
+            )
+            _http_clients[key] = client
+            _counters[key] = counter
+    return client
+
+
+def get_openai_client(provider_cfg: Dict[str, Any]):
+    """Process-wide openai.OpenAI for a provider, on top of the shared pool."""
+    base_url = provider_cfg["base_url"]
+    api_key = os.environ.get(provider_cfg["key_env"], "")
+    if not api_key:
+        raise ValueError(f"API key not found. Set env var: {provider_cfg['key_env']}")
+    key = (base_url, api_key)
+    client = _openai_clients.get(key)
+    if client is not None:
+        return client
+    http_client = get_http_client(base_url)
+    with _lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                default_headers=provider_cfg.get("headers", {}),
+                http_client=http_client,
+            )
+            _openai_clients[key] = client
+    return client
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Open pools with their request totals and requests awaiting a response."""
+    with _lock:
+        items = list(_counters.items())
+    return {key: counter.stats() for key, counter in items}
+
+
+def close_all() -> None:
+    with _lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+        _openai_clients.clear()
+        _counters.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            log.debug("Failed to close HTTP client", exc_info=True)
+
+
+def _reset_after_fork() -> None:
+    # Inherited sockets belong to the parent: drop (do not close) them.
+    global _lock
+    _http_clients.clear()
+    _openai_clients.clear()
+    _counters.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -10,8 +10,7 @@ from __future__ import annotations
 
 import logging
 import os
-import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 log = logging.getLogger(__name__)
 
@@ -99,63 +98,82 @@ def add_usage(total: Dict[str, Any], usage: Dict[str, Any]) -> None:
         total["cost"] = float(total.get("cost") or 0) + float(usage["cost"])
 
 
-def fetch_openrouter_pricing() -> Dict[str, Tuple[float, float, float]]:
-    """
-    Fetch current pricing from OpenRouter API.
-
-    Returns dict of {model_id: (input_per_1m, cached_per_1m, output_per_1m)}.
-    Returns empty dict on failure.
-    """
-    try:
-        import requests
-    except ImportError:
-        log.warning("requests not installed, cannot fetch pricing")
-        return {}
-
-    try:
-        url = "https://openrouter.ai/api/v1/models"
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-
-        data = resp.json()
-        models = data.get("data", [])
-
-        prefixes = ("anthropic/", "openai/", "google/", "meta-llama/", "x-ai/", "qwen/")
-
-        pricing_dict = {}
-        for model in models:
-            model_id = model.get("id", "")
-            if not model_id.startswith(prefixes):
-                continue
-
-            pricing = model.get("pricing", {})
-            if not pricing or not pricing.get("prompt"):
-                continue
-
-            raw_prompt = float(pricing.get("prompt", 0))
-            raw_completion = float(pricing.get("completion", 0))
-            raw_cached_str = pricing.get("input_cache_read")
-            raw_cached = float(raw_cached_str) if raw_cached_str else None
-
-            prompt_price = round(raw_prompt * 1_000_000, 4)
-            completion_price = round(raw_completion * 1_000_000, 4)
-            if raw_cached is not None:
-                cached_price = round(raw_cached * 1_000_000, 4)
-            else:
-                cached_price = round(prompt_price * 0.1, 4)
-
-            if prompt_price > 1000 or completion_price > 1000:
-                log.warning(f"Skipping {model_id}: prices seem wrong (prompt={prompt_price}, completion={completion_price})")
-                continue
+def streaming_enabled() -> bool:
+    """OUROBOROS_LLM_STREAM (opt-in): stream completions in the tool loop."""
+    return os.environ.get("OUROBOROS_LLM_STREAM", "0").strip().lower() not in ("0", "false", "no", "off")
 
-            pricing_dict[model_id] = (prompt_price, cached_price, completion_price)
 
-        log.info(f"Fetched pricing for {len(pricing_dict)} models from OpenRouter")
-        return pricing_dict
+def _assemble_stream(
+    chunks: Iterable[Any],
+    on_text_delta: Optional[Callable[[str], None]] = None,
+    on_tool_call: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Fold streamed chunks into the shape of a non-streamed response dict.
 
-    except (requests.RequestException, ValueError, KeyError) as e:
-        log.warning(f"Failed to fetch OpenRouter pricing: {e}")
-        return {}
+    Tool calls arrive as argument fragments keyed by index. A call is complete
+    once the next index starts or the stream ends; on_tool_call fires for it
+    right then, so the caller can start executing it before the stream is done.
+    """
+    resp_id = ""
+    usage: Optional[Dict[str, Any]] = None
+    finish_reason = None
+    text_parts: List[str] = []
+    calls: List[Dict[str, Any]] = []
+    by_index: Dict[Any, Dict[str, Any]] = {}
+    announced = 0
+
+    def announce() -> None:
+        nonlocal announced
+        while announced < len(calls):
+            call = calls[announced]
+            announced += 1
+            if on_tool_call is not None:
+                try:
+                    on_tool_call(call)
+                except Exception:
+                    log.debug("on_tool_call callback failed", exc_info=True)
+
+    for chunk in chunks:
+        data = chunk.model_dump() if hasattr(chunk, "model_dump") else chunk
+        resp_id = resp_id or data.get("id") or ""
+        if data.get("usage"):
+            usage = data["usage"]
+        for choice in data.get("choices") or []:
+            delta = choice.get("delta") or {}
+            text = delta.get("content")
+            if text:
+                text_parts.append(text)
+                if on_text_delta is not None:
+                    try:
+                        on_text_delta(text)
+                    except Exception:
+                        log.debug("on_text_delta callback failed", exc_info=True)
+            for frag in delta.get("tool_calls") or []:
+                idx = frag.get("index")
+                if idx is None:  # some providers send whole calls without an index
+                    idx = len(calls) if frag.get("id") or not calls else len(calls) - 1
+                call = by_index.get(idx)
+                if call is None:
+                    announce()  # a new index starts: every earlier call is complete
+                    call = {"id": "", "type": "function", "function": {"name": "", "arguments": ""}}
+                    by_index[idx] = call
+                    calls.append(call)
+                fn = frag.get("function") or {}
+                call["id"] = call["id"] or frag.get("id") or ""
+                call["function"]["name"] = call["function"]["name"] or fn.get("name") or ""
+                call["function"]["arguments"] += fn.get("arguments") or ""
+            finish_reason = choice.get("finish_reason") or finish_reason
+    announce()
+
+    message: Dict[str, Any] = {"role": "assistant", "content": "".join(text_parts) or None}
+    if calls:
+        message["tool_calls"] = calls
+    return {
+        "id": resp_id,
+        "usage": usage,
+        "choices": [{"message": message, "finish_reason": finish_reason}],
+    }
 
 
 class LLMClient:
@@ -169,7 +187,8 @@ class LLMClient:
       всё остальное -> OpenRouter
 
     Все провайдеры используют один и тот же openai.OpenAI клиент —
-    только с разным base_url и api_key.
+    только с разным base_url и api_key. Клиенты и keep-alive пулы
+    соединений общие для процесса (см. http_pool.py).
     """
 
     def __init__(self):
@@ -177,45 +196,13 @@ class LLMClient:
         self._clients: Dict[str, Any] = {}
 
     def _get_client(self, provider_cfg: Dict[str, Any]):
-        """Получить или создать openai.OpenAI клиент для провайдера."""
+        """Получить openai.OpenAI клиент для провайдера (общий пул соединений процесса)."""
         base_url = provider_cfg["base_url"]
         if base_url not in self._clients:
-            from openai import OpenAI
-            api_key = os.environ.get(provider_cfg["key_env"], "")
-            if not api_key:
-                raise ValueError(
-                    f"API key not found. Set env var: {provider_cfg['key_env']}"
-                )
-            self._clients[base_url] = OpenAI(
-                base_url=base_url,
-                api_key=api_key,
-                default_headers=provider_cfg.get("headers", {}),
-            )
+            from ouroboros.http_pool import get_openai_client
+            self._clients[base_url] = get_openai_client(provider_cfg)
         return self._clients[base_url]
 
-    def _fetch_generation_cost(self, generation_id: str, base_url: str, api_key: str) -> Optional[float]:
-        """Fetch cost from OpenRouter Generation API as fallback (только для OpenRouter)."""
-        try:
-            import requests
-            url = f"{base_url.rstrip('/')}/generation?id={generation_id}"
-            headers = {"Authorization": f"Bearer {api_key}"}
-            resp = requests.get(url, headers=headers, timeout=5)
-            if resp.status_code == 200:
-                data = resp.json().get("data") or {}
-                cost = data.get("total_cost") or data.get("usage", {}).get("cost")
-                if cost is not None:
-                    return float(cost)
-            time.sleep(0.5)
-            resp = requests.get(url, headers=headers, timeout=5)
-            if resp.status_code == 200:
-                data = resp.json().get("data") or {}
-                cost = data.get("total_cost") or data.get("usage", {}).get("cost")
-                if cost is not None:
-                    return float(cost)
-        except Exception:
-            log.debug("Failed to fetch generation cost from OpenRouter", exc_info=True)
-        return None
-
     def chat(
         self,
         messages: List[Dict[str, Any]],
@@ -224,11 +211,17 @@ class LLMClient:
         reasoning_effort: str = "medium",
         max_tokens: int = 16384,
         tool_choice: str = "auto",
+        stream: bool = False,
+        on_text_delta: Optional[Callable[[str], None]] = None,
+        on_tool_call: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
         Single LLM call. Returns: (response_message_dict, usage_dict with cost).
 
         Автоматически выбирает провайдера по префиксу модели.
+        With stream=True the response is streamed: on_text_delta receives
+        text as it arrives and on_tool_call each tool call once its arguments
+        are complete. The return value has the same shape either way.
         """
         provider_cfg, resolved_model = _resolve_provider(model)
         is_openrouter = provider_cfg["openrouter"]
@@ -272,8 +265,12 @@ class LLMClient:
                 kwargs["tool_choice"] = tool_choice
             log.debug(f"[LLM] Routing {model!r} -> {provider_cfg['base_url']} as {resolved_model!r}")
 
-        resp = client.chat.completions.create(**kwargs)
-        resp_dict = resp.model_dump()
+        if stream:
+            kwargs["stream"] = True
+            kwargs["stream_options"] = {"include_usage": True}
+            resp_dict = _assemble_stream(client.chat.completions.create(**kwargs), on_text_delta, on_tool_call)
+        else:
+            resp_dict = client.chat.completions.create(**kwargs).model_dump()
         usage = resp_dict.get("usage") or {}
         choices = resp_dict.get("choices") or [{}]
         msg = (choices[0] if choices else {}).get("message") or {}
@@ -294,14 +291,13 @@ class LLMClient:
                 if cache_write:
                     usage["cache_write_tokens"] = int(cache_write)
 
-        # Cost: только для OpenRouter (у прямых провайдеров cost = 0)
+        # Cost: только для OpenRouter (у прямых провайдеров cost = 0).
+        # Без usage.cost не ждём Generation API: id уходит дальше, и
+        # supervisor/cost_reconciler.py уточняет стоимость в фоне.
         if is_openrouter and not usage.get("cost"):
             gen_id = resp_dict.get("id") or ""
             if gen_id:
-                api_key = os.environ.get(provider_cfg["key_env"], "")
-                cost = self._fetch_generation_cost(gen_id, provider_cfg["base_url"], api_key)
-                if cost is not None:
-                    usage["cost"] = cost
+                usage["generation_id"] = gen_id
 
         return msg, usage
 
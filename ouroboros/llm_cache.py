@@ -0,0 +1,234 @@
+"""
+Ouroboros — Response cache for deterministic auxiliary LLM calls.
+
+Some light-model calls are effectively pure functions of their prompt and
+get repeated verbatim: the task dedup check, tool-result summaries during
+compaction, dialogue summaries of an unchanged chat tail, and multi-model
+reviews of identical content. Their responses are cached under
+sha256(model, normalized messages, params):
+
+    memory   LRU of MEMORY_ENTRIES responses per process
+    disk     <drive>/cache/llm/<key>.json, shared by all processes, pruned
+             oldest-first to OUROBOROS_LLM_CACHE_MB
+
+Puts keep a running byte total of the directory instead of listing it each
+time; it is rescanned (and pruned) when the total crosses the limit, and
+every PRUNE_EVERY_PUTS puts to pick up other processes' writes and expiries.
+
+Entries expire after OUROBOROS_LLM_CACHE_TTL_HOURS. A hit costs nothing:
+callers report it in their llm_usage event with cache_hit=True, zero tokens
+and zero cost (rounds=0, so it is not counted as a call).
+
+Opt-out: OUROBOROS_LLM_CACHE=0 disables the cache; OUROBOROS_LLM_CACHE_OFF
+takes a comma-separated list of call sites (dedup, compaction,
+dialogue_summary, review) to bypass. Call sites may also pass use_cache=False.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from ouroboros.utils import drive_available, drive_root
+
+log = logging.getLogger(__name__)
+
+SITES = ("dedup", "compaction", "dialogue_summary", "review")
+MEMORY_ENTRIES = 256
+MAX_BYTES = int(float(os.environ.get("OUROBOROS_LLM_CACHE_MB", "50") or 50) * 1024 * 1024)
+TTL_SEC = float(os.environ.get("OUROBOROS_LLM_CACHE_TTL_HOURS", "24") or 24) * 3600
+PRUNE_EVERY_PUTS = 100
+
+
+def site_enabled(site: str) -> bool:
+    if os.environ.get("OUROBOROS_LLM_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return False
+    off = {s.strip() for s in os.environ.get("OUROBOROS_LLM_CACHE_OFF", "").split(",") if s.strip()}
+    return site not in off
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):  # content blocks: keep what the model sees, drop cache_control
+        return [{k: v for k, v in b.items() if k != "cache_control"} if isinstance(b, dict) else b
+                for b in content]
+    return content
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None) -> str:
+    normalized = [{"role": m.get("role"), "content": _normalize_content(m.get("content"))} for m in messages]
+    blob = json.dumps({"model": model, "messages": normalized, "params": params or {}},
+                      sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """LRU in memory over a size-bounded, TTL'd directory of JSON entries."""
+
+    def __init__(self, cache_dir: Optional[pathlib.Path] = None,
+                 memory_entries: int = MEMORY_ENTRIES, max_bytes: int = MAX_BYTES, ttl_sec: float = TTL_SEC):
+        self._dir = pathlib.Path(cache_dir) if cache_dir is not None else None
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._memory: "collections.OrderedDict[str, Dict[str, Any]]" = collections.OrderedDict()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._disk_bytes: Optional[int] = None  # running total of cache_dir; None = rescan on next put
+        self._puts_since_scan = 0
+
+    @property
+    def cache_dir(self) -> pathlib.Path:
+        if self._dir is not None:
+            return self._dir
+        return drive_root() / "cache" / "llm"
+
+    def set_cache_dir(self, cache_dir: Optional[pathlib.Path]) -> None:
+        with self._lock:
+            self._dir = pathlib.Path(cache_dir) if cache_dir is not None else None
+            self._memory.clear()
+            self._stats.clear()
+            self._disk_bytes = None
+            self._puts_since_scan = 0
+
+    def _disk_enabled(self) -> bool:
+        return drive_available(self._dir)
+
+    def _count(self, site: str, field: str, amount: float = 1) -> None:
+        st = self._stats.setdefault(site, {"hits": 0, "misses": 0, "saved_usd": 0.0})
+        st[field] += amount
+
+    def get(self, key: str, site: str = "") -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry["ts"] < self.ttl_sec:
+                self._memory.move_to_end(key)
+                self._count(site, "hits")
+                self._count(site, "saved_usd", float(entry.get("cost") or 0))
+                return entry
+        entry = self._read_disk(key, now) if self._disk_enabled() else None
+        with self._lock:
+            if entry is None:
+                self._count(site, "misses")
+                return None
+            self._remember(key, entry)
+            self._count(site, "hits")
+            self._count(site, "saved_usd", float(entry.get("cost") or 0))
+        return entry
+
+    def put(self, key: str, value: Dict[str, Any], cost: float = 0.0) -> None:
+        entry = {"ts": time.time(), "cost": float(cost or 0), "value": value}
+        with self._lock:
+            self._remember(key, entry)
+        if not self._disk_enabled():
+            return
+        try:
+            d = self.cache_dir
+            d.mkdir(parents=True, exist_ok=True)
+            path = d / f"{key}.json"
+            tmp = d / f".{key}.tmp.{uuid.uuid4().hex}"
+            data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+            tmp.write_bytes(data)
+            os.replace(str(tmp), str(path))
+            self._account(len(data))
+        except Exception:
+            log.debug("Failed to write LLM cache entry", exc_info=True)
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.debug(f"Unreadable LLM cache entry {path}", exc_info=True)
+            return None
+        if now - float(entry.get("ts") or 0) >= self.ttl_sec:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _account(self, added: int) -> None:
+        # The total over-counts overwritten keys and misses other processes'
+        # puts; both are corrected by the rescan in _prune_disk.
+        with self._lock:
+            self._puts_since_scan += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += added
+            due = (self._disk_bytes is None or self._disk_bytes > self.max_bytes
+                   or self._puts_since_scan >= PRUNE_EVERY_PUTS)
+            if due:
+                self._puts_since_scan = 0
+        if due:
+            total = self._prune_disk()
+            with self._lock:
+                self._disk_bytes = total
+
+    def _prune_disk(self) -> int:
+        """Drop expired entries and the oldest ones over max_bytes. Returns the bytes left."""
+        now = time.time()
+        files: List[Tuple[float, int, pathlib.Path]] = []
+        for p in self.cache_dir.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _mtime, size, _p in files)
+        for mtime, size, p in sorted(files):
+            if total <= self.max_bytes and now - mtime < self.ttl_sec:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {site: dict(st) for site, st in self._stats.items()}
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+
+response_cache = LLMResponseCache()
+
+
+def cached_chat(llm: Any, site: str, messages: List[Dict[str, Any]], model: str,
+                use_cache: bool = True, **params: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """llm.chat through the response cache. On a hit usage is zero-cost with cache_hit=True."""
+    if not (use_cache and site_enabled(site)):
+        return llm.chat(messages=messages, model=model, **params)
+    key = cache_key(model, messages, params)
+    entry = response_cache.get(key, site)
+    if entry is not None:
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0, "rounds": 0,
+                 "cache_hit": True, "saved_cost": float(entry.get("cost") or 0)}
+        return dict(entry["value"]), usage
+    msg, usage = llm.chat(messages=messages, model=model, **params)
+    usage["cache_hit"] = False
+    if (msg.get("content") or "").strip() and not msg.get("tool_calls"):
+        response_cache.put(key, {"role": "assistant", "content": msg["content"]}, cost=usage.get("cost") or 0)
+    return msg, usage
@@ -0,0 +1,555 @@
+"""
+Ouroboros — Columnar log archive.
+
+Sealed segments of events.jsonl and tools.jsonl (see segmented_log.py) are
+compacted once into fixed-width column files under logs/columns/<stem>.NNNNNN/:
+
+    meta.json               per table: row count, column types, and the
+                            dictionaries for string columns
+    <table>.<column>.bin    little-endian array (float64 / int64 / int32 / int8)
+
+String columns (model, category, tool, task, ...) are dictionary-encoded
+as int32 codes. Files are raw arrays, so NumPy can load them with
+np.fromfile when it is installed and group-bys become np.bincount calls;
+without NumPy the same files are read through the stdlib array module.
+
+A per-log watermark (logs/columns/<stem>.watermark.json) records the
+segment up to which every chunk is current, so the check run on each
+rotation only looks at segments sealed since.
+
+Query with LogColumns(logs_dir).group_by(table, by, sums, mins, maxes); by
+may be one column or a tuple of columns. The live (unsealed) file is folded
+in so results are complete; it is parsed incrementally, so each query only
+reads the lines appended since the previous one in this process.
+iter_groups() yields the same per chunk, optionally newest first, for
+queries that can stop early.
+
+The llm table also holds llm_cost_reconciled rows (calls=0), which adjust
+cost without counting as calls. model_costs() and recent_task_costs() are
+the cost queries built on it (per-category and per-day totals come from
+supervisor/cost_rollup.py).
+"""
+
+from __future__ import annotations
+
+import array
+import datetime
+import json
+import logging
+import os
+import pathlib
+import shutil
+import sys
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ouroboros.segmented_log import SegmentedLog, line_fingerprint
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+log = logging.getLogger(__name__)
+
+COLUMNS_VERSION = 2
+_NP_DTYPES = {"d": "<f8", "q": "<i8", "i": "<i4", "b": "i1"}
+
+
+def _ts(value: Any) -> float:
+    try:
+        return datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _num(value: Any, cast: Callable[[Any], Any]) -> Any:
+    try:
+        return cast(value or 0)
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+def _llm_cost(e: Dict[str, Any]) -> float:
+    if "cost" in e:
+        return _num(e.get("cost"), float)
+    usage = e.get("usage")
+    return _num(usage.get("cost"), float) if isinstance(usage, dict) else 0.0
+
+
+# table -> (source log, row filter, [(column, typecode or "s" for dictionary, extractor)])
+TABLES: Dict[str, Tuple[str, Callable[[Dict[str, Any]], bool], List[Tuple[str, str, Callable]]]] = {
+    "llm": ("events.jsonl", lambda e: e.get("type") in ("llm_usage", "llm_cost_reconciled"), [
+        ("ts", "d", lambda e: _ts(e.get("ts"))),
+        ("calls", "b", lambda e: int(e.get("type") == "llm_usage")),
+        ("type", "s", lambda e: e.get("type")),
+        ("model", "s", lambda e: e.get("model") or "unknown"),
+        ("category", "s", lambda e: e.get("category") or "other"),
+        ("task", "s", lambda e: e.get("task_id") or ""),
+        ("prompt_tokens", "q", lambda e: _num(e.get("prompt_tokens"), int)),
+        ("completion_tokens", "q", lambda e: _num(e.get("completion_tokens"), int)),
+        ("cached_tokens", "q", lambda e: _num(e.get("cached_tokens"), int)),
+        ("cost", "d", _llm_cost),
+    ]),
+    "events": ("events.jsonl", lambda e: True, [
+        ("ts", "d", lambda e: _ts(e.get("ts"))),
+        ("type", "s", lambda e: e.get("type") or "unknown"),
+        ("task", "s", lambda e: e.get("task_id") or ""),
+    ]),
+    "tools": ("tools.jsonl", lambda e: True, [
+        ("ts", "d", lambda e: _ts(e.get("ts"))),
+        ("tool", "s", lambda e: e.get("tool") or e.get("tool_name") or "?"),
+        ("task", "s", lambda e: e.get("task_id") or ""),
+        ("source", "s", lambda e: e.get("source") or "task"),
+        ("error", "b", lambda e: int(str(e.get("result_preview", "")).lstrip().startswith("⚠️"))),
+    ]),
+}
+COLUMNAR_LOGS = tuple(sorted({spec[0] for spec in TABLES.values()}))
+
+_chunk_cache_lock = threading.Lock()
+_chunk_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+_live_lock = threading.Lock()
+_live_cache: Dict[str, Dict[str, Any]] = {}  # live log path -> {fingerprint, offset, builder}
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+class _ChunkBuilder:
+    """Column tables of one log, filled record by record."""
+
+    def __init__(self, log_name: str):
+        self.specs = {t: spec for t, spec in TABLES.items() if spec[0] == log_name}
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.codes: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for t, (_src, _keep, cols) in self.specs.items():
+            self.tables[t] = {
+                "rows": 0,
+                "cols": {c: array.array("i" if tc == "s" else tc) for c, tc, _ in cols},
+                "dicts": {c: [] for c, tc, _ in cols if tc == "s"},
+            }
+            self.codes[t] = {c: {} for c, tc, _ in cols if tc == "s"}
+
+    def add(self, rec: Dict[str, Any]) -> None:
+        for t, (_src, keep, cols) in self.specs.items():
+            if not keep(rec):
+                continue
+            table = self.tables[t]
+            for c, tc, get in cols:
+                value = get(rec)
+                if tc == "s":
+                    codes = self.codes[t][c]
+                    code = codes.get(value)
+                    if code is None:
+                        code = codes[value] = len(codes)
+                        table["dicts"][c].append(value)
+                    value = code
+                table["cols"][c].append(value)
+            table["rows"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the tables, safe to query while more records are added."""
+        return {t: {"rows": table["rows"],
+                    "cols": {c: array.array(arr.typecode, arr) for c, arr in table["cols"].items()},
+                    "dicts": {c: list(names) for c, names in table["dicts"].items()}}
+                for t, table in self.tables.items()}
+
+
+def build_chunk(records: Iterable[Dict[str, Any]], log_name: str) -> Dict[str, Any]:
+    """Encode parsed records of one log into in-memory column tables."""
+    builder = _ChunkBuilder(log_name)
+    for rec in records:
+        builder.add(rec)
+    return builder.tables
+
+
+def _write_chunk(out_dir: pathlib.Path, tables: Dict[str, Any], source: str) -> None:
+    tmp = out_dir.with_name(f".{out_dir.name}.tmp.{uuid.uuid4().hex}")
+    tmp.mkdir(parents=True)
+    meta: Dict[str, Any] = {"version": COLUMNS_VERSION, "source": source, "tables": {}}
+    for t, table in tables.items():
+        for c, arr in table["cols"].items():
+            if sys.byteorder == "big":
+                arr = array.array(arr.typecode, arr)
+                arr.byteswap()
+            with (tmp / f"{t}.{c}.bin").open("wb") as f:
+                arr.tofile(f)
+        meta["tables"][t] = {
+            "rows": table["rows"],
+            "columns": {c: arr.typecode for c, arr in table["cols"].items()},
+            "dicts": table["dicts"],
+        }
+    (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    try:
+        os.rename(str(tmp), str(out_dir))
+    except OSError:  # another compactor got there first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read_chunk(chunk_dir: pathlib.Path) -> Optional[Dict[str, Any]]:
+    try:
+        meta_path = chunk_dir / "meta.json"
+        mtime = meta_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    key = str(chunk_dir)
+    with _chunk_cache_lock:
+        cached = _chunk_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("version") != COLUMNS_VERSION:
+        return None  # written by an older version; recompacted by the next pass
+    tables: Dict[str, Any] = {}
+    for t, info in meta.get("tables", {}).items():
+        cols = {}
+        for c, tc in info["columns"].items():
+            path = chunk_dir / f"{t}.{c}.bin"
+            if np is not None:
+                cols[c] = np.fromfile(str(path), dtype=_NP_DTYPES[tc])
+            else:
+                arr = array.array(tc)
+                arr.frombytes(path.read_bytes())
+                if sys.byteorder == "big":
+                    arr.byteswap()
+                cols[c] = arr
+        tables[t] = {"rows": info["rows"], "cols": cols, "dicts": info["dicts"]}
+    with _chunk_cache_lock:
+        _chunk_cache[key] = (mtime, tables)
+    return tables
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+def _chunk_dir(logs_dir: pathlib.Path, slog: SegmentedLog, seg: Dict[str, Any]) -> pathlib.Path:
+    return pathlib.Path(logs_dir) / "columns" / f"{slog.stem}.{int(seg['seq']):06d}"
+
+
+def _chunk_current(chunk_dir: pathlib.Path) -> bool:
+    try:
+        meta = json.loads((chunk_dir / "meta.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return False
+    except Exception:
+        log.debug(f"Unreadable column chunk {chunk_dir}", exc_info=True)
+        return False
+    return meta.get("version") == COLUMNS_VERSION
+
+
+def _watermark_path(logs_dir: pathlib.Path, slog: SegmentedLog) -> pathlib.Path:
+    return pathlib.Path(logs_dir) / "columns" / f"{slog.stem}.watermark.json"
+
+
+def _watermark(logs_dir: pathlib.Path, slog: SegmentedLog) -> int:
+    """Highest segment seq up to which every chunk is current (-1: none)."""
+    try:
+        data = json.loads(_watermark_path(logs_dir, slog).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return -1
+    except Exception:
+        log.debug(f"Unreadable column watermark of {slog.stem}", exc_info=True)
+        return -1
+    return int(data.get("seq", -1)) if data.get("version") == COLUMNS_VERSION else -1
+
+
+def _set_watermark(logs_dir: pathlib.Path, slog: SegmentedLog, seq: int) -> None:
+    path = _watermark_path(logs_dir, slog)
+    tmp = path.with_name(f".{path.name}.tmp.{uuid.uuid4().hex}")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps({"version": COLUMNS_VERSION, "seq": seq}), encoding="utf-8")
+        os.replace(str(tmp), str(path))
+    except Exception:
+        log.debug(f"Failed to save column watermark of {slog.stem}", exc_info=True)
+
+
+def needs_compaction(logs_dir: pathlib.Path) -> bool:
+    for name in COLUMNAR_LOGS:
+        slog = SegmentedLog(logs_dir, name)
+        mark = _watermark(logs_dir, slog)
+        if any(not _chunk_current(_chunk_dir(logs_dir, slog, seg))
+               for seg in slog.segments() if int(seg["seq"]) > mark):
+            return True
+    return False
+
+
+def compact_sealed(logs_dir: pathlib.Path) -> int:
+    """Encode every sealed segment past the watermark that has no current
+    column chunk, then advance the watermark. Returns how many were encoded."""
+    done = 0
+    for name in COLUMNAR_LOGS:
+        slog = SegmentedLog(logs_dir, name)
+        mark = new_mark = _watermark(logs_dir, slog)
+        contiguous = True
+        for seg in slog.segments():
+            seq = int(seg["seq"])
+            if seq <= mark:
+                continue
+            out = _chunk_dir(logs_dir, slog, seg)
+            if not _chunk_current(out):
+                if out.exists():
+                    shutil.rmtree(out, ignore_errors=True)  # older column layout
+                try:
+                    with slog.open(seg) as f:
+                        tables = build_chunk(_parse_lines(f), name)
+                except FileNotFoundError:
+                    contiguous = False  # pruned meanwhile; next pass re-checks
+                    continue
+                except Exception:
+                    log.warning(f"Failed to compact {name} segment {seq}", exc_info=True)
+                    contiguous = False
+                    continue
+                _write_chunk(out, tables, seg["file"])
+                done += 1
+            if contiguous:
+                new_mark = seq
+        if new_mark > mark:
+            _set_watermark(logs_dir, slog, new_mark)
+    return done
+
+
+def _parse_lines(lines: Iterable[bytes]) -> Iterable[Dict[str, Any]]:
+    for raw in lines:
+        if not raw.strip():
+            continue
+        try:
+            rec = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(rec, dict):
+            yield rec
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+def _live_chunk(path: pathlib.Path, log_name: str) -> Optional[Dict[str, Any]]:
+    """Tables of the live log, parsing only lines appended since the last call."""
+    key = str(path)
+    with _live_lock:
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            _live_cache.pop(key, None)
+            return None
+        fingerprint = line_fingerprint(path)
+        state = _live_cache.get(key)
+        if state is None or state["fingerprint"] != fingerprint or size < state["offset"]:
+            state = _live_cache[key] = {"fingerprint": fingerprint, "offset": 0,
+                                        "builder": _ChunkBuilder(log_name)}
+        if size > state["offset"]:
+            with path.open("rb") as f:
+                f.seek(state["offset"])
+                offset = state["offset"]
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # partial trailing line: picked up next time
+                    offset += len(raw)
+                    for rec in _parse_lines((raw,)):
+                        state["builder"].add(rec)
+                state["offset"] = offset
+            if not state["fingerprint"]:
+                state["fingerprint"] = line_fingerprint(path)
+        return state["builder"].snapshot()
+
+
+class LogColumns:
+    """Vectorized group-bys over the columnar archive plus the live log."""
+
+    def __init__(self, logs_dir: pathlib.Path):
+        self.logs_dir = pathlib.Path(logs_dir)
+
+    def _chunks(self, table: str, include_live: bool, newest_first: bool = False) -> Iterator[Dict[str, Any]]:
+        log_name = TABLES[table][0]
+        slog = SegmentedLog(self.logs_dir, log_name)
+        live = _live_chunk(slog.live_path, log_name) if include_live else None
+        if newest_first and live is not None:
+            yield live[table]
+        segs = slog.segments()
+        for seg in (reversed(segs) if newest_first else segs):
+            chunk = _read_chunk(_chunk_dir(self.logs_dir, slog, seg))
+            if chunk is None:  # not compacted yet: decode on the fly
+                try:
+                    with slog.open(seg) as f:
+                        chunk = build_chunk(_parse_lines(f), log_name)
+                except FileNotFoundError:
+                    continue
+            yield chunk[table]
+        if not newest_first and live is not None:
+            yield live[table]
+
+    def iter_groups(self, table: str, by: Union[str, Tuple[str, ...]], sums: Iterable[str] = (),
+                    since: Optional[float] = None, until: Optional[float] = None,
+                    include_live: bool = True, mins: Iterable[str] = (), maxes: Iterable[str] = (),
+                    newest_first: bool = False) -> Iterator[Dict[Any, Dict[str, float]]]:
+        """group_by of each chunk (sealed segment or live log) separately, oldest
+        first or newest first, so a caller can stop once it has what it needs."""
+        keys = (by,) if isinstance(by, str) else tuple(by)
+        aggs = _aggregations(sums, mins, maxes)
+        for chunk in self._chunks(table, include_live, newest_first):
+            if not chunk["rows"]:
+                continue
+            names = [chunk["dicts"].get(k) for k in keys]
+            if any(n is None for n in names):
+                raise ValueError(f"{table}.{keys} are not all dictionary columns")
+            groups = (_group_numpy if np is not None else _group_python)(chunk, keys, aggs, since, until)
+            out: Dict[Any, Dict[str, float]] = {}
+            for codes, totals in groups:
+                key = tuple(n[c] for n, c in zip(names, codes))
+                _merge_group(out, key[0] if isinstance(by, str) else key, totals, aggs)
+            yield out
+
+    def group_by(self, table: str, by: Union[str, Tuple[str, ...]], sums: Iterable[str] = (),
+                 since: Optional[float] = None, until: Optional[float] = None,
+                 include_live: bool = True, mins: Iterable[str] = (),
+                 maxes: Iterable[str] = ()) -> Dict[Any, Dict[str, float]]:
+        """{key: {"count": n, <sum column>: total, "min_<c>": .., "max_<c>": ..}} over rows
+        with since <= ts < until. key is a value of by, or a tuple of values if by is a tuple."""
+        sums, mins, maxes = tuple(sums), tuple(mins), tuple(maxes)
+        aggs = _aggregations(sums, mins, maxes)
+        out: Dict[Any, Dict[str, float]] = {}
+        for groups in self.iter_groups(table, by, sums, since, until, include_live, mins, maxes):
+            for key, totals in groups.items():
+                _merge_group(out, key, totals, aggs)
+        return out
+
+
+def _aggregations(sums: Iterable[str], mins: Iterable[str], maxes: Iterable[str]) -> List[Tuple[str, str, str]]:
+    return [(s, "sum", s) for s in sums] + [(f"min_{c}", "min", c) for c in mins] \
+        + [(f"max_{c}", "max", c) for c in maxes]
+
+
+def _merge_group(out: Dict[Any, Dict[str, float]], key: Any, totals: Dict[str, float],
+                 aggs: List[Tuple[str, str, str]]) -> None:
+    acc = out.get(key)
+    if acc is None:
+        out[key] = dict(totals)
+        return
+    acc["count"] += totals["count"]
+    for name, kind, _col in aggs:
+        if kind == "sum":
+            acc[name] += totals[name]
+        elif kind == "min":
+            acc[name] = min(acc[name], totals[name])
+        else:
+            acc[name] = max(acc[name], totals[name])
+
+
+def _group_numpy(chunk: Dict[str, Any], keys: Tuple[str, ...], aggs: List[Tuple[str, str, str]],
+                 since: Optional[float], until: Optional[float]) -> List[Tuple[Tuple[int, ...], Dict[str, float]]]:
+    cols = {c: np.asarray(v) for c, v in chunk["cols"].items()}
+    mask = np.ones(chunk["rows"], dtype=bool)
+    if since is not None:
+        mask &= cols["ts"] >= since
+    if until is not None:
+        mask &= cols["ts"] < until
+    sizes = [len(chunk["dicts"][k]) for k in keys]
+    combined = np.zeros(int(mask.sum()), dtype=np.int64)
+    for k, n in zip(keys, sizes):
+        combined = combined * n + cols[k][mask]
+    groups, inv = np.unique(combined, return_inverse=True)
+    totals = {"count": np.bincount(inv, minlength=len(groups))}
+    for name, kind, col in aggs:
+        values = cols[col][mask].astype(np.float64)
+        if kind == "sum":
+            totals[name] = np.bincount(inv, weights=values, minlength=len(groups))
+        else:
+            acc = np.full(len(groups), np.inf if kind == "min" else -np.inf)
+            (np.minimum if kind == "min" else np.maximum).at(acc, inv, values)
+            totals[name] = acc
+    out = []
+    for i, g in enumerate(groups.tolist()):
+        codes = []
+        for n in reversed(sizes):
+            g, code = divmod(g, n)
+            codes.append(code)
+        out.append((tuple(reversed(codes)), {k: v[i].item() for k, v in totals.items()}))
+    return out
+
+
+def _group_python(chunk: Dict[str, Any], keys: Tuple[str, ...], aggs: List[Tuple[str, str, str]],
+                  since: Optional[float], until: Optional[float]) -> List[Tuple[Tuple[int, ...], Dict[str, float]]]:
+    key_cols = [chunk["cols"][k] for k in keys]
+    ts = chunk["cols"]["ts"]
+    values = [(name, kind, chunk["cols"][col]) for name, kind, col in aggs]
+    groups: Dict[Tuple[int, ...], Dict[str, float]] = {}
+    for i in range(chunk["rows"]):
+        if (since is not None and ts[i] < since) or (until is not None and ts[i] >= until):
+            continue
+        codes = tuple(col[i] for col in key_cols)
+        acc = groups.get(codes)
+        if acc is None:
+            acc = groups[codes] = {"count": 0, **{name: (0 if kind == "sum" else col[i])
+                                                  for name, kind, col in values}}
+        acc["count"] += 1
+        for name, kind, col in values:
+            if kind == "sum":
+                acc[name] += col[i]
+            elif kind == "min":
+                acc[name] = min(acc[name], col[i])
+            else:
+                acc[name] = max(acc[name], col[i])
+    return list(groups.items())
+
+
+# ---------------------------------------------------------------------------
+# Cost queries
+# ---------------------------------------------------------------------------
+
+def model_costs(logs_dir: pathlib.Path) -> Dict[str, Dict[str, float]]:
+    """{model: {cost, calls, prompt_tokens, completion_tokens, cached_tokens}} over the whole log."""
+    groups = LogColumns(logs_dir).group_by(
+        "llm", "model", sums=("calls", "cost", "prompt_tokens", "completion_tokens", "cached_tokens"))
+    return {
+        model: {"cost": g["cost"], "calls": int(g["calls"]), "prompt_tokens": int(g["prompt_tokens"]),
+                "completion_tokens": int(g["completion_tokens"]), "cached_tokens": int(g["cached_tokens"])}
+        for model, g in groups.items() if g["calls"] > 0  # reconciliations alone are not calls
+    }
+
+
+def recent_task_costs(logs_dir: pathlib.Path, max_tasks: int = 10,
+                      recent_tasks: int = 50) -> List[Dict[str, Any]]:
+    """Most expensive of the recent_tasks most recently active tasks:
+    [{task_id, cost, rounds, model}], model being that of the task's first call.
+
+    Chunks are read newest first. Once the recent set is known, reading stops
+    at the first chunk holding none of its tasks: a task's calls are
+    contiguous in time, so older chunks hold none either. Calls without a
+    task ("unknown") never keep the scan going.
+    """
+    tasks: Dict[str, Dict[str, Any]] = {}
+    recent: Optional[set] = None
+    for groups in LogColumns(logs_dir).iter_groups(
+            "llm", ("task", "model", "type"), sums=("calls", "cost"),
+            mins=("ts",), maxes=("ts",), newest_first=True):
+        touched = False
+        for (task, model, etype), g in groups.items():
+            tid = task or "unknown"
+            if recent is not None and tid not in recent:
+                continue
+            touched = touched or bool(task)
+            t = tasks.setdefault(tid, {"task_id": tid, "cost": 0.0, "rounds": 0,
+                                       "model": None, "first": None, "last": None})
+            t["cost"] += g["cost"]
+            if etype != "llm_usage":
+                continue  # reconciliations adjust cost but are not activity
+            t["rounds"] += int(g["calls"])
+            t["last"] = g["max_ts"] if t["last"] is None else max(t["last"], g["max_ts"])
+            if t["first"] is None or g["min_ts"] < t["first"]:
+                t["first"], t["model"] = g["min_ts"], model
+        if recent is None:
+            active = [t for t in tasks.values() if t["rounds"]]
+            if len(active) >= recent_tasks:
+                active.sort(key=lambda t: t["last"], reverse=True)
+                recent = {t["task_id"] for t in active[:recent_tasks]}
+        elif not touched:
+            break
+    active = sorted((t for t in tasks.values() if t["rounds"]), key=lambda t: t["last"], reverse=True)
+    out = [{k: t[k] for k in ("task_id", "cost", "rounds", "model")} for t in active[:recent_tasks]]
+    out.sort(key=lambda t: t["cost"], reverse=True)
+    return out[:max_tasks]
@@ -11,104 +11,25 @@ import json
 import os
 import pathlib
 import queue
-import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import logging
 
-from ouroboros.llm import LLMClient, normalize_reasoning_effort, add_usage
+from ouroboros.llm import LLMClient, normalize_reasoning_effort, add_usage, streaming_enabled
+from ouroboros.stream_dispatch import EarlyToolDispatcher
+from ouroboros.tool_pool import get_pool
+from ouroboros.tool_scheduler import build_dag, run_dag
 from ouroboros.tools.registry import ToolRegistry
-from ouroboros.context import compact_tool_history, compact_tool_history_llm
-from ouroboros.utils import utc_now_iso, append_jsonl, truncate_for_log, sanitize_tool_args_for_log, sanitize_tool_result_for_log, estimate_tokens
+from ouroboros.context import ToolHistoryCompactor, compact_tool_history_llm
+from ouroboros.utils import utc_now_iso, append_jsonl, truncate_for_log, sanitize_tool_args_for_log, sanitize_tool_result_for_log
+from ouroboros.tokenizer import count_messages_tokens
+from ouroboros.pricing import estimate_cost
+from ouroboros import model_health
 
 log = logging.getLogger(__name__)
 
-# Pricing from OpenRouter API (2026-02-17). Update periodically via /api/v1/models.
-_MODEL_PRICING_STATIC = {
-    "anthropic/claude-opus-4.6": (5.0, 0.5, 25.0),
-    "anthropic/claude-opus-4": (15.0, 1.5, 75.0),
-    "anthropic/claude-sonnet-4": (3.0, 0.30, 15.0),
-    "anthropic/claude-sonnet-4.6": (3.0, 0.30, 15.0),
-    "anthropic/claude-sonnet-4.5": (3.0, 0.30, 15.0),
-    "openai/o3": (2.0, 0.50, 8.0),
-    "openai/o3-pro": (20.0, 1.0, 80.0),
-    "openai/o4-mini": (1.10, 0.275, 4.40),
-    "openai/gpt-4.1": (2.0, 0.50, 8.0),
-    "openai/gpt-5.2": (1.75, 0.175, 14.0),
-    "openai/gpt-5.2-codex": (1.75, 0.175, 14.0),
-    "google/gemini-2.5-pro-preview": (1.25, 0.125, 10.0),
-    "google/gemini-3-pro-preview": (2.0, 0.20, 12.0),
-    "x-ai/grok-3-mini": (0.30, 0.03, 0.50),
-    "qwen/qwen3.5-plus-02-15": (0.40, 0.04, 2.40),
-}
-
-_pricing_fetched = False
-_cached_pricing = None
-_pricing_lock = threading.Lock()
-
-def _get_pricing() -> Dict[str, Tuple[float, float, float]]:
-    """
-    Lazy-load pricing. On first call, attempts to fetch from OpenRouter API.
-    Falls back to static pricing if fetch fails.
-    Thread-safe via module-level lock.
-    """
-    global _pricing_fetched, _cached_pricing
-
-    if _pricing_fetched:
-        return _cached_pricing or _MODEL_PRICING_STATIC
-
-    with _pricing_lock:
-        if _pricing_fetched:
-            return _cached_pricing or _MODEL_PRICING_STATIC
-
-        _pricing_fetched = True
-        _cached_pricing = dict(_MODEL_PRICING_STATIC)
-
-        try:
-            from ouroboros.llm import fetch_openrouter_pricing
-            _live = fetch_openrouter_pricing()
-            if _live and len(_live) > 5:
-                _cached_pricing.update(_live)
-        except Exception as e:
-            import logging as _log
-            _log.getLogger(__name__).warning("Failed to sync pricing from OpenRouter: %s", e)
-            _pricing_fetched = False
-
-        return _cached_pricing
-
-def _estimate_cost(model: str, prompt_tokens: int, completion_tokens: int,
-                   cached_tokens: int = 0, cache_write_tokens: int = 0) -> float:
-    """Estimate cost from token counts using known pricing. Returns 0 if model unknown."""
-    model_pricing = _get_pricing()
-    pricing = model_pricing.get(model)
-    if not pricing:
-        best_match = None
-        best_length = 0
-        for key, val in model_pricing.items():
-            if model and model.startswith(key):
-                if len(key) > best_length:
-                    best_match = val
-                    best_length = len(key)
-        pricing = best_match
-    if not pricing:
-        return 0.0
-    input_price, cached_price, output_price = pricing
-    regular_input = max(0, prompt_tokens - cached_tokens)
-    cost = (
-        regular_input * input_price / 1_000_000
-        + cached_tokens * cached_price / 1_000_000
-        + completion_tokens * output_price / 1_000_000
-    )
-    return round(cost, 6)
-
-READ_ONLY_PARALLEL_TOOLS = frozenset({
-    "repo_read", "repo_list",
-    "drive_read", "drive_list",
-    "web_search", "codebase_digest", "chat_history",
-})
-
 STATEFUL_BROWSER_TOOLS = frozenset({"browse_page", "browser_action"})
 
 
@@ -240,43 +161,12 @@ def _make_timeout_result(
     }
 
 
-def _execute_with_timeout(
-    tools: ToolRegistry,
-    tc: Dict[str, Any],
-    drive_logs: pathlib.Path,
-    timeout_sec: int,
-    task_id: str = "",
-    stateful_executor: Optional[_StatefulToolExecutor] = None,
-) -> Dict[str, Any]:
-    fn_name = tc["function"]["name"]
-    tool_call_id = tc["id"]
-    is_code_tool = fn_name in tools.CODE_TOOLS
-    use_stateful = stateful_executor and fn_name in STATEFUL_BROWSER_TOOLS
-
-    if use_stateful:
-        future = stateful_executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
-        try:
-            return future.result(timeout=timeout_sec)
-        except TimeoutError:
-            stateful_executor.reset()
-            reset_msg = "Browser state has been reset. "
-            return _make_timeout_result(
-                fn_name, tool_call_id, is_code_tool, tc, drive_logs,
-                timeout_sec, task_id, reset_msg
-            )
-    else:
-        executor = ThreadPoolExecutor(max_workers=1)
-        try:
-            future = executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
-            try:
-                return future.result(timeout=timeout_sec)
-            except TimeoutError:
-                return _make_timeout_result(
-                    fn_name, tool_call_id, is_code_tool, tc, drive_logs,
-                    timeout_sec, task_id, reset_msg=""
-                )
-        finally:
-            executor.shutdown(wait=False, cancel_futures=True)
+def _call_access(tools: ToolRegistry, tc: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+    try:
+        args = json.loads(tc["function"]["arguments"] or "{}")
+    except (json.JSONDecodeError, ValueError):
+        return "read", ()  # fails fast with TOOL_ARG_ERROR, touches nothing
+    return tools.access(tc["function"]["name"], args if isinstance(args, dict) else {})
 
 
 def _handle_tool_calls(
@@ -288,41 +178,55 @@ def _handle_tool_calls(
     messages: List[Dict[str, Any]],
     llm_trace: Dict[str, Any],
     emit_progress: Callable[[str], None],
+    prefetched: Optional[EarlyToolDispatcher] = None,
 ) -> int:
-    can_parallel = (
-        len(tool_calls) > 1 and
-        all(
-            tc.get("function", {}).get("name") in READ_ONLY_PARALLEL_TOOLS
-            for tc in tool_calls
-        )
-    )
-
-    if not can_parallel:
-        results = [
-            _execute_with_timeout(tools, tc, drive_logs,
-                                  tools.get_timeout(tc["function"]["name"]), task_id,
-                                  stateful_executor)
-            for tc in tool_calls
-        ]
-    else:
-        max_workers = min(len(tool_calls), 8)
-        executor = ThreadPoolExecutor(max_workers=max_workers)
-        try:
-            future_to_index = {
-                executor.submit(
-                    _execute_with_timeout, tools, tc, drive_logs,
-                    tools.get_timeout(tc["function"]["name"]), task_id,
-                    stateful_executor,
-                ): idx
-                for idx, tc in enumerate(tool_calls)
-            }
-            results = [None] * len(tool_calls)
-            for future in as_completed(future_to_index):
-                idx = future_to_index[future]
-                results[idx] = future.result()
-        finally:
-            executor.shutdown(wait=False, cancel_futures=True)
+    """
+    Execute a batch of tool calls, concurrently where their resources allow.
 
+    Calls that conflict (see tool_scheduler) run in the model's order; the
+    rest run in parallel on the tool pool. Browser tools go through the
+    thread-sticky stateful executor. Results keep the original order.
+    """
+    early: Dict[int, Any] = {}
+    if prefetched is not None:
+        for idx, tc in enumerate(tool_calls):
+            future = prefetched.take(tc)
+            if future is not None:
+                early[idx] = future  # a read-only prefix of the batch, already running
+
+    pool = get_pool()
+    deps = build_dag([_call_access(tools, tc) for tc in tool_calls])
+
+    def _is_stateful(idx: int) -> bool:
+        return bool(stateful_executor) and tool_calls[idx]["function"]["name"] in STATEFUL_BROWSER_TOOLS
+
+    def _start(idx: int):
+        tc = tool_calls[idx]
+        if _is_stateful(idx):
+            return stateful_executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
+        return pool.submit(_execute_single_tool, tools, tc, drive_logs, task_id, name=tc["function"]["name"])
+
+    def _on_timeout(idx: int, future) -> Dict[str, Any]:
+        tc = tool_calls[idx]
+        fn_name = tc["function"]["name"]
+        reset_msg = ""
+        if _is_stateful(idx):
+            stateful_executor.reset()
+            reset_msg = "Browser state has been reset. "
+        else:
+            pool.abandon(future)
+        return _make_timeout_result(fn_name, tc["id"], fn_name in tools.CODE_TOOLS, tc, drive_logs,
+                                    tools.get_timeout(fn_name), task_id, reset_msg)
+
+    def _on_error(idx: int, e: BaseException) -> Dict[str, Any]:
+        tc = tool_calls[idx]
+        fn_name = tc["function"]["name"]
+        return {"tool_call_id": tc["id"], "fn_name": fn_name, "is_error": True, "args_for_log": {},
+                "result": f"⚠️ TOOL_ERROR ({fn_name}): {type(e).__name__}: {e}",
+                "is_code_tool": fn_name in tools.CODE_TOOLS}
+
+    results = run_dag(deps, _start, lambda idx: tools.get_timeout(tool_calls[idx]["function"]["name"]),
+                      _on_timeout, _on_error, started=early)
     return _process_tool_results(results, messages, llm_trace, emit_progress)
 
 
@@ -387,12 +291,7 @@ def _maybe_inject_self_check(
     REMINDER_INTERVAL = 50
     if round_idx <= 1 or round_idx % REMINDER_INTERVAL != 0:
         return
-    ctx_tokens = sum(
-        estimate_tokens(str(m.get("content", "")))
-        if isinstance(m.get("content"), str)
-        else sum(estimate_tokens(str(b.get("text", ""))) for b in m.get("content", []) if isinstance(b, dict))
-        for m in messages
-    )
+    ctx_tokens = count_messages_tokens(messages)
     task_cost = accumulated_usage.get("cost", 0)
     checkpoint_num = round_idx // REMINDER_INTERVAL
 
@@ -470,7 +369,7 @@ def _drain_incoming_messages(
     drive_root: Optional[pathlib.Path],
     task_id: str,
     event_queue: Optional[queue.Queue],
-    _owner_msg_seen: set,
+    owner_cursor: Any,
 ) -> None:
     while not incoming_messages.empty():
         try:
@@ -481,7 +380,7 @@ def _drain_incoming_messages(
 
     if drive_root is not None and task_id:
         from ouroboros.owner_inject import drain_owner_messages
-        drive_msgs = drain_owner_messages(drive_root, task_id=task_id, seen_ids=_owner_msg_seen)
+        drive_msgs = drain_owner_messages(drive_root, task_id=task_id, cursor=owner_cursor)
         for dmsg in drive_msgs:
             messages.append({
                 "role": "user",
@@ -548,7 +447,16 @@ def run_llm_loop(
     tools._ctx.event_queue = event_queue
     tools._ctx.task_id = task_id
     stateful_executor = _StatefulToolExecutor()
-    _owner_msg_seen: set = set()
+    from ouroboros.owner_inject import MailboxCursor
+    owner_cursor = MailboxCursor()
+    compactor = ToolHistoryCompactor(keep_recent=6)
+    dispatcher: Optional[EarlyToolDispatcher] = None
+    if streaming_enabled():
+        dispatcher = EarlyToolDispatcher(
+            run_tool=lambda tc: _execute_single_tool(tools, tc, drive_logs, task_id),
+            can_start_early=tools.can_start_early,
+            emit_progress=emit_progress,
+        )
 
     try:
         MAX_ROUNDS = max(1, int(os.environ.get("OUROBOROS_MAX_ROUNDS", "200")))
@@ -557,11 +465,7 @@ def run_llm_loop(
         log.warning("Invalid OUROBOROS_MAX_ROUNDS, defaulting to 200")
 
     # Build fallback chain once — reuse every round
-    _fallback_list_raw = os.environ.get(
-        "OUROBOROS_MODEL_FALLBACK_LIST",
-        "google/gemini-2.5-flash,openai/gpt-oss-120b:free,meta-llama/llama-3.3-70b-instruct:free,groq/llama-3.3-70b-versatile"
-    )
-    _fallback_chain = [m.strip() for m in _fallback_list_raw.split(",") if m.strip()]
+    _fallback_chain = model_health.fallback_chain()
 
     round_idx = 0
     try:
@@ -584,6 +488,8 @@ def run_llm_loop(
                     return finish_reason, accumulated_usage, llm_trace
 
             _maybe_inject_self_check(round_idx, MAX_ROUNDS, messages, accumulated_usage, emit_progress)
+            if dispatcher is not None:
+                dispatcher.new_round()
 
             ctx = tools._ctx
             if ctx.active_model_override:
@@ -593,44 +499,43 @@ def run_llm_loop(
                 active_effort = normalize_reasoning_effort(ctx.active_effort_override, default=active_effort)
                 ctx.active_effort_override = None
 
-            _drain_incoming_messages(messages, incoming_messages, drive_root, task_id, event_queue, _owner_msg_seen)
+            _drain_incoming_messages(messages, incoming_messages, drive_root, task_id, event_queue, owner_cursor)
 
             pending_compaction = getattr(tools._ctx, '_pending_compaction', None)
             if pending_compaction is not None:
                 messages = compact_tool_history_llm(messages, keep_recent=pending_compaction)
+                compactor.mark_compacted(messages, keep_recent=pending_compaction)
                 tools._ctx._pending_compaction = None
             elif round_idx > 8:
-                messages = compact_tool_history(messages, keep_recent=6)
+                compactor.compact(messages)
             elif round_idx > 3:
                 if len(messages) > 60:
-                    messages = compact_tool_history(messages, keep_recent=6)
-
-            # --- LLM call ---
-            msg, _ = _call_llm_with_retry(
-                llm, messages, active_model, tool_schemas, active_effort,
-                max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type
-            )
+                    compactor.compact(messages)
+
+            # --- LLM call (skipped while the model's circuit is open) ---
+            msg = None
+            primary_skipped = not model_health.available(active_model)
+            if not primary_skipped:
+                msg, _ = _call_llm_with_retry(
+                    llm, messages, active_model, tool_schemas, active_effort,
+                    max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+                    stream_handler=dispatcher,
+                )
 
-            # --- Fallback chain: перебираем все кандидаты по очереди ---
             if msg is None:
-                candidates = [m for m in _fallback_chain if m != active_model]
-                msg = None
-                for fallback_model in candidates:
-                    emit_progress(f"⚡ Fallback: {active_model} → {fallback_model} after empty response")
-                    msg, _ = _call_llm_with_retry(
-                        llm, messages, fallback_model, tool_schemas, active_effort,
-                        max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type
-                    )
-                    if msg is not None:
-                        # Успешный fallback — временно переключаемся на эту модель
-                        log.info("Fallback succeeded: %s → %s", active_model, fallback_model)
-                        break
-
+                msg, tried = _call_fallbacks(
+                    llm, messages, active_model, _fallback_chain, tool_schemas, active_effort,
+                    max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+                    dispatcher, emit_progress, primary_skipped,
+                )
                 if msg is None:
+                    primary = (f"{active_model} was skipped: its circuit is open after recent failures. "
+                               if primary_skipped else
+                               f"Failed to get a response from {active_model} after {max_retries} attempts. ")
                     return (
-                        f"⚠️ Failed to get a response from {active_model} after {max_retries} attempts. "
+                        f"⚠️ {primary}"
                         f"All fallback models also returned no response. "
-                        f"Chain tried: {', '.join(candidates) or 'none'}."
+                        f"Chain tried: {', '.join(tried) or 'none'}."
                     ), accumulated_usage, llm_trace
 
             tool_calls = msg.get("tool_calls") or []
@@ -642,12 +547,14 @@ def run_llm_loop(
             messages.append({"role": "assistant", "content": content or "", "tool_calls": tool_calls})
 
             if content and content.strip():
-                emit_progress(content.strip())
+                unsent = dispatcher.unsent_text(content) if dispatcher else content
+                if unsent.strip():
+                    emit_progress(unsent.strip())
                 llm_trace["assistant_notes"].append(content.strip()[:320])
 
             error_count = _handle_tool_calls(
                 tool_calls, tools, drive_logs, task_id, stateful_executor,
-                messages, llm_trace, emit_progress
+                messages, llm_trace, emit_progress, prefetched=dispatcher,
             )
 
             budget_result = _check_budget_limits(
@@ -659,6 +566,13 @@ def run_llm_loop(
                 return budget_result
 
     finally:
+        if dispatcher is not None:
+            dispatcher.shutdown()
+        pool_stats = get_pool().stats()
+        if pool_stats["submitted"]:
+            append_jsonl(drive_logs / "events.jsonl", {
+                "ts": utc_now_iso(), "type": "tool_pool_stats", "task_id": task_id, **pool_stats,
+            })
         if stateful_executor:
             try:
                 stateful_executor.shutdown(wait=False, cancel_futures=True)
@@ -672,6 +586,99 @@ def run_llm_loop(
                 log.debug("Failed to cleanup task mailbox", exc_info=True)
 
 
+def _call_fallbacks(
+    llm: LLMClient,
+    messages: List[Dict[str, Any]],
+    active_model: str,
+    fallback_chain: List[str],
+    tool_schemas: Optional[List[Dict[str, Any]]],
+    effort: str,
+    max_retries: int,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    round_idx: int,
+    event_queue: Optional[queue.Queue],
+    accumulated_usage: Dict[str, Any],
+    task_type: str,
+    dispatcher: Optional[EarlyToolDispatcher],
+    emit_progress: Callable[[str], None],
+    primary_skipped: bool = False,
+) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Walk the fallback chain, healthiest first (see model_health).
+
+    Models with an open circuit are skipped and probed in the background once
+    their cooldown expires; a half-open one is called only if this caller wins
+    its probe claim. Every candidate but the last gets a single attempt, so a
+    dead model costs one request, not a retry ladder. If every circuit is
+    open, the chain (and the active model) is tried as a last resort.
+    primary_skipped: the active model was not called because its circuit is open.
+    Returns (message or None, models tried).
+    """
+    candidates = [m for m in fallback_chain if m != active_model]
+    ordered = model_health.order_candidates(candidates)
+    if primary_skipped:
+        emit_progress(f"⚡ {active_model} circuit is open — routing to fallback")
+    last_resort = not ordered
+    if last_resort:
+        ordered = candidates + [active_model]  # everything is open: try anyway, in configured order
+    else:
+        model_health.probe_due_in_background(
+            llm, [active_model] + candidates,
+            on_usage=lambda m, usage: _emit_llm_usage_event(
+                event_queue, task_id, m, usage, _usage_cost(m, usage), "probe"))
+    reason = "(circuit open)" if primary_skipped else "after empty response"
+    tried: List[str] = []
+    for i, fallback_model in enumerate(ordered):
+        if (not last_resort and model_health.state(fallback_model) == "half_open"
+                and not model_health.available(fallback_model)):
+            continue  # another caller is probing it
+        if fallback_model != active_model:
+            emit_progress(f"⚡ Fallback: {active_model} → {fallback_model} {reason}")
+        tried.append(fallback_model)
+        msg, _ = _call_llm_with_retry(
+            llm, messages, fallback_model, tool_schemas, effort,
+            max_retries if i == len(ordered) - 1 else 1,
+            drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+            stream_handler=dispatcher,
+        )
+        if msg is not None:
+            # Успешный fallback — временно переключаемся на эту модель
+            log.info("Fallback succeeded: %s → %s", active_model, fallback_model)
+            return msg, tried
+    return None, tried
+
+
+def _record_model_health(drive_logs: pathlib.Path, task_id: str, model: str, ok: bool,
+                         latency_sec: float, rate_limited: bool = False) -> None:
+    before = model_health.state(model)
+    after = model_health.record(model, ok, latency_sec, rate_limited)
+    if after != before and after in ("open", "closed"):
+        append_jsonl(drive_logs / "events.jsonl", {
+            "ts": utc_now_iso(), "type": f"llm_circuit_{after}",
+            "task_id": task_id, "model": model,
+            **({"stats": model_health.model_stats(model)} if after == "open" else {}),
+        })
+
+
+def _usage_cost(model: str, usage: Dict[str, Any]) -> float:
+    """Cost reported by the provider, else estimated from token counts."""
+    cost = float(usage.get("cost") or 0)
+    if not cost:
+        cost = estimate_cost(
+            model,
+            int(usage.get("prompt_tokens") or 0),
+            int(usage.get("completion_tokens") or 0),
+            int(usage.get("cached_tokens") or 0),
+            int(usage.get("cache_write_tokens") or 0),
+        )
+        if usage.get("generation_id"):
+            # Provisional: the supervisor reconciles it with OpenRouter later.
+            usage["cost"] = cost
+            usage["cost_estimated"] = True
+    return cost
+
+
 def _emit_llm_usage_event(
     event_queue: Optional[queue.Queue],
     task_id: str,
@@ -693,7 +700,7 @@ def _emit_llm_usage_event(
             "cached_tokens": int(usage.get("cached_tokens") or 0),
             "cache_write_tokens": int(usage.get("cache_write_tokens") or 0),
             "cost": cost,
-            "cost_estimated": not bool(usage.get("cost")),
+            "cost_estimated": bool(usage.get("cost_estimated")) or not usage.get("cost"),
             "usage": usage,
             "category": category,
         })
@@ -714,12 +721,17 @@ def _call_llm_with_retry(
     event_queue: Optional[queue.Queue],
     accumulated_usage: Dict[str, Any],
     task_type: str = "",
+    stream_handler: Optional[EarlyToolDispatcher] = None,
 ) -> Tuple[Optional[Dict[str, Any]], float]:
     """
     Call LLM with retry logic, usage tracking, and event emission.
 
+    With a stream_handler the call is streamed and the handler receives
+    text deltas and completed tool calls while the response is generated.
+
     Rate limit errors (429 / quota) trigger immediate return of None
     so the caller can switch to a fallback model without wasting retries.
+    Every attempt's outcome and latency is recorded in model_health.
 
     Returns:
         (response_message, cost) on success
@@ -728,6 +740,7 @@ def _call_llm_with_retry(
     last_error: Optional[Exception] = None
 
     for attempt in range(max_retries):
+        started = time.time()
         try:
             kwargs: Dict[str, Any] = {
                 "messages": messages,
@@ -736,19 +749,15 @@ def _call_llm_with_retry(
             }
             if tools:
                 kwargs["tools"] = tools
+            if stream_handler is not None:
+                stream_handler.reset()
+                kwargs.update(stream=True, on_text_delta=stream_handler.on_text_delta,
+                              on_tool_call=stream_handler.on_tool_call)
 
             resp_msg, usage = llm.chat(**kwargs)
-            add_usage(accumulated_usage, usage)
 
-            cost = float(usage.get("cost") or 0)
-            if not cost:
-                cost = _estimate_cost(
-                    model,
-                    int(usage.get("prompt_tokens") or 0),
-                    int(usage.get("completion_tokens") or 0),
-                    int(usage.get("cached_tokens") or 0),
-                    int(usage.get("cache_write_tokens") or 0),
-                )
+            cost = _usage_cost(model, usage)
+            add_usage(accumulated_usage, usage)
 
             category = task_type if task_type in ("evolution", "consciousness", "review", "summarize") else "task"
             _emit_llm_usage_event(event_queue, task_id, model, usage, cost, category)
@@ -770,12 +779,14 @@ def _call_llm_with_retry(
                     "raw_tool_calls": repr(tool_calls)[:500] if tool_calls else None,
                     "finish_reason": resp_msg.get("finish_reason") or resp_msg.get("stop_reason"),
                 })
+                _record_model_health(drive_logs, task_id, model, False, time.time() - started)
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
                     continue
                 return None, cost
 
             accumulated_usage["rounds"] = accumulated_usage.get("rounds", 0) + 1
+            _record_model_health(drive_logs, task_id, model, True, time.time() - started)
 
             append_jsonl(drive_logs / "events.jsonl", {
                 "ts": utc_now_iso(), "type": "llm_round",
@@ -788,10 +799,14 @@ def _call_llm_with_retry(
                 "cache_write_tokens": int(usage.get("cache_write_tokens") or 0),
                 "cost_usd": cost,
             })
+            if stream_handler is not None:
+                stream_handler.commit()
             return resp_msg, cost
 
         except Exception as e:
             last_error = e
+            _record_model_health(drive_logs, task_id, model, False, time.time() - started,
+                                 rate_limited=_is_rate_limit_error(e))
 
             # --- FIX: Rate limit = немедленный выход, не ретраить ---
             # 429 / quota exhausted — ретрай не поможет, нужен другой провайдер.
@@ -13,7 +13,10 @@ import pathlib
 from collections import Counter
 from typing import Any, Dict, List, Optional
 
-from ouroboros.utils import utc_now_iso, read_text, write_text, append_jsonl, short
+from ouroboros.segmented_log import SEGMENTED_LOGS, SegmentedLog
+from ouroboros.utils import (
+    utc_now_iso, read_text, write_text, append_jsonl, read_jsonl_tail, read_task_log_tail, short,
+)
 
 log = logging.getLogger(__name__)
 
@@ -75,77 +78,84 @@ class Memory:
     # --- Chat history ---
 
     def chat_history(self, count: int = 100, offset: int = 0, search: str = "") -> str:
-        """Read from logs/chat.jsonl. count messages, offset from end, filter by search."""
+        """Read from logs/chat.jsonl. count messages, offset from end.
+
+        With search: ranked matches from the chat index (live log + archives),
+        offset skips that many best matches.
+        """
+        if search:
+            return self._search_chat(search, count, offset)
         chat_path = self.logs_path("chat.jsonl")
         if not chat_path.exists():
             return "(chat history is empty)"
 
         try:
-            raw_lines = chat_path.read_text(encoding="utf-8").strip().split("\n")
-            entries = []
-            for line in raw_lines:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entries.append(json.loads(line))
-                except Exception:
-                    log.debug(f"Failed to parse JSON line in chat_history: {line[:100]}")
-                    continue
-
-            if search:
-                search_lower = search.lower()
-                entries = [e for e in entries if search_lower in str(e.get("text", "")).lower()]
-
+            # Only the newest count + offset records are needed: read them from the end.
+            entries = read_jsonl_tail(chat_path, count + offset)
             if offset > 0:
                 entries = entries[:-offset] if offset < len(entries) else []
 
-            entries = entries[-count:] if count < len(entries) else entries
-
             if not entries:
                 return "(no messages matching query)"
 
-            lines = []
-            for e in entries:
-                dir_raw = str(e.get("direction", "")).lower()
-                direction = "→" if dir_raw in ("out", "outgoing") else "←"
-                ts = str(e.get("ts", ""))[:16]
-                raw_text = str(e.get("text", ""))
-                if dir_raw in ("out", "outgoing"):
-                    text = short(raw_text, 800)
-                else:
-                    text = raw_text  # never truncate creator's messages
-                lines.append(f"{direction} [{ts}] {text}")
-
-            return f"Showing {len(entries)} messages:\n\n" + "\n".join(lines)
+            return f"Showing {len(entries)} messages:\n\n" + "\n".join(self._format_chat_lines(entries))
         except Exception as e:
             return f"(error reading history: {e})"
 
+    def _search_chat(self, search: str, count: int, offset: int) -> str:
+        from ouroboros.chat_index import search_chat
+        try:
+            total, entries = search_chat(self.drive_root, search, count=count, offset=max(0, offset))
+        except Exception as e:
+            log.warning("Chat index search failed", exc_info=True)
+            return f"(error searching history: {e})"
+        if not entries:
+            return "(no messages matching query)"
+        header = (f"Found {total} matching messages, showing {offset + 1}-{offset + len(entries)} "
+                  f"(best match first):")
+        return header + "\n\n" + "\n".join(self._format_chat_lines(entries))
+
+    @staticmethod
+    def _format_chat_lines(entries: List[Dict[str, Any]]) -> List[str]:
+        lines = []
+        for e in entries:
+            dir_raw = str(e.get("direction", "")).lower()
+            direction = "→" if dir_raw in ("out", "outgoing") else "←"
+            ts = str(e.get("ts", ""))[:16]
+            raw_text = str(e.get("text", ""))
+            if dir_raw in ("out", "outgoing"):
+                text = short(raw_text, 800)
+            else:
+                text = raw_text  # never truncate creator's messages
+            lines.append(f"{direction} [{ts}] {text}")
+        return lines
+
     # --- JSONL tail reading ---
 
     def read_jsonl_tail(self, log_name: str, max_entries: int = 100) -> List[Dict[str, Any]]:
-        """Read the last max_entries records from a JSONL file."""
+        """Read the last max_entries records from a JSONL file.
+
+        Segmented logs continue into sealed segments right after a rotation.
+        """
         path = self.logs_path(log_name)
-        if not path.exists():
-            return []
         try:
-            lines = path.read_text(encoding="utf-8").strip().split("\n")
-            tail = lines[-max_entries:] if max_entries < len(lines) else lines
-            entries = []
-            for line in tail:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entries.append(json.loads(line))
-                except Exception:
-                    log.debug(f"Failed to parse JSON line in read_jsonl_tail: {line[:100]}", exc_info=True)
-                    continue
-            return entries
+            if log_name in SEGMENTED_LOGS:
+                return SegmentedLog(path.parent, log_name).tail(max_entries)
+            if not path.exists():
+                return []
+            return read_jsonl_tail(path, max_entries)
         except Exception:
             log.warning(f"Failed to read JSONL tail from {log_name}", exc_info=True)
             return []
 
+    def read_task_tail(self, log_name: str, task_id: str, max_entries: int = 100) -> List[Dict[str, Any]]:
+        """Read the last max_entries records of one task (per-task sidecar log)."""
+        try:
+            return read_task_log_tail(self.logs_path(log_name).parent, task_id, log_name, max_entries)
+        except Exception:
+            log.warning(f"Failed to read task tail from {log_name} for {task_id}", exc_info=True)
+            return []
+
     # --- Log summarization ---
 
     def summarize_chat(self, entries: List[Dict[str, Any]]) -> str:
@@ -197,12 +207,22 @@ class Memory:
             lines.append(f"{status} {tool} {hint_str}".strip())
         return "\n".join(lines)
 
-    def summarize_events(self, entries: List[Dict[str, Any]]) -> str:
-        if not entries:
+    def event_type_counts(self, task_id: str) -> Counter:
+        """Event counts of one task over the whole events log, from the columnar archive."""
+        from ouroboros.log_columns import LogColumns
+        try:
+            groups = LogColumns(self.logs_path("events.jsonl").parent).group_by("events", ("task", "type"))
+        except Exception:
+            log.debug("Failed to count events from the columnar archive", exc_info=True)
+            return Counter()
+        return Counter({etype: int(g["count"]) for (task, etype), g in groups.items() if task == task_id})
+
+    def summarize_events(self, entries: List[Dict[str, Any]], type_counts: Optional[Counter] = None) -> str:
+        """type_counts, when given, are complete counts that replace counting the entries tail."""
+        if not entries and not type_counts:
             return ""
-        type_counts: Counter = Counter()
-        for e in entries:
-            type_counts[e.get("type", "unknown")] += 1
+        if not type_counts:
+            type_counts = Counter(e.get("type", "unknown") for e in entries)
         top_types = type_counts.most_common(10)
         lines = ["Event counts:"]
         for evt_type, count in top_types:
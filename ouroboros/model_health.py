@@ -0,0 +1,356 @@
+"""
+Ouroboros — Shared model health registry.
+
+Every LLM call made by run_llm_loop and background consciousness records its
+outcome here: success with latency, failure, or rate limit (429 / quota).
+Per model the registry keeps a rolling window of samples from which it
+derives the error rate and p50/p95 latency, plus a circuit breaker:
+
+    closed     normal operation
+    open       recent calls failed (a 429, CONSECUTIVE_FAILURES in a row, or
+               an error rate of OPEN_ERROR_RATE over MIN_SAMPLES); callers
+               skip the model until the cooldown expires
+    half_open  cooldown expired; one call decides: the caller (or background
+               probe) that claims the probe across processes is let through,
+               everyone else still treats the model as open. Success closes
+               the circuit, failure reopens it with the cooldown doubled up
+               to MAX_COOLDOWN_SEC
+
+The registry lives on Drive at state/model_health.json so the supervisor,
+all workers and consciousness share one view. Updates are read-modify-write
+under an fcntl lock; reads re-stat the file at most every STAT_INTERVAL_SEC.
+Without a Drive root it is kept in memory only.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from ouroboros.utils import drive_available, drive_root
+
+log = logging.getLogger(__name__)
+
+DEFAULT_FALLBACK_LIST = (
+    "google/gemini-2.5-flash,openai/gpt-oss-120b:free,"
+    "meta-llama/llama-3.3-70b-instruct:free,groq/llama-3.3-70b-versatile"
+)
+WINDOW_SEC = 900.0
+MAX_SAMPLES = 50
+MIN_SAMPLES = 4
+OPEN_ERROR_RATE = 0.5
+CONSECUTIVE_FAILURES = 3
+BASE_COOLDOWN_SEC = float(os.environ.get("OUROBOROS_MODEL_COOLDOWN_SEC", "60") or 60)
+MAX_COOLDOWN_SEC = 1800.0
+STAT_INTERVAL_SEC = 2.0
+PROBE_TIMEOUT_SEC = 60.0  # a probe claim expires after this
+
+_lock = threading.Lock()
+_path: Optional[pathlib.Path] = None
+_data: Dict[str, Dict[str, Any]] = {}
+_file_key: Optional[tuple] = None
+_last_stat = 0.0
+
+
+def fallback_chain() -> List[str]:
+    raw = os.environ.get("OUROBOROS_MODEL_FALLBACK_LIST", DEFAULT_FALLBACK_LIST)
+    return [m.strip() for m in raw.split(",") if m.strip()]
+
+
+def _default_path() -> pathlib.Path:
+    return drive_root() / "state" / "model_health.json"
+
+
+def set_path(path: Optional[pathlib.Path]) -> None:
+    """Point at another registry file (tests, non-Colab runs); resets in-memory state."""
+    global _path, _file_key, _last_stat
+    with _lock:
+        _path = pathlib.Path(path) if path is not None else None
+        _data.clear()
+        _file_key = None
+        _last_stat = 0.0
+
+
+def registry_path() -> pathlib.Path:
+    return _path or _default_path()
+
+
+def _disk_enabled() -> bool:
+    return drive_available(_path)
+
+
+# ---------------------------------------------------------------------------
+# Persistence
+# ---------------------------------------------------------------------------
+
+def _read_file(path: pathlib.Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        log.debug(f"Unreadable model health registry {path}", exc_info=True)
+        return {}
+    models = data.get("models") if isinstance(data, dict) else None
+    return models if isinstance(models, dict) else {}
+
+
+def _refresh(force: bool = False) -> None:
+    """Reload the shared file if another process changed it. Caller holds _lock."""
+    global _file_key, _last_stat
+    now = time.time()
+    if not force and now - _last_stat < STAT_INTERVAL_SEC:
+        return
+    _last_stat = now
+    if not _disk_enabled():
+        return
+    path = registry_path()
+    try:
+        st = path.stat()
+    except OSError:
+        return
+    key = (st.st_mtime_ns, st.st_size)
+    if key == _file_key:
+        return
+    _data.clear()
+    _data.update(_read_file(path))
+    _file_key = key
+
+
+def _update(model: str, fn) -> Dict[str, Any]:
+    """Apply fn(entry, now) to one model's entry under the file lock and persist."""
+    global _file_key, _last_stat
+    with _lock:
+        if not _disk_enabled():
+            entry = _data.setdefault(model, {})
+            fn(entry, time.time())
+            return dict(entry)
+        import fcntl
+        path = registry_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.with_name(path.name + ".lock").open("a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                models = _read_file(path)
+                entry = models.setdefault(model, {})
+                fn(entry, time.time())
+                tmp = path.with_name(f".{path.name}.tmp.{uuid.uuid4().hex}")
+                tmp.write_text(json.dumps({"models": models}, ensure_ascii=False), encoding="utf-8")
+                os.replace(str(tmp), str(path))
+                st = path.stat()
+                _data.clear()
+                _data.update(models)
+                _file_key = (st.st_mtime_ns, st.st_size)
+                _last_stat = time.time()
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        return dict(entry)
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+def _window(entry: Dict[str, Any], now: float) -> List[List[float]]:
+    return [s for s in entry.get("samples") or [] if now - s[0] < WINDOW_SEC]
+
+
+def _open(entry: Dict[str, Any], now: float, reason: str) -> None:
+    prev = float(entry.get("cooldown") or 0)
+    cooldown = min(MAX_COOLDOWN_SEC, prev * 2) if prev else BASE_COOLDOWN_SEC
+    entry.update(cooldown=cooldown, open_until=now + cooldown, reason=reason, probe_at=0)
+
+
+def record(model: str, ok: bool, latency_sec: float = 0.0, rate_limited: bool = False) -> str:
+    """Record one call outcome. Returns the circuit state after it."""
+    if not model:
+        return "closed"
+
+    def apply(entry: Dict[str, Any], now: float) -> None:
+        samples = _window(entry, now)
+        samples.append([round(now, 3), int(ok), round(float(latency_sec), 3), int(rate_limited)])
+        entry["samples"] = samples[-MAX_SAMPLES:]
+        if ok:
+            entry.update(consecutive=0, cooldown=0, open_until=0, reason="", probe_at=0)
+            return
+        entry["consecutive"] = int(entry.get("consecutive") or 0) + 1
+        was_probe = float(entry.get("open_until") or 0) > 0 and now >= float(entry["open_until"])
+        failures = sum(1 for s in entry["samples"] if not s[1])
+        if rate_limited:
+            _open(entry, now, "rate_limited")
+        elif was_probe:
+            _open(entry, now, "probe_failed")
+        elif entry["consecutive"] >= CONSECUTIVE_FAILURES:
+            _open(entry, now, f"{entry['consecutive']} consecutive failures")
+        elif len(entry["samples"]) >= MIN_SAMPLES and failures / len(entry["samples"]) >= OPEN_ERROR_RATE:
+            _open(entry, now, f"error rate {failures}/{len(entry['samples'])}")
+
+    try:
+        entry = _update(model, apply)
+    except Exception:
+        log.debug("Failed to record model health", exc_info=True)
+        return "closed"
+    return _state(entry, time.time())
+
+
+def _state(entry: Dict[str, Any], now: float) -> str:
+    open_until = float(entry.get("open_until") or 0)
+    if not open_until:
+        return "closed"
+    return "open" if now < open_until else "half_open"
+
+
+def _entry(model: str) -> Dict[str, Any]:
+    with _lock:
+        try:
+            _refresh()
+        except Exception:
+            log.debug("Failed to reload model health registry", exc_info=True)
+        return dict(_data.get(model) or {})
+
+
+def state(model: str) -> str:
+    return _state(_entry(model), time.time())
+
+
+def available(model: str) -> bool:
+    """True if the caller may call model now.
+
+    Closed: always. Open: never. Half-open: only for the one caller that wins
+    the probe claim (the claim is released by the outcome it records, or
+    expires after PROBE_TIMEOUT_SEC), so recovering models are not stampeded.
+    """
+    st = state(model)
+    if st == "half_open":
+        return _claim_probe(model)
+    return st == "closed"
+
+
+# ---------------------------------------------------------------------------
+# Metrics and routing
+# ---------------------------------------------------------------------------
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def model_stats(model: str) -> Dict[str, Any]:
+    now = time.time()
+    entry = _entry(model)
+    samples = _window(entry, now)
+    latencies = [s[2] for s in samples if s[1]]
+    failures = sum(1 for s in samples if not s[1])
+    return {
+        "state": _state(entry, now),
+        "samples": len(samples),
+        "error_rate": round(failures / len(samples), 3) if samples else 0.0,
+        "rate_limited": sum(1 for s in samples if s[3]),
+        "p50_sec": _percentile(latencies, 0.5),
+        "p95_sec": _percentile(latencies, 0.95),
+        "open_for_sec": max(0.0, round(float(entry.get("open_until") or 0) - now, 1)),
+        "reason": entry.get("reason") or "",
+    }
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        try:
+            _refresh(force=True)
+        except Exception:
+            log.debug("Failed to reload model health registry", exc_info=True)
+        models = list(_data)
+    return {m: model_stats(m) for m in models}
+
+
+def order_candidates(models: List[str]) -> List[str]:
+    """Healthy models first, by error rate then p50 latency; open circuits dropped.
+
+    Models without samples keep their configured order after measured ones with
+    the same error bucket. Returns [] only if every candidate is open.
+    """
+    ranked = []
+    for idx, m in enumerate(models):
+        st = model_stats(m)
+        if st["state"] == "open":
+            continue
+        p50 = st["p50_sec"] if st["p50_sec"] is not None else float("inf")
+        ranked.append((st["state"] == "half_open", round(st["error_rate"] * 4) / 4, p50, idx, m))
+    return [r[-1] for r in sorted(ranked)]
+
+
+def pick(preferred: str, fallbacks: Optional[List[str]] = None) -> str:
+    """preferred if it is available, else the healthiest available fallback."""
+    if available(preferred):
+        return preferred
+    for m in order_candidates([m for m in (fallbacks if fallbacks is not None else fallback_chain())
+                               if m != preferred]):
+        if available(m):
+            return m
+    return preferred
+
+
+# ---------------------------------------------------------------------------
+# Background probes
+# ---------------------------------------------------------------------------
+
+def _claim_probe(model: str) -> bool:
+    """Claim the probe of a half-open model across processes. True if we got it."""
+    claimed = {"ok": False}
+
+    def apply(entry: Dict[str, Any], now: float) -> None:
+        if _state(entry, now) == "half_open" and now - float(entry.get("probe_at") or 0) > PROBE_TIMEOUT_SEC:
+            entry["probe_at"] = now
+            claimed["ok"] = True
+
+    try:
+        _update(model, apply)
+    except Exception:
+        log.debug("Failed to claim model probe", exc_info=True)
+        return False
+    return claimed["ok"]
+
+
+def probe(llm: Any, model: str,
+          on_usage: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> bool:
+    """Send a minimal request to a half-open model and record the outcome.
+
+    The probe is a paid request: on_usage(model, usage) reports its usage so
+    it reaches budget tracking like any other call.
+    """
+    started = time.time()
+    try:
+        msg, usage = llm.chat(messages=[{"role": "user", "content": "Reply with: ok"}],
+                              model=model, reasoning_effort="low", max_tokens=16)
+        if on_usage is not None:
+            try:
+                on_usage(model, usage or {})
+            except Exception:
+                log.debug("Failed to report probe usage", exc_info=True)
+        ok = bool((msg.get("content") or "").strip() or msg.get("tool_calls"))
+        record(model, ok, time.time() - started)
+        return ok
+    except Exception as e:
+        from ouroboros.loop import _is_rate_limit_error
+        record(model, False, time.time() - started, rate_limited=_is_rate_limit_error(e))
+        log.debug("Probe of %s failed: %r", model, e)
+        return False
+
+
+def probe_due_in_background(llm: Any, models: List[str],
+                            on_usage: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> int:
+    """Start one daemon probe per half-open model this process managed to claim."""
+    started = 0
+    for m in models:
+        if state(m) == "half_open" and _claim_probe(m):
+            threading.Thread(target=probe, args=(llm, m, on_usage), name=f"model_probe:{m}", daemon=True).start()
+            started += 1
+    return started
@@ -3,15 +3,19 @@ Per-task owner message injection for running worker tasks.
 
 Each task gets its own mailbox file: owner_messages_{task_id}.jsonl
 Messages have unique IDs for dedup. Reading uses offset tracking
-(append-only within a session) instead of clearing the file.
+(append-only within a session) instead of clearing the file: a
+MailboxCursor remembers the byte offset already consumed, so a drain
+with no new messages is a single os.stat and only new lines are parsed.
 
 The supervisor does NOT write here directly. Only the LLM (via
 forward_to_worker tool) writes to a task's mailbox. Workers drain
 messages for their own task_id on each LLM round.
 """
+import collections
 import datetime
 import json
 import logging
+import os
 import pathlib
 import uuid
 from typing import List, Optional
@@ -19,6 +23,21 @@ from typing import List, Optional
 log = logging.getLogger(__name__)
 
 _MAILBOX_DIR = "memory/owner_mailbox"
+_RECENT_IDS = 256
+
+
+class MailboxCursor:
+    """Read position in one task's mailbox, kept by the consumer across rounds.
+
+    Dedup only needs the last few message IDs (for a mailbox that was
+    replaced and is re-read from the start), so memory stays bounded.
+    """
+
+    def __init__(self) -> None:
+        self.offset = 0
+        self.size = 0
+        self.inode: Optional[int] = None
+        self.recent_ids: collections.deque = collections.deque(maxlen=_RECENT_IDS)
 
 
 def _mailbox_path(drive_root: pathlib.Path, task_id: str) -> pathlib.Path:
@@ -55,13 +74,18 @@ def drain_owner_messages(
     drive_root: pathlib.Path,
     task_id: str,
     seen_ids: Optional[set] = None,
+    cursor: Optional[MailboxCursor] = None,
 ) -> List[str]:
     """Read new messages for a specific task. Returns list of message texts.
 
-    Uses seen_ids set for dedup: messages already in the set are skipped,
-    new message IDs are added to it. Caller should keep the set across rounds.
+    With a cursor only bytes appended since the previous drain are read.
+    Without one the whole file is read and seen_ids is used for dedup:
+    messages already in the set are skipped, new message IDs are added to it.
+    Caller should keep the cursor (or set) across rounds.
     """
     path = _mailbox_path(drive_root, task_id)
+    if cursor is not None:
+        return _drain_from_cursor(path, task_id, cursor)
     if not path.exists():
         return []
     if seen_ids is None:
@@ -93,6 +117,50 @@ def drain_owner_messages(
         return []
 
 
+def _drain_from_cursor(path: pathlib.Path, task_id: str, cursor: MailboxCursor) -> List[str]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return []
+    except Exception:
+        log.debug("Failed to stat mailbox for task %s", task_id, exc_info=True)
+        return []
+    if st.st_ino == cursor.inode and st.st_size == cursor.size:
+        return []
+    if st.st_ino != cursor.inode or st.st_size < cursor.offset:
+        cursor.offset = 0  # replaced or truncated: rescan, recent_ids dedups
+    cursor.inode = st.st_ino
+    try:
+        with path.open("rb") as f:
+            f.seek(cursor.offset)
+            chunk = f.read(st.st_size - cursor.offset)
+    except Exception:
+        log.debug("Failed to read mailbox for task %s", task_id, exc_info=True)
+        return []
+    # Leave a half-written last line for the next drain.
+    complete = chunk[:chunk.rfind(b"\n") + 1]
+    cursor.offset += len(complete)
+    cursor.size = st.st_size
+    messages = []
+    for line in complete.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except Exception:
+            log.debug("Malformed mailbox line for task %s", task_id, exc_info=True)
+            continue
+        mid = entry.get("msg_id", "")
+        if mid:
+            if mid in cursor.recent_ids:
+                continue
+            cursor.recent_ids.append(mid)
+        text = entry.get("text", "")
+        if text:
+            messages.append(text)
+    return messages
+
+
 def cleanup_task_mailbox(drive_root: pathlib.Path, task_id: str) -> None:
     """Remove a task's mailbox file after task completes."""
     path = _mailbox_path(drive_root, task_id)
@@ -0,0 +1,276 @@
+"""
+Ouroboros — Model pricing.
+
+Per-1M-token prices (input, cached input, output) used to estimate a round's
+cost when the provider does not report one.
+
+The OpenRouter catalogue is cached on Drive at state/pricing.json and shared
+by every process (supervisor, workers, direct chat, consciousness). Loading
+it is one small file read. When it is older than OUROBOROS_PRICING_TTL_HOURS,
+one process (whoever takes the non-blocking lock) revalidates it in a
+background thread with If-None-Match / If-Modified-Since; everyone else keeps
+using the current file, or the static table below until one exists.
+
+Lookups go exact id first, then longest known prefix, through a table of the
+distinct key lengths, and the result per model name is memoized.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from ouroboros.utils import drive_root
+
+log = logging.getLogger(__name__)
+
+Price = Tuple[float, float, float]
+
+# Pricing from OpenRouter API (2026-02-17). Fallback until the catalogue is cached.
+MODEL_PRICING_STATIC: Dict[str, Price] = {
+    "anthropic/claude-opus-4.6": (5.0, 0.5, 25.0),
+    "anthropic/claude-opus-4": (15.0, 1.5, 75.0),
+    "anthropic/claude-sonnet-4": (3.0, 0.30, 15.0),
+    "anthropic/claude-sonnet-4.6": (3.0, 0.30, 15.0),
+    "anthropic/claude-sonnet-4.5": (3.0, 0.30, 15.0),
+    "openai/o3": (2.0, 0.50, 8.0),
+    "openai/o3-pro": (20.0, 1.0, 80.0),
+    "openai/o4-mini": (1.10, 0.275, 4.40),
+    "openai/gpt-4.1": (2.0, 0.50, 8.0),
+    "openai/gpt-5.2": (1.75, 0.175, 14.0),
+    "openai/gpt-5.2-codex": (1.75, 0.175, 14.0),
+    "google/gemini-2.5-pro-preview": (1.25, 0.125, 10.0),
+    "google/gemini-3-pro-preview": (2.0, 0.20, 12.0),
+    "x-ai/grok-3-mini": (0.30, 0.03, 0.50),
+    "qwen/qwen3.5-plus-02-15": (0.40, 0.04, 2.40),
+}
+
+CATALOGUE_URL = "https://openrouter.ai/api/v1/models"
+CATALOGUE_PREFIXES = ("anthropic/", "openai/", "google/", "meta-llama/", "x-ai/", "qwen/")
+TTL_SEC = float(os.environ.get("OUROBOROS_PRICING_TTL_HOURS", "24") or 24) * 3600
+RETRY_AFTER_SEC = 600.0  # between refresh attempts of one process
+STAT_INTERVAL_SEC = 60.0  # how often a process checks the cache file for updates
+
+_lock = threading.Lock()
+_cache_path: Optional[pathlib.Path] = None
+_file_key: Optional[Tuple[int, int]] = None
+_file_meta: Dict[str, Any] = {}
+_table: Dict[str, Price] = dict(MODEL_PRICING_STATIC)
+_lengths: List[int] = []
+_resolved: Dict[str, Optional[Price]] = {}
+_last_stat = 0.0
+_refreshing = False
+_last_attempt = 0.0
+
+
+def _default_cache_path() -> pathlib.Path:
+    override = os.environ.get("OUROBOROS_PRICING_CACHE")
+    if override:
+        return pathlib.Path(override)
+    return drive_root() / "state" / "pricing.json"
+
+
+def set_cache_path(path: Optional[pathlib.Path]) -> None:
+    """Point at another cache file (tests, non-Colab runs); resets in-memory state."""
+    global _cache_path, _file_key, _last_stat, _last_attempt
+    with _lock:
+        _cache_path = pathlib.Path(path) if path is not None else None
+        _file_key = None
+        _file_meta.clear()
+        _last_stat = 0.0
+        _last_attempt = 0.0
+        _install({})
+
+
+def cache_path() -> pathlib.Path:
+    return _cache_path or _default_cache_path()
+
+
+def _install(models: Dict[str, Price]) -> None:
+    """Swap in a new table (static prices overlaid by the catalogue). Caller holds _lock."""
+    global _table, _lengths, _resolved
+    table = dict(MODEL_PRICING_STATIC)
+    table.update(models)
+    _table = table
+    _lengths = sorted({len(k) for k in table}, reverse=True)
+    _resolved = {}
+
+
+# ---------------------------------------------------------------------------
+# Cache file
+# ---------------------------------------------------------------------------
+
+def _load_file_if_changed() -> None:
+    global _file_key, _last_stat
+    now = time.time()
+    if now - _last_stat < STAT_INTERVAL_SEC and _file_key is not None:
+        return
+    _last_stat = now
+    path = cache_path()
+    try:
+        st = path.stat()
+    except OSError:
+        return
+    key = (st.st_mtime_ns, st.st_size)
+    if key == _file_key:
+        return
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        models = {k: tuple(float(x) for x in v) for k, v in (data.get("models") or {}).items() if len(v) == 3}
+    except Exception:
+        log.debug(f"Unreadable pricing cache {path}", exc_info=True)
+        return
+    with _lock:
+        _file_key = key
+        _file_meta.clear()
+        _file_meta.update({k: data.get(k) for k in ("fetched_at", "etag", "last_modified")})
+        _install(models)
+
+
+def _write_file(path: pathlib.Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_name(f".{path.name}.tmp.{uuid.uuid4().hex}")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(str(tmp), str(path))
+
+
+def parse_catalogue(data: Dict[str, Any]) -> Dict[str, Price]:
+    """{model_id: (input_per_1m, cached_per_1m, output_per_1m)} from /api/v1/models."""
+    out: Dict[str, Price] = {}
+    for model in data.get("data", []):
+        model_id = model.get("id", "")
+        pricing = model.get("pricing") or {}
+        if not model_id.startswith(CATALOGUE_PREFIXES) or not pricing.get("prompt"):
+            continue
+        try:
+            prompt_price = round(float(pricing.get("prompt", 0)) * 1_000_000, 4)
+            completion_price = round(float(pricing.get("completion", 0)) * 1_000_000, 4)
+            raw_cached = pricing.get("input_cache_read")
+            cached_price = round(float(raw_cached) * 1_000_000, 4) if raw_cached else round(prompt_price * 0.1, 4)
+        except (TypeError, ValueError):
+            continue
+        if prompt_price > 1000 or completion_price > 1000:
+            log.warning(f"Skipping {model_id}: prices seem wrong (prompt={prompt_price}, completion={completion_price})")
+            continue
+        out[model_id] = (prompt_price, cached_price, completion_price)
+    return out
+
+
+def refresh(force: bool = False) -> bool:
+    """Revalidate the cache file if stale. Only the lock holder fetches. Returns True if it ran."""
+    path = cache_path()
+    if not path.parent.exists():
+        return False  # no Drive here: keep the static table
+    import fcntl
+    lock_path = path.with_name(path.name + ".lock")
+    with lock_path.open("a") as lock_file:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False  # another process is refreshing
+        try:
+            try:
+                current = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                current = {}
+            if not force and time.time() - float(current.get("fetched_at") or 0) < TTL_SEC:
+                return False  # someone refreshed it while we waited
+            headers = {}
+            if current.get("models"):
+                if current.get("etag"):
+                    headers["If-None-Match"] = current["etag"]
+                if current.get("last_modified"):
+                    headers["If-Modified-Since"] = current["last_modified"]
+            from ouroboros.http_pool import get_http_client
+            resp = get_http_client(CATALOGUE_URL).get(CATALOGUE_URL, headers=headers, timeout=15)
+            if resp.status_code == 304:
+                current["fetched_at"] = time.time()
+                _write_file(path, current)
+                return True
+            resp.raise_for_status()
+            models = parse_catalogue(resp.json())
+            if len(models) <= 5:
+                raise ValueError(f"suspiciously small pricing catalogue ({len(models)} models)")
+            _write_file(path, {
+                "fetched_at": time.time(),
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "models": {k: list(v) for k, v in models.items()},
+            })
+            log.info(f"Fetched pricing for {len(models)} models from OpenRouter")
+            return True
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _refresh_in_background() -> None:
+    global _refreshing, _last_stat
+    try:
+        if refresh():
+            _last_stat = 0.0  # pick the new file up on the next lookup
+    except Exception as e:
+        log.warning("Failed to sync pricing from OpenRouter: %s", e)
+    finally:
+        _refreshing = False
+
+
+def _maybe_refresh() -> None:
+    global _refreshing, _last_attempt
+    now = time.time()
+    if now - float(_file_meta.get("fetched_at") or 0) < TTL_SEC or now - _last_attempt < RETRY_AFTER_SEC:
+        return
+    with _lock:
+        if _refreshing:
+            return
+        _refreshing = True
+        _last_attempt = now
+    threading.Thread(target=_refresh_in_background, name="pricing_refresh", daemon=True).start()
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+def get_pricing() -> Dict[str, Price]:
+    """Current table: static prices overlaid by the cached OpenRouter catalogue."""
+    _load_file_if_changed()
+    _maybe_refresh()
+    return _table
+
+
+def lookup(model: str) -> Optional[Price]:
+    """Price of a model: exact id, else the longest known prefix."""
+    table = get_pricing()
+    resolved = _resolved
+    if model in resolved:
+        return resolved[model]
+    price = table.get(model)
+    if price is None and model:
+        for n in _lengths:
+            if n < len(model):
+                price = table.get(model[:n])
+                if price is not None:
+                    break
+    resolved[model] = price
+    return price
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int,
+                  cached_tokens: int = 0, cache_write_tokens: int = 0) -> float:
+    """Estimate cost from token counts using known pricing. Returns 0 if model unknown."""
+    pricing = lookup(model)
+    if not pricing:
+        return 0.0
+    input_price, cached_price, output_price = pricing
+    regular_input = max(0, prompt_tokens - cached_tokens)
+    cost = (
+        regular_input * input_price / 1_000_000
+        + cached_tokens * cached_price / 1_000_000
+        + completion_tokens * output_price / 1_000_000
+    )
+    return round(cost, 6)
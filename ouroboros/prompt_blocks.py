@@ -0,0 +1,78 @@
+"""
+Ouroboros — Prompt block cache.
+
+The static (SYSTEM.md + BIBLE.md [+ README.md]) and semi-stable (scratchpad,
+identity, dialogue summary, knowledge index) system prompt blocks are
+rebuilt only when one of their input files changes. A block is keyed by the
+(path, mtime_ns, size) of every input, so an unchanged block is returned as
+the very same string: byte-identical across tasks, which keeps provider
+prompt caching hitting.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+_FileKey = Tuple[str, Optional[int], Optional[int]]
+
+
+def _file_key(path: pathlib.Path) -> _FileKey:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (str(path), None, None)
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+class PromptBlockCache:
+    """Named text blocks, each rebuilt only when its input files change."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, Tuple[Tuple[_FileKey, ...], str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.build_sec = 0.0
+
+    def get(self, name: str, inputs: Iterable[pathlib.Path], build: Callable[[], str]) -> Tuple[str, bool]:
+        """Return (text, hit). build() runs only when an input's stat changed."""
+        key = tuple(_file_key(pathlib.Path(p)) for p in inputs)
+        with self._lock:
+            cached = self._blocks.get(name)
+            if cached is not None and cached[0] == key:
+                self.hits += 1
+                return cached[1], True
+        t0 = time.perf_counter()
+        text = build()
+        elapsed = time.perf_counter() - t0
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            self.misses += 1
+            self.build_sec += elapsed
+            prev = self._blocks.get(name)
+            if prev is not None and prev[2] == digest:
+                text = prev[1]  # same content under a new key: keep the old object
+            self._blocks[name] = (key, text, digest)
+        return text, False
+
+    def digest(self, name: str) -> str:
+        with self._lock:
+            cached = self._blocks.get(name)
+        return cached[2] if cached else ""
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "build_ms_total": round(self.build_sec * 1000, 2)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+
+prompt_block_cache = PromptBlockCache()
@@ -0,0 +1,151 @@
+"""
+Ouroboros — Task-scoped read cache.
+
+repo_read / drive_read / repo_list / drive_list go through ReadCache, which
+lives in the task's ToolContext. An entry is keyed by kind and resolved path
+and validated on every hit by one stat() against the (mtime_ns, size) it was
+read at, so a re-read of an unchanged file costs a stat instead of a read
+over Drive FUSE.
+
+Files modified within RACY_SEC of being read are not cached (a same-tick
+rewrite would keep the signature). On top of that, ToolRegistry.execute
+invalidates after every non-read tool using its declared resources:
+drive_write drops its path, repo_write_commit / llm_code_edit the repo
+tree, and exclusive tools such as run_shell trigger sweep(), which drops
+everything git status reports dirty and re-stats the rest.
+
+stats() (hits, misses, saved read time) is reported in task metrics.
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+import os
+import pathlib
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+RACY_SEC = 2.0
+MAX_BYTES = 32 * 1024 * 1024
+
+_Key = Tuple[str, str, Any]
+
+
+class ReadCache:
+    """Read-through cache of file reads and directory listings for one task."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (signature, value, seconds the original read took)
+        self._entries: "collections.OrderedDict[_Key, Tuple[Tuple[int, int], str, float]]" = collections.OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_sec = 0.0
+
+    def read(self, kind: str, path: pathlib.Path, loader: Callable[[], str], variant: Any = ()) -> str:
+        """loader() through the cache. Missing or unreadable paths are not cached."""
+        try:
+            st = path.stat()
+        except OSError:
+            return loader()
+        sig = (st.st_mtime_ns, st.st_size)
+        key = (kind, str(path), variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == sig:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_sec += entry[2]
+                return entry[1]
+        started = time.perf_counter()
+        value = loader()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.misses += 1
+            if time.time() - st.st_mtime_ns / 1e9 >= RACY_SEC and isinstance(value, str):
+                self._store(key, (sig, value, elapsed))
+        return value
+
+    def _store(self, key: _Key, entry: Tuple[Tuple[int, int], str, float]) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = entry
+        self._bytes += len(entry[1])
+        while self._bytes > self.max_bytes and self._entries:
+            _key, dropped = self._entries.popitem(last=False)
+            self._bytes -= len(dropped[1])
+
+    def _drop(self, key: _Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+            self.invalidations += 1
+
+    # --- invalidation -----------------------------------------------------
+
+    def invalidate(self, path: Optional[pathlib.Path] = None) -> None:
+        """Drop entries for path, everything under it, and listings of its ancestors."""
+        with self._lock:
+            if path is None:
+                for key in list(self._entries):
+                    self._drop(key)
+                return
+            target = str(path)
+            for key in list(self._entries):
+                kind, cached, _variant = key
+                if (cached == target or cached.startswith(target + os.sep)
+                        or (kind == "list" and target.startswith(cached + os.sep))):
+                    self._drop(key)
+
+    def sweep(self, repo_dir: pathlib.Path) -> None:
+        """After a tool that may have changed anything: drop dirty and changed entries."""
+        with self._lock:
+            if not self._entries:
+                return
+        try:
+            res = subprocess.run(["git", "status", "--porcelain", "-z", "--untracked-files=all"],
+                                 cwd=str(repo_dir), capture_output=True, timeout=15)
+            if res.returncode != 0:
+                raise RuntimeError(res.stderr.decode("utf-8", "replace")[:200])
+            dirty = [p[3:] for p in res.stdout.decode("utf-8", "replace").split("\0") if len(p) > 3]
+        except Exception:
+            log.debug("git status failed during read cache sweep; clearing", exc_info=True)
+            self.invalidate()
+            return
+        root = pathlib.Path(repo_dir).resolve()
+        for rel in dirty:
+            self.invalidate(root / rel)
+        with self._lock:
+            keys = list(self._entries.items())
+        for key, (sig, _value, _sec) in keys:
+            try:
+                st = pathlib.Path(key[1]).stat()
+                changed = (st.st_mtime_ns, st.st_size) != sig
+            except OSError:
+                changed = True
+            if changed:
+                with self._lock:
+                    self._drop(key)
+
+    # --- metrics ----------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "invalidations": self.invalidations,
+                "saved_ms": round(self.saved_sec * 1000, 1),
+                "entries": len(self._entries),
+            }
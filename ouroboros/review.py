@@ -11,6 +11,7 @@ import os
 import pathlib
 from typing import Any, Dict, List, Tuple
 
+from ouroboros.symbol_cache import symbol_cache
 from ouroboros.utils import clip_text, estimate_tokens
 
 
@@ -33,49 +34,20 @@ def compute_complexity_metrics(sections: List[Tuple[str, str]]) -> Dict[str, Any
     function_lengths: List[Tuple[str, int, int]] = []  # (path, start_line, length)
     file_sizes: List[Tuple[str, int]] = []  # (path, lines)
     total_files = len(sections)
-    py_files = 0
+
+    py_sections = [(path, content) for path, content in sections if path.endswith(".py")]
+    # Function spans come from the shared symbol cache (keyed by content hash)
+    py_records = symbol_cache.for_texts(py_sections)
+    py_files = len(py_sections)
 
     for path, content in sections:
-        lines = content.splitlines()
-        line_count = len(lines)
+        line_count = len(content.splitlines())
         total_lines += line_count
         file_sizes.append((path, line_count))
 
-        if not path.endswith(".py"):
-            continue
-        py_files += 1
-
-        func_starts: List[int] = []
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if stripped.startswith("def ") or stripped.startswith("async def "):
-                func_starts.append(i)
-                total_functions += 1
-
-        for j, start in enumerate(func_starts):
-            # Get indentation of the def line
-            def_line = lines[start]
-            def_indent = len(def_line) - len(def_line.lstrip())
-
-            # Find end: first non-blank, non-comment line with indent <= def_indent
-            end = len(lines)
-            for k in range(start + 1, len(lines)):
-                line = lines[k]
-                stripped = line.strip()
-                # Skip blank lines and comments
-                if not stripped or stripped.startswith("#"):
-                    continue
-                # Check indentation
-                line_indent = len(line) - len(line.lstrip())
-                if line_indent <= def_indent:
-                    end = k
-                    break
-
-            # Cap at next function start if it comes first
-            if j + 1 < len(func_starts):
-                end = min(end, func_starts[j + 1])
-
-            length = end - start
+    for (path, _content), rec in zip(py_sections, py_records):
+        total_functions += len(rec["def_spans"])
+        for start, length in rec["def_spans"]:
             function_lengths.append((path, start, length))
 
     # Compute aggregates
@@ -0,0 +1,401 @@
+"""
+Ouroboros — Segmented logs.
+
+Size/time-based rotation for the append-only JSONL logs (events, tools,
+progress, supervisor). The live file stays at logs/<name>.jsonl; when it
+grows past max_bytes or gets older than max_age_sec it is sealed by a rename
+(never a copy) into logs/segments/<name>/<name>.NNNNNN.jsonl. Sealed
+segments are compressed (zstd if the zstandard package is installed, gzip
+otherwise) once a short grace period has passed, so writers that opened the
+file just before the rename can finish. manifest.json in the segment
+directory lists the segments in order.
+
+Readers iterate across segments and the live file, oldest-first or
+newest-first, without caring about rotation. The same background pass
+also compacts sealed events/tools segments into the columnar archive
+(log_columns.py).
+"""
+
+from __future__ import annotations
+
+import collections
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import pathlib
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from ouroboros.utils import TAIL_BLOCK_SIZE, tail_lines, utc_now_iso
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+SEGMENTED_LOGS = ("events.jsonl", "tools.jsonl", "progress.jsonl", "supervisor.jsonl")
+DEFAULT_MAX_BYTES = int(float(os.environ.get("OUROBOROS_LOG_SEGMENT_MB", "8") or 8) * 1024 * 1024)
+DEFAULT_MAX_AGE_SEC = float(os.environ.get("OUROBOROS_LOG_SEGMENT_HOURS", "24") or 24) * 3600
+SEAL_GRACE_SEC = 30.0
+TASK_LOG_RETENTION_SEC = float(os.environ.get("OUROBOROS_TASK_LOG_DAYS", "14") or 14) * 86400
+
+
+def line_fingerprint(path: pathlib.Path) -> str:
+    """Hash of the first complete line of a file ("" if there is none)."""
+    try:
+        with open_segment(path) as f:
+            head = f.read(4096)
+    except FileNotFoundError:
+        return ""
+    first = head.split(b"\n", 1)[0] if b"\n" in head else b""
+    return hashlib.sha256(first).hexdigest()[:16] if first else ""
+
+
+def open_segment(path: pathlib.Path):
+    """Open a (possibly compressed) segment for binary reading."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is not installed, cannot read {path}")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True))
+    return path.open("rb")
+
+
+def _iter_lines_reverse(path: pathlib.Path, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield non-empty lines of an uncompressed file, last line first."""
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            parts = (f.read(step) + rest).split(b"\n")
+            rest = parts[0]
+            for line in reversed(parts[1:]):
+                if line.strip():
+                    yield line
+        if rest.strip():
+            yield rest
+
+
+class SegmentedLog:
+    """One rotating JSONL log: live file + sealed segments + manifest."""
+
+    def __init__(self, logs_dir: pathlib.Path, name: str,
+                 max_bytes: int = DEFAULT_MAX_BYTES, max_age_sec: float = DEFAULT_MAX_AGE_SEC):
+        self.logs_dir = pathlib.Path(logs_dir)
+        self.name = name
+        self.stem = name[:-len(".jsonl")] if name.endswith(".jsonl") else name
+        self.live_path = self.logs_dir / name
+        self.seg_dir = self.logs_dir / "segments" / self.stem
+        self.manifest_path = self.seg_dir / "manifest.json"
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+
+    # --- Manifest ---
+
+    def load_manifest(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if isinstance(data, dict) and isinstance(data.get("segments"), list):
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception:
+            log.warning(f"Unreadable segment manifest {self.manifest_path}", exc_info=True)
+        return {"name": self.name, "next_seq": 1, "live_since": None, "segments": []}
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        self.seg_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(f".manifest.json.tmp.{uuid.uuid4().hex}")
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(str(tmp), str(self.manifest_path))
+
+    def _locked(self):
+        self.seg_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.seg_dir / ".lock"), os.O_CREAT | os.O_RDWR, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                log.debug("flock unsupported for segment lock", exc_info=True)
+        return fd
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Sealed segments, oldest first."""
+        return list(self.load_manifest()["segments"])
+
+    def segment_path(self, seg: Dict[str, Any]) -> pathlib.Path:
+        return self.seg_dir / seg["file"]
+
+    # --- Rotation ---
+
+    def maybe_rotate(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Seal the live file if it is too big or too old. Returns the new segment entry."""
+        now = time.time() if now is None else now
+        try:
+            st = self.live_path.stat()
+        except FileNotFoundError:
+            return None
+        if st.st_size == 0:
+            return None
+        manifest = self.load_manifest()
+        live_since = manifest.get("live_since")
+        if live_since is None:
+            manifest["live_since"] = now
+            self._save_manifest(manifest)
+            live_since = now
+        too_big = st.st_size >= self.max_bytes
+        too_old = self.max_age_sec > 0 and now - float(live_since) >= self.max_age_sec
+        if not (too_big or too_old):
+            return None
+        return self.seal(now)
+
+    def seal(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        now = time.time() if now is None else now
+        fd = self._locked()
+        try:
+            manifest = self.load_manifest()
+            if not self.live_path.exists() or self.live_path.stat().st_size == 0:
+                return None
+            seq = int(manifest.get("next_seq") or 1)
+            seg_file = f"{self.stem}.{seq:06d}.jsonl"
+            fingerprint = line_fingerprint(self.live_path)
+            os.rename(str(self.live_path), str(self.seg_dir / seg_file))
+            entry = {
+                "seq": seq,
+                "file": seg_file,
+                "fingerprint": fingerprint,
+                "sealed_at": utc_now_iso(),
+                "sealed_ts": now,
+                "bytes": (self.seg_dir / seg_file).stat().st_size,
+                "compressed": False,
+            }
+            manifest["segments"].append(entry)
+            manifest["next_seq"] = seq + 1
+            manifest["live_since"] = now
+            self._save_manifest(manifest)
+            return entry
+        finally:
+            os.close(fd)
+
+    def compress_sealed(self, now: Optional[float] = None) -> int:
+        """Compress sealed segments older than the grace period. Returns how many."""
+        now = time.time() if now is None else now
+        done = 0
+        for seg in self.segments():
+            if seg.get("compressed") or now - float(seg.get("sealed_ts") or 0) < SEAL_GRACE_SEC:
+                continue
+            src = self.segment_path(seg)
+            ext = ".zst" if zstandard is not None else ".gz"
+            dst = src.with_name(src.name + ext)
+            tmp = dst.with_name(f".{dst.name}.tmp")
+            try:
+                raw_bytes = src.stat().st_size
+                with src.open("rb") as fin, tmp.open("wb") as fout:
+                    if zstandard is not None:
+                        zstandard.ZstdCompressor(level=6).copy_stream(fin, fout)
+                    else:
+                        with gzip.GzipFile(fileobj=fout, mode="wb", compresslevel=6) as gz:
+                            while True:
+                                chunk = fin.read(1024 * 1024)
+                                if not chunk:
+                                    break
+                                gz.write(chunk)
+                os.replace(str(tmp), str(dst))
+            except Exception:
+                log.warning(f"Failed to compress segment {src}", exc_info=True)
+                continue
+            fd = self._locked()
+            try:
+                manifest = self.load_manifest()
+                for entry in manifest["segments"]:
+                    if entry["seq"] == seg["seq"]:
+                        entry.update(file=dst.name, compressed=True, bytes=raw_bytes,
+                                     stored_bytes=dst.stat().st_size)
+                self._save_manifest(manifest)
+            finally:
+                os.close(fd)
+            src.unlink()
+            done += 1
+        return done
+
+    # --- Reading ---
+
+    def open(self, seg: Dict[str, Any]):
+        """Open a sealed segment, following a compression that replaced it meanwhile.
+
+        compress_sealed() updates the manifest and then unlinks the uncompressed
+        file, so a reader holding an older manifest retries once with a fresh one.
+        """
+        try:
+            return open_segment(self.segment_path(seg))
+        except FileNotFoundError:
+            fresh = next((s for s in self.segments() if s["seq"] == seg["seq"]), None)
+            if fresh is None or fresh["file"] == seg["file"]:
+                raise
+            seg.update(fresh)
+            return open_segment(self.segment_path(seg))
+
+    def _segment_lines(self, seg: Dict[str, Any]) -> Iterator[bytes]:
+        """Non-empty lines of a sealed segment, oldest first (streamed)."""
+        with self.open(seg) as f:
+            for raw in f:
+                if raw.strip():
+                    yield raw.rstrip(b"\n")
+
+    def _segment_lines_reverse(self, seg: Dict[str, Any]) -> Iterator[bytes]:
+        """Non-empty lines of a sealed segment, newest first."""
+        if not seg.get("compressed"):
+            try:
+                yield from _iter_lines_reverse(self.segment_path(seg))
+                return
+            except FileNotFoundError:
+                pass  # compressed meanwhile: fall through with a fresh manifest entry
+        # Compressed streams cannot seek backwards; segments are bounded by max_bytes.
+        yield from reversed(list(self._segment_lines(seg)))
+
+    def iter_lines(self, reverse: bool = False) -> Iterator[bytes]:
+        """All lines across sealed segments and the live file."""
+        segs = self.segments()
+        if not reverse:
+            for seg in segs:
+                yield from self._segment_lines(seg)
+            try:
+                with self.live_path.open("rb") as f:
+                    for raw in f:
+                        if raw.strip():
+                            yield raw.rstrip(b"\n")
+            except FileNotFoundError:
+                pass
+            return
+        if self.live_path.exists():
+            yield from _iter_lines_reverse(self.live_path)
+        for seg in reversed(segs):
+            yield from self._segment_lines_reverse(seg)
+
+    def iter_records(self, reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        for raw in self.iter_lines(reverse=reverse):
+            try:
+                obj = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(obj, dict):
+                yield obj
+
+    def _segment_tail(self, seg: Dict[str, Any], n: int) -> List[Dict[str, Any]]:
+        """Last n records of a sealed segment, oldest first, in O(n) memory."""
+        if not seg.get("compressed"):
+            out: List[Dict[str, Any]] = []
+            for raw in self._segment_lines_reverse(seg):
+                try:
+                    out.append(json.loads(raw))
+                except ValueError:
+                    continue
+                if len(out) >= n:
+                    break
+            out.reverse()
+            return out
+        last: "collections.deque[Dict[str, Any]]" = collections.deque(maxlen=n)
+        for raw in self._segment_lines(seg):
+            try:
+                last.append(json.loads(raw))
+            except ValueError:
+                continue
+        return list(last)
+
+    def tail(self, max_entries: int) -> List[Dict[str, Any]]:
+        """Last max_entries records, continuing into sealed segments after a rotation."""
+        out: List[Dict[str, Any]] = []
+        for line in reversed(tail_lines(self.live_path, max_entries)):
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                continue
+        if len(out) < max_entries:
+            for seg in reversed(self.segments()):
+                out.extend(reversed(self._segment_tail(seg, max_entries - len(out))))
+                if len(out) >= max_entries:
+                    break
+        out.reverse()
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Supervisor entry point
+# ---------------------------------------------------------------------------
+
+_compress_lock = threading.Lock()
+_last_task_prune = 0.0
+
+
+def prune_task_logs(logs_dir: pathlib.Path, max_age_sec: float = TASK_LOG_RETENTION_SEC,
+                    now: Optional[float] = None) -> int:
+    """Delete per-task sidecar dirs (logs/tasks/<id>/) untouched for max_age_sec."""
+    now = time.time() if now is None else now
+    removed = 0
+    tasks_dir = pathlib.Path(logs_dir) / "tasks"
+    if not tasks_dir.is_dir():
+        return 0
+    for task_dir in tasks_dir.iterdir():
+        try:
+            newest = max((p.stat().st_mtime for p in task_dir.iterdir()), default=task_dir.stat().st_mtime)
+            if now - newest >= max_age_sec:
+                shutil.rmtree(task_dir)
+                removed += 1
+        except Exception:
+            log.debug(f"Failed to prune task log dir {task_dir}", exc_info=True)
+    return removed
+
+
+def rotate_logs(logs_dir: pathlib.Path, names=SEGMENTED_LOGS) -> List[str]:
+    """Seal oversized/old logs and compress sealed segments in the background."""
+    sealed: List[str] = []
+    logs = [SegmentedLog(logs_dir, name) for name in names]
+    for slog in logs:
+        try:
+            entry = slog.maybe_rotate()
+            if entry:
+                sealed.append(f"{slog.name}:{entry['file']}")
+        except Exception:
+            log.warning(f"Failed to rotate {slog.name}", exc_info=True)
+
+    def _compress_all() -> None:
+        if not _compress_lock.acquire(blocking=False):
+            return
+        try:
+            for slog in logs:
+                slog.compress_sealed()
+            from ouroboros.log_columns import compact_sealed
+            compact_sealed(logs_dir)
+        except Exception:
+            log.warning("Segment compression failed", exc_info=True)
+        finally:
+            _compress_lock.release()
+
+    global _last_task_prune
+    if time.time() - _last_task_prune >= 3600:
+        _last_task_prune = time.time()
+        prune_task_logs(logs_dir)
+
+    from ouroboros.log_columns import needs_compaction
+    pending = (any(not seg.get("compressed") for slog in logs for seg in slog.segments())
+               or needs_compaction(logs_dir))
+    if pending and not _compress_lock.locked():
+        threading.Thread(target=_compress_all, name="log-segment-compress", daemon=True).start()
+    return sealed
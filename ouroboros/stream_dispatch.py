@@ -0,0 +1,175 @@
+"""
+Ouroboros — Early tool dispatch for streamed LLM rounds.
+
+While a completion streams, LLMClient.chat reports each tool call as soon as
+its arguments are complete. EarlyToolDispatcher starts read-only calls right
+away on the agent's tool runner pool, so file reads and searches overlap with the rest
+of the model's output; the loop later picks up the running futures instead
+of executing those calls again. Paid or external calls (ToolEntry.early=False)
+are never started early.
+
+Only a leading run of read-only calls is started early: once the model emits
+any other tool, later reads wait for it, preserving the model's order
+between writes and reads.
+
+A retried attempt (reset()) does not throw away calls the failed stream
+already started: they are kept by (name, arguments) and reused when the
+retry asks for the same call, so nothing runs twice. new_round() drops them.
+
+Long assistant text is cut into paragraphs (at most once per
+PROGRESS_INTERVAL_SEC) and held; commit() forwards them to emit_progress
+once the attempt succeeded, so a failed attempt never reaches the owner.
+unsent_text() gives the loop the remainder still to show.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ouroboros.tool_pool import ToolRunnerPool, get_pool
+
+log = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL_SEC = float(os.environ.get("OUROBOROS_STREAM_PROGRESS_SEC", "5") or 5)
+
+
+class EarlyToolDispatcher:
+    """Starts read-only tool calls mid-stream and streams long text as progress."""
+
+    def __init__(
+        self,
+        run_tool: Callable[[Dict[str, Any]], Dict[str, Any]],
+        can_start_early: Callable[[str], bool],
+        emit_progress: Optional[Callable[[str], None]] = None,
+        pool: Optional[ToolRunnerPool] = None,
+        progress_interval_sec: float = PROGRESS_INTERVAL_SEC,
+    ):
+        self._run_tool = run_tool
+        self._can_start_early = can_start_early
+        self._emit_progress = emit_progress
+        self._pool = pool
+        self._progress_interval = progress_interval_sec
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[str, str, Future]] = {}  # id -> (name, arguments, future)
+        self._carried: Dict[Tuple[str, str], List[Future]] = {}  # started by a failed attempt
+        self._blocked = False
+        self._text: List[str] = []
+        self._held: List[str] = []
+        self._emitted = 0
+        self._stream_start = 0.0
+        self._last_emit = 0.0
+        self.dispatched = 0
+        self.reused = 0
+
+    # --- stream callbacks -------------------------------------------------
+
+    def on_tool_call(self, tc: Dict[str, Any]) -> None:
+        fn = tc.get("function") or {}
+        name = fn.get("name") or ""
+        arguments = fn.get("arguments") or ""
+        with self._lock:
+            if self._blocked or not tc.get("id") or not self._can_start_early(name):
+                self._blocked = True
+                return
+            try:
+                json.loads(arguments or "{}")
+            except ValueError:
+                self._blocked = True  # let the loop report the bad arguments in order
+                return
+            future = self._claim_carried(name, arguments)
+            if future is None:
+                snapshot = {"id": tc["id"], "type": "function",
+                            "function": {"name": name, "arguments": arguments}}
+                future = (self._pool or get_pool()).submit(self._run_tool, snapshot, name=f"early:{name}")
+                self.dispatched += 1
+            self._pending[tc["id"]] = (name, arguments, future)
+
+    def _claim_carried(self, name: str, arguments: str) -> Optional[Future]:
+        futures = self._carried.get((name, arguments))
+        if not futures:
+            return None
+        future = futures.pop(0)
+        if not futures:
+            del self._carried[(name, arguments)]
+        return future
+
+    def on_text_delta(self, delta: str) -> None:
+        now = time.monotonic()
+        self._text.append(delta)
+        if not self._stream_start:
+            self._stream_start = now
+        if self._emit_progress is None or now - max(self._stream_start, self._last_emit) < self._progress_interval:
+            return
+        text = "".join(self._text)
+        self._text = [text]
+        cut = text.rfind("\n\n", self._emitted)
+        if cut <= self._emitted:
+            return
+        paragraph = text[self._emitted:cut].strip()
+        self._emitted = cut
+        self._last_emit = now
+        if paragraph:
+            self._held.append(paragraph)
+
+    # --- loop side --------------------------------------------------------
+
+    def reset(self) -> None:
+        """Start of an LLM attempt: drop the previous attempt's text; keep its
+        started calls for reuse and cancel the ones still queued."""
+        with self._lock:
+            for name, arguments, future in self._pending.values():
+                if not future.cancel():
+                    self._carried.setdefault((name, arguments), []).append(future)
+            self._pending.clear()
+            self._blocked = False
+        self._text = []
+        self._held = []
+        self._emitted = 0
+        self._stream_start = 0.0
+        self._last_emit = 0.0
+
+    def new_round(self) -> None:
+        """Start of a loop round: calls of earlier rounds must not be reused."""
+        self.reset()
+        with self._lock:
+            for futures in self._carried.values():
+                for future in futures:
+                    future.cancel()
+            self._carried.clear()
+
+    def commit(self) -> None:
+        """The attempt succeeded: forward its held paragraphs."""
+        held, self._held = self._held, []
+        for paragraph in held:
+            self._emit_progress(paragraph)
+
+    def take(self, tc: Dict[str, Any]) -> Optional[Future]:
+        """Future of an early-started call, if the final call still matches it."""
+        fn = tc.get("function") or {}
+        with self._lock:
+            entry = self._pending.pop(tc.get("id") or "", None)
+            if entry is None:
+                future = self._claim_carried(fn.get("name") or "", fn.get("arguments") or "")
+                if future is not None:
+                    self.reused += 1
+                return future
+        _name, arguments, future = entry
+        if arguments != (fn.get("arguments") or ""):
+            future.cancel()
+            return None
+        self.reused += 1
+        return future
+
+    def unsent_text(self, content: str) -> str:
+        """Part of the final assistant text not yet forwarded as progress."""
+        return content[self._emitted:] if self._emitted <= len(content) else content
+
+    def shutdown(self) -> None:
+        """Cancel unclaimed calls; runners belong to the shared pool and stay up."""
+        self.new_round()
@@ -0,0 +1,281 @@
+"""
+Ouroboros — Persistent per-file symbol cache.
+
+codebase_digest, review.compute_complexity_metrics and the codebase_health
+tool all need the same facts about each file: line count, class and function
+names (from the AST) and function spans (the line heuristic used for the
+length metrics). SymbolCache keeps them in one record per file *content*,
+keyed by sha1, so an unchanged file is never parsed twice:
+
+    records   sha1 -> {lines, classes, functions, def_spans}
+    paths     absolute path -> (mtime_ns, size, sha1), so files whose stat
+              has not changed are not even read
+
+Both live on Drive at cache/symbols.json and are shared by every process;
+writes merge with the file on disk and keep the MAX_RECORDS most recently
+used records. Without a Drive root the cache is in memory only.
+
+Misses are analyzed serially in the calling thread: a cold run over the
+whole repo takes well under a second, and a process pool would have to fork
+the multi-threaded supervisor or re-import its __main__ under spawn.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ouroboros.utils import drive_available, drive_root
+
+log = logging.getLogger(__name__)
+
+SCHEMA = 1
+MAX_RECORDS = 5000
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+def def_spans(lines: Sequence[str]) -> List[List[int]]:
+    """[start_line, length] of each def, by indentation (see compute_complexity_metrics)."""
+    func_starts = [i for i, line in enumerate(lines)
+                   if line.strip().startswith("def ") or line.strip().startswith("async def ")]
+    spans: List[List[int]] = []
+    for j, start in enumerate(func_starts):
+        def_line = lines[start]
+        def_indent = len(def_line) - len(def_line.lstrip())
+        # End: first non-blank, non-comment line indented no deeper than the def
+        end = len(lines)
+        for k in range(start + 1, len(lines)):
+            line = lines[k]
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            if len(line) - len(line.lstrip()) <= def_indent:
+                end = k
+                break
+        if j + 1 < len(func_starts):
+            end = min(end, func_starts[j + 1])
+        spans.append([start, end - start])
+    return spans
+
+
+def analyze_source(text: str, filename: str = "") -> Dict[str, Any]:
+    """Record for one file's content. Python symbols only for .py (or unnamed) sources."""
+    lines = text.splitlines()
+    record: Dict[str, Any] = {"lines": len(lines), "classes": [], "functions": [], "def_spans": []}
+    if filename and not filename.endswith(".py"):
+        return record
+    record["def_spans"] = def_spans(lines)
+    try:
+        tree = ast.parse(text, filename=filename or "<source>")
+    except (SyntaxError, ValueError):
+        record["syntax_error"] = True
+        return record
+    classes, functions = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            classes.append(node.name)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.append(node.name)
+    record["classes"] = list(dict.fromkeys(classes))
+    record["functions"] = list(dict.fromkeys(functions))
+    return record
+
+
+def content_hash(data: bytes, filename: str = "") -> str:
+    """Record key: sha1 of the content, suffixed for non-Python files (no symbols parsed)."""
+    h = hashlib.sha1(data).hexdigest()
+    return h if not filename or filename.endswith(".py") else h + ":text"
+
+
+def _analyze_file(path: str) -> Optional[Tuple[int, int, str, Dict[str, Any]]]:
+    """(mtime_ns, size, sha1, record) of a file, or None if it is not UTF-8 text."""
+    try:
+        st = os.stat(path)
+        data = pathlib.Path(path).read_bytes()
+        text = data.decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    return st.st_mtime_ns, st.st_size, content_hash(data, path), analyze_source(text, path)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class SymbolCache:
+    """Content-addressed file records, persisted on Drive and shared by processes."""
+
+    def __init__(self, cache_path: Optional[pathlib.Path] = None):
+        self._path = pathlib.Path(cache_path) if cache_path is not None else None
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._paths: Dict[str, List[Any]] = {}
+        self._file_key: Optional[Tuple[int, int]] = None
+        self._dirty = False
+        self._used: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_path(self) -> pathlib.Path:
+        if self._path is not None:
+            return self._path
+        return drive_root() / "cache" / "symbols.json"
+
+    def set_cache_path(self, path: Optional[pathlib.Path]) -> None:
+        with self._lock:
+            self._path = pathlib.Path(path) if path is not None else None
+            self._records.clear()
+            self._paths.clear()
+            self._used.clear()
+            self._file_key = None
+            self._dirty = False
+            self.hits = self.misses = 0
+
+    def _disk_enabled(self) -> bool:
+        return drive_available(self._path)
+
+    def _read_disk(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            log.debug(f"Unreadable symbol cache {self.cache_path}", exc_info=True)
+            return {}
+        return data if isinstance(data, dict) and data.get("schema") == SCHEMA else {}
+
+    def _load(self) -> None:
+        """Pick up records other processes wrote. Caller holds _lock."""
+        if not self._disk_enabled():
+            return
+        try:
+            st = self.cache_path.stat()
+        except OSError:
+            return
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._file_key:
+            return
+        data = self._read_disk()
+        self._records.update(data.get("records") or {})
+        for p, sig in (data.get("paths") or {}).items():
+            self._paths.setdefault(p, sig)
+        self._file_key = key
+
+    def flush(self) -> None:
+        """Write new records, merged with what is on disk, pruned to MAX_RECORDS."""
+        with self._lock:
+            if not self._dirty or not self._disk_enabled():
+                self._dirty = False
+                return
+            now = time.time()
+            data = self._read_disk()
+            records = data.get("records") or {}
+            records.update(self._records)
+            for h in self._used:
+                if h in records:
+                    records[h]["used"] = now
+            if len(records) > MAX_RECORDS:
+                keep = sorted(records, key=lambda h: records[h].get("used") or 0, reverse=True)[:MAX_RECORDS]
+                records = {h: records[h] for h in keep}
+            paths = {**(data.get("paths") or {}), **self._paths}
+            paths = {p: sig for p, sig in paths.items() if sig[2] in records}
+            try:
+                path = self.cache_path
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.tmp.{uuid.uuid4().hex}")
+                tmp.write_text(json.dumps({"schema": SCHEMA, "records": records, "paths": paths},
+                                          ensure_ascii=False), encoding="utf-8")
+                os.replace(str(tmp), str(path))
+                st = path.stat()
+                self._file_key = (st.st_mtime_ns, st.st_size)
+            except Exception:
+                log.debug("Failed to write symbol cache", exc_info=True)
+            self._records, self._paths = records, paths
+            self._used.clear()
+            self._dirty = False
+
+    # --- lookups ----------------------------------------------------------
+
+    def _remember(self, h: str, record: Dict[str, Any]) -> None:
+        """Caller holds _lock."""
+        self._records[h] = record
+        self._used[h] = time.time()
+        self._dirty = True
+
+    def for_files(self, paths: Sequence[pathlib.Path]) -> Dict[pathlib.Path, Dict[str, Any]]:
+        """Records of files (unreadable or non-UTF-8 files are omitted)."""
+        out: Dict[pathlib.Path, Dict[str, Any]] = {}
+        misses: List[pathlib.Path] = []
+        with self._lock:
+            self._load()
+            for p in paths:
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                sig = self._paths.get(str(p))
+                record = self._records.get(sig[2]) if sig and sig[:2] == [st.st_mtime_ns, st.st_size] else None
+                if record is None:
+                    misses.append(p)
+                    continue
+                self.hits += 1
+                self._used[sig[2]] = time.time()
+                out[p] = record
+        results = [_analyze_file(str(p)) for p in misses]
+        with self._lock:
+            for p, res in zip(misses, results):
+                if res is None:
+                    continue
+                mtime_ns, size, h, record = res
+                self.misses += 1
+                record = self._records.get(h) or record  # same content under another path
+                self._paths[str(p)] = [mtime_ns, size, h]
+                self._remember(h, record)
+                out[p] = record
+        if misses:
+            self.flush()
+        return out
+
+    def for_texts(self, items: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Records of (filename, content) pairs, e.g. review sections."""
+        hashes = [content_hash(text.encode("utf-8", errors="replace"), name) for name, text in items]
+        out: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        todo: List[int] = []
+        with self._lock:
+            self._load()
+            for i, h in enumerate(hashes):
+                record = self._records.get(h)
+                if record is None:
+                    todo.append(i)
+                else:
+                    self.hits += 1
+                    self._used[h] = time.time()
+                    out[i] = record
+        results = [analyze_source(items[i][1], items[i][0]) for i in todo]
+        with self._lock:
+            for i, record in zip(todo, results):
+                self.misses += 1
+                self._remember(hashes[i], record)
+                out[i] = record
+        if todo:
+            self.flush()
+        return out  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "records": len(self._records)}
+
+
+symbol_cache = SymbolCache()
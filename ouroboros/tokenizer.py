@@ -0,0 +1,166 @@
+"""
+Ouroboros — Token counting.
+
+Pluggable tokenizer for context-size accounting (soft cap, checkpoints).
+OUROBOROS_TOKENIZER selects the backend:
+
+    auto (default)       tiktoken o200k_base if installed, else heuristic
+    tiktoken:<encoding>  a tiktoken encoding, only if its vocabulary is already in
+                         tiktoken's local cache (TIKTOKEN_CACHE_DIR); the
+                         tokenizer never downloads it
+    hf:<tokenizer.json>  a local HuggingFace tokenizer file (needs `tokenizers`)
+    heuristic            script-aware estimate, no dependencies
+
+The heuristic counts ASCII at ~4 chars/token, other alphabetic scripts
+(Cyrillic, Greek, ...) at ~2.5 and CJK at ~1, which is much closer than a
+flat chars/4 for Russian chat and symbol-heavy code.
+
+Counts are memoized by content hash, so the same system blocks and tool
+results are not re-tokenized on every round.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 6
+_MEMO_MAX = 4096
+_MEMO_MIN_CHARS = 256  # shorter texts are cheaper to count than to hash
+_CJK_RE = re.compile("[\u3000-\u9fff\uac00-\ud7af]")
+
+_lock = threading.Lock()
+_memo: "collections.OrderedDict[bytes, int]" = collections.OrderedDict()
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+_backend: Optional[Callable[[str], int]] = None
+_backend_name = ""
+
+
+def heuristic_tokens(text: str) -> int:
+    """Script-aware estimate: ASCII ~4 chars/token, other scripts denser."""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    cjk = len(_CJK_RE.findall(text)) if ascii_chars < len(text) else 0
+    other = len(text) - ascii_chars - cjk
+    return max(1, (ascii_chars + 3) // 4 + (other * 2 + 4) // 5 + cjk)
+
+
+def _tiktoken_vocab_cached(encoding: str) -> bool:
+    """True if tiktoken can load encoding without network (same cache layout as tiktoken.load)."""
+    if "TIKTOKEN_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    elif "DATA_GYM_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["DATA_GYM_CACHE_DIR"]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return False
+    name = "p50k_base" if encoding == "p50k_edit" else encoding
+    url = f"https://openaipublic.blob.core.windows.net/encodings/{name}.tiktoken"
+    return os.path.isfile(os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest()))
+
+
+def _load_backend(spec: str):
+    """Build a backend. Called without _lock held: loading a vocabulary reads files."""
+    kind, _, arg = spec.partition(":")
+    if kind in ("auto", "tiktoken"):
+        try:
+            import tiktoken  # type: ignore
+            name = arg or "o200k_base"
+            if not _tiktoken_vocab_cached(name):
+                raise FileNotFoundError(f"tiktoken vocabulary {name!r} is not in the local cache")
+            enc = tiktoken.get_encoding(name)
+            return f"tiktoken:{enc.name}", lambda text: len(enc.encode(text, disallowed_special=()))
+        except Exception:
+            if kind == "tiktoken":
+                log.warning("tiktoken tokenizer %r unavailable, using heuristic", arg, exc_info=True)
+    elif kind == "hf":
+        try:
+            from tokenizers import Tokenizer  # type: ignore
+            tok = Tokenizer.from_file(arg)
+            return f"hf:{os.path.basename(arg)}", lambda text: len(tok.encode(text, add_special_tokens=False).ids)
+        except Exception:
+            log.warning("HF tokenizer %r unavailable, using heuristic", arg, exc_info=True)
+    elif kind != "heuristic":
+        log.warning("Unknown OUROBOROS_TOKENIZER %r, using heuristic", spec)
+    return "heuristic", heuristic_tokens
+
+
+def _get_backend() -> Callable[[str], int]:
+    global _backend, _backend_name
+    if _backend is None:
+        spec = (os.environ.get("OUROBOROS_TOKENIZER", "auto") or "auto").strip()
+        name, backend = _load_backend(spec)  # may race with another thread; both get the same result
+        with _lock:
+            if _backend is None:
+                _backend_name, _backend = name, backend
+    return _backend
+
+
+def set_backend(spec: str) -> str:
+    """Switch backend (e.g. for tests); clears the memo. Returns the backend name."""
+    global _backend, _backend_name
+    name, backend = _load_backend(spec)
+    with _lock:
+        _backend_name, _backend = name, backend
+        _memo.clear()
+    return _backend_name
+
+
+def backend_name() -> str:
+    _get_backend()
+    return _backend_name
+
+
+def count_tokens(text: Any) -> int:
+    """Token count of one text block (memoized by content hash)."""
+    text = str(text or "")
+    if not text:
+        return 1
+    backend = _get_backend()
+    if len(text) < _MEMO_MIN_CHARS:
+        return max(1, backend(text))
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _lock:
+        hit = _memo.get(key)
+        if hit is not None:
+            _memo.move_to_end(key)
+            _stats["hits"] += 1
+            return hit
+        _stats["misses"] += 1
+    n = max(1, backend(text))
+    with _lock:
+        _memo[key] = n
+        if len(_memo) > _MEMO_MAX:
+            _memo.popitem(last=False)
+    return n
+
+
+def count_message_tokens(msg: Dict[str, Any]) -> int:
+    """Tokens of one chat message: text content blocks plus tool-call arguments."""
+    content = msg.get("content", "")
+    if isinstance(content, list):
+        total = sum(count_tokens(b.get("text", "")) for b in content
+                    if isinstance(b, dict) and b.get("type") == "text")
+    else:
+        total = count_tokens(content) if content else 0
+    for tc in msg.get("tool_calls") or []:
+        fn = (tc.get("function") if isinstance(tc, dict) else None) or {}
+        total += count_tokens(fn.get("name", "")) + count_tokens(fn.get("arguments", ""))
+    return total + MESSAGE_OVERHEAD_TOKENS
+
+
+def count_messages_tokens(messages: Iterable[Dict[str, Any]]) -> int:
+    return sum(count_message_tokens(m) for m in messages)
+
+
+def memo_stats() -> Dict[str, Any]:
+    with _lock:
+        return {"backend": _backend_name or "unloaded", "memo_entries": len(_memo), **_stats}
@@ -0,0 +1,215 @@
+"""
+Ouroboros — Persistent tool runner pool.
+
+One bounded pool of runner threads per process (i.e. per agent) executes
+tool calls for run_llm_loop, early stream dispatch and background
+consciousness. Threads are started on demand up to OUROBOROS_TOOL_POOL_SIZE
+and reused across rounds and tasks instead of building an executor per call.
+
+A Python thread cannot be killed, so a tool that outlives its timeout keeps
+running. The caller calls abandon(future): the runner is marked orphaned and
+a replacement thread keeps the pool at full strength, as long as runners plus
+orphans stay within size + OUROBOROS_TOOL_POOL_MAX_ORPHANS. Past that cap the
+pool runs short-handed instead of growing without bound until an orphan
+finishes; a finished orphan rejoins the pool if there is room, else exits.
+
+stats() reports occupancy: threads, busy, idle, queued, orphaned, peak and
+counters, plus the calls in flight with their age.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+POOL_SIZE = max(1, int(os.environ.get("OUROBOROS_TOOL_POOL_SIZE", "8") or 8))
+MAX_ORPHANS = max(0, int(os.environ.get("OUROBOROS_TOOL_POOL_MAX_ORPHANS", "4") or 4))
+
+_STOP = object()
+
+
+class _Call:
+    __slots__ = ("call_id", "name", "fn", "args", "kwargs", "future", "submitted", "started", "runner")
+
+    def __init__(self, call_id: int, name: str, fn: Callable, args: tuple, kwargs: dict):
+        self.call_id = call_id
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.submitted = time.time()
+        self.started = 0.0
+        self.runner: Optional[str] = None
+
+
+class ToolRunnerPool:
+    """Bounded, long-lived thread pool with orphan tracking for timed-out calls."""
+
+    def __init__(self, size: int = POOL_SIZE, max_orphans: int = MAX_ORPHANS, name: str = "tool_runner"):
+        self.size = size
+        self.max_orphans = max_orphans
+        self._name = name
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._ids = itertools.count(1)
+        self._threads = 0  # runner threads alive, excluding orphans
+        self._idle = 0
+        self._queued = 0
+        self._in_flight: Dict[int, _Call] = {}
+        self._orphans: Dict[int, _Call] = {}
+        self._counters = {"submitted": 0, "completed": 0, "timeouts": 0, "short_handed": 0,
+                          "threads_started": 0, "peak_busy": 0}
+
+    # --- submission -------------------------------------------------------
+
+    def submit(self, fn: Callable[..., Any], *args: Any, name: str = "", **kwargs: Any) -> Future:
+        call = _Call(next(self._ids), name or getattr(fn, "__name__", "call"), fn, args, kwargs)
+        with self._lock:
+            self._counters["submitted"] += 1
+            self._queued += 1
+            self._grow()
+        self._queue.put(call)
+        return call.future
+
+    def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None,
+            name: str = "", **kwargs: Any) -> Any:
+        """submit + result; on timeout the call is abandoned and TimeoutError raised."""
+        future = self.submit(fn, *args, name=name, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            self.abandon(future)
+            raise
+
+    def abandon(self, future: Future) -> None:
+        """Give up on a timed-out call: cancel it if queued, else orphan its runner."""
+        if future.cancel():
+            return
+        with self._lock:
+            call = next((c for c in self._in_flight.values() if c.future is future), None)
+            if call is None or call.call_id in self._orphans:
+                return
+            self._counters["timeouts"] += 1
+            self._orphans[call.call_id] = call
+            self._threads -= 1  # its runner no longer counts toward the pool
+            if len(self._orphans) > self.max_orphans:
+                log.warning("Tool pool orphan cap (%d) reached; %s keeps running without a replacement",
+                            self.max_orphans, call.name)
+            self._grow()
+
+    # --- runners ----------------------------------------------------------
+
+    def _grow(self) -> None:
+        """Start a runner if queued work has no idle one. Caller holds _lock.
+
+        Runners plus orphans never exceed size + max_orphans.
+        """
+        if self._idle >= self._queued or self._threads >= self.size:
+            return
+        if self._threads + len(self._orphans) >= self.size + self.max_orphans:
+            self._counters["short_handed"] += 1
+            return
+        self._spawn()
+
+    def _spawn(self) -> None:
+        """Start one runner thread. Caller holds _lock."""
+        self._threads += 1
+        self._idle += 1
+        self._counters["threads_started"] += 1
+        t = threading.Thread(target=self._runner, name=f"{self._name}_{self._counters['threads_started']}",
+                             daemon=True)
+        t.start()
+
+    def _runner(self) -> None:
+        while True:
+            call = self._queue.get()
+            if call is _STOP:
+                with self._lock:
+                    self._threads -= 1
+                    self._idle -= 1
+                return
+            with self._lock:
+                self._queued -= 1
+                if not call.future.set_running_or_notify_cancel():
+                    continue
+                self._idle -= 1
+                call.started = time.time()
+                call.runner = threading.current_thread().name
+                self._in_flight[call.call_id] = call
+                busy = self._threads - self._idle
+                self._counters["peak_busy"] = max(self._counters["peak_busy"], busy)
+            try:
+                call.future.set_result(call.fn(*call.args, **call.kwargs))
+            except BaseException as e:
+                call.future.set_exception(e)
+            with self._lock:
+                self._in_flight.pop(call.call_id, None)
+                self._counters["completed"] += 1
+                if self._orphans.pop(call.call_id, None) is None:
+                    self._idle += 1
+                    continue
+                if self._threads >= self.size:
+                    return  # a replacement took this slot
+                self._threads += 1  # rejoin the pool
+                self._idle += 1
+
+    def shutdown(self) -> None:
+        """Stop idle runners (busy ones and orphans finish their calls first)."""
+        with self._lock:
+            n = self._threads
+        for _ in range(n):
+            self._queue.put(_STOP)
+
+    # --- metrics ----------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            in_flight: List[Dict[str, Any]] = [
+                {"name": c.name, "age_sec": round(now - c.started, 1), "orphaned": c.call_id in self._orphans}
+                for c in self._in_flight.values()
+            ]
+            return {
+                "size": self.size,
+                "threads": self._threads,
+                "busy": self._threads - self._idle,
+                "idle": self._idle,
+                "queued": self._queued,
+                "orphaned": len(self._orphans),
+                "max_orphans": self.max_orphans,
+                **self._counters,
+                "in_flight": in_flight,
+            }
+
+
+_pool: Optional[ToolRunnerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ToolRunnerPool:
+    """The process-wide tool runner pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ToolRunnerPool()
+    return _pool
+
+
+def _reset_after_fork() -> None:
+    global _pool, _pool_lock
+    _pool = None  # runner threads do not survive fork
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
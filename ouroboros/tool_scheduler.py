@@ -0,0 +1,88 @@
+"""
+Ouroboros — Conflict-aware scheduling of a tool-call batch.
+
+Each call declares (via its ToolEntry) a concurrency class and the resource
+keys it touches:
+
+    read        shares its resources with other reads
+    write       owns its resources
+    exclusive   conflicts with every other call (tools that may touch anything)
+
+Two calls conflict if either is exclusive, or both touch overlapping
+resources and at least one writes. Keys are hierarchical: "drive" overlaps
+"drive/memory/x.md", which does not overlap "drive/memory/y.md".
+
+build_dag() makes each call depend on every earlier call it conflicts with,
+so the model's order is kept exactly where it matters and everything else
+runs concurrently. run_dag() starts calls as their dependencies finish and
+returns results in the original order. A call that times out counts as
+finished for its dependents, just as sequential execution moved on after a
+timeout.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+Access = Tuple[str, Tuple[str, ...]]
+
+
+def _overlap(a: str, b: str) -> bool:
+    return a == b or a.startswith(b + "/") or b.startswith(a + "/")
+
+
+def conflicts(a: Access, b: Access) -> bool:
+    mode_a, keys_a = a
+    mode_b, keys_b = b
+    if mode_a == "exclusive" or mode_b == "exclusive":
+        return True
+    if mode_a == "read" and mode_b == "read":
+        return False
+    return any(_overlap(x, y) for x in keys_a for y in keys_b)
+
+
+def build_dag(accesses: Sequence[Access]) -> List[Set[int]]:
+    """deps[i] = earlier calls that call i must wait for."""
+    return [{j for j in range(i) if conflicts(accesses[j], accesses[i])} for i in range(len(accesses))]
+
+
+def run_dag(
+    deps: List[Set[int]],
+    start: Callable[[int], Future],
+    timeout_of: Callable[[int], float],
+    on_timeout: Callable[[int, Future], Any],
+    on_error: Callable[[int, BaseException], Any],
+    started: Optional[Dict[int, Future]] = None,
+) -> List[Any]:
+    """Run a batch in dependency order. started: calls already running (no deps)."""
+    n = len(deps)
+    results: List[Any] = [None] * n
+    running: Dict[int, Tuple[Future, float]] = {}
+    for idx, future in (started or {}).items():
+        running[idx] = (future, time.time() + timeout_of(idx))
+    done: Set[int] = set()
+    while len(done) < n:
+        for idx in range(n):
+            if idx not in done and idx not in running and deps[idx] <= done:
+                running[idx] = (start(idx), time.time() + timeout_of(idx))
+        if not running:
+            raise RuntimeError("tool dependency cycle")  # build_dag only points backwards
+        wait([f for f, _ in running.values()],
+             timeout=max(0.0, min(d for _, d in running.values()) - time.time()),
+             return_when=FIRST_COMPLETED)
+        now = time.time()
+        for idx, (future, deadline) in list(running.items()):
+            if future.done():
+                try:
+                    results[idx] = future.result()
+                except BaseException as e:
+                    results[idx] = on_error(idx, e)
+            elif now >= deadline:
+                results[idx] = on_timeout(idx, future)
+            else:
+                continue
+            del running[idx]
+            done.add(idx)
+    return results
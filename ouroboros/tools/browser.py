@@ -361,6 +361,8 @@ def get_tools() -> List[ToolEntry]:
                 },
             },
             handler=_browse_page,
+            concurrency="write",
+            resources=("browser",),
             timeout_sec=60,
         ),
         ToolEntry(
@@ -398,6 +400,8 @@ def get_tools() -> List[ToolEntry]:
                 },
             },
             handler=_browser_action,
+            concurrency="write",
+            resources=("browser",),
             timeout_sec=60,
         ),
     ]
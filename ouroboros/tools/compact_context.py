@@ -75,6 +75,8 @@ def get_tools() -> List[ToolEntry]:
                 },
             },
             handler=_compact_context,
+            concurrency="write",
+            resources=("context",),
             timeout_sec=5,
         ),
     ]
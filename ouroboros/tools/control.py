@@ -217,7 +217,7 @@ def get_tools() -> List[ToolEntry]:
             "name": "promote_to_stable",
             "description": "Promote ouroboros -> ouroboros-stable. Call when you consider the code stable.",
             "parameters": {"type": "object", "properties": {"reason": {"type": "string"}}, "required": ["reason"]},
-        }, _promote_to_stable),
+        }, _promote_to_stable, concurrency="write", resources=("git",)),
         ToolEntry("schedule_task", {
             "name": "schedule_task",
             "description": "Schedule a background task. Returns task_id for later retrieval. For complex tasks, decompose into focused subtasks with clear scope.",
@@ -226,28 +226,28 @@ def get_tools() -> List[ToolEntry]:
                 "context": {"type": "string", "description": "Optional context from parent task: background info, constraints, style guide, etc."},
                 "parent_task_id": {"type": "string", "description": "Optional parent task ID for tracking lineage"},
             }, "required": ["description"]},
-        }, _schedule_task),
+        }, _schedule_task, concurrency="write", resources=("tasks",)),
         ToolEntry("cancel_task", {
             "name": "cancel_task",
             "description": "Cancel a task by ID.",
             "parameters": {"type": "object", "properties": {"task_id": {"type": "string"}}, "required": ["task_id"]},
-        }, _cancel_task),
+        }, _cancel_task, concurrency="write", resources=("tasks",)),
         ToolEntry("request_review", {
             "name": "request_review",
             "description": "Request a deep review of code, prompts, and state. You decide when a review is needed.",
             "parameters": {"type": "object", "properties": {
                 "reason": {"type": "string", "description": "Why you want a review (context for the reviewer)"},
             }, "required": ["reason"]},
-        }, _request_review),
+        }, _request_review, concurrency="write", resources=("tasks",)),
         ToolEntry("chat_history", {
             "name": "chat_history",
             "description": "Retrieve messages from chat history. Supports search.",
             "parameters": {"type": "object", "properties": {
                 "count": {"type": "integer", "default": 100, "description": "Number of messages (from latest)"},
-                "offset": {"type": "integer", "default": 0, "description": "Skip N from end (pagination)"},
-                "search": {"type": "string", "default": "", "description": "Text filter"},
+                "offset": {"type": "integer", "default": 0, "description": "Skip N from end (pagination); with search: skip N best matches"},
+                "search": {"type": "string", "default": "", "description": "Search words; ranked matches across live and archived chat"},
             }, "required": []},
-        }, _chat_history),
+        }, _chat_history, concurrency="read", resources=("chat",)),
         ToolEntry("update_scratchpad", {
             "name": "update_scratchpad",
             "description": "Update your working memory. Write freely — any format you find useful. "
@@ -255,7 +255,7 @@ def get_tools() -> List[ToolEntry]:
             "parameters": {"type": "object", "properties": {
                 "content": {"type": "string", "description": "Full scratchpad content"},
             }, "required": ["content"]},
-        }, _update_scratchpad),
+        }, _update_scratchpad, concurrency="write", resources=("drive/memory/scratchpad.md",)),
         ToolEntry("send_owner_message", {
             "name": "send_owner_message",
             "description": "Send a proactive message to the owner. Use when you have something "
@@ -265,7 +265,7 @@ def get_tools() -> List[ToolEntry]:
                 "text": {"type": "string", "description": "Message text"},
                 "reason": {"type": "string", "description": "Why you're reaching out (logged, not sent)"},
             }, "required": ["text"]},
-        }, _send_owner_message),
+        }, _send_owner_message, concurrency="write", resources=("chat",)),
         ToolEntry("update_identity", {
             "name": "update_identity",
             "description": "Update your identity manifest (who you are, who you want to become). "
@@ -273,7 +273,7 @@ def get_tools() -> List[ToolEntry]:
             "parameters": {"type": "object", "properties": {
                 "content": {"type": "string", "description": "Full identity content"},
             }, "required": ["content"]},
-        }, _update_identity),
+        }, _update_identity, concurrency="write", resources=("drive/memory/identity.md",)),
         ToolEntry("toggle_evolution", {
             "name": "toggle_evolution",
             "description": "Enable or disable evolution mode. When enabled, Ouroboros runs continuous self-improvement cycles.",
@@ -298,19 +298,19 @@ def get_tools() -> List[ToolEntry]:
                 "effort": {"type": "string", "enum": ["low", "medium", "high", "xhigh"],
                            "description": "Reasoning effort level. Leave empty to keep current."},
             }, "required": []},
-        }, _switch_model),
+        }, _switch_model, concurrency="write", resources=("model",)),
         ToolEntry("get_task_result", {
             "name": "get_task_result",
             "description": "Read the result of a completed subtask. Use after schedule_task to collect results.",
             "parameters": {"type": "object", "required": ["task_id"], "properties": {
                 "task_id": {"type": "string", "description": "Task ID returned by schedule_task"},
             }},
-        }, _get_task_result),
+        }, _get_task_result, concurrency="read", resources=("tasks",)),
         ToolEntry("wait_for_task", {
             "name": "wait_for_task",
             "description": "Check if a subtask has completed. Returns result if done, or 'still running' message. Call repeatedly to poll. Default timeout: 120s.",
             "parameters": {"type": "object", "required": ["task_id"], "properties": {
                 "task_id": {"type": "string", "description": "Task ID to check"},
             }},
-        }, _wait_for_task),
+        }, _wait_for_task, concurrency="read", resources=("tasks",)),
     ]
@@ -2,16 +2,16 @@
 
 from __future__ import annotations
 
-import ast
 import json
 import logging
 import os
 import pathlib
 import uuid
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List
 
-from ouroboros.tools.registry import ToolContext, ToolEntry
-from ouroboros.utils import read_text, safe_relpath, utc_now_iso
+from ouroboros.symbol_cache import symbol_cache
+from ouroboros.tools.registry import ToolContext, ToolEntry, path_resource
+from ouroboros.utils import read_text, read_jsonl_tail, safe_relpath, utc_now_iso
 
 log = logging.getLogger(__name__)
 
@@ -35,20 +35,31 @@ def _list_dir(root: pathlib.Path, rel: str, max_entries: int = 500) -> List[str]
     return items
 
 
+def _cached_list(ctx: ToolContext, root: pathlib.Path, rel: str, max_entries: int) -> str:
+    target = (root / safe_relpath(rel)).resolve()
+    return ctx.read_cache.read(
+        "list", target,
+        lambda: json.dumps(_list_dir(root, rel, max_entries), ensure_ascii=False, indent=2),
+        variant=(str(root), max_entries),
+    )
+
+
 def _repo_read(ctx: ToolContext, path: str) -> str:
-    return read_text(ctx.repo_path(path))
+    p = ctx.repo_path(path)
+    return ctx.read_cache.read("file", p, lambda: read_text(p))
 
 
 def _repo_list(ctx: ToolContext, dir: str = ".", max_entries: int = 500) -> str:
-    return json.dumps(_list_dir(ctx.repo_dir, dir, max_entries), ensure_ascii=False, indent=2)
+    return _cached_list(ctx, ctx.repo_dir, dir, max_entries)
 
 
 def _drive_read(ctx: ToolContext, path: str) -> str:
-    return read_text(ctx.drive_path(path))
+    p = ctx.drive_path(path)
+    return ctx.read_cache.read("file", p, lambda: read_text(p))
 
 
 def _drive_list(ctx: ToolContext, dir: str = ".", max_entries: int = 500) -> str:
-    return json.dumps(_list_dir(ctx.drive_root, dir, max_entries), ensure_ascii=False, indent=2)
+    return _cached_list(ctx, ctx.drive_root, dir, max_entries)
 
 
 def _drive_write(ctx: ToolContext, path: str, content: str, mode: str = "overwrite") -> str:
@@ -100,24 +111,6 @@ _SKIP_DIRS = frozenset({
 })
 
 
-def _extract_python_symbols(file_path: pathlib.Path) -> Tuple[List[str], List[str]]:
-    """Extract class and function names from a Python file using AST."""
-    try:
-        code = file_path.read_text(encoding="utf-8")
-        tree = ast.parse(code, filename=str(file_path))
-        classes = []
-        functions = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                classes.append(node.name)
-            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                functions.append(node.name)
-        return list(dict.fromkeys(classes)), list(dict.fromkeys(functions))
-    except Exception:
-        log.warning(f"Failed to extract Python symbols from {file_path}", exc_info=True)
-        return [], []
-
-
 def _codebase_digest(ctx: ToolContext) -> str:
     """Generate a compact digest of the codebase: files, sizes, classes, functions."""
     repo_dir = ctx.repo_dir
@@ -142,53 +135,44 @@ def _codebase_digest(ctx: ToolContext) -> str:
     total_lines = 0
     total_functions = 0
     sections: List[str] = []
+    # Line counts and symbols come from the shared cache: only new or changed files are read
+    records = symbol_cache.for_files(py_files + md_files + other_files)
 
     # Python files
     for pf in py_files:
-        try:
-            lines = pf.read_text(encoding="utf-8").splitlines()
-            line_count = len(lines)
-            total_lines += line_count
-            classes, functions = _extract_python_symbols(pf)
-            total_functions += len(functions)
-            rel = pf.relative_to(repo_dir).as_posix()
-            parts = [f"\n== {rel} ({line_count} lines) =="]
-            if classes:
-                cl = ", ".join(classes[:10])
-                if len(classes) > 10:
-                    cl += f", ... ({len(classes)} total)"
-                parts.append(f"  Classes: {cl}")
-            if functions:
-                fn = ", ".join(functions[:20])
-                if len(functions) > 20:
-                    fn += f", ... ({len(functions)} total)"
-                parts.append(f"  Functions: {fn}")
-            sections.append("\n".join(parts))
-        except Exception:
-            log.debug(f"Failed to process Python file {pf} in codebase_digest", exc_info=True)
-            pass
-
-    # Markdown files
-    for mf in md_files:
-        try:
-            line_count = len(mf.read_text(encoding="utf-8").splitlines())
-            total_lines += line_count
-            rel = mf.relative_to(repo_dir).as_posix()
-            sections.append(f"\n== {rel} ({line_count} lines) ==")
-        except Exception:
-            log.debug(f"Failed to process markdown file {mf} in codebase_digest", exc_info=True)
-            pass
-
-    # Other config files (just names + sizes)
-    for of in other_files:
-        try:
-            line_count = len(of.read_text(encoding="utf-8").splitlines())
-            total_lines += line_count
-            rel = of.relative_to(repo_dir).as_posix()
-            sections.append(f"\n== {rel} ({line_count} lines) ==")
-        except Exception:
-            log.debug(f"Failed to process config file {of} in codebase_digest", exc_info=True)
-            pass
+        rec = records.get(pf)
+        if rec is None:
+            log.debug(f"Failed to process Python file {pf} in codebase_digest")
+            continue
+        if rec.get("syntax_error"):
+            log.warning(f"Failed to extract Python symbols from {pf}")
+        line_count = rec["lines"]
+        total_lines += line_count
+        classes, functions = rec["classes"], rec["functions"]
+        total_functions += len(functions)
+        rel = pf.relative_to(repo_dir).as_posix()
+        parts = [f"\n== {rel} ({line_count} lines) =="]
+        if classes:
+            cl = ", ".join(classes[:10])
+            if len(classes) > 10:
+                cl += f", ... ({len(classes)} total)"
+            parts.append(f"  Classes: {cl}")
+        if functions:
+            fn = ", ".join(functions[:20])
+            if len(functions) > 20:
+                fn += f", ... ({len(functions)} total)"
+            parts.append(f"  Functions: {fn}")
+        sections.append("\n".join(parts))
+
+    # Markdown and other config files (just names + sizes)
+    for f in md_files + other_files:
+        rec = records.get(f)
+        if rec is None:
+            log.debug(f"Failed to process file {f} in codebase_digest")
+            continue
+        total_lines += rec["lines"]
+        rel = f.relative_to(repo_dir).as_posix()
+        sections.append(f"\n== {rel} ({rec['lines']} lines) ==")
 
     total_files = len(py_files) + len(md_files) + len(other_files)
     header = f"Codebase Digest ({total_files} files, {total_lines} lines, {total_functions} functions)"
@@ -209,19 +193,7 @@ def _summarize_dialogue(ctx: ToolContext, last_n: int = 200) -> str:
         return "⚠️ chat.jsonl not found"
 
     try:
-        entries = []
-        with chat_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        entries.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        log.debug("Failed to parse chat.jsonl line in summarize_dialogue", exc_info=True)
-                        continue
-
-        # Take last N entries
-        entries = entries[-last_n:] if len(entries) > last_n else entries
+        entries = read_jsonl_tail(chat_path, last_n)
 
         if not entries:
             return "⚠️ No chat entries found"
@@ -256,15 +228,16 @@ Dialogue history ({len(entries)} messages):
 
 Now write a comprehensive summary:"""
 
-        # Call LLM
-        llm = LLMClient()
+        # Call LLM (an unchanged chat tail is answered from the response cache)
+        from ouroboros.llm_cache import cached_chat
         model = os.environ.get("OUROBOROS_MODEL_LIGHT", "") or DEFAULT_LIGHT_MODEL
 
         messages = [
             {"role": "user", "content": prompt}
         ]
 
-        response, usage = llm.chat(
+        response, usage = cached_chat(
+            LLMClient(), "dialogue_summary",
             messages=messages,
             model=model,
             max_tokens=4096,
@@ -280,6 +253,9 @@ Now write a comprehensive summary:"""
                     "prompt_tokens": usage.get("prompt_tokens", 0),
                     "completion_tokens": usage.get("completion_tokens", 0),
                     "cost": usage.get("cost", 0),
+                    "generation_id": usage.get("generation_id", ""),
+                    "cache_hit": bool(usage.get("cache_hit")),
+                    "rounds": usage.get("rounds", 1),
                 },
                 "category": "summarize",
             }
@@ -302,7 +278,8 @@ Now write a comprehensive summary:"""
         summary_path.write_text(summary, encoding="utf-8")
 
         cost = float(usage.get("cost", 0))
-        return f"OK: Summarized {len(entries)} messages. Written to memory/dialogue_summary.md. Cost: ${cost:.4f}\n\n{summary[:500]}..."
+        cached = " (cached: chat tail unchanged)" if usage.get("cache_hit") else ""
+        return f"OK: Summarized {len(entries)} messages. Written to memory/dialogue_summary.md. Cost: ${cost:.4f}{cached}\n\n{summary[:500]}..."
 
     except Exception as e:
         log.warning("Failed to summarize dialogue", exc_info=True)
@@ -330,7 +307,7 @@ def get_tools() -> List[ToolEntry]:
             "name": "repo_read",
             "description": "Read a UTF-8 text file from the GitHub repo (relative path).",
             "parameters": {"type": "object", "properties": {"path": {"type": "string"}}, "required": ["path"]},
-        }, _repo_read),
+        }, _repo_read, concurrency="read", resources=path_resource("repo")),
         ToolEntry("repo_list", {
             "name": "repo_list",
             "description": "List files under a repo directory (relative path).",
@@ -338,12 +315,12 @@ def get_tools() -> List[ToolEntry]:
                 "dir": {"type": "string", "default": "."},
                 "max_entries": {"type": "integer", "default": 500},
             }, "required": []},
-        }, _repo_list),
+        }, _repo_list, concurrency="read", resources=path_resource("repo", "dir")),
         ToolEntry("drive_read", {
             "name": "drive_read",
             "description": "Read a UTF-8 text file from Google Drive (relative to MyDrive/Ouroboros/).",
             "parameters": {"type": "object", "properties": {"path": {"type": "string"}}, "required": ["path"]},
-        }, _drive_read),
+        }, _drive_read, concurrency="read", resources=path_resource("drive")),
         ToolEntry("drive_list", {
             "name": "drive_list",
             "description": "List files under a Drive directory.",
@@ -351,7 +328,7 @@ def get_tools() -> List[ToolEntry]:
                 "dir": {"type": "string", "default": "."},
                 "max_entries": {"type": "integer", "default": 500},
             }, "required": []},
-        }, _drive_list),
+        }, _drive_list, concurrency="read", resources=path_resource("drive", "dir")),
         ToolEntry("drive_write", {
             "name": "drive_write",
             "description": "Write a UTF-8 text file on Google Drive.",
@@ -360,7 +337,7 @@ def get_tools() -> List[ToolEntry]:
                 "content": {"type": "string"},
                 "mode": {"type": "string", "enum": ["overwrite", "append"], "default": "overwrite"},
             }, "required": ["path", "content"]},
-        }, _drive_write),
+        }, _drive_write, concurrency="write", resources=path_resource("drive")),
         ToolEntry("send_photo", {
             "name": "send_photo",
             "description": (
@@ -372,19 +349,19 @@ def get_tools() -> List[ToolEntry]:
                 "image_base64": {"type": "string", "description": "Base64-encoded PNG image data"},
                 "caption": {"type": "string", "description": "Optional caption for the photo"},
             }, "required": ["image_base64"]},
-        }, _send_photo),
+        }, _send_photo, concurrency="write", resources=("chat",)),
         ToolEntry("codebase_digest", {
             "name": "codebase_digest",
             "description": "Get a compact digest of the entire codebase: files, sizes, classes, functions. One call instead of many repo_read calls.",
             "parameters": {"type": "object", "properties": {}, "required": []},
-        }, _codebase_digest),
+        }, _codebase_digest, concurrency="read", resources=("repo",)),
         ToolEntry("summarize_dialogue", {
             "name": "summarize_dialogue",
             "description": "Summarize dialogue history into key moments, decisions, and creator preferences. Writes to memory/dialogue_summary.md.",
             "parameters": {"type": "object", "properties": {
                 "last_n": {"type": "integer", "description": "Number of recent messages to summarize (default 200)"},
             }, "required": []},
-        }, _summarize_dialogue),
+        }, _summarize_dialogue, concurrency="write", resources=("drive/memory/dialogue_summary.md",)),
         ToolEntry("forward_to_worker", {
             "name": "forward_to_worker",
             "description": (
@@ -397,5 +374,5 @@ def get_tools() -> List[ToolEntry]:
                 "task_id": {"type": "string", "description": "ID of the running task to forward to"},
                 "message": {"type": "string", "description": "Message text to forward"},
             }, "required": ["task_id", "message"]},
-        }, _forward_to_worker),
+        }, _forward_to_worker, concurrency="write", resources=("tasks",)),
     ]
@@ -232,7 +232,7 @@ def get_tools() -> List[ToolEntry]:
                 "content": {"type": "string"},
                 "commit_message": {"type": "string"},
             }, "required": ["path", "content", "commit_message"]},
-        }, _repo_write_commit, is_code_tool=True),
+        }, _repo_write_commit, is_code_tool=True, concurrency="write", resources=("repo", "git")),
         ToolEntry("repo_commit_push", {
             "name": "repo_commit_push",
             "description": "Commit + push already-changed files. Does pull --rebase before push.",
@@ -240,17 +240,17 @@ def get_tools() -> List[ToolEntry]:
                 "commit_message": {"type": "string"},
                 "paths": {"type": "array", "items": {"type": "string"}, "description": "Files to add (empty = git add -A)"},
             }, "required": ["commit_message"]},
-        }, _repo_commit_push, is_code_tool=True),
+        }, _repo_commit_push, is_code_tool=True, concurrency="write", resources=("repo", "git")),
         ToolEntry("git_status", {
             "name": "git_status",
             "description": "git status --porcelain",
             "parameters": {"type": "object", "properties": {}, "required": []},
-        }, _git_status, is_code_tool=True),
+        }, _git_status, is_code_tool=True, concurrency="read", resources=("repo", "git")),
         ToolEntry("git_diff", {
             "name": "git_diff",
             "description": "git diff (use staged=true to see staged changes after git add)",
             "parameters": {"type": "object", "properties": {
                 "staged": {"type": "boolean", "default": False, "description": "If true, show staged changes (--staged)"},
             }, "required": []},
-        }, _git_diff, is_code_tool=True),
+        }, _git_diff, is_code_tool=True, concurrency="read", resources=("repo", "git")),
     ]
@@ -226,7 +226,7 @@ def get_tools() -> List[ToolEntry]:
                 "labels": {"type": "string", "default": "", "description": "Filter by label (comma-separated)"},
                 "limit": {"type": "integer", "default": 20, "description": "Max issues to return (max 50)"},
             }, "required": []},
-        }, _list_issues),
+        }, _list_issues, concurrency="read", resources=("github",)),
 
         ToolEntry("get_github_issue", {
             "name": "get_github_issue",
@@ -234,7 +234,7 @@ def get_tools() -> List[ToolEntry]:
             "parameters": {"type": "object", "properties": {
                 "number": {"type": "integer", "description": "Issue number"},
             }, "required": ["number"]},
-        }, _get_issue),
+        }, _get_issue, concurrency="read", resources=("github",)),
 
         ToolEntry("comment_on_issue", {
             "name": "comment_on_issue",
@@ -243,7 +243,7 @@ def get_tools() -> List[ToolEntry]:
                 "number": {"type": "integer", "description": "Issue number"},
                 "body": {"type": "string", "description": "Comment text (markdown)"},
             }, "required": ["number", "body"]},
-        }, _comment_on_issue),
+        }, _comment_on_issue, concurrency="write", resources=("github",)),
 
         ToolEntry("close_github_issue", {
             "name": "close_github_issue",
@@ -252,7 +252,7 @@ def get_tools() -> List[ToolEntry]:
                 "number": {"type": "integer", "description": "Issue number"},
                 "comment": {"type": "string", "default": "", "description": "Optional closing comment"},
             }, "required": ["number"]},
-        }, _close_issue),
+        }, _close_issue, concurrency="write", resources=("github",)),
 
         ToolEntry("create_github_issue", {
             "name": "create_github_issue",
@@ -262,5 +262,5 @@ def get_tools() -> List[ToolEntry]:
                 "body": {"type": "string", "default": "", "description": "Issue body (markdown)"},
                 "labels": {"type": "string", "default": "", "description": "Labels (comma-separated)"},
             }, "required": ["title"]},
-        }, _create_issue),
+        }, _create_issue, concurrency="write", resources=("github",)),
     ]
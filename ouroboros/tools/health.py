@@ -75,5 +75,5 @@ def get_tools():
             "name": "codebase_health",
             "description": "Get codebase complexity metrics: file sizes, longest functions, modules exceeding limits. Useful for self-assessment per Bible Principle 5 (Minimalism).",
             "parameters": {"type": "object", "properties": {}, "required": []},
-        }, _codebase_health),
+        }, _codebase_health, concurrency="read", resources=("repo",)),
     ]
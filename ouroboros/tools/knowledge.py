@@ -259,6 +259,15 @@ def _knowledge_list(ctx: ToolContext) -> str:
 
 # --- Tool registration ---
 
+def _topic_resource(args: dict) -> tuple:
+    """Scheduling key of one topic file (the whole knowledge base if the topic is invalid)."""
+    try:
+        topic = _sanitize_topic(args.get("topic"))
+    except ValueError:
+        return ("drive/" + KNOWLEDGE_DIR,)
+    return (f"drive/{KNOWLEDGE_DIR}/{topic}.md",)
+
+
 def get_tools() -> List[ToolEntry]:
     return [
         ToolEntry("knowledge_read", {
@@ -274,7 +283,7 @@ def get_tools() -> List[ToolEntry]:
                 },
                 "required": ["topic"]
             },
-        }, _knowledge_read),
+        }, _knowledge_read, concurrency="read", resources=_topic_resource),
         ToolEntry("knowledge_write", {
             "name": "knowledge_write",
             "description": "Write or append to a knowledge topic. Use for recipes, gotchas, patterns learned from experience.",
@@ -297,7 +306,7 @@ def get_tools() -> List[ToolEntry]:
                 },
                 "required": ["topic", "content"]
             },
-        }, _knowledge_write),
+        }, _knowledge_write, concurrency="write", resources=("drive/" + KNOWLEDGE_DIR,)),
         ToolEntry("knowledge_list", {
             "name": "knowledge_list",
             "description": "List all topics in the knowledge base with summaries.",
@@ -306,5 +315,5 @@ def get_tools() -> List[ToolEntry]:
                 "properties": {},
                 "required": []
             },
-        }, _knowledge_list),
+        }, _knowledge_list, concurrency="read", resources=("drive/" + KNOWLEDGE_DIR,)),
     ]
@@ -7,11 +7,14 @@ ToolRegistry collects all tools, provides schemas() and execute().
 
 from __future__ import annotations
 
+import dataclasses
 import json
 import pathlib
+import posixpath
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from ouroboros.read_cache import ReadCache
 from ouroboros.utils import safe_relpath
 
 
@@ -45,6 +48,9 @@ class ToolContext:
     # Per-task browser state
     browser_state: BrowserState = field(default_factory=BrowserState)
 
+    # Per-task cache of repo/drive reads (invalidated by ToolRegistry.execute)
+    read_cache: ReadCache = field(default_factory=ReadCache)
+
     # Budget tracking (set by loop.py for real-time usage events)
     event_queue: Optional[Any] = None
     task_id: Optional[str] = None
@@ -67,13 +73,36 @@ class ToolContext:
 
 @dataclass
 class ToolEntry:
-    """Single tool descriptor: name, schema, handler, metadata."""
+    """Single tool descriptor: name, schema, handler, metadata.
+
+    concurrency/resources drive parallel scheduling (see tool_scheduler):
+    "read" calls share their resources, "write" calls own them, and
+    "exclusive" calls (the default, for tools that may touch anything)
+    run alone. resources is a tuple of keys such as "repo", "git",
+    "drive/memory/x.md", "browser", or fn(args) -> keys.
+
+    Tools that spend money or reach external services (LLM calls, web
+    search) set early=False: a streamed round never starts them before the
+    response is final. LLM-backed ones also own the "llm" key, so they run
+    one at a time.
+    """
 
     name: str
     schema: Dict[str, Any]
     handler: Callable  # fn(ctx: ToolContext, **args) -> str
     is_code_tool: bool = False
     timeout_sec: int = 120
+    concurrency: str = "exclusive"  # "read" | "write" | "exclusive"
+    resources: Any = ()  # Tuple[str, ...] or fn(args) -> Tuple[str, ...]
+    early: bool = True  # may start mid-stream (read calls only)
+
+
+def path_resource(root: str, arg: str = "path") -> Callable[[Dict[str, Any]], Tuple[str, ...]]:
+    """Resource key of a path argument: "<root>/<normalized path>", or "<root>" for the top."""
+    def keys(args: Dict[str, Any]) -> Tuple[str, ...]:
+        rel = posixpath.normpath(str(args.get(arg) or ".").replace("\\", "/")).strip("/")
+        return (root,) if rel in ("", ".") else (f"{root}/{rel}",)
+    return keys
 
 
 CORE_TOOL_NAMES = {
@@ -164,6 +193,28 @@ class ToolRegistry:
         entry = self._entries.get(name)
         return entry.timeout_sec if entry is not None else 120
 
+    def access(self, name: str, args: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+        """(concurrency class, resource keys) of one call. Unknown tools touch nothing."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return "read", ()
+        resources = entry.resources
+        if callable(resources):
+            try:
+                resources = resources(args if isinstance(args, dict) else {})
+            except Exception:
+                return "exclusive", ()
+        return entry.concurrency, tuple(resources)
+
+    def is_read_only(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.concurrency == "read"
+
+    def can_start_early(self, name: str) -> bool:
+        """Whether a streamed round may start this call before the response is final."""
+        entry = self._entries.get(name)
+        return entry is not None and entry.concurrency == "read" and entry.early
+
     def execute(self, name: str, args: Dict[str, Any]) -> str:
         entry = self._entries.get(name)
         if entry is None:
@@ -174,17 +225,28 @@ class ToolRegistry:
             return f"⚠️ TOOL_ARG_ERROR ({name}): {e}"
         except Exception as e:
             return f"⚠️ TOOL_ERROR ({name}): {e}"
+        finally:
+            if entry.concurrency != "read":
+                self._invalidate_reads(name, args)
+
+    def _invalidate_reads(self, name: str, args: Dict[str, Any]) -> None:
+        """Drop cached reads a write may have changed, by its declared resources."""
+        ctx = self._ctx
+        mode, keys = self.access(name, args)
+        if mode == "exclusive":
+            ctx.read_cache.sweep(ctx.repo_dir)
+            return
+        roots = {"repo": ctx.repo_dir, "drive": ctx.drive_root}
+        for key in keys:
+            root, _, rel = key.partition("/")
+            if root in roots:
+                ctx.read_cache.invalidate((roots[root] / rel).resolve() if rel else pathlib.Path(roots[root]).resolve())
 
     def override_handler(self, name: str, handler) -> None:
         """Override the handler for a registered tool (used for closure injection)."""
         entry = self._entries.get(name)
         if entry:
-            self._entries[name] = ToolEntry(
-                name=entry.name,
-                schema=entry.schema,
-                handler=handler,
-                timeout_sec=entry.timeout_sec,
-            )
+            self._entries[name] = dataclasses.replace(entry, handler=handler)
 
     @property
     def CODE_TOOLS(self) -> frozenset:
@@ -8,8 +8,9 @@ import os
 import json
 import asyncio
 import logging
-import httpx
 
+from ouroboros.http_pool import get_http_client
+from ouroboros.llm_cache import cache_key, response_cache, site_enabled
 from ouroboros.utils import utc_now_iso
 from ouroboros.tools.registry import ToolEntry, ToolContext
 
@@ -58,16 +59,27 @@ def get_tools():
                                 "(e.g. 3 diverse models for good coverage)"
                             ),
                         },
+                        "use_cache": {
+                            "type": "boolean",
+                            "description": (
+                                "Reuse a cached verdict when the same model already reviewed "
+                                "identical content and prompt (default true; false forces a fresh review)"
+                            ),
+                        },
                     },
                     "required": ["content", "prompt", "models"],
                 },
             },
             handler=_handle_multi_model_review,
+            concurrency="write",
+            resources=("llm",),
+            early=False,
         )
     ]
 
 
-def _handle_multi_model_review(ctx: ToolContext, content: str = "", prompt: str = "", models: list = None) -> str:
+def _handle_multi_model_review(ctx: ToolContext, content: str = "", prompt: str = "", models: list = None,
+                               use_cache: bool = True) -> str:
     """Sync wrapper around async multi-model review. Registry calls this."""
     if models is None:
         models = []
@@ -77,21 +89,31 @@ def _handle_multi_model_review(ctx: ToolContext, content: str = "", prompt: str
             # Already in async context — run in a separate thread
             import concurrent.futures
             with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                result = pool.submit(asyncio.run, _multi_model_review_async(content, prompt, models, ctx)).result()
+                result = pool.submit(
+                    asyncio.run, _multi_model_review_async(content, prompt, models, ctx, use_cache)).result()
         except RuntimeError:
             # No running loop — safe to use asyncio.run directly
-            result = asyncio.run(_multi_model_review_async(content, prompt, models, ctx))
+            result = asyncio.run(_multi_model_review_async(content, prompt, models, ctx, use_cache))
         return json.dumps(result, ensure_ascii=False)
     except Exception as e:
         log.error("Multi-model review failed: %s", e, exc_info=True)
         return json.dumps({"error": f"Review failed: {e}"}, ensure_ascii=False)
 
 
-async def _query_model(client, model, messages, api_key, semaphore):
-    """Query a single model with semaphore-based concurrency control. Returns (model, response_dict, headers_dict) or (model, error_str, None)."""
+async def _query_model(client, model, messages, api_key, semaphore, use_cache=False):
+    """Query a single model with semaphore-based concurrency control.
+
+    Returns (model, response_dict, headers_dict, cache_hit) or (model, error_str, None, False).
+    """
+    key = cache_key(model, messages, {"temperature": 0.2}) if use_cache else ""
+    if key:
+        entry = response_cache.get(key, "review")
+        if entry is not None:
+            return model, entry["value"]["data"], entry["value"]["headers"], True
     async with semaphore:
         try:
-            resp = await client.post(
+            resp = await asyncio.to_thread(
+                client.post,
                 OPENROUTER_URL,
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -114,20 +136,24 @@ async def _query_model(client, model, messages, api_key, semaphore):
                 error_text = response_text[:200]
                 if len(response_text) > 200:
                     error_text += " [truncated]"
-                return model, f"HTTP {status_code}: {error_text}", None
+                return model, f"HTTP {status_code}: {error_text}", None, False
 
             data = resp.json()
-            return model, data, response_headers
+            if key and data.get("choices"):
+                response_cache.put(key, {"data": data, "headers": response_headers},
+                                   cost=float((data.get("usage") or {}).get("cost") or 0))
+            return model, data, response_headers, False
         except asyncio.TimeoutError:
-            return model, "Error: Timeout after 120s", None
+            return model, "Error: Timeout after 120s", None, False
         except Exception as e:
             error_msg = str(e)[:200]
             if len(str(e)) > 200:
                 error_msg += " [truncated]"
-            return model, f"Error: {error_msg}", None
+            return model, f"Error: {error_msg}", None, False
 
 
-async def _multi_model_review_async(content: str, prompt: str, models: list, ctx: ToolContext):
+async def _multi_model_review_async(content: str, prompt: str, models: list, ctx: ToolContext,
+                                    use_cache: bool = True):
     """Async orchestration: validate → query → parse → emit → return."""
     # Validation
     if not content:
@@ -155,16 +181,21 @@ async def _multi_model_review_async(content: str, prompt: str, models: list, ctx
         {"role": "user", "content": content},
     ]
 
-    # Query all models with bounded concurrency
+    # Query all models with bounded concurrency over the shared OpenRouter pool
+    # (keep-alive connections survive between reviews, unlike a per-call AsyncClient).
     semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
-    async with httpx.AsyncClient() as client:
-        tasks = [_query_model(client, m, messages, api_key, semaphore) for m in models]
-        results = await asyncio.gather(*tasks)
+    client = get_http_client(OPENROUTER_URL)
+    use_cache = bool(use_cache) and site_enabled("review")
+    tasks = [_query_model(client, m, messages, api_key, semaphore, use_cache) for m in models]
+    results = await asyncio.gather(*tasks)
 
     # Parse and process results
     review_results = []
-    for model, result, headers_dict in results:
+    for model, result, headers_dict, cache_hit in results:
         review_result = _parse_model_response(model, result, headers_dict)
+        if cache_hit:
+            review_result.update(cached=True, saved_cost=review_result["cost_estimate"],
+                                 tokens_in=0, tokens_out=0, cost_estimate=0.0)
         _emit_usage_event(review_result, ctx)
         review_results.append(review_result)
 
@@ -260,6 +291,8 @@ def _emit_usage_event(review_result: dict, ctx: ToolContext) -> None:
             "prompt_tokens": review_result["tokens_in"],
             "completion_tokens": review_result["tokens_out"],
             "cost": review_result["cost_estimate"],
+            **({"cache_hit": True, "saved_cost": review_result["saved_cost"], "rounds": 0}
+               if review_result.get("cached") else {}),
         },
         "category": "review",
     }
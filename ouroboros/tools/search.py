@@ -194,5 +194,5 @@ def get_tools() -> List[ToolEntry]:
                 },
                 "required": ["query"],
             },
-        }, _web_search),
+        }, _web_search, concurrency="read", resources=("web",), early=False),
     ]
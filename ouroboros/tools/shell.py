@@ -277,5 +277,5 @@ def get_tools() -> List[ToolEntry]:
                 "file_path": {"type": "string",  "description": "Path relative to repo root (e.g. ouroboros/llm.py)"},
                 "cwd":       {"type": "string",  "default": ""},
             }, "required": ["prompt"]},
-        }, _llm_code_edit, is_code_tool=True, timeout_sec=300),
+        }, _llm_code_edit, is_code_tool=True, timeout_sec=300, concurrency="write", resources=("repo",)),
     ]
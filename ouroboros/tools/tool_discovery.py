@@ -77,6 +77,7 @@ def get_tools() -> List[ToolEntry]:
                 },
             },
             handler=_list_available_tools,
+            concurrency="read",
         ),
         ToolEntry(
             name="enable_tools",
@@ -99,5 +100,7 @@ def get_tools() -> List[ToolEntry]:
                 },
             },
             handler=_enable_tools,
+            concurrency="write",
+            resources=("tools",),
         ),
     ]
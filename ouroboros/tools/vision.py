@@ -113,6 +113,7 @@ def _emit_usage(ctx: ToolContext, usage: Dict[str, Any], model: str) -> None:
             "completion_tokens": usage.get("completion_tokens", 0),
             "cached_tokens": usage.get("cached_tokens", 0),
             "cost": usage.get("cost", 0.0),
+            "generation_id": usage.get("generation_id", ""),
             "task_id": ctx.task_id,
             "task_type": ctx.current_task_type or "task",
         }
@@ -149,6 +150,9 @@ def get_tools() -> List[ToolEntry]:
                 },
             },
             handler=_analyze_screenshot,
+            concurrency="write",
+            resources=("llm", "browser"),
+            early=False,
             timeout_sec=30,
         ),
         ToolEntry(
@@ -188,6 +192,9 @@ def get_tools() -> List[ToolEntry]:
                 },
             },
             handler=_vlm_query,
+            concurrency="write",
+            resources=("llm",),
+            early=False,
             timeout_sec=30,
         ),
     ]
@@ -7,15 +7,23 @@ Does not import anything from ouroboros.* (zero dependency level).
 
 from __future__ import annotations
 
+import atexit
 import datetime as _dt
 import hashlib
 import json
 import logging
 import os
 import pathlib
+import queue
 import subprocess
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
 
 log = logging.getLogger(__name__)
 
@@ -49,79 +57,303 @@ def write_text(path: pathlib.Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
 
-def append_jsonl(path: pathlib.Path, obj: Dict[str, Any]) -> None:
-    """Append a JSON object as a line to a JSONL file (concurrent-safe)."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    line = json.dumps(obj, ensure_ascii=False)
-    data = (line + "\n").encode("utf-8")
+# ---------------------------------------------------------------------------
+# Drive root
+# ---------------------------------------------------------------------------
+
+DEFAULT_DRIVE_ROOT = "/content/drive/MyDrive/Ouroboros"
+
+
+def drive_root() -> pathlib.Path:
+    """The configured Drive root (DRIVE_ROOT, exported by the launcher to workers)."""
+    return pathlib.Path(os.environ.get("DRIVE_ROOT", DEFAULT_DRIVE_ROOT))
+
+
+def drive_available(override: Optional[pathlib.Path] = None) -> bool:
+    """Whether a shared on-disk file may be used.
 
-    lock_timeout_sec = 2.0
-    lock_stale_sec = 10.0
-    lock_sleep_sec = 0.01
+    An explicitly configured path (tests, non-Colab runs) always may; the
+    default locations only when the Drive root exists, so an unmounted Drive
+    never gets a stray local directory tree created in its place.
+    """
+    return override is not None or drive_root().exists()
+
+
+# ---------------------------------------------------------------------------
+# JSONL sink (batched appends)
+# ---------------------------------------------------------------------------
+#
+# append_jsonl() hands serialized records to a per-file background thread that
+# coalesces them into a single O_APPEND write per flush interval. Each batch is
+# written under fcntl.flock on the target itself, so whole batches never
+# interleave across processes, and the lock dies with its holder (no stale
+# lock files). Where flock is unsupported (some FUSE mounts) O_APPEND alone
+# still keeps single-write batches intact.
+
+JSONL_FLUSH_INTERVAL_SEC = float(os.environ.get("OUROBOROS_JSONL_FLUSH_SEC", "0.2") or 0.2)
+JSONL_QUEUE_MAX = 10_000
+JSONL_BATCH_MAX_BYTES = 1024 * 1024
+JSONL_SYNC = os.environ.get("OUROBOROS_JSONL_SYNC", "").strip().lower() in ("1", "true", "yes")
+
+
+def _write_jsonl_batch(path: pathlib.Path, data: bytes) -> None:
+    """Append data to path with one O_APPEND write, flock-serialized across processes."""
     write_retries = 3
     retry_sleep_base_sec = 0.01
+    for attempt in range(write_retries):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                locked = False
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                        locked = True
+                    except OSError:
+                        log.debug("flock unsupported for %s, relying on O_APPEND", path, exc_info=True)
+                try:
+                    view = memoryview(data)
+                    while view:
+                        written = os.write(fd, view)
+                        view = view[written:]
+                finally:
+                    if locked:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+            return
+        except Exception:
+            if attempt < write_retries - 1:
+                time.sleep(retry_sleep_base_sec * (2 ** attempt))
+    log.warning("append_jsonl: all write attempts failed for %s", path, exc_info=True)
+
+
+class _JsonlSink:
+    """Background writer for one JSONL file."""
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=JSONL_QUEUE_MAX)
+        self._unwritten = 0  # queued or in-flight records
+        self._count_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"jsonl-sink:{path.name}", daemon=True)
+        self._thread.start()
+
+    def put(self, data: bytes, sidecar: Optional[pathlib.Path] = None) -> None:
+        with self._count_lock:
+            self._unwritten += 1
+        # Bounded queue: block until the writer makes room (backpressure).
+        # Never write inline: the record would land ahead of ones still
+        # queued for the same file, and readers rely on per-file order.
+        self._q.put((data, sidecar))
+
+    def _write(self, batch: List[Tuple[bytes, Optional[pathlib.Path]]]) -> None:
+        _write_jsonl_batch(self.path, b"".join(data for data, _ in batch))
+        by_sidecar: Dict[pathlib.Path, List[bytes]] = {}
+        for data, sidecar in batch:
+            if sidecar is not None:
+                by_sidecar.setdefault(sidecar, []).append(data)
+        for sidecar, chunks in by_sidecar.items():
+            _write_jsonl_batch(sidecar, b"".join(chunks))
+
+    def pending(self) -> bool:
+        return self._unwritten > 0
+
+    def _mark_written(self, n: int) -> None:
+        with self._count_lock:
+            self._unwritten -= n
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued before this call is written."""
+        done = threading.Event()
+        try:
+            self._q.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._q.get()
+            batch: List[Tuple[bytes, Optional[pathlib.Path]]] = []
+            size = 0
+            waiters: List[threading.Event] = []
+            deadline = time.monotonic() + JSONL_FLUSH_INTERVAL_SEC
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break  # explicit flush: write now
+                batch.append(item)
+                size += len(item[0])
+                if size >= JSONL_BATCH_MAX_BYTES:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+                self._mark_written(len(batch))
+            for w in waiters:
+                w.set()
+
+
+_sinks: Dict[str, _JsonlSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def _get_sink(path: pathlib.Path) -> _JsonlSink:
+    key = os.path.abspath(str(path))
+    sink = _sinks.get(key)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(key)
+            if sink is None:
+                sink = _JsonlSink(pathlib.Path(key))
+                _sinks[key] = sink
+    return sink
+
+
+def _reset_sinks_after_fork() -> None:
+    # Writer threads do not survive fork; records queued in the parent are
+    # written by the parent, so the child simply starts with no sinks.
+    global _sinks_lock
+    _sinks.clear()
+    _sinks_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_sinks_after_fork)
+
+
+# Records with a task_id appended to these logs are also copied to a per-task
+# sidecar, logs/tasks/<task_id>/<name>, so one task's entries can be read in
+# O(k) no matter how many workers interleave in the shared log.
+TASK_INDEXED_LOGS = ("events.jsonl", "tools.jsonl", "progress.jsonl")
+
+
+def _safe_task_id(task_id: Any) -> str:
+    return "".join(c for c in str(task_id) if c.isalnum() or c in "-_")[:64]
+
+
+def task_log_path(logs_dir: pathlib.Path, task_id: str, log_name: str) -> pathlib.Path:
+    return logs_dir / "tasks" / _safe_task_id(task_id) / log_name
+
+
+def _task_sidecar(path: pathlib.Path, obj: Dict[str, Any]) -> Optional[pathlib.Path]:
+    task_id = obj.get("task_id")
+    if not task_id or path.name not in TASK_INDEXED_LOGS or path.parent.name != "logs":
+        return None
+    if not _safe_task_id(task_id):
+        return None
+    return task_log_path(path.parent, task_id, path.name)
 
-    path_hash = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
-    lock_path = path.parent / f".append_jsonl_{path_hash}.lock"
-    lock_fd = None
-    lock_acquired = False
 
+def append_jsonl(path: pathlib.Path, obj: Dict[str, Any]) -> None:
+    """Append a JSON object as a line to a JSONL file (batched, concurrent-safe)."""
+    data = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+    sidecar = _task_sidecar(pathlib.Path(path), obj)
+    if JSONL_SYNC:
+        _write_jsonl_batch(path, data)
+        if sidecar is not None:
+            _write_jsonl_batch(sidecar, data)
+        return
+    _get_sink(path).put(data, sidecar)
+
+
+def flush_jsonl(path: Optional[pathlib.Path] = None, timeout: float = 5.0) -> None:
+    """Write out queued records (for one file, or all files) and wait for it."""
+    if path is not None:
+        sink = _sinks.get(os.path.abspath(str(path)))
+        sinks = [sink] if sink is not None else []
+    else:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        if not sink.flush(timeout):
+            log.warning("flush_jsonl: timed out flushing %s", sink.path)
+
+
+atexit.register(flush_jsonl)
+
+
+def install_sigterm_flush(timeout: float = 3.0) -> None:
+    """On SIGTERM, write out queued JSONL records and exit (atexit does not run on signals).
+
+    The flush runs on a helper thread: the signal may interrupt the main thread
+    inside a sink queue's lock, and waiting on it there would deadlock.
+    """
+    import signal
+
+    def _on_sigterm(signum, _frame):
+        t = threading.Thread(target=flush_jsonl, kwargs={"timeout": timeout}, daemon=True)
+        t.start()
+        t.join(timeout + 1.0)
+        os._exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def tail_lines(path: pathlib.Path, max_lines: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """Return the last max_lines non-empty lines of a text file.
+
+    Reads fixed-size blocks backwards from EOF until enough complete lines
+    are collected, so cost depends on the tail size, not the file size.
+    """
+    if max_lines <= 0:
+        return []
+    sink = _sinks.get(os.path.abspath(str(path)))
+    if sink is not None and sink.pending():
+        sink.flush()  # read-your-writes within this process
     try:
-        start = time.time()
-        while time.time() - start < lock_timeout_sec:
-            try:
-                lock_fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
-                lock_acquired = True
-                break
-            except FileExistsError:
-                try:
-                    stat = lock_path.stat()
-                    if time.time() - stat.st_mtime > lock_stale_sec:
-                        lock_path.unlink()
-                        continue
-                except Exception:
-                    log.debug("Failed to read lock stat during lock acquisition retry", exc_info=True)
-                    pass
-                time.sleep(lock_sleep_sec)
-            except Exception:
-                log.debug("Failed to acquire file lock for jsonl append", exc_info=True)
+        f = path.open("rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        lines: List[bytes] = []
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            # max_lines complete lines need max_lines + 1 separators (or BOF).
+            if data.count(b"\n") <= max_lines:
+                continue
+            lines = [ln for ln in data.split(b"\n")[1:] if ln.strip()]
+            if len(lines) >= max_lines:
                 break
+        else:
+            lines = [ln for ln in data.split(b"\n") if ln.strip()]
+    return [ln.decode("utf-8", errors="replace") for ln in lines[-max_lines:]]
 
-        for attempt in range(write_retries):
-            try:
-                fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
-                try:
-                    os.write(fd, data)
-                finally:
-                    os.close(fd)
-                return
-            except Exception:
-                if attempt < write_retries - 1:
-                    time.sleep(retry_sleep_base_sec * (2 ** attempt))
 
-        for attempt in range(write_retries):
-            try:
-                with path.open("a", encoding="utf-8") as f:
-                    f.write(line + "\n")
-                return
-            except Exception:
-                if attempt < write_retries - 1:
-                    time.sleep(retry_sleep_base_sec * (2 ** attempt))
-    except Exception:
-        log.warning("append_jsonl: all write attempts failed for %s", path, exc_info=True)
-    finally:
-        if lock_fd is not None:
-            try:
-                os.close(lock_fd)
-            except Exception:
-                log.debug("Failed to close lock fd after jsonl append", exc_info=True)
-                pass
-        if lock_acquired:
-            try:
-                lock_path.unlink()
-            except Exception:
-                log.debug("Failed to unlink lock file after jsonl append", exc_info=True)
-                pass
+def read_task_log_tail(logs_dir: pathlib.Path, task_id: str, log_name: str,
+                       max_entries: int) -> List[Dict[str, Any]]:
+    """Last max_entries records of one task from its sidecar (see TASK_INDEXED_LOGS)."""
+    main = _sinks.get(os.path.abspath(str(logs_dir / log_name)))
+    if main is not None and main.pending():
+        main.flush()  # sidecar records ride along with the main log's batches
+    return read_jsonl_tail(task_log_path(logs_dir, task_id, log_name), max_entries)
+
+
+def read_jsonl_tail(path: pathlib.Path, max_entries: int, block_size: int = TAIL_BLOCK_SIZE) -> List[Dict[str, Any]]:
+    """Parse the last max_entries JSON records of a JSONL file (bad lines skipped)."""
+    entries: List[Dict[str, Any]] = []
+    for line in tail_lines(path, max_entries, block_size=block_size):
+        try:
+            entries.append(json.loads(line))
+        except Exception:
+            log.debug(f"Failed to parse JSON line in read_jsonl_tail: {line[:100]}", exc_info=True)
+            continue
+    return entries
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,211 @@
+"""
+Supervisor — Cost reconciliation.
+
+OpenRouter responses sometimes arrive without usage.cost. Rather than block
+the round on the Generation API, the round reports the _estimate_cost figure
+and carries the generation id; the llm_usage handler queues it here.
+
+A background thread resolves due ids in batches, then corrects the ledger
+after the fact:
+  - update_budget_from_usage({"cost": actual - estimate, "rounds": 0})
+  - an llm_cost_reconciled event in events.jsonl (cost = the same delta,
+    ts = the original call's ts), which the cost rollup folds in.
+
+Ids whose cost is not available yet are retried with backoff and dropped
+after MAX_ATTEMPTS (the estimate stands). Pending ids are persisted in
+state/cost_pending.json so a restart does not lose them.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ouroboros.utils import append_jsonl, utc_now_iso
+from supervisor.state import atomic_write_text, json_load_file, update_budget_from_usage
+
+log = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Module-level config (set via init())
+# ---------------------------------------------------------------------------
+DRIVE_ROOT: pathlib.Path = pathlib.Path("/content/drive/MyDrive/Ouroboros")
+PENDING_PATH: pathlib.Path = DRIVE_ROOT / "state" / "cost_pending.json"
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+BATCH_SIZE = 20
+FETCH_CONCURRENCY = 4
+INTERVAL_SEC = 5.0
+FIRST_DELAY_SEC = 2.0  # generation stats take a moment to appear
+MAX_ATTEMPTS = 6
+MAX_PENDING = 2000
+
+_lock = threading.Lock()
+_pending: Dict[str, Dict[str, Any]] = {}
+_stats: Dict[str, Any] = {"queued": 0, "resolved": 0, "gave_up": 0, "delta_usd": 0.0}
+_thread: Optional[threading.Thread] = None
+
+
+def init(drive_root: pathlib.Path) -> None:
+    global DRIVE_ROOT, PENDING_PATH
+    DRIVE_ROOT = drive_root
+    PENDING_PATH = drive_root / "state" / "cost_pending.json"
+    data = json_load_file(PENDING_PATH) or {}
+    with _lock:
+        _pending.clear()
+        for item in data.get("pending") or []:
+            if isinstance(item, dict) and item.get("generation_id"):
+                _pending[item["generation_id"]] = item
+        restored = len(_pending)
+    if restored:
+        _ensure_thread()
+
+
+def fetch_generation_cost(generation_id: str) -> Optional[float]:
+    """One Generation API lookup over the shared pool; None if not available (yet)."""
+    api_key = os.environ.get("OPENROUTER_API_KEY", "")
+    if not api_key:
+        return None
+    from ouroboros.http_pool import get_http_client
+    resp = get_http_client(OPENROUTER_BASE_URL).get(
+        f"{OPENROUTER_BASE_URL}/generation",
+        params={"id": generation_id},
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=10,
+    )
+    if resp.status_code != 200:
+        return None
+    data = resp.json().get("data") or {}
+    cost = data.get("total_cost")
+    if cost is None:
+        cost = (data.get("usage") or {}).get("cost")
+    return float(cost) if cost is not None else None
+
+
+_fetch: Callable[[str], Optional[float]] = fetch_generation_cost
+
+
+# ---------------------------------------------------------------------------
+# Queue
+# ---------------------------------------------------------------------------
+
+def enqueue(evt: Dict[str, Any], usage: Dict[str, Any]) -> bool:
+    """Queue an llm_usage event whose cost is an estimate. Returns True if queued."""
+    gen_id = str(usage.get("generation_id") or evt.get("generation_id") or "")
+    if not gen_id:
+        return False
+    item = {
+        "generation_id": gen_id,
+        "estimated": float(usage.get("cost") or 0.0),
+        "task_id": evt.get("task_id", ""),
+        "category": evt.get("category", "other"),
+        "model": evt.get("model", ""),
+        "ts": evt.get("ts") or utc_now_iso(),
+        "attempts": 0,
+        "due": time.time() + FIRST_DELAY_SEC,
+    }
+    with _lock:
+        if gen_id in _pending:
+            return False
+        _pending[gen_id] = item
+        while len(_pending) > MAX_PENDING:
+            _pending.pop(next(iter(_pending)))
+        _stats["queued"] += 1
+    _save_pending()
+    _ensure_thread()
+    return True
+
+
+def _save_pending() -> None:
+    with _lock:
+        items = list(_pending.values())
+    try:
+        atomic_write_text(PENDING_PATH, json.dumps({"pending": items}, ensure_ascii=False))
+    except Exception:
+        log.debug("Failed to persist pending cost reconciliations", exc_info=True)
+
+
+def _resolve(gen_id: str) -> Optional[float]:
+    try:
+        return _fetch(gen_id)
+    except Exception:
+        log.debug(f"Generation cost lookup failed for {gen_id}", exc_info=True)
+        return None
+
+
+def _apply(item: Dict[str, Any], actual: float) -> float:
+    delta = actual - float(item.get("estimated") or 0.0)
+    if abs(delta) >= 1e-9:
+        update_budget_from_usage({"cost": delta, "rounds": 0})
+    append_jsonl(DRIVE_ROOT / "logs" / "events.jsonl", {
+        "ts": item.get("ts") or utc_now_iso(),
+        "type": "llm_cost_reconciled",
+        "reconciled_at": utc_now_iso(),
+        "task_id": item.get("task_id", ""),
+        "category": item.get("category", "other"),
+        "model": item.get("model", ""),
+        "generation_id": item["generation_id"],
+        "estimated_cost": item.get("estimated", 0.0),
+        "actual_cost": actual,
+        "cost": delta,
+    })
+    return delta
+
+
+def reconcile_once(now: Optional[float] = None) -> int:
+    """Resolve up to BATCH_SIZE due ids. Returns how many were reconciled."""
+    now = time.time() if now is None else now
+    with _lock:
+        due = [item for item in _pending.values() if float(item.get("due") or 0) <= now][:BATCH_SIZE]
+    if not due:
+        return 0
+    with ThreadPoolExecutor(max_workers=min(FETCH_CONCURRENCY, len(due))) as pool:
+        costs = list(pool.map(_resolve, [item["generation_id"] for item in due]))
+    resolved = 0
+    for item, actual in zip(due, costs):
+        if actual is None:
+            item["attempts"] = int(item.get("attempts") or 0) + 1
+            if item["attempts"] < MAX_ATTEMPTS:
+                item["due"] = now + INTERVAL_SEC * (2 ** item["attempts"])
+                continue
+            with _lock:
+                _pending.pop(item["generation_id"], None)
+                _stats["gave_up"] += 1
+            continue
+        delta = _apply(item, actual)
+        resolved += 1
+        with _lock:
+            _pending.pop(item["generation_id"], None)
+            _stats["resolved"] += 1
+            _stats["delta_usd"] += delta
+    _save_pending()
+    return resolved
+
+
+def _run() -> None:
+    while True:
+        time.sleep(INTERVAL_SEC)
+        try:
+            reconcile_once()
+        except Exception:
+            log.warning("Cost reconciliation pass failed", exc_info=True)
+
+
+def _ensure_thread() -> None:
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_run, name="cost_reconciler", daemon=True)
+        _thread.start()
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {"pending": len(_pending), **_stats}
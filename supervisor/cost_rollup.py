@@ -0,0 +1,204 @@
+"""
+Supervisor — Cost rollups.
+
+Incremental aggregates of llm_usage events from logs/events.jsonl:
+per category and per day (per-model and per-task costs are queried from the
+columnar archive, ouroboros/log_columns.py). llm_cost_reconciled events
+(supervisor/cost_reconciler.py) adjust the cost of an earlier call without
+counting as a call. The rollup remembers the
+byte offset it has consumed, so each refresh only parses newly appended
+lines. Persisted at state/cost_rollup.json and survives restarts.
+
+Rotation is detected via a fingerprint of the first line. When the old
+file was sealed into a log segment (ouroboros/segmented_log.py), its
+unconsumed remainder and any later segments are folded in before moving on
+to the new live file; otherwise consumption restarts at offset 0.
+
+Concurrency: every persisted snapshot is base + consumed delta written
+atomically, so concurrent refreshers (supervisor and workers) can at worst
+redo work, never double-count.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import pathlib
+import threading
+import time
+from typing import Any, Dict, List
+
+from ouroboros.segmented_log import SegmentedLog, line_fingerprint, open_segment
+from supervisor.state import atomic_write_text, json_load_file
+
+log = logging.getLogger(__name__)
+
+ROLLUP_VERSION = 1
+_DROPPED_KEYS = ("seq", "by_model", "by_task")  # kept by older versions; served by log_columns now
+
+_lock = threading.Lock()
+_cache: Dict[str, Any] = {"path": None, "mtime_ns": None, "data": None}
+
+
+def rollup_path(drive_root: pathlib.Path) -> pathlib.Path:
+    return drive_root / "state" / "cost_rollup.json"
+
+
+def _empty_rollup() -> Dict[str, Any]:
+    return {
+        "version": ROLLUP_VERSION,
+        "offset": 0,
+        "fingerprint": "",
+        "updated_at": 0.0,
+        "by_category": {},
+        "by_day": {},
+    }
+
+
+_fingerprint = line_fingerprint
+
+
+def _event_cost(event: Dict[str, Any]) -> float:
+    if "cost" in event:
+        return float(event.get("cost", 0) or 0)
+    if isinstance(event.get("usage"), dict):
+        return float(event["usage"].get("cost", 0) or 0)
+    return 0.0
+
+
+def _apply_reconciled(data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    delta = _event_cost(event)
+    category = event.get("category", "other")
+    data["by_category"][category] = data["by_category"].get(category, 0.0) + delta
+    day = str(event.get("ts") or "")[:10] or "unknown"
+    if day in data["by_day"]:
+        data["by_day"][day]["cost"] += delta
+
+
+def apply_event(data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """Fold one llm_usage (or llm_cost_reconciled) event into the rollup aggregates."""
+    if event.get("type") == "llm_cost_reconciled":
+        _apply_reconciled(data, event)
+        return
+    cost = _event_cost(event)
+    if cost > 0:
+        category = event.get("category", "other")
+        data["by_category"][category] = data["by_category"].get(category, 0.0) + cost
+
+    day = str(event.get("ts") or "")[:10] or "unknown"
+    d = data["by_day"].setdefault(day, {"cost": 0.0, "calls": 0})
+    d["cost"] += cost
+    d["calls"] += 1
+
+
+def consume(data: Dict[str, Any], path: pathlib.Path, offset: int) -> int:
+    """Fold complete lines of path (plain or compressed segment) starting at
+    offset into data. Returns the new offset."""
+    with open_segment(path) as f:
+        if path.suffix == ".jsonl":
+            f.seek(offset)
+        else:
+            skip = offset
+            while skip > 0:
+                chunk = f.read(min(skip, 1024 * 1024))
+                if not chunk:
+                    break
+                skip -= len(chunk)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # partial trailing line: pick it up next time
+            offset += len(raw)
+            if b'"llm_usage"' not in raw and b'"llm_cost_reconciled"' not in raw:
+                continue
+            try:
+                event = json.loads(raw)
+                if event.get("type") not in ("llm_usage", "llm_cost_reconciled"):
+                    continue
+                apply_event(data, event)
+            except (json.JSONDecodeError, ValueError, TypeError, AttributeError):
+                continue
+    return offset
+
+
+def _load(path: pathlib.Path) -> Dict[str, Any]:
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return _empty_rollup()
+    if _cache["path"] == str(path) and _cache["mtime_ns"] == mtime_ns and _cache["data"] is not None:
+        return _cache["data"]
+    data = json_load_file(path)
+    if not data or data.get("version") != ROLLUP_VERSION:
+        return _empty_rollup()
+    for key in _DROPPED_KEYS:
+        data.pop(key, None)
+    _cache.update({"path": str(path), "mtime_ns": mtime_ns, "data": data})
+    return data
+
+
+def _save(path: pathlib.Path, data: Dict[str, Any]) -> None:
+    data["updated_at"] = time.time()
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False))
+    try:
+        _cache.update({"path": str(path), "mtime_ns": path.stat().st_mtime_ns, "data": data})
+    except Exception:
+        log.debug("Failed to stat cost rollup after save", exc_info=True)
+
+
+def refresh(drive_root: pathlib.Path) -> Dict[str, Any]:
+    """Bring the rollup up to date with logs/events.jsonl and return it."""
+    events_path = drive_root / "logs" / "events.jsonl"
+    store = rollup_path(drive_root)
+    with _lock:
+        data = _load(store)
+        try:
+            size = events_path.stat().st_size
+        except FileNotFoundError:
+            return data
+        offset = int(data.get("offset") or 0)
+        fp = _fingerprint(events_path)
+        rotated = fp != data.get("fingerprint") or size < offset
+        if not rotated and size == offset:
+            return data
+        # Work on a copy so a failed pass never leaves half-applied aggregates.
+        work = copy.deepcopy(data)
+        try:
+            if rotated:
+                _consume_sealed(work, drive_root, data.get("fingerprint") or "", offset)
+                offset = 0
+            work["offset"] = consume(work, events_path, offset)
+            work["fingerprint"] = fp
+            _save(store, work)
+            return work
+        except Exception:
+            log.warning("Failed to refresh cost rollup", exc_info=True)
+            return data
+
+
+def _consume_sealed(data: Dict[str, Any], drive_root: pathlib.Path, fingerprint: str, offset: int) -> None:
+    """After a rotation: finish the sealed file we were reading, then every later segment."""
+    if not fingerprint:
+        return
+    slog = SegmentedLog(drive_root / "logs", "events.jsonl")
+    segs = slog.segments()
+    start = next((i for i, seg in enumerate(segs) if seg.get("fingerprint") == fingerprint), None)
+    if start is None:
+        log.info("Cost rollup: events.jsonl rotated without a matching segment; restarting at 0")
+        return
+    consume(data, slog.segment_path(segs[start]), offset)
+    for seg in segs[start + 1:]:
+        consume(data, slog.segment_path(seg), 0)
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def category_costs(drive_root: pathlib.Path) -> Dict[str, float]:
+    return dict(refresh(drive_root)["by_category"])
+
+
+def daily_costs(drive_root: pathlib.Path, days: int = 7) -> Dict[str, Dict[str, float]]:
+    by_day = refresh(drive_root)["by_day"]
+    return {k: dict(by_day[k]) for k in sorted(by_day)[-days:]}
@@ -24,6 +24,11 @@ log = logging.getLogger(__name__)
 def _handle_llm_usage(evt: Dict[str, Any], ctx: Any) -> None:
     usage = evt.get("usage") or {}
     ctx.update_budget_from_usage(usage)
+    generation_id = usage.get("generation_id") or evt.get("generation_id")
+    if generation_id:
+        # Cost is an estimate: correct it in the background, not on the request path.
+        from supervisor import cost_reconciler
+        cost_reconciler.enqueue(evt, usage)
 
     # Log to events.jsonl for audit trail
     from ouroboros.utils import utc_now_iso, append_jsonl
@@ -37,6 +42,8 @@ def _handle_llm_usage(evt: Dict[str, Any], ctx: Any) -> None:
             "cost": usage.get("cost", 0),
             "prompt_tokens": usage.get("prompt_tokens", 0),
             "completion_tokens": usage.get("completion_tokens", 0),
+            **({"generation_id": generation_id, "cost_estimated": True} if generation_id else {}),
+            **({"cache_hit": True, "saved_cost": usage.get("saved_cost", 0)} if usage.get("cache_hit") else {}),
         })
     except Exception:
         log.warning("Failed to log llm_usage event to events.jsonl", exc_info=True)
@@ -163,6 +170,7 @@ def _handle_task_metrics(evt: Dict[str, Any], ctx: Any) -> None:
             "duration_sec": round(float(evt.get("duration_sec") or 0.0), 3),
             "tool_calls": int(evt.get("tool_calls") or 0),
             "tool_errors": int(evt.get("tool_errors") or 0),
+            "read_cache": evt.get("read_cache") or {},
         },
     )
 
@@ -196,6 +204,8 @@ def _handle_restart_request(evt: Dict[str, Any], ctx: Any) -> None:
     ctx.persist_queue_snapshot(reason="pre_restart_exit")
     # Replace current process with fresh Python — loads all modules from scratch
     launcher = os.path.join(os.getcwd(), "colab_launcher.py")
+    from supervisor.state import flush_jsonl
+    flush_jsonl()
     os.execv(sys.executable, [sys.executable, launcher])
 
 
@@ -261,9 +271,10 @@ def _find_duplicate_task(desc: str, pending: list, running: dict) -> Optional[st
 
     try:
         from ouroboros.llm import LLMClient, DEFAULT_LIGHT_MODEL
+        from ouroboros.llm_cache import cached_chat
         light_model = os.environ.get("OUROBOROS_MODEL_LIGHT") or DEFAULT_LIGHT_MODEL
-        client = LLMClient()
-        resp_msg, usage = client.chat(
+        resp_msg, usage = cached_chat(
+            LLMClient(), "dedup",
             messages=[{"role": "user", "content": prompt}],
             model=light_model,
             reasoning_effort="low",
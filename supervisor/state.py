@@ -6,14 +6,17 @@ Persistent state on Google Drive: load, save, atomic writes, file locks.
 
 from __future__ import annotations
 
+import copy
 import datetime
+import hashlib
 import json
 import logging
 import os
 import pathlib
+import threading
 import time
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 log = logging.getLogger(__name__)
 
@@ -28,13 +31,33 @@ STATE_LOCK_PATH: pathlib.Path = DRIVE_ROOT / "locks" / "state.lock"
 QUEUE_SNAPSHOT_PATH: pathlib.Path = DRIVE_ROOT / "state" / "queue_snapshot.json"
 
 
+def _default_state_db(drive_root: pathlib.Path) -> pathlib.Path:
+    """Local disk, not the Drive mount: WAL needs shared memory that FUSE lacks.
+    One file per drive root; an empty store is seeded from the state.json mirror."""
+    digest = hashlib.sha1(str(drive_root).encode("utf-8")).hexdigest()[:12]
+    return pathlib.Path.home() / ".ouroboros" / f"state-{digest}.db"
+
+
+STATE_DB_PATH: pathlib.Path = _default_state_db(DRIVE_ROOT)
+
+# "json" (default): state.json under a file lock.
+# "sqlite": supervisor/state_store.py (WAL, key-level updates); state.json
+# is kept as a throttled read-only mirror for code that reads it directly.
+STATE_BACKEND: str = (os.environ.get("OUROBOROS_STATE_BACKEND", "json") or "json").strip().lower()
+_STORE = None
+
+
 def init(drive_root: pathlib.Path, total_budget_limit: float = 0.0) -> None:
     global DRIVE_ROOT, STATE_PATH, STATE_LAST_GOOD_PATH, STATE_LOCK_PATH, QUEUE_SNAPSHOT_PATH
+    global STATE_DB_PATH, _STORE
     DRIVE_ROOT = drive_root
     STATE_PATH = drive_root / "state" / "state.json"
     STATE_LAST_GOOD_PATH = drive_root / "state" / "state.last_good.json"
     STATE_LOCK_PATH = drive_root / "locks" / "state.lock"
     QUEUE_SNAPSHOT_PATH = drive_root / "state" / "queue_snapshot.json"
+    STATE_DB_PATH = pathlib.Path(os.environ.get("OUROBOROS_STATE_DB") or _default_state_db(drive_root))
+    _STORE = None
+    _invalidate_state_cache()
     set_budget_limit(total_budget_limit)
 
 
@@ -115,8 +138,8 @@ def release_file_lock(lock_path: pathlib.Path, lock_fd: Optional[int]) -> None:
         pass
 
 
-# Re-export append_jsonl from ouroboros.utils (single source of truth)
-from ouroboros.utils import append_jsonl  # noqa: F401
+# Re-export append_jsonl/flush_jsonl from ouroboros.utils (single source of truth)
+from ouroboros.utils import append_jsonl, flush_jsonl  # noqa: F401
 
 
 # ---------------------------------------------------------------------------
@@ -161,6 +184,97 @@ def default_state_dict() -> Dict[str, Any]:
 # Load / Save
 # ---------------------------------------------------------------------------
 
+# Budget counters: only ever changed through increments, never by save_state
+# (a stale dict passed to save_state must not roll back concurrent spend).
+_COUNTER_KEYS = ("spent_usd", "spent_calls", "spent_tokens_prompt",
+                 "spent_tokens_completion", "spent_tokens_cached")
+_MIRROR_MIN_INTERVAL_SEC = 5.0
+_last_mirror_at = 0.0
+_mirror_timer: Optional[threading.Timer] = None
+_mirror_lock = threading.Lock()
+
+
+def _store():
+    """Return the SQLite store when that backend is selected, else None."""
+    global _STORE
+    if STATE_BACKEND != "sqlite":
+        return None
+    if _STORE is None:
+        from supervisor.state_store import SqliteStateStore
+        store = SqliteStateStore(STATE_DB_PATH)
+        store.migrate_from_json(STATE_PATH, STATE_LAST_GOOD_PATH)
+        _STORE = store
+    return _STORE
+
+
+def _mirror_state_json(st: Dict[str, Any], force: bool = False) -> None:
+    """Refresh the state.json mirror, at most every _MIRROR_MIN_INTERVAL_SEC.
+
+    Throttled calls schedule one trailing refresh so the last update is
+    never left out of the mirror.
+    """
+    global _last_mirror_at, _mirror_timer
+    with _mirror_lock:
+        wait = _last_mirror_at + _MIRROR_MIN_INTERVAL_SEC - time.time()
+        if not force and wait > 0:
+            if _mirror_timer is None:
+                _mirror_timer = threading.Timer(wait, _trailing_mirror)
+                _mirror_timer.daemon = True
+                _mirror_timer.start()
+            return
+        _last_mirror_at = time.time()
+    try:
+        atomic_write_text(STATE_PATH, json.dumps(st, ensure_ascii=False, indent=2))
+    except Exception:
+        log.debug("Failed to mirror state.json from SQLite store", exc_info=True)
+
+
+def _trailing_mirror() -> None:
+    global _mirror_timer
+    with _mirror_lock:
+        _mirror_timer = None
+    store = _store()
+    if store is not None:
+        _mirror_state_json(ensure_state_defaults(store.load_all()), force=True)
+
+
+# ---------------------------------------------------------------------------
+# Read-through cache for state.json
+# ---------------------------------------------------------------------------
+# Keyed by (path, inode, mtime_ns, size) of state.json. Every writer replaces
+# the file atomically under STATE_LOCK (new inode), so a matching stat means
+# the bytes we parsed are still current and the Drive read can be skipped.
+
+_state_cache_lock = threading.Lock()
+_state_cache: Dict[str, Any] = {"key": None, "state": None}
+_state_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _state_file_key() -> Optional[tuple]:
+    try:
+        st = os.stat(STATE_PATH)
+    except OSError:
+        return None
+    return (str(STATE_PATH), st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _remember_state(key: Optional[tuple], st: Dict[str, Any]) -> None:
+    with _state_cache_lock:
+        _state_cache["key"] = key
+        _state_cache["state"] = copy.deepcopy(st) if key is not None else None
+
+
+def _invalidate_state_cache() -> None:
+    _remember_state(None, {})
+
+
+def state_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the load_state cache (json backend)."""
+    hits, misses = _state_cache_stats["hits"], _state_cache_stats["misses"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": (hits / total) if total else 0.0}
+
+
 def _load_state_unlocked() -> Dict[str, Any]:
     """Load state without acquiring lock. Caller must hold STATE_LOCK."""
     recovered = False
@@ -184,19 +298,53 @@ def _save_state_unlocked(st: Dict[str, Any]) -> None:
     """Save state without acquiring lock. Caller must hold STATE_LOCK."""
     st = ensure_state_defaults(st)
     payload = json.dumps(st, ensure_ascii=False, indent=2)
+    _invalidate_state_cache()
     atomic_write_text(STATE_PATH, payload)
     atomic_write_text(STATE_LAST_GOOD_PATH, payload)
+    _remember_state(_state_file_key(), st)
+
+
+class _LoadedState(dict):
+    """State dict from the SQLite store; remembers what it was loaded from so
+    save_state writes only the keys the caller changed."""
+    _base: Dict[str, str]
 
 
 def load_state() -> Dict[str, Any]:
+    store = _store()
+    if store is not None:
+        raw, base = store.load_with_base()
+        st = _LoadedState(raw)
+        st._base = base
+        return ensure_state_defaults(st)
+    key = _state_file_key()
+    with _state_cache_lock:
+        if key is not None and _state_cache["key"] == key:
+            _state_cache_stats["hits"] += 1
+            return copy.deepcopy(_state_cache["state"])  # callers mutate what they get
+        _state_cache_stats["misses"] += 1
     lock_fd = acquire_file_lock(STATE_LOCK_PATH)
     try:
-        return _load_state_unlocked()
+        key = _state_file_key()  # writers hold the lock, so this matches what we read
+        st = _load_state_unlocked()
+        if key is not None and _state_file_key() == key:
+            _remember_state(key, st)
+        return st
     finally:
         release_file_lock(STATE_LOCK_PATH, lock_fd)
 
 
 def save_state(st: Dict[str, Any]) -> None:
+    store = _store()
+    if store is not None:
+        st = ensure_state_defaults(st)
+        base = getattr(st, "_base", None)
+        if store.save(st, preserve_keys=_COUNTER_KEYS, base=base):
+            _mirror_state_json(store.load_all())
+        if base is not None:
+            from supervisor.state_store import encode_value
+            st._base = {k: encode_value(v) for k, v in st.items()}
+        return
     lock_fd = acquire_file_lock(STATE_LOCK_PATH)
     try:
         _save_state_unlocked(st)
@@ -211,34 +359,42 @@ def init_state() -> Dict[str, Any]:
     Fetches OpenRouter ground truth and stores session_daily_snapshot and
     session_spent_snapshot for drift calculation.
     """
+    store = _store()
+    if store is not None:
+        ground_truth = check_openrouter_ground_truth()
+        st = store.update(lambda s: _init_session_snapshots(ensure_state_defaults(s), ground_truth))
+        _mirror_state_json(st, force=True)
+        return st
+
     lock_fd = acquire_file_lock(STATE_LOCK_PATH)
     try:
         st = _load_state_unlocked()
-
-        # Capture session snapshots for drift detection
-        st["session_spent_snapshot"] = float(st.get("spent_usd") or 0.0)
-
-        # Fetch OpenRouter ground truth to capture total_usd baseline
-        ground_truth = check_openrouter_ground_truth()
-        if ground_truth is not None:
-            st["session_total_snapshot"] = ground_truth["total_usd"]
-            st["openrouter_total_usd"] = ground_truth["total_usd"]
-            st["openrouter_daily_usd"] = ground_truth["daily_usd"]
-            st["openrouter_last_check_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        else:
-            # If we can't fetch ground truth, use 0 as baseline
-            st["session_total_snapshot"] = 0.0
-
-        # Reset drift tracking
-        st["budget_drift_pct"] = None
-        st["budget_drift_alert"] = False
-
+        _init_session_snapshots(st, check_openrouter_ground_truth())
         _save_state_unlocked(st)
         return st
     finally:
         release_file_lock(STATE_LOCK_PATH, lock_fd)
 
 
+def _init_session_snapshots(st: Dict[str, Any], ground_truth: Optional[Dict[str, float]]) -> None:
+    # Capture session snapshots for drift detection
+    st["session_spent_snapshot"] = float(st.get("spent_usd") or 0.0)
+
+    # OpenRouter ground truth captures the total_usd baseline
+    if ground_truth is not None:
+        st["session_total_snapshot"] = ground_truth["total_usd"]
+        st["openrouter_total_usd"] = ground_truth["total_usd"]
+        st["openrouter_daily_usd"] = ground_truth["daily_usd"]
+        st["openrouter_last_check_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    else:
+        # If we can't fetch ground truth, use 0 as baseline
+        st["session_total_snapshot"] = 0.0
+
+    # Reset drift tracking
+    st["budget_drift_pct"] = None
+    st["budget_drift_alert"] = False
+
+
 # ---------------------------------------------------------------------------
 # Budget tracking (moved from workers.py)
 # ---------------------------------------------------------------------------
@@ -299,97 +455,122 @@ def budget_pct(st: Dict[str, Any]) -> float:
     return (spent / total) * 100.0
 
 
+def _to_float(v: Any, default: float = 0.0) -> float:
+    try:
+        return float(v)
+    except Exception:
+        log.debug(f"Failed to convert value to float: {v!r}", exc_info=True)
+        return default
+
+
+def _to_int(v: Any, default: int = 0) -> int:
+    try:
+        return int(v)
+    except Exception:
+        log.debug(f"Failed to convert value to int: {v!r}", exc_info=True)
+        return default
+
+
+def _usage_deltas(usage: Dict[str, Any]) -> Dict[str, Any]:
+    """Budget counter increments for one usage record."""
+    u = usage if isinstance(usage, dict) else {}
+    cost = u.get("cost")
+    return {
+        "spent_usd": _to_float(cost if cost is not None else 0.0),
+        "spent_calls": _to_int(u.get("rounds") if isinstance(usage, dict) else 0, default=1),
+        "spent_tokens_prompt": _to_int(u.get("prompt_tokens") or 0),
+        "spent_tokens_completion": _to_int(u.get("completion_tokens") or 0),
+        "spent_tokens_cached": _to_int(u.get("cached_tokens") or 0),
+    }
+
+
 def update_budget_from_usage(usage: Dict[str, Any]) -> None:
     """Update state with LLM usage costs and tokens.
 
-    Uses a single lock scope for the read-modify-write cycle to prevent
-    concurrent writes from losing budget updates.
+    JSON backend: a single lock scope for the read-modify-write cycle prevents
+    concurrent writes from losing budget updates. SQLite backend: one atomic
+    increment of the counters.
 
     Every 50 calls, fetches OpenRouter ground truth for comparison.
     """
-    def _to_float(v: Any, default: float = 0.0) -> float:
-        try:
-            return float(v)
-        except Exception:
-            log.debug(f"Failed to convert value to float: {v!r}", exc_info=True)
-            return default
+    deltas = _usage_deltas(usage)
 
-    def _to_int(v: Any, default: int = 0) -> int:
+    # Step 1: Update budget counters (fast, no I/O beyond Drive)
+    store = _store()
+    if store is not None:
+        totals = store.increment(deltas)
+        spent_calls = int(totals["spent_calls"])
+    else:
+        lock_fd = acquire_file_lock(STATE_LOCK_PATH)
         try:
-            return int(v)
-        except Exception:
-            log.debug(f"Failed to convert value to int: {v!r}", exc_info=True)
-            return default
-
-    # Step 1: Update budget counters under lock (fast, no I/O beyond Drive)
-    lock_fd = acquire_file_lock(STATE_LOCK_PATH)
-    try:
-        st = _load_state_unlocked()
-        cost = usage.get("cost") if isinstance(usage, dict) else None
-        if cost is None:
-            cost = 0.0
-        st["spent_usd"] = _to_float(st.get("spent_usd") or 0.0) + _to_float(cost)
-        rounds = _to_int(usage.get("rounds") if isinstance(usage, dict) else 0, default=1)
-        st["spent_calls"] = int(st.get("spent_calls") or 0) + rounds
-        st["spent_tokens_prompt"] = _to_int(st.get("spent_tokens_prompt") or 0) + _to_int(
-            usage.get("prompt_tokens") if isinstance(usage, dict) else 0)
-        st["spent_tokens_completion"] = _to_int(st.get("spent_tokens_completion") or 0) + _to_int(
-            usage.get("completion_tokens") if isinstance(usage, dict) else 0)
-        st["spent_tokens_cached"] = _to_int(st.get("spent_tokens_cached") or 0) + _to_int(
-            usage.get("cached_tokens") if isinstance(usage, dict) else 0)
-        should_check_ground_truth = (st["spent_calls"] % 50 == 0)
-        _save_state_unlocked(st)
-    finally:
-        release_file_lock(STATE_LOCK_PATH, lock_fd)
+            st = _load_state_unlocked()
+            st["spent_usd"] = _to_float(st.get("spent_usd") or 0.0) + deltas["spent_usd"]
+            for key in _COUNTER_KEYS[1:]:
+                st[key] = _to_int(st.get(key) or 0) + deltas[key]
+            spent_calls = st["spent_calls"]
+            _save_state_unlocked(st)
+        finally:
+            release_file_lock(STATE_LOCK_PATH, lock_fd)
+    should_check_ground_truth = deltas["spent_calls"] > 0 and spent_calls % 50 == 0
 
     # Step 2: HTTP to OpenRouter OUTSIDE the lock (can take up to 10s)
     if should_check_ground_truth:
         ground_truth = check_openrouter_ground_truth()
-        if ground_truth is not None:
-            lock_fd = acquire_file_lock(STATE_LOCK_PATH)
-            try:
-                st = _load_state_unlocked()
-                st["openrouter_total_usd"] = ground_truth["total_usd"]
-                st["openrouter_daily_usd"] = ground_truth["daily_usd"]
-                st["openrouter_last_check_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
-
-                session_total_snap = st.get("session_total_snapshot")
-                session_spent_snap = st.get("session_spent_snapshot")
-
-                if session_total_snap is not None and session_spent_snap is not None:
-                    current_total_usd = ground_truth["total_usd"]
-                    current_spent_usd = _to_float(st.get("spent_usd") or 0.0)
-                    or_delta = current_total_usd - _to_float(session_total_snap)
-                    our_delta = current_spent_usd - _to_float(session_spent_snap)
-
-                    if or_delta > 0.001:
-                        drift_pct = abs(or_delta - our_delta) / max(abs(or_delta), 0.01) * 100.0
-                        st["budget_drift_pct"] = drift_pct
-                        abs_diff = abs(or_delta - our_delta)
-                        if drift_pct > 50.0 and abs_diff > 5.0:
-                            st["budget_drift_alert"] = True
-                            append_jsonl(
-                                DRIVE_ROOT / "logs" / "events.jsonl",
-                                {
-                                    "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                                    "event": "budget_drift_warning",
-                                    "drift_pct": round(drift_pct, 2),
-                                    "our_delta": round(our_delta, 4),
-                                    "or_delta": round(or_delta, 4),
-                                    "abs_diff": round(abs_diff, 4),
-                                    "spent_calls": st["spent_calls"],
-                                    "note": "High drift expected if OR key is shared or tracking had early bugs",
-                                }
-                            )
-                        else:
-                            st["budget_drift_alert"] = False
-                    else:
-                        st["budget_drift_pct"] = 0.0
-                        st["budget_drift_alert"] = False
-
-                _save_state_unlocked(st)
-            finally:
-                release_file_lock(STATE_LOCK_PATH, lock_fd)
+        if ground_truth is None:
+            return
+        if store is not None:
+            _mirror_state_json(store.update(lambda st: _apply_ground_truth(st, ground_truth)), force=True)
+            return
+        lock_fd = acquire_file_lock(STATE_LOCK_PATH)
+        try:
+            st = _load_state_unlocked()
+            _apply_ground_truth(st, ground_truth)
+            _save_state_unlocked(st)
+        finally:
+            release_file_lock(STATE_LOCK_PATH, lock_fd)
+    elif store is not None:
+        _mirror_state_json(store.load_all())
+
+
+def _apply_ground_truth(st: Dict[str, Any], ground_truth: Dict[str, float]) -> None:
+    """Record OpenRouter ground truth and recompute budget drift in st."""
+    st["openrouter_total_usd"] = ground_truth["total_usd"]
+    st["openrouter_daily_usd"] = ground_truth["daily_usd"]
+    st["openrouter_last_check_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    session_total_snap = st.get("session_total_snapshot")
+    session_spent_snap = st.get("session_spent_snapshot")
+
+    if session_total_snap is not None and session_spent_snap is not None:
+        current_total_usd = ground_truth["total_usd"]
+        current_spent_usd = _to_float(st.get("spent_usd") or 0.0)
+        or_delta = current_total_usd - _to_float(session_total_snap)
+        our_delta = current_spent_usd - _to_float(session_spent_snap)
+
+        if or_delta > 0.001:
+            drift_pct = abs(or_delta - our_delta) / max(abs(or_delta), 0.01) * 100.0
+            st["budget_drift_pct"] = drift_pct
+            abs_diff = abs(or_delta - our_delta)
+            if drift_pct > 50.0 and abs_diff > 5.0:
+                st["budget_drift_alert"] = True
+                append_jsonl(
+                    DRIVE_ROOT / "logs" / "events.jsonl",
+                    {
+                        "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                        "event": "budget_drift_warning",
+                        "drift_pct": round(drift_pct, 2),
+                        "our_delta": round(our_delta, 4),
+                        "or_delta": round(or_delta, 4),
+                        "abs_diff": round(abs_diff, 4),
+                        "spent_calls": st.get("spent_calls"),
+                        "note": "High drift expected if OR key is shared or tracking had early bugs",
+                    }
+                )
+            else:
+                st["budget_drift_alert"] = False
+        else:
+            st["budget_drift_pct"] = 0.0
+            st["budget_drift_alert"] = False
 
 
 # ---------------------------------------------------------------------------
@@ -400,49 +581,22 @@ def budget_breakdown(st: Dict[str, Any]) -> Dict[str, float]:
     """
     Calculate budget breakdown by category from events.jsonl.
 
-    Reads llm_usage events and aggregates cost_usd by category field.
+    Aggregates cost of llm_usage events by category field, served from the
+    incremental rollup (supervisor/cost_rollup.py).
     Returns dict like {"task": 12.5, "evolution": 45.2, ...}
     """
-    events_path = DRIVE_ROOT / "logs" / "events.jsonl"
-    if not events_path.exists():
-        return {}
-
-    breakdown: Dict[str, float] = {}
+    from supervisor.cost_rollup import category_costs
     try:
-        with events_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    event = json.loads(line)
-                    if event.get("type") != "llm_usage":
-                        continue
-
-                    # Get category (default to "other" if not present)
-                    category = event.get("category", "other")
-
-                    # Get cost from either top-level "cost" or nested "usage.cost"
-                    cost = 0.0
-                    if "cost" in event:
-                        cost = float(event.get("cost", 0))
-                    elif "usage" in event and isinstance(event["usage"], dict):
-                        cost = float(event["usage"].get("cost", 0))
-
-                    if cost > 0:
-                        breakdown[category] = breakdown.get(category, 0.0) + cost
-
-                except (json.JSONDecodeError, ValueError, TypeError):
-                    continue
+        return category_costs(DRIVE_ROOT)
     except Exception:
         log.warning("Failed to calculate budget breakdown", exc_info=True)
-
-    return breakdown
+        return {}
 
 
 def model_breakdown(st: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
     """
-    Calculate budget breakdown by model from events.jsonl.
+    Calculate budget breakdown by model from events.jsonl (via the columnar
+    log archive, ouroboros/log_columns.py).
 
     Returns dict like:
     {
@@ -450,96 +604,28 @@ def model_breakdown(st: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
         "openai/gpt-4o": {"cost": 3.2, "calls": 15, ...},
     }
     """
-    events_path = DRIVE_ROOT / "logs" / "events.jsonl"
-    if not events_path.exists():
-        return {}
-
-    breakdown: Dict[str, Dict[str, float]] = {}
+    from ouroboros.log_columns import model_costs
     try:
-        with events_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    event = json.loads(line)
-                    if event.get("type") != "llm_usage":
-                        continue
-
-                    model = event.get("model") or "unknown"
-                    if not model:
-                        model = "unknown"
-
-                    # Get cost
-                    cost = 0.0
-                    if "cost" in event:
-                        cost = float(event.get("cost", 0))
-                    elif "usage" in event and isinstance(event["usage"], dict):
-                        cost = float(event["usage"].get("cost", 0))
-
-                    # Get tokens
-                    prompt_tokens = int(event.get("prompt_tokens", 0) or 0)
-                    completion_tokens = int(event.get("completion_tokens", 0) or 0)
-                    cached_tokens = int(event.get("cached_tokens", 0) or 0)
-
-                    if model not in breakdown:
-                        breakdown[model] = {"cost": 0.0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
-
-                    breakdown[model]["cost"] += cost
-                    breakdown[model]["calls"] += 1
-                    breakdown[model]["prompt_tokens"] += prompt_tokens
-                    breakdown[model]["completion_tokens"] += completion_tokens
-                    breakdown[model]["cached_tokens"] += cached_tokens
-
-                except (json.JSONDecodeError, ValueError, TypeError):
-                    continue
+        return model_costs(DRIVE_ROOT / "logs")
     except Exception:
         log.warning("Failed to calculate model breakdown", exc_info=True)
-
-    return breakdown
+        return {}
 
 
-def per_task_cost_summary(max_tasks: int = 10, tail_bytes: int = 512_000) -> List[Dict[str, Any]]:
-    """Return cost summary for recent tasks from events.jsonl.
+def per_task_cost_summary(max_tasks: int = 10, recent_tasks: int = 50) -> List[Dict[str, Any]]:
+    """Return cost summary for recent tasks (via the columnar log archive).
 
-    Only reads the last `tail_bytes` of the file to avoid scanning
-    megabytes of history on every LLM round.
+    Considers the `recent_tasks` most recently active tasks.
 
     Returns list of dicts: [{task_id, cost, rounds, model}, ...]
     sorted by cost descending, limited to max_tasks.
     """
-    events_path = DRIVE_ROOT / "logs" / "events.jsonl"
-    if not events_path.exists():
-        return []
-
-    tasks: Dict[str, Dict[str, Any]] = {}
+    from ouroboros.log_columns import recent_task_costs
     try:
-        file_size = events_path.stat().st_size
-        with events_path.open("r", encoding="utf-8") as f:
-            if file_size > tail_bytes:
-                f.seek(file_size - tail_bytes)
-                f.readline()  # skip partial first line
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    event = json.loads(line)
-                    if event.get("type") != "llm_usage":
-                        continue
-                    tid = event.get("task_id") or "unknown"
-                    cost = float(event.get("cost", 0) or 0)
-                    if tid not in tasks:
-                        tasks[tid] = {"task_id": tid, "cost": 0.0, "rounds": 0, "model": event.get("model", "")}
-                    tasks[tid]["cost"] += cost
-                    tasks[tid]["rounds"] += 1
-                except (json.JSONDecodeError, ValueError, TypeError):
-                    continue
+        return recent_task_costs(DRIVE_ROOT / "logs", max_tasks=max_tasks, recent_tasks=recent_tasks)
     except Exception:
         log.warning("Failed to calculate per-task cost summary", exc_info=True)
-
-    sorted_tasks = sorted(tasks.values(), key=lambda x: x["cost"], reverse=True)
-    return sorted_tasks[:max_tasks]
+        return []
 
 
 # ---------------------------------------------------------------------------
@@ -597,6 +683,10 @@ def status_text(workers_dict: Dict[int, Any], pending_list: list, running_dict:
     else:
         lines.append(f"spent_usd: ${spent:.2f}")
     lines.append(f"spent_calls: {st.get('spent_calls')}")
+    if _store() is None:
+        cache = state_cache_stats()
+        lines.append(f"state_cache: hits={cache['hits']} misses={cache['misses']} "
+                     f"({cache['hit_rate'] * 100:.0f}% hit)")
     lines.append(f"prompt_tokens: {st.get('spent_tokens_prompt')}, completion_tokens: {st.get('spent_tokens_completion')}, cached_tokens: {st.get('spent_tokens_cached')}")
 
     # Add budget breakdown by category
@@ -638,6 +728,15 @@ def status_text(workers_dict: Dict[int, Any], pending_list: list, running_dict:
                 ct = int(stats["completion_tokens"])
                 lines.append(f"  {model_name}: ${cost:.2f} ({calls} calls, {pt:,}p/{ct:,}c tok)")
 
+    # Daily spend (last 7 days)
+    try:
+        from supervisor.cost_rollup import daily_costs
+        days = daily_costs(DRIVE_ROOT, days=7)
+        if days:
+            lines.append("daily_spend: " + ", ".join(f"{d}=${v['cost']:.2f}" for d, v in days.items()))
+    except Exception:
+        log.debug("Failed to read daily spend from cost rollup", exc_info=True)
+
     lines.append(
         "evolution: "
         + f"enabled={int(bool(st.get('evolution_mode_enabled')))}, "
@@ -648,7 +747,7 @@ def status_text(workers_dict: Dict[int, Any], pending_list: list, running_dict:
 
 
 def rotate_chat_log_if_needed(drive_root: pathlib.Path, max_bytes: int = 800_000) -> None:
-    """Rotate chat log if it exceeds max_bytes."""
+    """Rotate chat log if it exceeds max_bytes (renamed into archive/, not copied)."""
     chat = drive_root / "logs" / "chat.jsonl"
     if not chat.exists():
         return
@@ -657,5 +756,26 @@ def rotate_chat_log_if_needed(drive_root: pathlib.Path, max_bytes: int = 800_000
     ts = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d_%H%M%S")
     archive_path = drive_root / "archive" / f"chat_{ts}.jsonl"
     archive_path.parent.mkdir(parents=True, exist_ok=True)
-    archive_path.write_bytes(chat.read_bytes())
-    chat.write_text("", encoding="utf-8")
+    os.replace(str(chat), str(archive_path))
+    chat.touch()
+
+
+_LOG_ROTATION_INTERVAL_SEC = 60.0
+_last_log_rotation_check = 0.0
+
+
+def rotate_logs_if_needed(drive_root: pathlib.Path) -> None:
+    """Seal and compress events/tools/progress/supervisor log segments (throttled)."""
+    global _last_log_rotation_check
+    now = time.time()
+    if now - _last_log_rotation_check < _LOG_ROTATION_INTERVAL_SEC:
+        return
+    _last_log_rotation_check = now
+    from ouroboros.segmented_log import rotate_logs
+    sealed = rotate_logs(drive_root / "logs")
+    if sealed:
+        append_jsonl(drive_root / "logs" / "supervisor.jsonl", {
+            "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "type": "log_segments_sealed",
+            "segments": sealed,
+        })
@@ -0,0 +1,192 @@
+"""
+Supervisor — SQLite state store.
+
+Optional backend for supervisor/state.py (OUROBOROS_STATE_BACKEND=sqlite).
+State is a key/value table of JSON-encoded values in WAL mode: readers never
+block the writer, updates touch only the keys that changed, and budget
+counters are bumped with a single atomic increment instead of a locked
+whole-file read-modify-write.
+
+"Changed" is relative to what the caller loaded: load_with_base() returns
+the encoded values alongside the state, and save(st, base=...) writes only
+keys whose value differs from that base, so keys another process changed in
+the meantime are left alone.
+
+On first open an existing state.json (or state.last_good.json) is migrated.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def encode_value(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+class SqliteStateStore:
+    """Key-level state storage on SQLite (one connection per thread and process)."""
+
+    def __init__(self, db_path: pathlib.Path, busy_timeout_ms: int = 10_000):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    # --- Connection ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+        # isolation_level=None: transactions are explicit (BEGIN IMMEDIATE).
+        conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout_ms / 1000.0,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    @staticmethod
+    def _read_all(conn: sqlite3.Connection) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for key, raw in conn.execute("SELECT key, value FROM kv"):
+            try:
+                out[key] = json.loads(raw)
+            except ValueError:
+                log.debug(f"Skipping undecodable state key {key!r}", exc_info=True)
+        return out
+
+    # --- Public API ---
+
+    def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM kv LIMIT 1").fetchone() is None
+
+    def load_all(self) -> Dict[str, Any]:
+        return self._read_all(self._conn())
+
+    def load_with_base(self) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """State plus the encoded values it was loaded from (the base for save())."""
+        st = self.load_all()
+        return st, {k: encode_value(v) for k, v in st.items()}
+
+    def save(self, st: Dict[str, Any], preserve_keys: Iterable[str] = (),
+             base: Optional[Dict[str, str]] = None) -> int:
+        """Write the keys of st the caller changed.
+
+        With a base (from load_with_base), a key is changed if its value
+        differs from the base, and keys dropped from st since are deleted;
+        everything else is left as the store has it now. Without a base,
+        st is compared with the current rows. Keys in preserve_keys are
+        never overwritten or deleted once present (they are owned by
+        increment()). Returns number of keys written/deleted.
+        """
+        preserve = set(preserve_keys)
+        encoded = {k: encode_value(v) for k, v in st.items()}
+
+        def _apply(conn: sqlite3.Connection) -> int:
+            current = dict(conn.execute("SELECT key, value FROM kv").fetchall())
+            reference = current if base is None else base
+            upserts = [(k, v) for k, v in encoded.items()
+                       if reference.get(k) != v and not (k in preserve and k in current)]
+            deletes = [(k,) for k in reference if k not in encoded and k in current and k not in preserve]
+            if upserts:
+                conn.executemany("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", upserts)
+            if deletes:
+                conn.executemany("DELETE FROM kv WHERE key = ?", deletes)
+            return len(upserts) + len(deletes)
+
+        return self._transaction(_apply)
+
+    def set_many(self, values: Dict[str, Any]) -> None:
+        rows = [(k, encode_value(v)) for k, v in values.items()]
+        self._transaction(lambda conn: conn.executemany(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", rows))
+
+    def increment(self, deltas: Dict[str, float]) -> Dict[str, Any]:
+        """Atomically add deltas to numeric keys. Returns the new values."""
+
+        def _apply(conn: sqlite3.Connection) -> Dict[str, Any]:
+            out: Dict[str, Any] = {}
+            for key, delta in deltas.items():
+                row = conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+                try:
+                    current = json.loads(row[0]) if row else 0
+                    current = current if isinstance(current, (int, float)) else 0
+                except ValueError:
+                    current = 0
+                out[key] = current + delta
+                conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+                             (key, json.dumps(out[key])))
+            return out
+
+        return self._transaction(_apply)
+
+    def update(self, fn: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """Read-modify-write under one write transaction; fn mutates the dict."""
+
+        def _apply(conn: sqlite3.Connection) -> Dict[str, Any]:
+            before = self._read_all(conn)
+            st = json.loads(json.dumps(before))
+            fn(st)
+            rows = [(k, encode_value(v)) for k, v in st.items() if k not in before or before[k] != v]
+            if rows:
+                conn.executemany("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", rows)
+            gone = [(k,) for k in before if k not in st]
+            if gone:
+                conn.executemany("DELETE FROM kv WHERE key = ?", gone)
+            return st
+
+        return self._transaction(_apply)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def migrate_from_json(self, *paths: pathlib.Path) -> bool:
+        """Import the first readable JSON state file into an empty store."""
+        if not self.is_empty():
+            return False
+        for path in paths:
+            try:
+                obj = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                log.debug(f"Cannot migrate state from {path}", exc_info=True)
+                continue
+            if not isinstance(obj, dict):
+                continue
+            self.set_many(obj)
+            self._transaction(lambda conn: conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                ("migrated_from", json.dumps({"path": str(path), "at": time.time()}))))
+            log.info("Migrated state from %s to %s (%d keys)", path, self.db_path, len(obj))
+            return True
+        return False
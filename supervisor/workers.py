@@ -21,7 +21,8 @@ import uuid
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-from supervisor.state import load_state, append_jsonl
+from supervisor.state import load_state, append_jsonl, flush_jsonl
+from ouroboros.utils import install_sigterm_flush, read_jsonl_tail
 from supervisor import git_ops
 from supervisor.telegram import send_with_budget
 
@@ -210,11 +211,7 @@ def auto_resume_after_restart() -> None:
             sup_log = DRIVE_ROOT / "logs" / "supervisor.jsonl"
             if sup_log.exists():
                 try:
-                    lines = sup_log.read_text(encoding="utf-8").strip().split("\n")
-                    for line in reversed(lines[-20:]):
-                        if not line.strip():
-                            continue
-                        evt = json.loads(line)
+                    for evt in reversed(read_jsonl_tail(sup_log, 20)):
                         if evt.get("type") in ("launcher_start", "restart"):
                             recent_restart = True
                             break
@@ -280,6 +277,8 @@ def worker_main(wid: int, in_q: Any, out_q: Any, repo_dir: str, drive_root: str)
     import pathlib as _pathlib
     _sys.path.insert(0, repo_dir)
     _drive = _pathlib.Path(drive_root)
+    # kill_workers() terminates workers: flush buffered tools/events records first
+    install_sigterm_flush()
     try:
         from ouroboros.agent import make_agent
         agent = make_agent(repo_dir=repo_dir, drive_root=drive_root, event_queue=out_q)
@@ -298,6 +297,7 @@ def worker_main(wid: int, in_q: Any, out_q: Any, repo_dir: str, drive_root: str)
                 out_q.put(e2)
         except Exception as _e:
             _log_worker_crash(wid, _drive, "handle_task", _e, _tb.format_exc())
+    flush_jsonl()
 
 
 def _log_worker_crash(wid: int, drive_root: pathlib.Path, phase: str, exc: Exception, tb: str) -> None:
@@ -494,6 +494,7 @@ def assign_tasks() -> None:
                     queue.persist_queue_snapshot(reason="evolution_dropped_budget")
                     continue
                 task = PENDING.pop(chosen_idx)
+                flush_jsonl()  # worker builds context from chat/progress logs
                 w.busy_task_id = task["id"]
                 w.in_q.put(task)
                 now_ts = time.time()
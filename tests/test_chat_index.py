@@ -0,0 +1,106 @@
+"""
+Tests for the incremental chat search index (ouroboros/chat_index.py).
+
+Run: pytest tests/test_chat_index.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestChatIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        self.chat = self.root / "logs" / "chat.jsonl"
+        self.chat.parent.mkdir(parents=True)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _say(self, text, ts="2026-01-01T00:00:00", direction="in"):
+        with self.chat.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": ts, "direction": direction, "text": text}, ensure_ascii=False) + "\n")
+
+    def _search(self, q, count=10, offset=0):
+        from ouroboros.chat_index import search_chat
+        return search_chat(self.root, q, count=count, offset=offset)
+
+    def test_ranked_and_incremental(self):
+        self._say("deploy the budget dashboard")
+        self._say("budget budget budget report")
+        self._say("unrelated chatter")
+        total, hits = self._search("budget")
+        self.assertEqual(total, 2)
+        self.assertEqual(hits[0]["text"], "budget budget budget report")
+
+        self._say("Бюджет и budget на завтра")
+        total, hits = self._search("бюджет")
+        self.assertEqual([h["text"] for h in hits], ["Бюджет и budget на завтра"])
+        self.assertEqual(self._search("budget")[0], 3)
+
+    def test_all_terms_preferred_then_any(self):
+        self._say("alpha beta")
+        self._say("alpha only")
+        total, hits = self._search("alpha beta")
+        self.assertEqual((total, hits[0]["text"]), (1, "alpha beta"))
+        total, _ = self._search("beta gamma")
+        self.assertEqual(total, 1)
+
+    def test_paging(self):
+        for i in range(25):
+            self._say(f"needle number {i}", ts=f"2026-01-01T00:00:{i:02d}")
+        total, page1 = self._search("needle", count=10)
+        _, page3 = self._search("needle", count=10, offset=20)
+        self.assertEqual(total, 25)
+        self.assertEqual(len(page1), 10)
+        self.assertEqual(len(page3), 5)
+        self.assertEqual(page1[0]["text"], "needle number 24")  # ties: newest first
+
+    def test_rotation_keeps_history_searchable(self):
+        from supervisor.state import rotate_chat_log_if_needed
+        self._say("ancient wisdom about ouroboros")
+        self.assertEqual(self._search("wisdom")[0], 1)
+        rotate_chat_log_if_needed(self.root, max_bytes=1)
+        self._say("fresh wisdom")
+        total, hits = self._search("wisdom")
+        self.assertEqual(total, 2)
+        self.assertEqual({h["text"] for h in hits}, {"ancient wisdom about ouroboros", "fresh wisdom"})
+
+    def test_refresh_only_appends(self):
+        from ouroboros import chat_index
+        index_dir = self.root / "index" / "chat"
+        self._say("first needle")
+        self._search("needle")
+        docs_before = (index_dir / "docs.jsonl").read_bytes()
+        inode = (index_dir / "docs.jsonl").stat().st_ino
+        # An append that crashed before its header commit is invisible and truncated away.
+        with (index_dir / "docs.jsonl").open("ab") as f:
+            f.write(b"[0, 999, 1, \"\", 1]\n")
+        self._say("second needle")
+        self.assertEqual(self._search("needle")[0], 2)
+        docs_after = (index_dir / "docs.jsonl").read_bytes()
+        self.assertTrue(docs_after.startswith(docs_before))
+        self.assertEqual(len(docs_after.splitlines()), 2)
+        self.assertEqual((index_dir / "docs.jsonl").stat().st_ino, inode)  # appended in place
+        chat_index._cache.clear()  # a fresh process reads the same index
+        total, hits = self._search("second")
+        self.assertEqual((total, hits[0]["text"]), (1, "second needle"))
+
+    def test_memory_chat_history_search(self):
+        from ouroboros.memory import Memory
+        self._say("remember the password rotation")
+        out = Memory(drive_root=self.root).chat_history(search="rotation")
+        self.assertIn("Found 1 matching messages", out)
+        self.assertIn("password rotation", out)
+
+
+if __name__ == "__main__":
+    unittest.main()
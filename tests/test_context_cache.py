@@ -0,0 +1,186 @@
+"""
+Tests for context assembly caches and token accounting
+(ouroboros/prompt_blocks.py, ouroboros/tokenizer.py, context.py).
+
+Run: pytest tests/test_context_cache.py -v
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestPromptBlockCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        (self.root / "repo" / "prompts").mkdir(parents=True)
+        (self.root / "drive").mkdir()
+        (self.root / "repo" / "prompts" / "SYSTEM.md").write_text("system prompt", encoding="utf-8")
+        (self.root / "repo" / "BIBLE.md").write_text("bible v1", encoding="utf-8")
+        from ouroboros.agent import Env
+        from ouroboros.memory import Memory
+        from ouroboros.prompt_blocks import prompt_block_cache
+        self.env = Env(repo_dir=self.root / "repo", drive_root=self.root / "drive")
+        self.memory = Memory(drive_root=self.root / "drive", repo_dir=self.root / "repo")
+        prompt_block_cache.clear()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _build(self):
+        from ouroboros.context import build_llm_messages
+        messages, cap_info = build_llm_messages(self.env, self.memory, {"id": "t1", "type": "task", "text": "hi"})
+        blocks = messages[0]["content"]
+        return blocks[0]["text"], blocks[1]["text"], cap_info["prompt_cache"]
+
+    def test_blocks_reused_until_inputs_change(self):
+        static1, semi1, info1 = self._build()
+        self.assertFalse(info1["static_hit"])
+        self.assertIn("bible v1", static1)
+        static2, semi2, info2 = self._build()
+        self.assertTrue(info2["static_hit"] and info2["semi_stable_hit"])
+        self.assertIs(static2, static1)  # same object, byte-identical prompt prefix
+        self.assertIs(semi2, semi1)
+        self.assertGreaterEqual(info2["hits"], 2)
+        self.assertIn("assembly_ms", info2)
+
+        (self.root / "repo" / "BIBLE.md").write_text("bible version 2", encoding="utf-8")
+        static3, semi3, info3 = self._build()
+        self.assertFalse(info3["static_hit"])
+        self.assertTrue(info3["semi_stable_hit"])
+        self.assertIn("bible version 2", static3)
+
+        self.memory.save_scratchpad("new scratch notes")
+        _, semi4, info4 = self._build()
+        self.assertFalse(info4["semi_stable_hit"])
+        self.assertIn("new scratch notes", semi4)
+
+    def test_unchanged_content_keeps_identity_after_touch(self):
+        from ouroboros.prompt_blocks import PromptBlockCache
+        cache = PromptBlockCache()
+        path = self.root / "x.md"
+        path.write_text("same", encoding="utf-8")
+        first, hit = cache.get("x", [path], lambda: "block:" + path.read_text())
+        self.assertFalse(hit)
+        os.utime(path, ns=(1, 1))
+        second, hit = cache.get("x", [path], lambda: "block:" + path.read_text())
+        self.assertFalse(hit)
+        self.assertIs(second, first)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+
+class TestTokenizer(unittest.TestCase):
+
+    def setUp(self):
+        from ouroboros import tokenizer
+        self.tok = tokenizer
+        self.assertEqual(tokenizer.set_backend("heuristic"), "heuristic")
+
+    def tearDown(self):
+        self.tok._backend = None  # re-resolve from the environment next time
+
+    def test_heuristic_is_script_aware(self):
+        ascii_text = "hello world " * 100
+        cyrillic = "привет мир " * 100
+        self.assertAlmostEqual(self.tok.count_tokens(ascii_text), len(ascii_text) / 4, delta=2)
+        # Cyrillic text costs well over what flat chars/4 suggests.
+        self.assertGreater(self.tok.count_tokens(cyrillic), len(cyrillic) / 4 * 1.4)
+        self.assertEqual(self.tok.count_tokens("中文字"), 3)
+
+    def test_counts_memoized_by_content(self):
+        block = "x" * 10_000
+        before = self.tok.memo_stats()
+        first = self.tok.count_tokens(block)
+        self.assertEqual(self.tok.count_tokens("".join(["x"] * 10_000)), first)
+        after = self.tok.memo_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_uncached_tiktoken_vocab_falls_back_without_download(self):
+        import hashlib
+        from unittest import mock
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {"TIKTOKEN_CACHE_DIR": tmp}):
+            self.assertFalse(self.tok._tiktoken_vocab_cached("o200k_base"))
+            self.assertEqual(self.tok.set_backend("tiktoken:o200k_base"), "heuristic")
+            url = "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken"
+            pathlib.Path(tmp, hashlib.sha1(url.encode()).hexdigest()).write_text("")
+            self.assertTrue(self.tok._tiktoken_vocab_cached("o200k_base"))
+
+    def test_message_counting_includes_tool_calls(self):
+        plain = {"role": "assistant", "content": ""}
+        with_call = {"role": "assistant", "content": "", "tool_calls": [
+            {"id": "1", "function": {"name": "repo_read", "arguments": '{"path": "' + "a" * 400 + '"}'}},
+        ]}
+        self.assertGreater(self.tok.count_message_tokens(with_call),
+                           self.tok.count_message_tokens(plain) + 100)
+
+    def test_soft_cap_trims_using_tokenizer(self):
+        from ouroboros.context import apply_message_token_soft_cap
+        dynamic = "## Runtime context\n\nok\n\n## Recent chat\n\n" + "сообщение " * 2000
+        messages = [{"role": "system", "content": [
+            {"type": "text", "text": "static", "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": dynamic},
+        ]}]
+        # ~20k chars: chars/4 would say ~5k tokens and skip trimming.
+        pruned, info = apply_message_token_soft_cap(messages, 6000)
+        self.assertEqual(info["tokenizer"], "heuristic")
+        self.assertEqual(info["trimmed_sections"], ["## Recent chat"])
+        self.assertLess(info["estimated_tokens_after"], 6000)
+        self.assertNotIn("сообщение", pruned[0]["content"][1]["text"])
+
+
+class TestSoftCapSections(unittest.TestCase):
+
+    def setUp(self):
+        from ouroboros import tokenizer
+        tokenizer.set_backend("heuristic")
+        self.tok = tokenizer
+
+    def tearDown(self):
+        self.tok._backend = None
+
+    def _messages(self, scratchpad_words=10, chat_words=10):
+        static = "## Who I Am\n\n## Scratchpad\n\n" + "static " * 3000
+        semi = ("## Scratchpad\n\n" + "note " * scratchpad_words
+                + "\n\n## My own heading\n\nstill scratchpad"
+                + "\n\n## Identity\n\nI am me")
+        dynamic = "## Runtime context\n\n{}\n\n## Recent chat\n\n" + "chat " * chat_words
+        return [
+            {"role": "system", "content": [
+                {"type": "text", "text": static, "cache_control": {"type": "ephemeral", "ttl": "1h"}},
+                {"type": "text", "text": semi, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": dynamic},
+            ]},
+            {"role": "user", "content": "do it"},
+        ]
+
+    def test_trims_dynamic_before_semi_stable(self):
+        from ouroboros.context import apply_message_token_soft_cap
+        messages = self._messages(scratchpad_words=100, chat_words=20000)
+        snapshot = repr(messages)
+        pruned, info = apply_message_token_soft_cap(messages, 15000)
+        self.assertEqual(info["trimmed_sections"], ["## Recent chat"])
+        self.assertEqual(repr(messages), snapshot)  # input untouched
+        self.assertIs(pruned[0]["content"][0], messages[0]["content"][0])
+        self.assertIs(pruned[1], messages[1])
+        self.assertIn("note", pruned[0]["content"][1]["text"])
+
+    def test_huge_scratchpad_is_trimmed_as_one_section(self):
+        from ouroboros.context import apply_message_token_soft_cap
+        messages = self._messages(scratchpad_words=40000)
+        pruned, info = apply_message_token_soft_cap(messages, 15000)
+        self.assertEqual(info["trimmed_sections"], ["## Recent chat", "## Scratchpad"])
+        semi = pruned[0]["content"][1]["text"]
+        self.assertEqual(semi, "## Identity\n\nI am me")
+        self.assertIn("## Scratchpad", pruned[0]["content"][0]["text"])  # static block never trimmed
+        self.assertLessEqual(info["estimated_tokens_after"], 15000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for background cost reconciliation (supervisor/cost_reconciler.py).
+
+Run: pytest tests/test_cost_reconciler.py -v
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestCostReconciler(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        import supervisor.state as state
+        import supervisor.cost_reconciler as rec
+        import supervisor.cost_rollup as cr
+        state.init(self.root)
+        rec.init(self.root)
+        cr._cache.update({"path": None, "mtime_ns": None, "data": None})
+        self.state, self.rec, self.cr = state, rec, cr
+        self.costs = {}
+        self._orig_fetch = rec._fetch
+        self._orig_thread = rec._ensure_thread
+        rec._fetch = self.costs.get
+        rec._ensure_thread = lambda: None  # drive passes explicitly
+
+    def tearDown(self):
+        self.rec._fetch = self._orig_fetch
+        self.rec._ensure_thread = self._orig_thread
+        self._tmpdir.cleanup()
+
+    def _usage_event(self, gen_id, estimate):
+        from supervisor.events import _handle_llm_usage
+        import types
+        ctx = types.SimpleNamespace(DRIVE_ROOT=self.root,
+                                    update_budget_from_usage=self.state.update_budget_from_usage)
+        _handle_llm_usage({
+            "type": "llm_usage", "ts": "2026-03-01T10:00:00+00:00", "task_id": "t1",
+            "model": "anthropic/claude-sonnet-4.6", "category": "task",
+            "usage": {"prompt_tokens": 100, "completion_tokens": 10, "cost": estimate,
+                      "cost_estimated": True, "generation_id": gen_id},
+        }, ctx)
+
+    def test_estimate_then_correction(self):
+        from ouroboros.utils import flush_jsonl
+        self._usage_event("gen-1", 0.10)
+        self.assertAlmostEqual(self.state.load_state()["spent_usd"], 0.10)
+        self.assertEqual(self.rec.stats()["pending"], 1)
+
+        self.assertEqual(self.rec.reconcile_once(now=time.time()), 0)  # not due yet
+        self.costs["gen-1"] = 0.25
+        self.assertEqual(self.rec.reconcile_once(now=time.time() + 60), 1)
+        self.assertAlmostEqual(self.state.load_state()["spent_usd"], 0.25)
+        self.assertEqual(self.state.load_state()["spent_calls"], 1)
+
+        flush_jsonl()
+        self.assertAlmostEqual(self.cr.category_costs(self.root)["task"], 0.25)
+        from ouroboros.log_columns import recent_task_costs
+        task = recent_task_costs(self.root / "logs", max_tasks=1)[0]
+        self.assertAlmostEqual(task["cost"], 0.25)
+        self.assertEqual(task["rounds"], 1)
+        self.assertEqual(self.rec.stats()["pending"], 0)
+
+    def test_pending_survives_restart_and_gives_up(self):
+        self._usage_event("gen-2", 0.05)
+        self.rec.init(self.root)  # reload from state/cost_pending.json
+        self.assertEqual(self.rec.stats()["pending"], 1)
+        now = time.time()
+        for i in range(self.rec.MAX_ATTEMPTS):
+            now += 3600
+            self.rec.reconcile_once(now=now)
+        self.assertEqual(self.rec.stats()["pending"], 0)
+        self.assertAlmostEqual(self.state.load_state()["spent_usd"], 0.05)  # estimate stands
+
+    def test_chat_does_not_block_on_generation_lookup(self):
+        from ouroboros.llm import LLMClient, _PROVIDERS
+
+        class Resp:
+            def model_dump(self):
+                return {"id": "gen-3", "usage": {"prompt_tokens": 5, "completion_tokens": 1},
+                        "choices": [{"message": {"role": "assistant", "content": "ok"}}]}
+
+        completions = type("C", (), {"create": lambda self, **kw: Resp()})()
+        fake = type("Client", (), {"chat": type("Chat", (), {"completions": completions})()})()
+        llm = LLMClient()
+        llm._clients[_PROVIDERS["_default"]["base_url"]] = fake
+        _msg, usage = llm.chat([{"role": "user", "content": "hi"}], "anthropic/claude-sonnet-4.6")
+        self.assertEqual(usage["generation_id"], "gen-3")
+        self.assertNotIn("cost", usage)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for incremental cost rollups (supervisor/cost_rollup.py).
+
+Run: pytest tests/test_cost_rollup.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _usage(task_id, cost, model="m/a", category="task", ts="2026-01-02T00:00:00"):
+    return {"ts": ts, "type": "llm_usage", "task_id": task_id, "category": category,
+            "model": model, "cost": cost, "prompt_tokens": 10, "completion_tokens": 2}
+
+
+class TestCostRollup(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        self.events = self.root / "logs" / "events.jsonl"
+        self.events.parent.mkdir(parents=True)
+        import supervisor.cost_rollup as cr
+        self.cr = cr
+        cr._cache.update({"path": None, "mtime_ns": None, "data": None})
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _append(self, *events, partial=""):
+        with self.events.open("a", encoding="utf-8") as f:
+            for e in events:
+                f.write(json.dumps(e) + "\n")
+            f.write(partial)
+
+    def test_incremental_aggregates(self):
+        self._append(_usage("t1", 1.0), {"type": "task_done", "task_id": "t1"},
+                     _usage("t2", 2.5, model="m/b", category="evolution"))
+        self.assertEqual(self.cr.category_costs(self.root), {"task": 1.0, "evolution": 2.5})
+        offset = json.loads(self.cr.rollup_path(self.root).read_text())["offset"]
+        self.assertEqual(offset, self.events.stat().st_size)
+
+        self._append(_usage("t1", 0.5, ts="2026-01-03T00:00:00"))
+        self.assertAlmostEqual(self.cr.category_costs(self.root)["task"], 1.5)
+        self.assertEqual(list(self.cr.daily_costs(self.root)), ["2026-01-02", "2026-01-03"])
+        self.assertEqual(self.cr.daily_costs(self.root)["2026-01-02"]["calls"], 2)
+        # Per-model and per-task costs live in the columnar archive, not here.
+        self.assertNotIn("by_model", json.loads(self.cr.rollup_path(self.root).read_text()))
+
+    def test_partial_line_not_consumed(self):
+        self._append(_usage("t1", 1.0), partial='{"type": "llm_usage", "cost": 9')
+        self.assertEqual(self.cr.category_costs(self.root), {"task": 1.0})
+        with self.events.open("a", encoding="utf-8") as f:
+            f.write(', "category": "task"}\n')
+        self.assertEqual(self.cr.category_costs(self.root), {"task": 10.0})
+
+    def test_survives_restart_and_rotation(self):
+        self._append(_usage("t1", 1.0))
+        self.cr.refresh(self.root)
+        # Simulate a fresh process: drop in-memory cache, state comes from disk.
+        self.cr._cache.update({"path": None, "mtime_ns": None, "data": None})
+        self._append(_usage("t1", 1.0))
+        self.assertEqual(self.cr.category_costs(self.root), {"task": 2.0})
+
+        # Rotation: the log is replaced by a new file.
+        self.events.unlink()
+        self._append(_usage("t3", 4.0, category="review"))
+        self.assertEqual(self.cr.category_costs(self.root), {"task": 2.0, "review": 4.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for the health snapshot (ouroboros/health_snapshot.py).
+
+Run: pytest tests/test_health_snapshot.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestHealthSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self._tmpdir.name)
+        self.repo = root / "repo"
+        self.drive = root / "drive"
+        self.repo.mkdir()
+        (self.drive / "logs").mkdir(parents=True)
+        (self.drive / "state").mkdir()
+        (self.repo / "VERSION").write_text("1.2.3\n", encoding="utf-8")
+        (self.repo / "pyproject.toml").write_text('[project]\nversion = "1.2.3"\n', encoding="utf-8")
+        (self.drive / "state" / "state.json").write_text("{}", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _inject(self, task_id, text, name="events.jsonl"):
+        with (self.drive / "logs" / name).open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "owner_message_injected", "task_id": task_id, "text": text}) + "\n")
+
+    def test_refresh_writes_snapshot_and_scans_incrementally(self):
+        from ouroboros import health_snapshot as hs
+        self._inject("t1", "hello")
+        snap = hs.refresh(self.repo, self.drive)
+        self.assertIn("OK: version sync (1.2.3)", snap["checks"])
+        self.assertIn("OK: no duplicate message processing detected", snap["checks"])
+        self.assertTrue((self.drive / "state" / "health.json").exists())
+        offset = json.loads((self.drive / "state" / "health_scan.json").read_text())[
+            "sources"]["logs/events.jsonl"]["offset"]
+        self.assertEqual(offset, (self.drive / "logs" / "events.jsonl").stat().st_size)
+
+        self._inject("t2", "hello")  # same message, second task
+        checks = hs.refresh(self.repo, self.drive)["checks"]
+        self.assertTrue(any(c.startswith("CRITICAL: DUPLICATE PROCESSING — 1 message(s)") for c in checks))
+
+    def test_duplicate_clears_once_it_leaves_the_window(self):
+        from ouroboros import health_snapshot as hs
+        self._inject("t1", "hello")
+        self._inject("t2", "hello")
+        checks = hs.refresh(self.repo, self.drive)["checks"]
+        self.assertTrue(any(c.startswith("CRITICAL: DUPLICATE PROCESSING") for c in checks))
+        with (self.drive / "logs" / "events.jsonl").open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "task_done", "pad": "x" * hs._WINDOW_BYTES}) + "\n")
+        self.assertIn("OK: no duplicate message processing detected", hs.refresh(self.repo, self.drive)["checks"])
+        self.assertEqual(json.loads((self.drive / "state" / "health_scan.json").read_text())["messages"], {})
+
+    def test_context_reads_snapshot(self):
+        from ouroboros import health_snapshot as hs
+        from ouroboros.agent import Env
+        from ouroboros.context import _build_health_invariants
+        hs.refresh(self.repo, self.drive)
+        (self.repo / "VERSION").write_text("9.9.9\n", encoding="utf-8")
+        env = Env(repo_dir=self.repo, drive_root=self.drive)
+        section = _build_health_invariants(env)
+        self.assertIn("OK: version sync (1.2.3)", section)  # fresh snapshot, not recomputed
+
+        health = self.drive / "state" / "health.json"
+        snap = json.loads(health.read_text())
+        snap["updated_ts"] -= hs.STALE_AFTER_SEC + 1
+        health.write_text(json.dumps(snap))
+        self.assertIn("VERSION DESYNC", _build_health_invariants(env))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for the shared HTTP transport (ouroboros/http_pool.py).
+
+Run: pytest tests/test_http_pool.py -v
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+HAS_HTTPX = importlib.util.find_spec("httpx") is not None
+HAS_OPENAI = importlib.util.find_spec("openai") is not None
+
+
+class TestHttpPool(unittest.TestCase):
+
+    def tearDown(self):
+        from ouroboros import http_pool
+        http_pool.close_all()
+
+    def test_pool_key_is_per_host(self):
+        from ouroboros.http_pool import pool_key
+        from ouroboros.llm import _PROVIDERS
+        from ouroboros.tools.review import OPENROUTER_URL
+        self.assertEqual(pool_key(OPENROUTER_URL), pool_key(_PROVIDERS["_default"]["base_url"]))
+        self.assertNotEqual(pool_key(_PROVIDERS["google/"]["base_url"]),
+                            pool_key(_PROVIDERS["groq/"]["base_url"]))
+
+    def test_fork_reset_drops_pools(self):
+        from ouroboros import http_pool
+        http_pool._http_clients["https://example.invalid"] = object()
+        http_pool._reset_after_fork()
+        self.assertEqual(http_pool._http_clients, {})
+
+    def test_request_counter_tracks_in_flight(self):
+        import gc
+        import types
+        from ouroboros.http_pool import _RequestCounter
+
+        class _Request:
+            pass
+
+        counter = _RequestCounter()
+        ok, failed = _Request(), _Request()
+        counter.on_request(ok)
+        counter.on_request(failed)
+        self.assertEqual(counter.stats(), {"in_flight": 2, "requests": 2, "responses": 0})
+        counter.on_response(types.SimpleNamespace(request=ok))
+        del failed  # raised before a response: no hook, but it is not kept alive
+        gc.collect()
+        self.assertEqual(counter.stats(), {"in_flight": 0, "requests": 2, "responses": 1})
+
+    @unittest.skipUnless(HAS_HTTPX, "needs httpx")
+    def test_one_client_per_host(self):
+        from ouroboros.http_pool import get_http_client, pool_stats
+        a = get_http_client("https://openrouter.ai/api/v1")
+        b = get_http_client("https://openrouter.ai/api/v1/chat/completions")
+        self.assertIs(a, b)
+        self.assertEqual(pool_stats()["https://openrouter.ai"], {"in_flight": 0, "requests": 0, "responses": 0})
+
+    @unittest.skipUnless(HAS_HTTPX and HAS_OPENAI, "needs httpx and openai")
+    def test_llm_clients_share_transport(self):
+        from ouroboros.llm import LLMClient, _PROVIDERS
+        cfg = _PROVIDERS["_default"]
+        old = os.environ.get(cfg["key_env"])
+        os.environ[cfg["key_env"]] = "test-key"
+        try:
+            self.assertIs(LLMClient()._get_client(cfg), LLMClient()._get_client(cfg))
+        finally:
+            if old is None:
+                os.environ.pop(cfg["key_env"], None)
+            else:
+                os.environ[cfg["key_env"]] = old
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Tests for the auxiliary LLM response cache (ouroboros/llm_cache.py).
+
+Run: pytest tests/test_llm_cache.py -v
+"""
+
+import asyncio
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, messages, model, **params):
+        self.calls += 1
+        return ({"role": "assistant", "content": f"answer {self.calls}"},
+                {"prompt_tokens": 100, "completion_tokens": 5, "cost": 0.002})
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.dir = pathlib.Path(self._tmpdir.name) / "cache" / "llm"
+        from ouroboros.llm_cache import response_cache
+        self.cache = response_cache
+        self.cache.set_cache_dir(self.dir)
+        self._env = {k: os.environ.pop(k, None) for k in ("OUROBOROS_LLM_CACHE", "OUROBOROS_LLM_CACHE_OFF")}
+
+    def tearDown(self):
+        self.cache.set_cache_dir(None)
+        for k, v in self._env.items():
+            if v is not None:
+                os.environ[k] = v
+            else:
+                os.environ.pop(k, None)
+        self._tmpdir.cleanup()
+
+    def _ask(self, llm, text="Is this a duplicate?", site="dedup", **kw):
+        from ouroboros.llm_cache import cached_chat
+        return cached_chat(llm, site, [{"role": "user", "content": text}], "google/gemini-2.0-flash",
+                           max_tokens=50, **kw)
+
+    def test_hit_is_free_and_normalized(self):
+        llm = _FakeLLM()
+        msg1, usage1 = self._ask(llm)
+        msg2, usage2 = self._ask(llm, text="  Is this a duplicate?\n")
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual(msg1["content"], msg2["content"])
+        self.assertFalse(usage1["cache_hit"])
+        self.assertEqual((usage2["cost"], usage2["prompt_tokens"], usage2["rounds"]), (0.0, 0, 0))
+        self.assertTrue(usage2["cache_hit"])
+        self.assertAlmostEqual(usage2["saved_cost"], 0.002)
+        self.assertEqual(self.cache.stats()["dedup"]["hits"], 1)
+        self._ask(llm, text="Something else")
+        self.assertEqual(llm.calls, 2)
+
+    def test_disk_shared_and_ttl(self):
+        llm = _FakeLLM()
+        self._ask(llm)
+        self.cache.clear_memory()  # as seen from another process
+        self._ask(llm)
+        self.assertEqual(llm.calls, 1)
+        self.cache.clear_memory()
+        old_ttl = self.cache.ttl_sec
+        self.cache.ttl_sec = 0.0
+        try:
+            self._ask(llm)
+        finally:
+            self.cache.ttl_sec = old_ttl
+        self.assertEqual(llm.calls, 2)
+
+    def test_opt_out(self):
+        llm = _FakeLLM()
+        self._ask(llm, use_cache=False)
+        self._ask(llm, use_cache=False)
+        os.environ["OUROBOROS_LLM_CACHE_OFF"] = "compaction,dedup"
+        self._ask(llm)
+        self._ask(llm)
+        self.assertEqual(llm.calls, 4)
+        self._ask(llm, site="dialogue_summary")
+        self._ask(llm, site="dialogue_summary")
+        self.assertEqual(llm.calls, 5)
+
+    def test_disk_size_bound(self):
+        from ouroboros.llm_cache import LLMResponseCache
+        cache = LLMResponseCache(cache_dir=self.dir, max_bytes=3000)
+        for i in range(20):
+            cache.put(f"k{i}", {"content": "x" * 400})
+            time.sleep(0.002)
+        files = list(self.dir.glob("*.json"))
+        self.assertLessEqual(sum(p.stat().st_size for p in files), 3000)
+        self.assertTrue((self.dir / "k19.json").exists())
+        self.assertFalse((self.dir / "k0.json").exists())
+
+    def test_puts_do_not_rescan_the_directory(self):
+        from ouroboros import llm_cache
+        cache = llm_cache.LLMResponseCache(cache_dir=self.dir, max_bytes=10**6)
+        with mock.patch.object(cache, "_prune_disk", wraps=cache._prune_disk) as prune:
+            for i in range(llm_cache.PRUNE_EVERY_PUTS + 1):
+                cache.put(f"k{i}", {"content": "x"})
+        self.assertEqual(prune.call_count, 2)  # first put seeds the total; then once per PRUNE_EVERY_PUTS
+
+    def test_default_dir_follows_configured_drive_root(self):
+        from ouroboros.llm_cache import LLMResponseCache
+        drive = pathlib.Path(self._tmpdir.name) / "drive"
+        cache = LLMResponseCache()
+        with mock.patch.dict(os.environ, {"DRIVE_ROOT": str(drive)}):
+            cache.put("k", {"content": "x"})
+            self.assertFalse(drive.exists())  # not mounted: memory only
+            drive.mkdir()
+            cache.put("k", {"content": "x"})
+        self.assertTrue((drive / "cache" / "llm" / "k.json").exists())
+
+    def test_review_served_from_cache(self):
+        from ouroboros.llm_cache import cache_key
+        from ouroboros.tools.review import _query_model
+        messages = [{"role": "system", "content": "review"}, {"role": "user", "content": "code"}]
+        data = {"choices": [{"message": {"content": "PASS"}}], "usage": {"cost": 0.05}}
+        self.cache.put(cache_key("openai/o3", messages, {"temperature": 0.2}), {"data": data, "headers": {}})
+        got = asyncio.run(_query_model(None, "openai/o3", messages, "key", asyncio.Semaphore(1), True))
+        self.assertEqual(got, ("openai/o3", data, {}, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Tests for streamed completions: tool-call assembly in LLMClient and early
+dispatch of read-only tools in the loop.
+
+Run: pytest tests/test_llm_stream.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _chunk(content=None, tool_calls=None, finish=None, usage=None):
+    delta = {}
+    if content is not None:
+        delta["content"] = content
+    if tool_calls is not None:
+        delta["tool_calls"] = tool_calls
+    return {"id": "gen-1", "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            "usage": usage}
+
+
+def _frag(index, id=None, name=None, arguments=""):
+    fn = {"arguments": arguments}
+    if name:
+        fn["name"] = name
+    return {"index": index, "id": id, "function": fn}
+
+
+STREAM = [
+    _chunk(content="Reading "),
+    _chunk(content="files."),
+    _chunk(tool_calls=[_frag(0, "call_a", "repo_read", '{"path": ')]),
+    _chunk(tool_calls=[_frag(0, arguments='"a.py"}')]),
+    _chunk(tool_calls=[_frag(1, "call_b", "repo_list", '{"dir": "."}')]),
+    _chunk(finish="tool_calls"),
+    {"id": "gen-1", "choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 5, "cost": 0.01}},
+]
+
+
+class TestAssembleStream(unittest.TestCase):
+
+    def test_assembles_message_and_usage(self):
+        from ouroboros.llm import _assemble_stream
+        resp = _assemble_stream(iter(STREAM))
+        msg = resp["choices"][0]["message"]
+        self.assertEqual(msg["content"], "Reading files.")
+        self.assertEqual([tc["id"] for tc in msg["tool_calls"]], ["call_a", "call_b"])
+        self.assertEqual(json.loads(msg["tool_calls"][0]["function"]["arguments"]), {"path": "a.py"})
+        self.assertEqual(resp["usage"]["cost"], 0.01)
+        self.assertEqual(resp["choices"][0]["finish_reason"], "tool_calls")
+
+    def test_tool_call_announced_when_complete(self):
+        from ouroboros.llm import _assemble_stream
+        seen = []
+
+        def on_tool_call(tc):
+            seen.append((tc["id"], tc["function"]["arguments"], consumed[0]))
+
+        consumed = [0]
+
+        def chunks():
+            for c in STREAM:
+                consumed[0] += 1
+                yield c
+
+        _assemble_stream(chunks(), on_tool_call=on_tool_call)
+        # call_a fires when call_b starts (5th chunk), before the stream ends.
+        self.assertEqual(seen, [("call_a", '{"path": "a.py"}', 5), ("call_b", '{"dir": "."}', 7)])
+
+    def test_chat_stream_returns_same_shape(self):
+        from ouroboros.llm import LLMClient, _PROVIDERS
+
+        class FakeCompletions:
+            def __init__(self):
+                self.kwargs = None
+
+            def create(self, **kwargs):
+                self.kwargs = kwargs
+                return iter(STREAM)
+
+        completions = FakeCompletions()
+        fake = type("Client", (), {"chat": type("Chat", (), {"completions": completions})()})()
+        llm = LLMClient()
+        llm._clients[_PROVIDERS["_default"]["base_url"]] = fake
+        deltas = []
+        msg, usage = llm.chat([{"role": "user", "content": "hi"}], "anthropic/claude-sonnet-4.6",
+                              stream=True, on_text_delta=deltas.append)
+        self.assertTrue(completions.kwargs["stream"])
+        self.assertEqual(completions.kwargs["stream_options"], {"include_usage": True})
+        self.assertEqual("".join(deltas), msg["content"])
+        self.assertEqual(len(msg["tool_calls"]), 2)
+        self.assertEqual(usage["cost"], 0.01)
+
+
+class _FakeTools:
+    CODE_TOOLS = frozenset()
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def execute(self, name, args):
+        with self._lock:
+            self.calls.append((name, args))
+        return f"{name} ok"
+
+    def get_timeout(self, name):
+        return 5
+
+    def is_read_only(self, name):
+        return name in ("repo_read", "repo_list")
+
+    can_start_early = is_read_only
+
+    def access(self, name, args):
+        return ("read", ("repo",)) if self.is_read_only(name) else ("exclusive", ())
+
+
+class TestEarlyDispatch(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.logs = pathlib.Path(self._tmpdir.name) / "logs"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _dispatcher(self, tools, **kw):
+        from ouroboros.loop import _execute_single_tool
+        from ouroboros.stream_dispatch import EarlyToolDispatcher
+        return EarlyToolDispatcher(
+            run_tool=lambda tc: _execute_single_tool(tools, tc, self.logs, "t1"),
+            can_start_early=tools.can_start_early, **kw)
+
+    def test_reads_run_once_and_results_keep_order(self):
+        from ouroboros.llm import _assemble_stream
+        from ouroboros.loop import _handle_tool_calls
+        tools = _FakeTools()
+        dispatcher = self._dispatcher(tools)
+        stream = STREAM[:5] + [_chunk(tool_calls=[_frag(2, "call_c", "run_shell", '{"cmd": "ls"}')])]
+        msg = _assemble_stream(iter(stream), on_tool_call=dispatcher.on_tool_call)["choices"][0]["message"]
+        self.assertEqual(dispatcher.dispatched, 2)
+        messages = []
+        trace = {"tool_calls": []}
+        _handle_tool_calls(msg["tool_calls"], tools, self.logs, "t1", None, messages, trace,
+                           lambda _t: None, prefetched=dispatcher)
+        dispatcher.shutdown()
+        self.assertEqual(dispatcher.reused, 2)
+        self.assertEqual(sorted(c[0] for c in tools.calls), ["repo_list", "repo_read", "run_shell"])
+        self.assertEqual([m["tool_call_id"] for m in messages], ["call_a", "call_b", "call_c"])
+
+    def test_reads_after_a_write_wait(self):
+        tools = _FakeTools()
+        dispatcher = self._dispatcher(tools)
+        dispatcher.on_tool_call({"id": "w", "function": {"name": "run_shell", "arguments": "{}"}})
+        dispatcher.on_tool_call({"id": "r", "function": {"name": "repo_read", "arguments": "{}"}})
+        self.assertEqual(dispatcher.dispatched, 0)
+        dispatcher.reset()
+        dispatcher.on_tool_call({"id": "r", "function": {"name": "repo_read", "arguments": "{}"}})
+        self.assertEqual(dispatcher.dispatched, 1)
+        # Final arguments differ from what was started: the early result is not used.
+        self.assertIsNone(dispatcher.take({"id": "r", "function": {"name": "repo_read", "arguments": '{"x": 1}'}}))
+        dispatcher.shutdown()
+
+    def test_retry_reuses_started_calls(self):
+        import threading
+        release = threading.Event()
+        tools = _FakeTools()
+        execute = tools.execute
+        tools.execute = lambda name, args: (release.wait(5), execute(name, args))[1]
+        dispatcher = self._dispatcher(tools)
+        dispatcher.on_tool_call({"id": "a1", "function": {"name": "repo_read", "arguments": '{"path": "x"}'}})
+        time.sleep(0.2)  # the runner has picked it up
+        dispatcher.reset()  # the stream failed and is retried
+        dispatcher.on_tool_call({"id": "b1", "function": {"name": "repo_read", "arguments": '{"path": "x"}'}})
+        self.assertEqual(dispatcher.dispatched, 1)
+        release.set()
+        future = dispatcher.take({"id": "b1", "function": {"name": "repo_read", "arguments": '{"path": "x"}'}})
+        self.assertIsNotNone(future)
+        future.result(timeout=5)
+        self.assertEqual(tools.calls, [("repo_read", {"path": "x"})])
+        dispatcher.new_round()
+        self.assertIsNone(dispatcher.take({"id": "c1", "function": {"name": "repo_read", "arguments": '{"path": "x"}'}}))
+        dispatcher.shutdown()
+
+    def test_partial_text_progress(self):
+        sent = []
+        dispatcher = self._dispatcher(_FakeTools(), emit_progress=sent.append, progress_interval_sec=0)
+        dispatcher.on_text_delta("Failed attempt.\n\nmore")
+        dispatcher.reset()  # retried: nothing of the failed attempt reaches the owner
+        for delta in ["First para", "graph.\n\nSecond ", "one.\n\nTail"]:
+            dispatcher.on_text_delta(delta)
+        self.assertEqual(sent, [])
+        dispatcher.commit()
+        self.assertEqual(sent, ["First paragraph.", "Second one."])
+        content = "First paragraph.\n\nSecond one.\n\nTail"
+        self.assertEqual(dispatcher.unsent_text(content).strip(), "Tail")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Tests for the columnar log archive (ouroboros/log_columns.py).
+
+Run: pytest tests/test_log_columns.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+from collections import Counter
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _usage(i):
+    return {
+        "ts": f"2026-03-0{1 + i % 3}T12:00:00Z", "type": "llm_usage",
+        "model": ["m/a", "m/b"][i % 2], "category": "task", "task_id": f"t{i % 4}",
+        "prompt_tokens": 100, "completion_tokens": 10, "cached_tokens": i % 5, "cost": 0.5,
+    }
+
+
+def _json_costs(events):
+    """Reference: per-model costs and tasks by last activity, straight from JSON records."""
+    models, tasks = {}, {}
+    for e in events:
+        if e.get("type") not in ("llm_usage", "llm_cost_reconciled"):
+            continue
+        model, tid = e.get("model") or "unknown", e.get("task_id") or "unknown"
+        if e["type"] == "llm_cost_reconciled":
+            if model in models:
+                models[model]["cost"] += e["cost"]
+            if tid in tasks:
+                tasks[tid]["cost"] += e["cost"]
+            continue
+        m = models.setdefault(model, {"cost": 0.0, "calls": 0, "prompt_tokens": 0,
+                                      "completion_tokens": 0, "cached_tokens": 0})
+        m["cost"] += e["cost"]
+        m["calls"] += 1
+        for k in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+            m[k] += e[k]
+        t = tasks.pop(tid, None) or {"task_id": tid, "cost": 0.0, "rounds": 0, "model": model}
+        t["cost"] += e["cost"]
+        t["rounds"] += 1
+        tasks[tid] = t  # re-inserted: dict order is last activity
+    return models, list(reversed(list(tasks.values())))
+
+
+class TestLogColumns(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.logs = pathlib.Path(self._tmpdir.name) / "logs"
+        self.logs.mkdir()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _append(self, name, records):
+        with (self.logs / name).open("a", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec) + "\n")
+
+    def _fill(self):
+        from ouroboros.segmented_log import SegmentedLog
+        events = SegmentedLog(self.logs, "events.jsonl", max_bytes=1, max_age_sec=0)
+        tools = SegmentedLog(self.logs, "tools.jsonl", max_bytes=1, max_age_sec=0)
+        for batch in range(3):
+            self._append("events.jsonl", [_usage(batch * 10 + i) for i in range(10)])
+            self._append("events.jsonl", [{"ts": "2026-03-01T00:00:00Z", "type": "task_done"}])
+            self._append("tools.jsonl", [
+                {"ts": "2026-03-01T00:00:00Z", "tool": "repo_read", "result_preview": "ok"},
+                {"ts": "2026-03-01T00:00:00Z", "tool": "run_shell", "result_preview": "⚠️ boom"},
+            ])
+            if batch < 2:
+                events.maybe_rotate()
+                tools.maybe_rotate()
+        events.compress_sealed(now=time.time() + 3600)
+
+    def test_compaction_and_group_by(self):
+        from ouroboros.log_columns import LogColumns, compact_sealed, needs_compaction
+        self._fill()
+        self.assertTrue(needs_compaction(self.logs))
+        self.assertEqual(compact_sealed(self.logs), 4)
+        self.assertFalse(needs_compaction(self.logs))
+        self.assertEqual(compact_sealed(self.logs), 0)
+
+        cols = LogColumns(self.logs)
+        by_model = cols.group_by("llm", "model", sums=("cost", "prompt_tokens", "cached_tokens"))
+        self.assertEqual(by_model["m/a"]["count"], 15)
+        self.assertAlmostEqual(by_model["m/a"]["cost"] + by_model["m/b"]["cost"], 15.0)
+        self.assertEqual(by_model["m/b"]["prompt_tokens"], 1500)
+        self.assertEqual(sum(v["cached_tokens"] for v in by_model.values()),
+                         sum(i % 5 for i in range(30)))
+
+        day2 = cols.group_by("llm", "task", since=1772409600.0)  # 2026-03-02T00:00Z
+        self.assertEqual(sum(v["count"] for v in day2.values()), 20)
+        self.assertEqual(cols.group_by("events", "type")["task_done"]["count"], 3)
+        tools = cols.group_by("tools", "tool", sums=("error",))
+        self.assertEqual(tools["run_shell"], {"count": 3, "error": 3})
+        self.assertEqual(tools["repo_read"]["error"], 0)
+        archived = cols.group_by("tools", "tool", include_live=False)
+        self.assertEqual(archived["repo_read"]["count"], 2)
+
+    def test_uncompacted_segments_are_still_counted(self):
+        from ouroboros.log_columns import LogColumns
+        self._fill()
+        by_cat = LogColumns(self.logs).group_by("llm", "category", sums=("cost",))
+        self.assertEqual(by_cat, {"task": {"count": 30, "cost": 15.0}})
+
+    def test_live_tail_is_parsed_incrementally(self):
+        from ouroboros import log_columns
+        self._append("events.jsonl", [_usage(i) for i in range(4)])
+        cols = log_columns.LogColumns(self.logs)
+        self.assertEqual(cols.group_by("llm", "category")["task"]["count"], 4)
+        self._append("events.jsonl", [_usage(4)])
+        with mock.patch.object(log_columns, "_parse_lines", wraps=log_columns._parse_lines) as parse:
+            self.assertEqual(cols.group_by("llm", "category")["task"]["count"], 5)
+        self.assertEqual(parse.call_count, 1)  # only the appended line
+
+    def test_columnar_analytics_match_json_path(self):
+        import supervisor.state as state
+        from ouroboros.log_columns import compact_sealed
+        from ouroboros.memory import Memory
+        from ouroboros.segmented_log import SegmentedLog
+        drive = self.logs.parent
+        events = SegmentedLog(self.logs, "events.jsonl", max_bytes=1, max_age_sec=0)
+        for batch in range(3):
+            recs = []
+            for i in range(batch * 12, batch * 12 + 12):
+                rec = _usage(i)
+                rec.update(ts=f"2026-03-01T{i // 60:02d}:{i % 60:02d}:00Z", task_id=f"t{i % 7}",
+                           model=["m/a", "m/b", "m/c"][(i // 5) % 3], cost=0.25 * (i % 4))
+                recs.append(rec)
+            recs.append({"ts": "2026-03-01T05:00:00Z", "type": "llm_cost_reconciled",
+                         "model": "m/a", "task_id": "t1", "category": "task", "cost": 0.25})
+            recs.append({"ts": "2026-03-01T05:00:00Z", "type": "tool_error", "task_id": "t2", "error": "x"})
+            self._append("events.jsonl", recs)
+            if batch < 2:
+                events.maybe_rotate()
+        events.compress_sealed(now=time.time() + 3600)
+        compact_sealed(self.logs)
+        self._append("events.jsonl", [{"ts": "2026-03-01T06:00:00Z", "type": "task_done", "task_id": "t2"}])
+
+        all_events = []
+        for seg in events.segments():
+            with events.open(seg) as f:
+                all_events += [json.loads(line) for line in f]
+        all_events += [json.loads(line) for line in events.live_path.read_text(encoding="utf-8").splitlines()]
+        models, tasks = _json_costs(all_events)
+
+        def rounded(rows):
+            return [{k: round(v, 9) if k == "cost" else v for k, v in row.items()} for row in rows]
+
+        with mock.patch.object(state, "DRIVE_ROOT", drive):
+            columnar = state.model_breakdown({})
+            self.assertEqual(sorted(columnar), sorted(models))
+            for model in models:
+                self.assertEqual(rounded([columnar[model]]), rounded([models[model]]))
+            for max_tasks, recent in ((10, 50), (3, 4)):
+                expected = sorted(tasks[:recent], key=lambda t: t["cost"], reverse=True)[:max_tasks]
+                self.assertEqual(rounded(state.per_task_cost_summary(max_tasks, recent)), rounded(expected))
+
+        memory = Memory(drive_root=drive)
+        self.assertEqual(memory.event_type_counts("t2"),
+                         Counter(e["type"] for e in all_events if e.get("task_id") == "t2"))
+
+    def test_recent_tasks_stop_at_older_chunks(self):
+        from ouroboros import log_columns
+        from ouroboros.segmented_log import SegmentedLog
+        events = SegmentedLog(self.logs, "events.jsonl", max_bytes=1, max_age_sec=0)
+        for batch in range(4):  # one task per segment
+            self._append("events.jsonl", [dict(_usage(i), task_id=f"b{batch}",
+                                               ts=f"2026-03-0{batch + 1}T00:00:0{i}Z") for i in range(3)])
+            events.maybe_rotate()
+        log_columns.compact_sealed(self.logs)
+        with mock.patch.object(log_columns, "_read_chunk", wraps=log_columns._read_chunk) as read:
+            tasks = log_columns.recent_task_costs(self.logs, max_tasks=5, recent_tasks=2)
+        self.assertEqual(sorted(t["task_id"] for t in tasks), ["b2", "b3"])
+        self.assertEqual(read.call_count, 3)  # b3, b2, then one chunk without them
+
+    def test_watermark_skips_compacted_chunks(self):
+        from ouroboros import log_columns
+        self._fill()
+        log_columns.compact_sealed(self.logs)
+        with mock.patch.object(log_columns, "_chunk_current", wraps=log_columns._chunk_current) as check:
+            self.assertFalse(log_columns.needs_compaction(self.logs))
+        self.assertEqual(check.call_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
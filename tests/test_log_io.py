@@ -0,0 +1,323 @@
+"""
+Tests for JSONL log I/O: backward tail reading, batched appends,
+segmented rotation.
+
+Run: pytest tests/test_log_io.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _write_records(path, n, start=0, pad=0):
+    with path.open("a", encoding="utf-8") as f:
+        for i in range(start, start + n):
+            f.write(json.dumps({"i": i, "pad": "x" * pad}) + "\n")
+
+
+class TestTailReader(unittest.TestCase):
+    """tail_lines / read_jsonl_tail read from EOF backwards."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_tail_matches_full_read(self):
+        from ouroboros.utils import read_jsonl_tail
+        path = self.root / "events.jsonl"
+        _write_records(path, 1000, pad=37)
+        for n in (1, 7, 200, 999, 1000, 5000):
+            for block in (16, 100, 4096):
+                got = [e["i"] for e in read_jsonl_tail(path, n, block_size=block)]
+                self.assertEqual(got, list(range(max(0, 1000 - n), 1000)), (n, block))
+
+    def test_partial_and_blank_lines(self):
+        from ouroboros.utils import tail_lines
+        path = self.root / "x.jsonl"
+        path.write_text("a\n\n\nb\nc\n\n", encoding="utf-8")
+        self.assertEqual(tail_lines(path, 2, block_size=2), ["b", "c"])
+        self.assertEqual(tail_lines(path, 10, block_size=2), ["a", "b", "c"])
+        path.write_text("a\nb\nunterminated", encoding="utf-8")
+        self.assertEqual(tail_lines(path, 2), ["b", "unterminated"])
+
+    def test_missing_and_empty(self):
+        from ouroboros.utils import tail_lines
+        self.assertEqual(tail_lines(self.root / "nope.jsonl", 5), [])
+        (self.root / "empty.jsonl").write_text("", encoding="utf-8")
+        self.assertEqual(tail_lines(self.root / "empty.jsonl", 5), [])
+
+    def test_bad_json_skipped(self):
+        from ouroboros.utils import read_jsonl_tail
+        path = self.root / "x.jsonl"
+        path.write_text('{"i": 1}\nnot json\n{"i": 2}\n', encoding="utf-8")
+        self.assertEqual(read_jsonl_tail(path, 3), [{"i": 1}, {"i": 2}])
+
+    def test_memory_chat_history_offset(self):
+        from ouroboros.memory import Memory
+        mem = Memory(drive_root=self.root)
+        path = mem.logs_path("chat.jsonl")
+        path.parent.mkdir(parents=True)
+        with path.open("w", encoding="utf-8") as f:
+            for i in range(50):
+                f.write(json.dumps({"ts": "", "direction": "in", "text": f"msg{i}"}) + "\n")
+        out = mem.chat_history(count=3, offset=10)
+        self.assertIn("Showing 3 messages", out)
+        self.assertIn("msg37", out)
+        self.assertIn("msg39", out)
+        self.assertNotIn("msg40", out)
+
+    def test_tail_time_independent_of_file_size(self):
+        """Benchmark: tail of a ~40MB log costs about the same as of a small one."""
+        from ouroboros.utils import read_jsonl_tail
+        small = self.root / "small.jsonl"
+        big = self.root / "big.jsonl"
+        _write_records(small, 400, pad=200)
+        line = (json.dumps({"i": 0, "pad": "x" * 200}) + "\n").encode()
+        with big.open("wb") as f:
+            f.write(line * 200_000)
+
+        def best_of(path, runs=5):
+            best = float("inf")
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                self.assertEqual(len(read_jsonl_tail(path, 200)), 200)
+                best = min(best, time.perf_counter() - t0)
+            return best
+
+        t_small = best_of(small)
+        t_big = best_of(big)
+        self.assertGreater(big.stat().st_size, 100 * small.stat().st_size)
+        # Same amount of work: allow generous jitter but nothing near the 100x size ratio.
+        self.assertLess(t_big, max(t_small * 10, 0.02))
+
+
+class TestJsonlSink(unittest.TestCase):
+    """append_jsonl batches through a background writer per file."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmpdir.name) / "logs" / "events.jsonl"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _records(self):
+        return [json.loads(ln) for ln in self.path.read_text(encoding="utf-8").splitlines()]
+
+    def test_threads_then_flush(self):
+        import threading
+        from ouroboros.utils import append_jsonl, flush_jsonl
+
+        def writer(t):
+            for i in range(300):
+                append_jsonl(self.path, {"t": t, "i": i})
+
+        threads = [threading.Thread(target=writer, args=(t,)) for t in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        flush_jsonl(self.path)
+        records = self._records()
+        self.assertEqual(len(records), 1200)
+        for t in range(4):
+            self.assertEqual([r["i"] for r in records if r["t"] == t], list(range(300)))
+
+    def test_full_queue_keeps_order(self):
+        import threading
+        from unittest import mock
+        from ouroboros import utils
+        write = utils._write_jsonl_batch
+        release = threading.Event()
+
+        def stalled_writer(path, data):
+            if threading.current_thread().name.startswith("jsonl-sink"):
+                release.wait(5)
+            write(path, data)
+
+        timer = threading.Timer(1.5, release.set)  # past the old 1 s put timeout
+        timer.start()
+        with mock.patch.object(utils, "JSONL_QUEUE_MAX", 2), \
+                mock.patch.object(utils, "JSONL_FLUSH_INTERVAL_SEC", 0.0), \
+                mock.patch.object(utils, "_write_jsonl_batch", side_effect=stalled_writer):
+            for i in range(10):
+                utils.append_jsonl(self.path, {"i": i})
+            utils.flush_jsonl(self.path)
+        timer.join()
+        self.assertEqual([r["i"] for r in self._records()], list(range(10)))
+
+    def test_tail_sees_own_pending_writes(self):
+        from ouroboros.utils import append_jsonl, read_jsonl_tail
+        for i in range(5):
+            append_jsonl(self.path, {"i": i})
+        self.assertEqual([e["i"] for e in read_jsonl_tail(self.path, 2)], [3, 4])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_forked_writers_do_not_interleave(self):
+        from ouroboros.utils import append_jsonl, flush_jsonl
+        append_jsonl(self.path, {"p": "parent", "i": -1})
+        pids = []
+        for p in range(3):
+            pid = os.fork()
+            if pid == 0:  # child
+                try:
+                    for i in range(200):
+                        append_jsonl(self.path, {"p": p, "i": i, "pad": "x" * 500})
+                    flush_jsonl()
+                finally:
+                    os._exit(0)
+            pids.append(pid)
+        for pid in pids:
+            os.waitpid(pid, 0)
+        flush_jsonl()
+        records = self._records()  # every line parses: no torn writes
+        self.assertEqual(len(records), 601)
+        for p in range(3):
+            self.assertEqual([r["i"] for r in records if r["p"] == p], list(range(200)))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_sigterm_flushes_pending_records(self):
+        import signal
+        from ouroboros import utils
+        pid = os.fork()
+        if pid == 0:  # child: records sit in the sink until the flush interval
+            try:
+                utils.install_sigterm_flush()
+                for i in range(50):
+                    utils.append_jsonl(self.path, {"i": i})
+                os.kill(os.getpid(), signal.SIGTERM)
+                time.sleep(5)
+            finally:
+                os._exit(1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 128 + signal.SIGTERM)
+        self.assertEqual([r["i"] for r in self._records()], list(range(50)))
+
+
+class TestTaskSidecar(unittest.TestCase):
+    """Records carrying a task_id are mirrored into logs/tasks/<id>/."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.logs = pathlib.Path(self._tmpdir.name) / "logs"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_sidecar_holds_only_task_records(self):
+        from ouroboros.utils import append_jsonl, read_task_log_tail, task_log_path
+        events = self.logs / "events.jsonl"
+        for i in range(300):
+            append_jsonl(events, {"i": i, "task_id": "busy" if i % 10 else "quiet"})
+        append_jsonl(events, {"i": -1})  # no task_id: main log only
+        got = read_task_log_tail(self.logs, "quiet", "events.jsonl", 200)
+        self.assertEqual([e["i"] for e in got], list(range(0, 300, 10)))
+        self.assertEqual(len(read_task_log_tail(self.logs, "busy", "events.jsonl", 5)), 5)
+        self.assertEqual(read_task_log_tail(self.logs, "missing", "events.jsonl", 5), [])
+        self.assertEqual(len(events.read_text(encoding="utf-8").splitlines()), 301)
+        self.assertFalse(task_log_path(self.logs, "quiet", "chat.jsonl").exists())
+
+    def test_only_indexed_logs_get_sidecars(self):
+        from ouroboros.utils import append_jsonl, flush_jsonl
+        append_jsonl(self.logs / "chat.jsonl", {"task_id": "t1", "text": "hi"})
+        append_jsonl(self.logs.parent / "other" / "events.jsonl", {"task_id": "t1"})
+        flush_jsonl()
+        self.assertFalse((self.logs / "tasks").exists())
+
+    def test_memory_read_task_tail_and_prune(self):
+        from ouroboros.memory import Memory
+        from ouroboros.segmented_log import prune_task_logs
+        from ouroboros.utils import append_jsonl
+        mem = Memory(drive_root=self.logs.parent)
+        append_jsonl(mem.logs_path("tools.jsonl"), {"task_id": "t1", "tool": "repo_read"})
+        append_jsonl(mem.logs_path("tools.jsonl"), {"task_id": "t2", "tool": "run_shell"})
+        self.assertEqual([e["tool"] for e in mem.read_task_tail("tools.jsonl", "t2")], ["run_shell"])
+        self.assertEqual(prune_task_logs(self.logs, max_age_sec=3600), 0)
+        self.assertEqual(prune_task_logs(self.logs, max_age_sec=3600, now=time.time() + 7200), 2)
+        self.assertEqual(mem.read_task_tail("tools.jsonl", "t1"), [])
+
+
+class TestSegmentedLog(unittest.TestCase):
+    """Rename-based rotation, compression and cross-segment reading."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.logs = pathlib.Path(self._tmpdir.name) / "logs"
+        self.logs.mkdir()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _log(self, **kw):
+        from ouroboros.segmented_log import SegmentedLog
+        return SegmentedLog(self.logs, "events.jsonl", **kw)
+
+    def test_rotate_compress_and_iterate(self):
+        slog = self._log(max_bytes=200, max_age_sec=0)
+        n = 0
+        for _ in range(4):
+            _write_records(slog.live_path, 10, start=n, pad=20)
+            n += 10
+            self.assertIsNotNone(slog.maybe_rotate())
+        _write_records(slog.live_path, 3, start=n)
+        n += 3
+        self.assertEqual(len(slog.segments()), 4)
+        self.assertEqual(slog.compress_sealed(now=time.time() + 3600), 4)
+        self.assertTrue(all(s["compressed"] for s in slog.segments()))
+        self.assertEqual(sorted(p.name for p in slog.seg_dir.glob("*.jsonl")), [])
+
+        self.assertEqual([r["i"] for r in slog.iter_records()], list(range(n)))
+        self.assertEqual([r["i"] for r in slog.iter_records(reverse=True)], list(range(n))[::-1])
+        self.assertEqual([r["i"] for r in slog.tail(15)], list(range(n - 15, n)))
+
+    def test_reader_with_stale_manifest_follows_compression(self):
+        slog = self._log(max_bytes=1, max_age_sec=0)
+        _write_records(slog.live_path, 20, pad=10)
+        slog.maybe_rotate()
+        stale = slog.segments()  # loaded before compression
+        slog.compress_sealed(now=time.time() + 3600)
+        self.assertFalse(slog.segment_path(stale[0]).exists())
+        self.assertEqual(len(list(slog._segment_lines(dict(stale[0])))), 20)
+        self.assertEqual([r["i"] for r in slog._segment_tail(dict(stale[0]), 3)], [17, 18, 19])
+
+    def test_time_based_rotation(self):
+        slog = self._log(max_bytes=10 ** 9, max_age_sec=60)
+        _write_records(slog.live_path, 2)
+        self.assertIsNone(slog.maybe_rotate(now=1000.0))  # starts the clock
+        self.assertIsNone(slog.maybe_rotate(now=1030.0))
+        self.assertIsNotNone(slog.maybe_rotate(now=1061.0))
+        self.assertFalse(slog.live_path.exists())
+
+    def test_cost_rollup_follows_rename_rotation(self):
+        import supervisor.cost_rollup as cr
+        cr._cache.update({"path": None, "mtime_ns": None, "data": None})
+        root = self.logs.parent
+        slog = self._log(max_bytes=1, max_age_sec=0)
+
+        def usage(cost):
+            with slog.live_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"type": "llm_usage", "category": "task", "cost": cost}) + "\n")
+
+        usage(1.0)
+        self.assertEqual(cr.category_costs(root), {"task": 1.0})
+        usage(2.0)  # not yet consumed when the file is sealed
+        slog.maybe_rotate()
+        usage(4.0)
+        slog.maybe_rotate()
+        slog.compress_sealed(now=time.time() + 3600)
+        usage(8.0)
+        self.assertEqual(cr.category_costs(root), {"task": 15.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -61,6 +61,37 @@ class TestOwnerInjectPerTask(unittest.TestCase):
         self.assertEqual(second_read, ["msg3"])
         self.assertIn("id3", seen)
 
+    def test_cursor_reads_only_appended_lines(self):
+        from ouroboros.owner_inject import (
+            MailboxCursor, write_owner_message, drain_owner_messages, _mailbox_path,
+        )
+        cursor = MailboxCursor()
+        self.assertEqual(drain_owner_messages(self.drive_root, "t1", cursor=cursor), [])
+        write_owner_message(self.drive_root, "msg1", task_id="t1", msg_id="id1")
+        self.assertEqual(drain_owner_messages(self.drive_root, "t1", cursor=cursor), ["msg1"])
+        self.assertEqual(drain_owner_messages(self.drive_root, "t1", cursor=cursor), [])
+
+        path = _mailbox_path(self.drive_root, "t1")
+        with path.open("a", encoding="utf-8") as f:
+            f.write('{"msg_id": "id2", "text": "ms')  # writer mid-line
+        self.assertEqual(drain_owner_messages(self.drive_root, "t1", cursor=cursor), [])
+        with path.open("a", encoding="utf-8") as f:
+            f.write('g2"}\n')
+        self.assertEqual(drain_owner_messages(self.drive_root, "t1", cursor=cursor), ["msg2"])
+        self.assertEqual(cursor.offset, path.stat().st_size)
+
+    def test_cursor_rescans_replaced_mailbox_without_duplicates(self):
+        from ouroboros.owner_inject import (
+            MailboxCursor, write_owner_message, drain_owner_messages, cleanup_task_mailbox,
+        )
+        cursor = MailboxCursor()
+        write_owner_message(self.drive_root, "old", task_id="t1", msg_id="id1")
+        drain_owner_messages(self.drive_root, "t1", cursor=cursor)
+        cleanup_task_mailbox(self.drive_root, "t1")
+        write_owner_message(self.drive_root, "old", task_id="t1", msg_id="id1")
+        write_owner_message(self.drive_root, "new", task_id="t1", msg_id="id2")
+        self.assertEqual(drain_owner_messages(self.drive_root, "t1", cursor=cursor), ["new"])
+
     def test_cleanup_removes_file(self):
         from ouroboros.owner_inject import write_owner_message, cleanup_task_mailbox, _mailbox_path
         write_owner_message(self.drive_root, "hello", task_id="t1", msg_id="m1")
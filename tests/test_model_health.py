@@ -0,0 +1,139 @@
+"""
+Tests for the shared model health registry (ouroboros/model_health.py)
+and health-aware fallback routing in run_llm_loop.
+
+Run: pytest tests/test_model_health.py -v
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class _FakeLLM:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def chat(self, messages, model, **kw):
+        self.calls.append(model)
+        if model in self.failing:
+            raise RuntimeError("HTTP 503 upstream unavailable")
+        return {"role": "assistant", "content": f"hello from {model}"}, {"cost": 0.001}
+
+
+class TestModelHealth(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        self.path = self.root / "state" / "model_health.json"
+        from ouroboros import model_health
+        self.mh = model_health
+        model_health.set_path(self.path)
+
+    def tearDown(self):
+        self.mh.set_path(None)
+        self._tmpdir.cleanup()
+
+    def test_circuit_opens_and_recovers(self):
+        mh = self.mh
+        for _ in range(mh.CONSECUTIVE_FAILURES - 1):
+            self.assertEqual(mh.record("a/m", False, 1.0), "closed")
+        self.assertEqual(mh.record("a/m", False, 1.0), "open")
+        self.assertFalse(mh.available("a/m"))
+
+        entry = mh._data["a/m"]
+        mh._update("a/m", lambda e, now: e.update(open_until=now - 1))  # cooldown elapsed
+        self.assertEqual(mh.state("a/m"), "half_open")
+        self.assertEqual(mh.record("a/m", False, 1.0), "open")  # failed probe reopens, longer
+        self.assertEqual(mh._data["a/m"]["cooldown"], 2 * entry["cooldown"])
+        mh._update("a/m", lambda e, now: e.update(open_until=now - 1))
+        self.assertEqual(mh.record("a/m", True, 0.5), "closed")
+        self.assertEqual(mh.model_stats("a/m")["samples"], 5)
+
+    def test_rate_limit_opens_immediately_and_is_shared(self):
+        self.assertEqual(self.mh.record("b/m", False, 0.2, rate_limited=True), "open")
+        # Another process sees the same file.
+        self.mh.set_path(self.path)
+        self.assertFalse(self.mh.available("b/m"))
+        self.assertEqual(self.mh.model_stats("b/m")["rate_limited"], 1)
+
+    def test_order_by_health_and_latency(self):
+        mh = self.mh
+        for _ in range(3):
+            mh.record("slow/m", True, 9.0)
+            mh.record("fast/m", True, 1.0)
+        mh.record("flaky/m", True, 1.0)
+        mh.record("flaky/m", False, 1.0)
+        mh.record("dead/m", False, 0.0, rate_limited=True)
+        order = mh.order_candidates(["new/m", "dead/m", "flaky/m", "slow/m", "fast/m"])
+        self.assertEqual(order, ["fast/m", "slow/m", "new/m", "flaky/m"])
+        self.assertEqual(mh.pick("dead/m", ["dead/m", "slow/m", "fast/m"]), "fast/m")
+        self.assertEqual(mh.pick("fast/m", ["slow/m"]), "fast/m")
+
+    def test_probe_claimed_once(self):
+        mh = self.mh
+        mh.record("c/m", False, 0.0, rate_limited=True)
+        mh._update("c/m", lambda e, now: e.update(open_until=now - 1))
+        self.assertTrue(mh._claim_probe("c/m"))
+        self.assertFalse(mh._claim_probe("c/m"))
+        reported = []
+        self.assertTrue(mh.probe(_FakeLLM(), "c/m", on_usage=lambda m, u: reported.append((m, u))))
+        self.assertEqual(mh.state("c/m"), "closed")
+        self.assertEqual(reported, [("c/m", {"cost": 0.001})])  # the probe's spend is not lost
+
+    def test_half_open_admits_one_caller(self):
+        mh = self.mh
+        mh.record("d/m", False, 0.0, rate_limited=True)
+        mh._update("d/m", lambda e, now: e.update(open_until=now - 1))
+        self.assertTrue(mh.available("d/m"))  # this caller probes
+        self.assertFalse(mh.available("d/m"))  # everyone else waits for its outcome
+        self.assertEqual(mh.pick("d/m", ["d/m", "e/m"]), "e/m")
+        mh.record("d/m", True, 0.3)
+        self.assertTrue(mh.available("d/m"))
+        self.assertTrue(mh.available("d/m"))
+
+    def test_open_primary_is_skipped_without_retries(self):
+        from ouroboros.loop import _call_fallbacks
+        mh = self.mh
+        mh.record("primary/m", False, 0.0, rate_limited=True)
+        mh.record("fb1/m", False, 0.0, rate_limited=True)
+        llm = _FakeLLM(failing={"fb2/m"})
+        progress = []
+        started = time.time()
+        msg, tried = _call_fallbacks(
+            llm, [{"role": "user", "content": "hi"}], "primary/m", ["fb1/m", "fb2/m", "fb3/m"],
+            None, "low", 3, self.root, "t1", 1, None, {}, "", None, progress.append, True,
+        )
+        self.assertLess(time.time() - started, 1.0)  # no backoff sleeps on fb2
+        self.assertEqual(msg["content"], "hello from fb3/m")
+        self.assertEqual(tried, ["fb2/m", "fb3/m"])
+        self.assertEqual(llm.calls, ["fb2/m", "fb3/m"])
+        self.assertIn("circuit is open", progress[0])
+        self.assertEqual(progress[1], "⚡ Fallback: primary/m → fb2/m (circuit open)")
+        self.assertEqual(mh.model_stats("fb3/m")["samples"], 1)
+
+    def test_background_probe_usage_is_emitted(self):
+        import queue
+        from ouroboros.loop import _call_fallbacks
+        mh = self.mh
+        mh.record("primary/m", False, 0.0, rate_limited=True)
+        mh._update("primary/m", lambda e, now: e.update(open_until=now - 1))
+        events = queue.Queue()
+        _call_fallbacks(
+            _FakeLLM(), [{"role": "user", "content": "hi"}], "primary/m", ["fb1/m"],
+            None, "low", 3, self.root, "t1", 1, events, {}, "", None, lambda _t: None, True,
+        )
+        seen = [events.get(timeout=5) for _ in range(2)]
+        probe = [e for e in seen if e["category"] == "probe"]
+        self.assertEqual([(e["type"], e["model"], e["cost"]) for e in probe], [("llm_usage", "primary/m", 0.001)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the shared pricing table (ouroboros/pricing.py).
+
+Run: pytest tests/test_pricing.py -v
+"""
+
+import fcntl
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestPricing(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmpdir.name) / "state" / "pricing.json"
+        self.path.parent.mkdir()
+        from ouroboros import pricing
+        self.pricing = pricing
+        pricing.set_cache_path(self.path)
+        pricing._last_attempt = time.time()  # no background fetches in tests
+
+    def tearDown(self):
+        self.pricing.set_cache_path(None)
+        self._tmpdir.cleanup()
+
+    def _write_cache(self, models, fetched_at=None):
+        self.path.write_text(json.dumps({
+            "fetched_at": time.time() if fetched_at is None else fetched_at,
+            "etag": '"v1"', "models": models,
+        }), encoding="utf-8")
+        self.pricing._last_stat = 0.0
+
+    def test_static_fallback_and_prefix_match(self):
+        p = self.pricing
+        self.assertEqual(p.lookup("anthropic/claude-sonnet-4.6"), (3.0, 0.30, 15.0))
+        # Longest prefix wins: "openai/o3-pro" over "openai/o3".
+        self.assertEqual(p.lookup("openai/o3-pro-2026"), (20.0, 1.0, 80.0))
+        self.assertEqual(p.lookup("openai/o3-mini"), (2.0, 0.50, 8.0))
+        self.assertIsNone(p.lookup("unknown/model"))
+        self.assertEqual(p.estimate_cost("unknown/model", 1000, 1000), 0.0)
+        self.assertAlmostEqual(p.estimate_cost("anthropic/claude-sonnet-4.6", 1_000_000, 0, 500_000), 1.65)
+
+    def test_cache_file_overrides_static(self):
+        self._write_cache({"anthropic/claude-sonnet-4.6": [4.0, 0.4, 20.0], "meta-llama/llama-4": [0.1, 0.01, 0.2]})
+        self.assertEqual(self.pricing.lookup("anthropic/claude-sonnet-4.6"), (4.0, 0.4, 20.0))
+        self.assertEqual(self.pricing.lookup("meta-llama/llama-4:free"), (0.1, 0.01, 0.2))
+        self.assertEqual(self.pricing.lookup("openai/o3"), (2.0, 0.50, 8.0))  # static still there
+
+    def test_refresh_skips_when_fresh_or_locked(self):
+        self._write_cache({"openai/o3": [1.0, 0.1, 2.0]})
+        self.assertFalse(self.pricing.refresh())  # within TTL
+        lock_path = self.path.with_name(self.path.name + ".lock")
+        with lock_path.open("a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            self.assertFalse(self.pricing.refresh(force=True))  # another process holds it
+
+    def test_parse_catalogue(self):
+        data = {"data": [
+            {"id": "openai/gpt-5", "pricing": {"prompt": "0.00000125", "completion": "0.00001",
+                                                "input_cache_read": "0.000000125"}},
+            {"id": "google/gemini-x", "pricing": {"prompt": "0.000002", "completion": "0.000012"}},
+            {"id": "mistral/other", "pricing": {"prompt": "0.000001", "completion": "0.000001"}},
+            {"id": "openai/free", "pricing": {"prompt": "0", "completion": "0"}},
+        ]}
+        self.assertEqual(self.pricing.parse_catalogue(data), {
+            "openai/gpt-5": (1.25, 0.125, 10.0),
+            "google/gemini-x": (2.0, 0.2, 12.0),
+            "openai/free": (0.0, 0.0, 0.0),
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for the task-scoped read cache (ouroboros/read_cache.py).
+
+Run: pytest tests/test_read_cache.py -v
+"""
+
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _age(path, seconds=60):
+    t = time.time() - seconds
+    os.utime(path, (t, t))
+
+
+class TestReadCache(unittest.TestCase):
+
+    def setUp(self):
+        from ouroboros.tools.registry import ToolRegistry
+        self._tmpdir = tempfile.TemporaryDirectory()
+        base = pathlib.Path(self._tmpdir.name)
+        self.repo = base / "repo"
+        self.drive = base / "drive"
+        (self.repo / "pkg").mkdir(parents=True)
+        (self.drive / "memory").mkdir(parents=True)
+        subprocess.run(["git", "init", "-q"], cwd=self.repo, check=True)
+        for p, text in [(self.repo / "pkg" / "a.py", "A = 1\n"), (self.drive / "memory" / "scratchpad.md", "notes")]:
+            p.write_text(text, encoding="utf-8")
+            _age(p)
+        _age(self.repo / "pkg")
+        _age(self.drive / "memory")
+        self.registry = ToolRegistry(repo_dir=self.repo, drive_root=self.drive)
+        self.cache = self.registry._ctx.read_cache
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_repeated_reads_hit(self):
+        for _ in range(3):
+            self.assertEqual(self.registry.execute("repo_read", {"path": "pkg/a.py"}), "A = 1\n")
+            self.assertIn("pkg/a.py", self.registry.execute("repo_list", {"dir": "pkg"}))
+        st = self.cache.stats()
+        self.assertEqual((st["hits"], st["misses"]), (4, 2))
+        self.assertAlmostEqual(st["hit_rate"], 0.667)
+
+    def test_changed_signature_is_reread(self):
+        self.registry.execute("repo_read", {"path": "pkg/a.py"})
+        p = self.repo / "pkg" / "a.py"
+        p.write_text("A = 22\n", encoding="utf-8")
+        _age(p, 30)
+        self.assertEqual(self.registry.execute("repo_read", {"path": "pkg/a.py"}), "A = 22\n")
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    def test_racy_files_not_cached(self):
+        (self.repo / "fresh.py").write_text("x", encoding="utf-8")
+        self.registry.execute("repo_read", {"path": "fresh.py"})
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_drive_write_invalidates_same_signature(self):
+        self.registry.execute("drive_read", {"path": "memory/scratchpad.md"})
+        self.registry.execute("drive_list", {"dir": "memory"})
+        mtime = (self.drive / "memory" / "scratchpad.md").stat().st_mtime_ns
+        self.registry.execute("drive_write", {"path": "memory/scratchpad.md", "content": "NOTES"})
+        p = self.drive / "memory" / "scratchpad.md"
+        os.utime(p, ns=(mtime, mtime))  # same (mtime, size): only invalidation can catch it
+        self.assertEqual(self.registry.execute("drive_read", {"path": "memory/scratchpad.md"}), "NOTES")
+        self.assertEqual(self.cache.stats()["invalidations"], 2)  # the file and its dir listing
+
+    def test_run_shell_sweeps_dirty_files(self):
+        p = self.repo / "pkg" / "a.py"
+        self.registry.execute("repo_read", {"path": "pkg/a.py"})
+        mtime = p.stat().st_mtime_ns
+        self.registry.execute("run_shell", {"cmd": ["python", "-c", "open('pkg/a.py', 'w').write('B = 1\\n')"]})
+        os.utime(p, ns=(mtime, mtime))
+        self.assertEqual(self.registry.execute("repo_read", {"path": "pkg/a.py"}), "B = 1\n")
+
+    def test_reads_do_not_invalidate(self):
+        self.registry.execute("repo_read", {"path": "pkg/a.py"})
+        self.registry.execute("git_status", {})
+        self.registry.execute("repo_read", {"path": "pkg/a.py"})
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
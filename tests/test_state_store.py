@@ -0,0 +1,172 @@
+"""
+Tests for the SQLite state backend (supervisor/state_store.py).
+
+Run: pytest tests/test_state_store.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestSqliteStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _store(self):
+        from supervisor.state_store import SqliteStateStore
+        return SqliteStateStore(self.root / "state.db")
+
+    def test_migrates_json_once(self):
+        legacy = self.root / "state.json"
+        legacy.write_text(json.dumps({"owner_id": 7, "spent_usd": 1.5}), encoding="utf-8")
+        store = self._store()
+        self.assertTrue(store.migrate_from_json(legacy))
+        self.assertEqual(store.load_all(), {"owner_id": 7, "spent_usd": 1.5})
+        self.assertIn("state.json", store.get_meta("migrated_from"))
+        self.assertFalse(store.migrate_from_json(legacy))
+
+    def test_save_writes_only_changed_keys_and_preserves_counters(self):
+        store = self._store()
+        store.set_many({"a": 1, "b": [1, 2], "spent_usd": 0.0, "old": True})
+        store.increment({"spent_usd": 2.0})
+        stale = {"a": 1, "b": [1, 2], "spent_usd": 0.0, "new": "x"}
+        self.assertEqual(store.save(stale, preserve_keys=("spent_usd",)), 2)  # +new, -old
+        self.assertEqual(store.load_all(), {"a": 1, "b": [1, 2], "spent_usd": 2.0, "new": "x"})
+
+    def test_increment_is_atomic_across_threads(self):
+        store = self._store()
+
+        def bump():
+            for _ in range(50):
+                store.increment({"spent_calls": 1, "spent_usd": 0.5})
+
+        threads = [threading.Thread(target=bump) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        st = store.load_all()
+        self.assertEqual(st["spent_calls"], 200)
+        self.assertAlmostEqual(st["spent_usd"], 100.0)
+
+
+class TestStateModuleSqliteBackend(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        import supervisor.state as state
+        self.state = state
+        self._old_backend = state.STATE_BACKEND
+        state.STATE_BACKEND = "sqlite"
+        self._env = mock.patch.dict(os.environ, {"OUROBOROS_STATE_DB": str(self.root / "local" / "state.db")})
+        self._env.start()
+        (self.root / "state").mkdir()
+        (self.root / "state" / "state.json").write_text(json.dumps({"owner_id": 42}), encoding="utf-8")
+        state.init(self.root, 100.0)
+
+    def tearDown(self):
+        self._env.stop()
+        self.state.STATE_BACKEND = self._old_backend
+        self.state.init(pathlib.Path("/content/drive/MyDrive/Ouroboros"), 0.0)
+        self._tmpdir.cleanup()
+
+    def test_stale_dict_writes_only_its_own_changes(self):
+        first = self.state.load_state()
+        first["note"] = "x"
+        self.state.save_state(first)
+        a = self.state.load_state()
+        b = self.state.load_state()
+        b["tg_offset"] = 7
+        b["last_owner_message_at"] = "later"
+        b.pop("note")
+        self.state.save_state(b)
+        a["owner_id"] = 43
+        self.state.save_state(a)  # a never saw b's changes
+        st = self.state.load_state()
+        self.assertEqual((st["owner_id"], st["tg_offset"], st["last_owner_message_at"]), (43, 7, "later"))
+        self.assertNotIn("note", st)
+        a["owner_id"] = 44
+        self.state.save_state(a)  # the base follows each save
+        self.assertEqual(self.state.load_state()["tg_offset"], 7)
+
+    def test_default_db_is_not_on_drive(self):
+        with mock.patch.dict(os.environ, {"OUROBOROS_STATE_DB": ""}):
+            self.state.init(self.root, 100.0)
+            self.assertNotIn(str(self.root), str(self.state.STATE_DB_PATH))
+        self.state.init(self.root, 100.0)
+        self.assertEqual(self.state.STATE_DB_PATH, self.root / "local" / "state.db")
+
+    def test_load_save_and_budget(self):
+        st = self.state.load_state()
+        self.assertEqual(st["owner_id"], 42)  # migrated
+        self.state.update_budget_from_usage({"cost": 1.25, "rounds": 1, "prompt_tokens": 10})
+        st["tg_offset"] = 99
+        st["spent_usd"] = 0.0  # stale counter must not roll back spend
+        self.state.save_state(st)
+        st2 = self.state.load_state()
+        self.assertEqual(st2["tg_offset"], 99)
+        self.assertAlmostEqual(st2["spent_usd"], 1.25)
+        self.assertEqual(st2["spent_tokens_prompt"], 10)
+        self.state._trailing_mirror()
+        mirror = json.loads((self.root / "state" / "state.json").read_text(encoding="utf-8"))
+        self.assertEqual(mirror["tg_offset"], 99)
+        self.assertAlmostEqual(mirror["spent_usd"], 1.25)
+
+
+class TestLoadStateCache(unittest.TestCase):
+    """load_state() on the json backend skips the re-read while state.json is unchanged."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        import supervisor.state as state
+        self.state = state
+        self._old_backend = state.STATE_BACKEND
+        state.STATE_BACKEND = "json"
+        state.init(self.root, 100.0)
+
+    def tearDown(self):
+        self.state.STATE_BACKEND = self._old_backend
+        self.state.init(pathlib.Path("/content/drive/MyDrive/Ouroboros"), 0.0)
+        self._tmpdir.cleanup()
+
+    def test_hits_until_file_changes(self):
+        state = self.state
+        st = state.load_state()
+        st["owner_id"] = 5
+        state.save_state(st)
+        before = state.state_cache_stats()
+        for _ in range(3):
+            got = state.load_state()
+            self.assertEqual(got["owner_id"], 5)
+            got["owner_id"] = 999  # callers get private copies
+        after = state.state_cache_stats()
+        self.assertEqual(after["hits"] - before["hits"], 3)
+        self.assertEqual(after["misses"], before["misses"])
+
+        # Another process rewrites state.json: the stat key changes, so we re-read.
+        raw = json.loads(state.STATE_PATH.read_text(encoding="utf-8"))
+        raw["owner_id"] = 6
+        state.atomic_write_text(state.STATE_PATH, json.dumps(raw))
+        self.assertEqual(state.load_state()["owner_id"], 6)
+        self.assertEqual(state.state_cache_stats()["misses"], after["misses"] + 1)
+        self.assertEqual(state.load_state()["owner_id"], 6)
+        self.assertEqual(state.state_cache_stats()["hits"], after["hits"] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
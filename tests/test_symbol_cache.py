@@ -0,0 +1,127 @@
+"""
+Tests for the persistent symbol cache (ouroboros/symbol_cache.py).
+
+Run: pytest tests/test_symbol_cache.py -v
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+REPO = pathlib.Path(__file__).resolve().parent.parent
+
+MODULE = '''
+class Foo:
+    def bar(self):
+        return 1
+
+    # comment
+    async def baz(self):
+        pass
+
+
+def top(x):
+    if x:
+        return x
+    return None
+'''
+
+
+class TestSymbolCache(unittest.TestCase):
+
+    def setUp(self):
+        from ouroboros.symbol_cache import SymbolCache
+        self._tmpdir = tempfile.TemporaryDirectory()
+        base = pathlib.Path(self._tmpdir.name)
+        self.repo = base / "repo"
+        (self.repo / "pkg").mkdir(parents=True)
+        (base / "drive").mkdir()
+        self.cache_path = base / "drive" / "cache" / "symbols.json"
+        self.cache = SymbolCache(self.cache_path)
+        self.files = []
+        for i in range(3):
+            p = self.repo / "pkg" / f"m{i}.py"
+            p.write_text(MODULE + f"\ndef f{i}():\n    pass\n", encoding="utf-8")
+            self.files.append(p)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_analyze_source(self):
+        from ouroboros.symbol_cache import analyze_source
+        rec = analyze_source(MODULE, "m.py")
+        self.assertEqual(rec["classes"], ["Foo"])
+        self.assertEqual(rec["functions"], ["top", "bar", "baz"])
+        self.assertEqual(rec["def_spans"], [[2, 4], [6, 4], [10, 4]])
+        self.assertTrue(analyze_source("def (:\n", "bad.py")["syntax_error"])
+        self.assertEqual(analyze_source("def x():\n", "notes.md")["def_spans"], [])
+
+    def test_only_changed_files_are_reparsed(self):
+        with mock.patch("ouroboros.symbol_cache.analyze_source",
+                        wraps=__import__("ouroboros.symbol_cache").symbol_cache.analyze_source) as parse:
+            self.cache.for_files(self.files)
+            self.assertEqual(parse.call_count, 3)
+            self.files[1].write_text("def changed():\n    pass\n", encoding="utf-8")
+            records = self.cache.for_files(self.files)
+            self.assertEqual(parse.call_count, 4)
+        self.assertEqual(records[self.files[1]]["functions"], ["changed"])
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_persisted_across_instances(self):
+        from ouroboros.symbol_cache import SymbolCache
+        self.cache.for_files(self.files)
+        self.assertTrue(self.cache_path.exists())
+        other = SymbolCache(self.cache_path)
+        with mock.patch("ouroboros.symbol_cache._analyze_file") as analyze:
+            records = other.for_files(self.files)
+        analyze.assert_not_called()
+        self.assertEqual(records[self.files[0]]["functions"], ["top", "f0", "bar", "baz"])
+        # Same content under a new path (e.g. a renamed file) reuses the record by hash
+        self.assertEqual(other.for_texts([("x.py", self.files[2].read_text(encoding="utf-8"))])[0]["lines"],
+                         records[self.files[2]]["lines"])
+        self.assertEqual(other.stats()["misses"], 0)
+
+    def test_digest_uses_cache(self):
+        from ouroboros.symbol_cache import symbol_cache
+        from ouroboros.tools.core import _codebase_digest
+        from ouroboros.tools.registry import ToolContext
+        (self.repo / "README.md").write_text("# x\n\ny\n", encoding="utf-8")
+        ctx = ToolContext(repo_dir=self.repo, drive_root=self.repo.parent / "drive")
+        with mock.patch("ouroboros.tools.core.symbol_cache", self.cache):
+            first = _codebase_digest(ctx)
+            second = _codebase_digest(ctx)
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("Codebase Digest (4 files, 54 lines, 12 functions)"))
+        self.assertIn("== pkg/m0.py (17 lines) ==\n  Classes: Foo\n  Functions: top, f0, bar, baz", first)
+        self.assertIn("== README.md (3 lines) ==", first)
+        self.assertEqual(self.cache.stats()["hits"], 4)
+        self.assertIsNot(symbol_cache, self.cache)
+
+
+class TestComplexityMetrics(unittest.TestCase):
+
+    def test_repo_metrics_match_line_heuristic(self):
+        from ouroboros.review import compute_complexity_metrics
+        from ouroboros.symbol_cache import SymbolCache
+        sections = []
+        for p in sorted((REPO / "ouroboros").rglob("*.py")):
+            sections.append((p.relative_to(REPO).as_posix(), p.read_text(encoding="utf-8")))
+        sections.append(("README.md", (REPO / "README.md").read_text(encoding="utf-8")))
+        expected = sum(1 for _, text in sections if _.endswith(".py")
+                       for line in text.splitlines()
+                       if line.strip().startswith(("def ", "async def ")))
+        with tempfile.TemporaryDirectory() as tmp:
+            with mock.patch("ouroboros.review.symbol_cache", SymbolCache(pathlib.Path(tmp) / "x" / "s.json")):
+                metrics = compute_complexity_metrics(sections)
+        self.assertEqual(metrics["total_functions"], expected)
+        self.assertEqual(metrics["py_files"], len(sections) - 1)
+        self.assertEqual(metrics["oversized_modules"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for tool-history compaction (ouroboros/context.py).
+
+Run: pytest tests/test_tool_compaction.py -v
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _round(messages, n, result_len=500):
+    messages.append({"role": "assistant", "content": f"step {n} " + "why " * 100, "tool_calls": [
+        {"id": f"c{n}", "type": "function",
+         "function": {"name": "repo_read", "arguments": '{"path": "f%d.py"}' % n}},
+    ]})
+    messages.append({"role": "tool", "tool_call_id": f"c{n}", "content": f"result {n}\n" + "x" * result_len})
+
+
+class TestToolHistoryCompactor(unittest.TestCase):
+
+    def _conversation(self, rounds):
+        messages = [{"role": "system", "content": [{"type": "text", "text": "sys"}]},
+                    {"role": "user", "content": "task"}]
+        for n in range(rounds):
+            _round(messages, n)
+        return messages
+
+    def test_matches_one_shot_compaction(self):
+        from ouroboros.context import ToolHistoryCompactor, compact_tool_history
+        messages = self._conversation(20)
+        messages.insert(9, {"role": "user", "content": "owner says hi"})
+        expected = compact_tool_history(list(messages), keep_recent=6)
+        self.assertEqual(ToolHistoryCompactor(6).compact(list(messages)), expected)
+        self.assertEqual(expected[9], {"role": "user", "content": "owner says hi"})
+        self.assertTrue(expected[-1]["content"].endswith("x" * 100))  # recent rounds intact
+        self.assertIn("chars)", expected[3]["content"])
+
+    def test_each_round_compacted_once_and_prefix_stable(self):
+        from ouroboros import context
+        compactor = context.ToolHistoryCompactor(keep_recent=6)
+        messages = self._conversation(7)
+        calls = []
+        original = context._compact_tool_result
+
+        def counting(msg, content):
+            calls.append(msg["tool_call_id"])
+            return original(msg, content)
+
+        context._compact_tool_result = counting
+        try:
+            compactor.compact(messages)
+            prefix = [dict(m) for m in messages[:4]]
+            for n in range(7, 30):
+                _round(messages, n)
+                compactor.compact(messages)
+                self.assertEqual(messages[:4], prefix)  # compacted rounds never rewritten
+        finally:
+            context._compact_tool_result = original
+        self.assertEqual(calls, [f"c{n}" for n in range(24)])
+        self.assertEqual(len(messages), 2 + 60)
+
+    def test_mark_compacted_after_llm_compaction(self):
+        from ouroboros.context import ToolHistoryCompactor
+        compactor = ToolHistoryCompactor(keep_recent=6)
+        messages = self._conversation(10)
+        compactor.mark_compacted(messages, keep_recent=2)
+        before = list(messages)
+        compactor.compact(messages)
+        self.assertEqual(messages, before)  # rounds 0-7 treated as already compacted
+
+
+if __name__ == "__main__":
+    unittest.main()
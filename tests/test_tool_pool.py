@@ -0,0 +1,117 @@
+"""
+Tests for the persistent tool runner pool (ouroboros/tool_pool.py).
+
+Run: pytest tests/test_tool_pool.py -v
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestToolRunnerPool(unittest.TestCase):
+
+    def setUp(self):
+        from ouroboros.tool_pool import ToolRunnerPool
+        self.pool = ToolRunnerPool(size=2, max_orphans=1, name="test_runner")
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.pool.shutdown()
+
+    def _hang(self):
+        self.release.wait(10)
+        return "late"
+
+    def test_threads_are_reused(self):
+        names = {self.pool.run(lambda: threading.current_thread().name, timeout=5) for _ in range(20)}
+        self.assertEqual(len(names), 1)
+        st = self.pool.stats()
+        self.assertEqual((st["threads_started"], st["completed"], st["busy"], st["idle"]), (1, 20, 0, 1))
+
+    def test_timeout_orphans_and_replaces(self):
+        with self.assertRaises(TimeoutError):
+            self.pool.run(self._hang, timeout=0.05, name="hang")
+        st = self.pool.stats()
+        self.assertEqual((st["orphaned"], st["timeouts"]), (1, 1))
+        self.assertEqual(st["in_flight"][0]["name"], "hang")
+        self.assertTrue(st["in_flight"][0]["orphaned"])
+        # The pool keeps serving at full strength.
+        self.assertEqual(self.pool.run(lambda: 42, timeout=5), 42)
+
+        self.release.set()
+        deadline = time.time() + 5
+        while self.pool.stats()["orphaned"] and time.time() < deadline:
+            time.sleep(0.01)
+        st = self.pool.stats()
+        self.assertEqual(st["orphaned"], 0)
+        self.assertLessEqual(st["threads"], self.pool.size)
+
+    def test_orphan_cap_bounds_threads(self):
+        for _ in range(4):
+            with self.assertRaises(TimeoutError):
+                self.pool.run(self._hang, timeout=0.05)
+        st = self.pool.stats()
+        self.assertLessEqual(st["threads"] + st["orphaned"], self.pool.size + self.pool.max_orphans)
+        self.assertGreater(st["short_handed"], 0)
+        alive = [t for t in threading.enumerate() if t.name.startswith("test_runner")]
+        self.assertLessEqual(len(alive), self.pool.size + self.pool.max_orphans)
+
+    def test_queued_call_is_cancelled_not_orphaned(self):
+        for _ in range(2):
+            self.pool.submit(self._hang)
+        future = self.pool.submit(lambda: "never")
+        self.pool.abandon(future)
+        self.assertTrue(future.cancelled())
+        self.assertEqual(self.pool.stats()["orphaned"], 0)
+
+
+class TestLoopUsesPool(unittest.TestCase):
+
+    def test_parallel_batch_times_out_per_call(self):
+        import pathlib
+        import tempfile
+        import types
+        from ouroboros.loop import _handle_tool_calls
+        from ouroboros.tool_pool import get_pool
+
+        release = threading.Event()
+
+        class Tools:
+            CODE_TOOLS = frozenset()
+
+            def get_timeout(self, name):
+                return 0.2
+
+            def access(self, name, args):
+                return "read", ("repo",)
+
+            def execute(self, name, args):
+                if args.get("path") == "slow":
+                    release.wait(10)
+                return f"read {args['path']}"
+
+        calls = [{"id": f"c{i}", "function": {"name": "repo_read", "arguments": f'{{"path": "{p}"}}'}}
+                 for i, p in enumerate(["a", "slow", "b"])]
+        messages, trace = [], {"tool_calls": []}
+        before = get_pool().stats()["timeouts"]
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.time()
+            errors = _handle_tool_calls(calls, Tools(), pathlib.Path(tmp), "t1", types.SimpleNamespace(),
+                                        messages, trace, lambda _: None)
+            elapsed = time.time() - started
+        release.set()
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(errors, 1)
+        self.assertEqual([m["tool_call_id"] for m in messages], ["c0", "c1", "c2"])
+        self.assertIn("TOOL_TIMEOUT", messages[1]["content"])
+        self.assertEqual(get_pool().stats()["timeouts"], before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for conflict-aware tool batch scheduling (ouroboros/tool_scheduler.py).
+
+Run: pytest tests/test_tool_scheduler.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _tc(i, name, **args):
+    return {"id": f"c{i}", "function": {"name": name, "arguments": json.dumps(args)}}
+
+
+class TestConflicts(unittest.TestCase):
+
+    def setUp(self):
+        from ouroboros.tools.registry import ToolRegistry
+        self._tmpdir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self._tmpdir.name)
+        self.registry = ToolRegistry(repo_dir=root, drive_root=root)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _deps(self, calls):
+        from ouroboros.loop import _call_access
+        from ouroboros.tool_scheduler import build_dag
+        return build_dag([_call_access(self.registry, tc) for tc in calls])
+
+    def test_resource_keys(self):
+        from ouroboros.tool_scheduler import conflicts
+        self.assertTrue(conflicts(("write", ("drive",)), ("read", ("drive/memory/x.md",))))
+        self.assertFalse(conflicts(("write", ("drive/memory/x.md",)), ("read", ("drive/memory/xy.md",))))
+        self.assertFalse(conflicts(("read", ("repo",)), ("read", ("repo",))))
+        self.assertTrue(conflicts(("exclusive", ()), ("read", ())))
+
+    def test_mixed_batch_keeps_order_only_on_conflicts(self):
+        calls = [
+            _tc(0, "repo_read", path="a.py"),
+            _tc(1, "knowledge_write", topic="notes", content="x"),
+            _tc(2, "repo_read", path="b.py"),
+            _tc(3, "drive_write", path="memory/x.md", content="x"),
+            _tc(4, "drive_read", path="memory/x.md"),
+            _tc(5, "drive_read", path="memory/y.md"),
+            _tc(6, "knowledge_read", topic="notes"),
+            _tc(7, "run_shell", cmd=["ls"]),
+            _tc(8, "repo_read", path="c.py"),
+        ]
+        deps = self._deps(calls)
+        self.assertEqual(deps[:3], [set(), set(), set()])  # the knowledge write no longer serializes reads
+        self.assertEqual(deps[4], {3})  # read after write of the same path
+        self.assertEqual(deps[5], set())
+        self.assertEqual(deps[6], {1})
+        self.assertEqual(deps[7], set(range(7)))  # run_shell is exclusive
+        self.assertEqual(deps[8], {7})
+
+    def test_repo_and_git(self):
+        deps = self._deps([
+            _tc(0, "repo_write_commit", path="x.py", content="", commit_message="m"),
+            _tc(1, "git_status"),
+            _tc(2, "web_search", query="q"),
+            _tc(3, "browse_page", url="https://example.com"),
+            _tc(4, "browser_action", action="screenshot"),
+        ])
+        self.assertEqual(deps, [set(), {0}, set(), set(), {3}])
+
+    def test_paid_tools_are_serialized_and_never_early(self):
+        deps = self._deps([
+            _tc(0, "multi_model_review", content="c", prompt="p", models=["a"]),
+            _tc(1, "vlm_query", prompt="p"),
+            _tc(2, "repo_read", path="a.py"),
+        ])
+        self.assertEqual(deps, [set(), {0}, set()])
+        for name in ("multi_model_review", "vlm_query", "analyze_screenshot", "web_search"):
+            self.assertFalse(self.registry.can_start_early(name), name)
+        self.assertTrue(self.registry.can_start_early("repo_read"))
+
+    def test_override_handler_keeps_metadata(self):
+        self.registry.override_handler("repo_read", lambda ctx, **kw: "x")
+        self.assertEqual(self.registry.access("repo_read", {"path": "./a/../b.py"}), ("read", ("repo/b.py",)))
+        self.assertTrue(self.registry.is_read_only("repo_read"))
+        self.assertIn("run_shell", self.registry.CODE_TOOLS)
+
+
+class TestRunDag(unittest.TestCase):
+
+    def test_parallel_where_allowed_and_results_in_order(self):
+        from ouroboros.tool_pool import ToolRunnerPool
+        from ouroboros.tool_scheduler import run_dag
+        pool = ToolRunnerPool(size=4, name="dag_test")
+        log = []
+        lock = threading.Lock()
+
+        def work(i, delay):
+            with lock:
+                log.append(("start", i))
+            time.sleep(delay)
+            with lock:
+                log.append(("end", i))
+            return f"r{i}"
+
+        delays = [0.2, 0.2, 0.01, 0.2]
+        deps = [set(), set(), {0}, set()]
+        started = time.time()
+        results = run_dag(deps, lambda i: pool.submit(work, i, delays[i]), lambda i: 5,
+                          lambda i, f: "timeout", lambda i, e: "error")
+        elapsed = time.time() - started
+        pool.shutdown()
+        self.assertEqual(results, ["r0", "r1", "r2", "r3"])
+        self.assertLess(elapsed, 0.5)  # 0, 1, 3 overlap; serial would be 0.61s
+        self.assertLess(log.index(("end", 0)), log.index(("start", 2)))
+
+    def test_timeout_releases_dependents(self):
+        from ouroboros.tool_pool import ToolRunnerPool
+        from ouroboros.tool_scheduler import run_dag
+        pool = ToolRunnerPool(size=2, name="dag_test")
+        release = threading.Event()
+        fns = [lambda: release.wait(5) and "late", lambda: "ok"]
+        results = run_dag([set(), {0}], lambda i: pool.submit(fns[i]), lambda i: 0.1,
+                          lambda i, f: (pool.abandon(f), "timeout")[1], lambda i, e: repr(e))
+        release.set()
+        pool.shutdown()
+        self.assertEqual(results, ["timeout", "ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()